@@ -63,10 +63,37 @@ def parse_args(argv):
         'into benchmarked tables.',
         action='store_true')
     parser.add_argument(
-        '--restart_file',
-        help='File to start with when creating files if program failed in '
-        'the middle of file creation. Can only be used with '
-        '--create_files flag.')
+        '--progress_file',
+        help='Optional local file that records the files that have been '
+        'created, so that file creation can continue where it stopped if the '
+        'program failed in the middle of file creation. Use a separate file '
+        'for each bucket. Can only be used with --create_files flag.')
+    parser.add_argument(
+        '--max_concurrent_jobs',
+        type=int,
+        default=load_file_generator.DEFAULT_MAX_CONCURRENT_JOBS,
+        help='Maximum number of extract or Dataflow jobs run at the same '
+        'time when creating files. Can only be used with --create_files '
+        'flag.')
+    parser.add_argument(
+        '--use_dataflow',
+        help='Flag to generate parquet files, and avro files from staging '
+        'tables greater than 1 GB, using Dataflow instead of writing them '
+        'locally. Can only be used with --create_files flag.',
+        action='store_true')
+    parser.add_argument(
+        '--synthetic_file_rows',
+        help='Flag to write the local parquet and avro files from random rows '
+        'with the schema, number of rows, and size of the staging tables '
+        'instead of reading the staging table rows. Can only be used with '
+        '--create_files flag.',
+        action='store_true')
+    parser.add_argument(
+        '--max_file_processes',
+        type=int,
+        help='Maximum number of processes writing parquet and avro files '
+        'locally at the same time. Defaults to the number of CPUs. Can only '
+        'be used with --create_files flag.')
     parser.add_argument(
         '--create_benchmark_tables',
         help='Flag to initiate process of creating benchmarked tables '
@@ -181,8 +208,6 @@ def parse_args(argv):
             '--gcs_project_id': args.gcs_project_id,
             '--resized_staging_dataset_id': args.resized_staging_dataset_id,
             '--bucket_name': args.bucket_name,
-            '--dataflow_staging_location': args.dataflow_staging_location,
-            '--dataflow_temp_location': args.dataflow_temp_location,
         }
         missing_arguments = ", ".join(
             [arg for arg in required_args if not required_args[arg]])
@@ -190,13 +215,17 @@ def parse_args(argv):
             parser.error(
                 missing_args_error.format(missing_arguments, '--create_files'))
 
-    if args.restart_file:
-        required_args = {'--create_files': args.create_files}
+    if args.use_dataflow:
+        required_args = {
+            '--create_files': args.create_files,
+            '--dataflow_staging_location': args.dataflow_staging_location,
+            '--dataflow_temp_location': args.dataflow_temp_location,
+        }
         missing_arguments = ", ".join(
             [arg for arg in required_args if not required_args[arg]])
         if missing_arguments:
             parser.error(
-                missing_args_error.format(missing_arguments, '--restart_file'))
+                missing_args_error.format(missing_arguments, '--use_dataflow'))
 
     if args.run_file_loader_benchmark:
         required_args = {
@@ -247,7 +276,11 @@ def main(argv=None):
     benchmark_table_schemas_dir = args.benchmark_table_schemas_directory
     create_staging_tables = args.create_staging_tables
     create_files = args.create_files
-    restart_file = args.restart_file
+    progress_file = args.progress_file
+    max_concurrent_jobs = args.max_concurrent_jobs
+    use_dataflow = args.use_dataflow
+    synthetic_file_rows = args.synthetic_file_rows
+    max_file_processes = args.max_file_processes
     run_file_loader_benchmark = args.run_file_loader_benchmark
     run_federated_query_benchmark = args.run_federated_query_benchmark
     duplicate_benchmark_tables = args.duplicate_benchmark_tables
@@ -311,10 +344,12 @@ def main(argv=None):
             file_params=file_params,
             dataflow_staging_location=dataflow_staging_location,
             dataflow_temp_location=dataflow_temp_location,
+            max_concurrent_jobs=max_concurrent_jobs,
+            progress_file=progress_file,
+            use_dataflow=use_dataflow,
+            synthetic_rows=synthetic_file_rows,
+            max_processes=max_file_processes,
         )
-        if restart_file:
-            benchmark_load_file_generator.restart_incomplete_combination(
-                restart_file)
         benchmark_load_file_generator.create_files()
 
     if run_file_loader_benchmark:
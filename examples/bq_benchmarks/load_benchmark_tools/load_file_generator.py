@@ -12,10 +12,13 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+from concurrent.futures import as_completed
+from concurrent.futures import ProcessPoolExecutor
 from concurrent.futures import ThreadPoolExecutor
 import hashlib
 import itertools
 import logging
+import multiprocessing
 
 import apache_beam as beam
 from apache_beam.io.gcp.internal.clients import bigquery as beam_bigquery
@@ -29,8 +32,12 @@ from generic_benchmark_tools import bucket_util
 from generic_benchmark_tools import file_constants
 from generic_benchmark_tools import parquet_util
 from generic_benchmark_tools import table_util
+from load_benchmark_tools import load_file_progress
+from load_benchmark_tools import local_file_writer
 
 MAX_COMPOSABLE_BLOBS = 32
+DEFAULT_MAX_CONCURRENT_JOBS = 8
+MAX_CONCURRENT_COPIES = 64
 
 
 class FileGenerator(object):
@@ -41,8 +48,11 @@ class FileGenerator(object):
     from the resized staging tables in BigQuery and stores in the provided GCS
     bucket. If the file type is csv, json, or avro (generated from a table 1 GB
     or less), it is generated using BigQUery extract jobs. If the file type is
-    parquet or avro (generated from a table greater than 1 GB), it is generated
-    using DataFlow.
+    parquet or avro (generated from a table greater than 1 GB), it is written
+    locally in a separate process and uploaded to GCS, or generated using
+    DataFlow if use_dataflow is True. Independent jobs run concurrently, and
+    each file is copied to the combinations with more files as soon as it is
+    created.
 
     Attributes:
         bq_client(google.cloud.bigquery.client.Client): Client to hold
@@ -69,6 +79,19 @@ class FileGenerator(object):
             saved in.
         dataflow_staging_location(str): GCS staging path for dataflow jobs.
         dataflow_temp_location(str): GCS temp path for dataflow jobs.
+        max_concurrent_jobs(int): Maximum number of extract or DataFlow jobs
+            that run at the same time.
+        use_dataflow(bool): If True, parquet files and avro files generated
+            from tables greater than 1 GB are generated using DataFlow instead
+            of being written locally.
+        synthetic_rows(bool): If True, the locally written files contain random
+            rows with the schema, number of rows, and size of the staging
+            table instead of the rows of the staging table.
+        max_processes(int): Maximum number of processes writing files locally
+            at the same time. Defaults to the number of CPUs.
+        progress(load_benchmark_tools.load_file_progress.FileProgress):
+            Record of the files that have been created, kept in the
+            progress_file so that the program can be stopped and restarted.
     """
 
     def __init__(
@@ -79,6 +102,11 @@ class FileGenerator(object):
             file_params,
             dataflow_staging_location,
             dataflow_temp_location,
+            max_concurrent_jobs=DEFAULT_MAX_CONCURRENT_JOBS,
+            progress_file=None,
+            use_dataflow=False,
+            synthetic_rows=False,
+            max_processes=None,
     ):
         self.bq_client = bigquery.Client()
         self.gcs_client = storage.Client()
@@ -96,41 +124,12 @@ class FileGenerator(object):
                                                   file_params=file_params)
         self.dataflow_staging_location = dataflow_staging_location
         self.dataflow_temp_location = dataflow_temp_location
-
-    def restart_incomplete_combination(self, restart_file):
-        """Restarts file generation at a specific file if program was stopped.
-
-        When the extract_tables_to_files() method runs, it will skip any
-        combination that contains at least one file. However, sometimes the
-        program may time out, or a backend error will occur, meaning a
-        combination may not have a complete set of files. When this happens,
-        restart_incomplete_combination can be used to restart file generation
-        for a combination at the last file that was successfully created.
-
-        Args:
-            restart_file(str): the file last successful file that was created
-                in an incomplete perumtation. The string should start with
-                'fileType=' and end with the file extension.
-                # pylint: disable=line-too-long
-                Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=10000/tableSize=2147MB/file3876.csv
-        """
-
-        source_blob_name = restart_file
-        restart_file_split = restart_file.split('/')
-        destination_path = '/'.join(
-            restart_file_split[:len(restart_file_split) - 1]) + '/'
-        restart_file_num = int(
-            restart_file_split[len(restart_file_split) -
-                               1].split('file')[1].split('.')[0])
-        extension = restart_file.split('.')[1]
-        num_files = int(restart_file.split('numFiles=')[1].split('/')[0])
-        self.copy_blobs(
-            source_blob_name,
-            destination_path,
-            extension,
-            restart_file_num + 1,
-            num_files,
-        )
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.progress = load_file_progress.FileProgress(progress_file)
+        self.use_dataflow = use_dataflow
+        self.synthetic_rows = synthetic_rows
+        self.max_processes = max_processes
+        self._process_pool = None
 
     def _get_staging_tables(self, dataset_ref):
         """Internal method for getting list of staging tables.
@@ -260,6 +259,42 @@ class FileGenerator(object):
         p.run().wait_until_finish()
         logging.info('Created file: {0:s}'.format(blob_name))
 
+    def _create_local_file(self, blob_name, staging_table_util, file_type,
+                           compression):
+        """Writes a parquet or avro file locally and stores in GCS.
+
+        The file is written by local_file_writer.create_file() in one of the
+        processes of self._process_pool while create_files() runs, so that
+        multiple files are written at the same time without starting a
+        DataFlow job for each of them.
+
+        Args:
+            blob_name(str): Name of the file (or blob) to be generated. Starts
+                with 'fileType=' and end with the file extension.
+                Ex: fileType=parquet/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=2147MB/file1.parquet # pylint: disable=line-too-long
+            staging_table_util(load_benchmark_tools.table_util.TableUtil): Util
+                object for interacting with the staging table that the file
+                will be generated from.
+            file_type(str): Either 'parquet' or 'avro'.
+            compression(str): String representing the compression format that
+                the generated file should have.
+        """
+        create_file_args = (
+            self.project_id,
+            self.primitive_staging_dataset_id,
+            staging_table_util.table_id,
+            self.bucket_name,
+            blob_name,
+            file_type,
+            compression,
+            self.synthetic_rows,
+        )
+        if self._process_pool:
+            self._process_pool.submit(local_file_writer.create_file,
+                                      *create_file_args).result()
+        else:
+            local_file_writer.create_file(*create_file_args)
+
     def _compose_sharded_blobs(self, blob_name, max_composable_blobs):
         """Composes multiple files (or blobs) into one file.
 
@@ -394,7 +429,7 @@ class FileGenerator(object):
             # If the file type is avro, use _create_large_avro_file to create
             # the file via DataFlow. Using the shard and compose methods below
             # will cause errors if the file type is avro.
-            if 'avro' in blob_name:
+            if 'avro' in blob_name and self.use_dataflow:
                 self._create_large_avro_file(
                     blob_name,
                     staging_table_util,
@@ -402,6 +437,13 @@ class FileGenerator(object):
                     compression_type,
                     extension,
                 )
+            elif 'avro' in blob_name:
+                self._create_local_file(
+                    blob_name,
+                    staging_table_util,
+                    'avro',
+                    compression_type,
+                )
             else:
                 # Use a wildcard appended to the end of the file name to shard
                 # the extract into multiple files. Each file will have the
@@ -419,59 +461,179 @@ class FileGenerator(object):
                 # as a prefix into one single file with the name of blob_name.
                 self._compose_sharded_blobs(blob_name, MAX_COMPOSABLE_BLOBS)
 
-    def copy_blobs(
-            self,
-            source_blob_name,
-            destination_path,
-            extension,
-            start_num,
-            num_files,
-    ):
-        """Copies files (or blobs).
+    def _copy_blob(self, source_blob, combination, file_num):
+        """Copies a file (or blob) to one file of a combination.
 
-        Copies the file with provided source_blob_name n number of times,
-        where n is the number of files (numFiles) in the combination
-        (i.e. 10000 copies if numFiles in the combination is 100000). This is
-        a faster method than extracting the staging table to a file n number
-        of times.
+        Copying the file of the combination where numFiles=1 is a faster
+        method than extracting the staging table to a file n number of times.
 
         Args:
-            source_blob_name(str): Name of the file to be copied.
+            source_blob(google.cloud.storage.blob.Blob): The file to be copied.
                 Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=2147MB/file1.csv # pylint: disable=line-too-long
-            destination_path(str): Component of the path that the source blob
-                will share with the copied blob.
-                Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=2147MB/ # pylint: disable=line-too-long
-            extension(str): extension(str): String to be used as the extension
-                for the file. Options include 'avro', 'csv', 'json', 'parquet',
-                'deflate', 'gzip', and 'snappy'.
-            start_num(int): The file number that the first blob to be copied
-                should have. For example, if the program timed out, and the last
-                file for a combination that was successfully copied is
-                file4320, the start_num would 4321. That way, the first copied
-                file will be file4321. When the create_files() method calls
-                copy_blobs(), the start_num will be 1.
-            num_files(int): The number of files in the combination. This
-                allows copy_files() to know what file number the last copied
-                file should have. For exapmle, if the combination has
-                numFiles=10000, num_files should be 10000.
+            combination(FileCombination): The combination that the copied file
+                belongs to.
+            file_num(int): The number of the copied file in the combination.
+                For example, if file_num is 4321, the copied file will be
+                file4321.
         """
+        copied_blob = self.bucket.copy_blob(
+            blob=source_blob,
+            destination_bucket=self.bucket,
+            new_name=combination.get_blob_name(file_num),
+        )
+        self.progress.add_file(combination.destination_path, file_num,
+                               combination.num_files)
+        logging.info('Created file: {0:s}'.format(copied_blob.name))
+
+    def _create_source_file(self, combination):
+        """Creates the file of a combination where numFiles=1.
+
+        The method of creating the file depends on the file type. The created
+        file is the one that is copied for the combinations with the same
+        parameters where numFiles > 1.
 
-        source_blob = self.bucket.get_blob(source_blob_name)
-        # Copy the source file until the combination has the correct number
-        # of files.
-        for n in range(start_num, num_files + 1):
-            file_string = 'file{0:d}'.format(n)
-            copied_destination = '{0:s}{1:s}.{2:s}'.format(
-                destination_path,
-                file_string,
-                extension,
+        Args:
+            combination(FileCombination): The combination to create the file
+                of. Its num_files is 1.
+        """
+        self.progress.start_combination(combination.destination_path)
+        blob_name = combination.get_blob_name(1)
+        destination_prefix = 'gs://{0:s}/{1:s}file1'.format(
+            self.bucket_name,
+            combination.destination_path,
+        )
+        if combination.file_type == 'parquet' and self.use_dataflow:
+            # If the file type is parquet, use the _create_parquet_files()
+            # method, which uses DataFlow for file creation.
+            self._create_parquet_file(
+                blob_name,
+                combination.staging_table_util,
+                destination_prefix,
             )
-            copied_blob = self.bucket.copy_blob(
-                blob=source_blob,
-                destination_bucket=self.bucket,
-                new_name=copied_destination,
+        elif combination.file_type == 'parquet':
+            # Unless DataFlow is requested, write the parquet file locally.
+            self._create_local_file(
+                blob_name,
+                combination.staging_table_util,
+                'parquet',
+                combination.compression_type,
+            )
+        else:
+            # Otherwise, use the_extract_tables_to_files() method, which uses
+            # BigQuery extract jobs.
+            extract_formats = file_constants.FILE_CONSTANTS['extractFormats']
+            self._extract_tables_to_files(
+                blob_name,
+                combination.compression_type,
+                extract_formats[combination.file_type],
+                destination_prefix,
+                combination.extension,
+                combination.staging_table_util,
+            )
+        self.progress.add_file(combination.destination_path, 1, 1)
+
+    def _needs_creation(self, combination):
+        """Checks if any file of a combination still needs to be created.
+
+        Combinations that are not recorded in self.progress were either never
+        started, or created before progress was recorded. For those, check
+        that the first file in the combination doesn't yet exist. If it does
+        exist, assume that all other files in the combination already exist
+        too, and record the combination as completed.
+
+        Args:
+            combination(FileCombination): The combination to check.
+
+        Returns:
+            True if the combination has files to create, else False.
+        """
+        destination_path = combination.destination_path
+        if self.progress.is_started(destination_path):
+            return not self.progress.is_completed(destination_path)
+        first_blob_name = combination.get_blob_name(1)
+        if self._blob_exists(first_blob_name):
+            logging.info('Skipped path and its subsequent files: '
+                         '{0:s}'.format(first_blob_name))
+            self.progress.complete_combination(destination_path)
+            return False
+        return True
+
+    def _blob_exists(self, blob_name):
+        """Checks if a file (or blob) exists in self.bucket.
+
+        Args:
+            blob_name(str): Name of the file.
+
+        Returns:
+            True if the file exists, else False.
+        """
+        return storage.Blob(bucket=self.bucket,
+                            name=blob_name).exists(self.gcs_client)
+
+    def _get_combination_groups(self):
+        """Gathers all file combinations, grouped by the file they are
+            created from.
+
+        Each staging table is extracted to each fileType and each
+        compressionType to create the file of the combination where
+        numFiles=1. That file is then copied to create the combinations with
+        identical parameters except in which numFiles > 1. For example, the
+        files in the combination fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=100/tableSize=10MB/ # pylint: disable=line-too-long
+        are copied from fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=10MB/file1.csv # pylint: disable=line-too-long
+
+        Returns:
+            List of (source_combination, copy_combinations) tuples, where
+            source_combination is the FileCombination where numFiles=1 and
+            copy_combinations is the list of FileCombinations copied from its
+            file.
+        """
+        files_consts = file_constants.FILE_CONSTANTS
+        file_types = self.file_params['fileType']
+        file_compression_types = self.file_params['fileCompressionTypes']
+        file_counts = self.file_params['numFiles']
+
+        def _get_staging_table_util(table_list_item):
+            """Gathers the properties of a staging table.
+
+            Args:
+                table_list_item(google.cloud.bigquery.table.TableListItem):
+                    The staging table.
+
+            Returns:
+                A load_benchmark_tools.table_util.TableUtil for the table.
+            """
+            staging_table_util = table_util.TableUtil(
+                table_list_item.table_id,
+                table_list_item.dataset_id,
             )
-            logging.info('Created file: {0:s}'.format(copied_blob.name))
+            staging_table_util.set_table_properties()
+            return staging_table_util
+
+        # The staging tables already include the columnTypes, numColumns, and
+        # stagingDataSizes parameters (ex: the staging table
+        # 100_STRING_10_10MB has columnType=100_STRING, numColumns=10, and
+        # stagingDataSizes=10MB).
+        with ThreadPoolExecutor() as p:
+            staging_table_utils = list(
+                p.map(_get_staging_table_util, self.primitive_staging_tables))
+
+        combination_groups = []
+        for staging_table_util, file_type in itertools.product(
+                staging_table_utils, file_types):
+            for compression_type in file_compression_types[file_type]:
+                if compression_type == 'none':
+                    extension = file_type
+                else:
+                    extensions = (files_consts['compressionExtensions'])
+                    extension = extensions[compression_type]
+
+                combinations = [
+                    FileCombination(staging_table_util, file_type,
+                                    compression_type, extension, num_files)
+                    for num_files in sorted(set(file_counts) | {1})
+                ]
+                combination_groups.append((combinations[0], combinations[1:]))
+        return combination_groups
 
     def create_files(self):
         """Creates all file combinations and store in GCS.
@@ -482,168 +644,161 @@ class FileGenerator(object):
         While each file is generated from a BigQuery staging table and stored
         in GCS, the method of creating the file varies depending on the
         parameters in the combination.
-        """
-        # Gather file parameters and constants.
-        files_consts = file_constants.FILE_CONSTANTS
-        file_types = self.file_params['fileType']
-        extract_formats = files_consts['extractFormats']
-        file_compression_types = self.file_params['fileCompressionTypes']
-        file_counts = self.file_params['numFiles']
 
+        The files where numFiles=1 are created by up to
+        self.max_concurrent_jobs concurrent extract jobs, DataFlow jobs, or
+        local processes. As soon
+        as one of them is created, it is copied to the combinations that
+        depend on it, up to MAX_CONCURRENT_COPIES copies at a time, while the
+        other jobs keep running. The created files are recorded in
+        self.progress, so that the files that remain after the program was
+        stopped are created when it is run again.
+        """
         # Begin the process of iterating through each combination.
         logging.info('Starting to create files by exporting staging tables to '
                      'bucket {0:s}'.format(self.bucket_name))
-        skip_message = 'Skipped path and its subsequent files: {0:s}'
-
-        # Gather a list of the staging tables. The staging tables already
-        # include the columnTypes, numColumns, and stagingDataSizes
-        # parameters (ex: the staging table 100_STRING_10_10MB has
-        # columnType=100_STRING, numColumns=10, and stagingDataSizes=10MB).
-        tables = self.primitive_staging_tables
-        if len(tables) == 0:
+        if len(self.primitive_staging_tables) == 0:
             logging.info('Dataset {0:s} contains no tables. Please create '
                          'staging tables in {0:s}.'.format(
                              self.primitive_staging_dataset_id))
-        # For each staging table, extract to each fileType, each
-        # compressionType, and copy each file so that the combination has
-        # the correct numFiles.
-        for (table_list_item, file_type, num_files) in \
-                itertools.product(tables, file_types, file_counts):
-            for compression_type in file_compression_types[file_type]:
+        combination_groups = self._get_combination_groups()
+        failed_combinations = []
 
-                staging_table_util = table_util.TableUtil(
-                    table_list_item.table_id,
-                    table_list_item.dataset_id,
-                )
-                staging_table_util.set_table_properties()
-
-                gcs_prefix = 'gs://{0:s}/'.format(self.bucket_name)
-                dest_string = ('fileType={0:s}/'
-                               'compression={1:s}/'
-                               'numColumns={2:d}/'
-                               'columnTypes={3:s}/'
-                               'numFiles={4:d}/'
-                               'tableSize={5:d}MB/')
-                destination_path = dest_string.format(
-                    file_type,
-                    compression_type,
-                    staging_table_util.num_columns,
-                    staging_table_util.column_types,
-                    num_files,
-                    int(staging_table_util.table_size / 1000000),
-                )
+        def _copy_to_combinations(source_combination, copy_combinations):
+            """Schedules the copies of a created file to the combinations
+                that still miss files.
 
-                if compression_type == 'none':
-                    extension = file_type
-                else:
-                    extensions = (files_consts['compressionExtensions'])
-                    extension = extensions[compression_type]
+            Returns:
+                Dictionary mapping each copy future to its combination.
+            """
+            source_blob = self.bucket.blob(source_combination.get_blob_name(1))
+            futures = {}
+            for combination in copy_combinations:
+                self.progress.start_combination(combination.destination_path)
+                for file_num in self.progress.get_missing_file_nums(
+                        combination.destination_path, combination.num_files):
+                    future = copy_pool.submit(self._copy_blob, source_blob,
+                                              combination, file_num)
+                    futures[future] = combination
+            return futures
+
+        # Local files are written in new processes rather than forked ones,
+        # since forking a process with running client threads isn't safe.
+        self._process_pool = ProcessPoolExecutor(
+            self.max_processes, mp_context=multiprocessing.get_context('spawn'))
+        with self._process_pool, \
+                ThreadPoolExecutor(self.max_concurrent_jobs) as job_pool, \
+                ThreadPoolExecutor(MAX_CONCURRENT_COPIES) as copy_pool:
+            job_futures = {}
+            copy_futures = {}
+            for source_combination, copy_combinations in combination_groups:
+                copy_combinations = [
+                    combination for combination in copy_combinations
+                    if self._needs_creation(combination)
+                ]
+                needs_source = self._needs_creation(source_combination)
+                # A file recorded as created may have been deleted from the
+                # bucket since. Create it again before copying it.
+                if (not needs_source and copy_combinations and
+                        not self._blob_exists(
+                            source_combination.get_blob_name(1))):
+                    logging.info('Recreating missing file: {0:s}'.format(
+                        source_combination.get_blob_name(1)))
+                    needs_source = True
+                if needs_source:
+                    future = job_pool.submit(self._create_source_file,
+                                             source_combination)
+                    job_futures[future] = (source_combination,
+                                           copy_combinations)
+                elif copy_combinations:
+                    copy_futures.update(
+                        _copy_to_combinations(source_combination,
+                                              copy_combinations))
+
+            # Copy each created file as soon as its job finishes.
+            for future in as_completed(job_futures):
+                source_combination, copy_combinations = job_futures[future]
+                try:
+                    future.result()
+                except Exception:  # pylint: disable=broad-except
+                    logging.exception('Failed to create file: {0:s}'.format(
+                        source_combination.get_blob_name(1)))
+                    failed_combinations.append(
+                        source_combination.destination_path)
+                    continue
+                copy_futures.update(
+                    _copy_to_combinations(source_combination,
+                                          copy_combinations))
+
+            for future in as_completed(copy_futures):
+                combination = copy_futures[future]
+                try:
+                    future.result()
+                except Exception:  # pylint: disable=broad-except
+                    logging.exception('Failed to copy a file to {0:s}'.format(
+                        combination.destination_path))
+                    failed_combinations.append(combination.destination_path)
+
+        self._process_pool = None
+        self.progress.save()
+        if failed_combinations:
+            logging.error('{0:d} combinations have missing files. Run '
+                          '--create_files again to create them: {1:s}'.format(
+                              len(set(failed_combinations)),
+                              ', '.join(sorted(set(failed_combinations)))))
+        else:
+            logging.info('Done creating files.')
+
+
+class FileCombination(object):
+    """Holds the parameters of one combination of files.
 
-                file_string = 'file1'
+    Attributes:
+        staging_table_util(load_benchmark_tools.table_util.TableUtil): Helper
+            class for interacting with the staging table that the files are
+            generated from.
+        file_type(str): The fileType parameter of the combination.
+        compression_type(str): The compression parameter of the combination.
+        extension(str): The extension of the files in the combination.
+        num_files(int): The numFiles parameter of the combination.
+        destination_path(str): Path shared by the files in the combination.
+            Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=100/tableSize=10MB/ # pylint: disable=line-too-long
+    """
 
-                destination_prefix = '{0:s}{1:s}{2:s}'.format(
-                    gcs_prefix,
-                    destination_path,
-                    file_string,
-                )
+    def __init__(self, staging_table_util, file_type, compression_type,
+                 extension, num_files):
+        self.staging_table_util = staging_table_util
+        self.file_type = file_type
+        self.compression_type = compression_type
+        self.extension = extension
+        self.num_files = num_files
+        self.destination_path = ('fileType={0:s}/'
+                                 'compression={1:s}/'
+                                 'numColumns={2:d}/'
+                                 'columnTypes={3:s}/'
+                                 'numFiles={4:d}/'
+                                 'tableSize={5:d}MB/').format(
+                                     file_type,
+                                     compression_type,
+                                     staging_table_util.num_columns,
+                                     staging_table_util.column_types,
+                                     num_files,
+                                     int(staging_table_util.table_size /
+                                         1000000),
+                                 )
+
+    def get_blob_name(self, file_num):
+        """Builds the name of a file in the combination.
 
-                if num_files == 1:
-                    # If the number of files in the current combination is 1,
-                    # check to see if the one file doesn't yet exist.
-                    blob_name = '{0:s}{1:s}.{2:s}'.format(
-                        destination_path,
-                        file_string,
-                        extension,
-                    )
-                    if not storage.Blob(
-                            bucket=self.bucket,
-                            name=blob_name,
-                    ).exists(self.gcs_client):
-                        # If the one file doesn't yet exist, it needs to be
-                        # created. The method of creation depends on the file
-                        # type.
-                        if file_type == 'parquet':
-                            # If the file type is parquet, use the
-                            # _create_parquet_files() method, which uses
-                            # DataFlow for file creation.
-                            self._create_parquet_file(
-                                blob_name,
-                                staging_table_util,
-                                destination_prefix,
-                            )
-                        else:
-                            # Otherwise, use the_extract_tables_to_files()
-                            # method, which uses BigQuery extract jobs.
-                            destination_format = extract_formats[file_type]
-                            self._extract_tables_to_files(
-                                blob_name,
-                                compression_type,
-                                destination_format,
-                                destination_prefix,
-                                extension,
-                                staging_table_util,
-                            )
-                    else:
-                        # If the one file one file already exists,
-                        # skip its creation.
-                        logging.info(skip_message.format(blob_name))
-                else:
-                    # If the numFiles parameter in the current iteration is not
-                    # 1, that means multiple files need to be created for the
-                    # combination. In this case, obtain the file from the
-                    # combination in which all parameters are identical to the
-                    # current combination, except in which numFiles=1. file will
-                    # be used to make copies for the combinations where numFiles
-                    # > 1, since copying files is faster than running a new
-                    # extraction or DataFlow job. For example, if the current
-                    # combination is fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=100/tableSize=10MB/ # pylint: disable=line-too-long
-                    # then  fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=10MB/file1.csv # pylint: disable=line-too-long
-                    # will be used to make copies for the current  combination.
-                    file1_destination_path = dest_string.format(
-                        file_type,
-                        compression_type,
-                        staging_table_util.num_columns,
-                        staging_table_util.column_types,
-                        1,
-                        int(staging_table_util.table_size / 1000000),
-                    )
-                    file1_blob_name = '{0:s}{1:s}.{2:s}'.format(
-                        file1_destination_path,
-                        file_string,
-                        extension,
-                    )
-                    # Before making copies for the current combination, check
-                    # that the first file in the combination doesn't yet exist.
-                    # If it doesn't, then proceed. If it does exist, assume that
-                    # all other files in the combination already exist too.
-                    # While this can be a risky assumption, it saves a lot of
-                    # time, since combinations can contain as many as 10000
-                    # files. If a combination is stopped in the middle of
-                    # generating a large number of files, the restart_
-                    # incomplete_combination() method can be used to ensure the
-                    # combination gets completed without taking the time to
-                    # check each file's existence here.
-                    first_of_n_blobs = '{0:s}{1:s}.{2:s}'.format(
-                        destination_path,
-                        file_string,
-                        extension,
-                    )
-                    if not storage.Blob(
-                            bucket=self.bucket,
-                            name=first_of_n_blobs,
-                    ).exists(self.gcs_client):
-                        # If the first file in the combination doesn't exist,
-                        # run copy_blobs() to create each file in the
-                        # combination.
-                        start_num = 1
-                        self.copy_blobs(
-                            file1_blob_name,
-                            destination_path,
-                            extension,
-                            start_num,
-                            num_files,
-                        )
-                    else:
-                        # Otherwise, skip creating the first file and all
-                        # subsequent files in the combination.
-                        logging.info(skip_message.format(first_of_n_blobs))
+        Args:
+            file_num(int): The number of the file in the combination.
+
+        Returns:
+            The name of the file (or blob).
+                Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=100/tableSize=10MB/file3.csv # pylint: disable=line-too-long
+        """
+        return '{0:s}file{1:d}.{2:s}'.format(
+            self.destination_path,
+            file_num,
+            self.extension,
+        )
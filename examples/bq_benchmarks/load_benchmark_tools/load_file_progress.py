@@ -0,0 +1,196 @@
+# Copyright 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import threading
+import time
+
+SAVE_INTERVAL_SECONDS = 10
+
+
+class FileProgress(object):
+    """Records which files of each combination have been created.
+
+    The progress is kept in a local json file so that file generation can be
+    stopped and started again without recreating or skipping files. Each
+    combination is identified by its destination path, and holds the numbers
+    of the files that were created for it. A combination is marked as started
+    before its first file is created, so that combinations that were stopped
+    in the middle of being created are not mistaken for complete ones.
+
+    Attributes:
+        progress_file(str): Path to the local json file that holds the
+            progress. If None, the progress is only kept in memory.
+        started_combinations(dict): Dictionary mapping the destination path of
+            each started combination to the set of numbers of its files that
+            have been created.
+        completed_combinations(set): Destination paths of the combinations
+            that have all of their files created.
+    """
+
+    def __init__(self, progress_file=None):
+        self.progress_file = progress_file
+        self.started_combinations = {}
+        self.completed_combinations = set()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._last_save = 0.0
+        if self.progress_file and os.path.exists(self.progress_file):
+            self._load()
+
+    def _load(self):
+        """Internal method for reading the progress from the progress file.
+        """
+        with open(self.progress_file) as opened_progress_file:
+            progress = json.load(opened_progress_file)
+        self.started_combinations = {
+            destination_path: set(file_nums) for destination_path, file_nums
+            in progress['startedCombinations'].items()
+        }
+        self.completed_combinations = set(progress['completedCombinations'])
+        logging.info('Loaded progress of {0:d} started and {1:d} completed '
+                     'combinations from {2:s}'.format(
+                         len(self.started_combinations),
+                         len(self.completed_combinations),
+                         self.progress_file,
+                     ))
+
+    def save(self):
+        """Writes the progress to the progress file.
+
+        The progress is written to a temporary file that then replaces the
+        progress file, so that a stopped write leaves the last progress intact.
+        """
+        if not self.progress_file:
+            return
+        tmp_progress_file = '{0:s}.tmp'.format(self.progress_file)
+        with self._save_lock:
+            with self._lock:
+                progress = {
+                    'startedCombinations': {
+                        destination_path: sorted(file_nums)
+                        for destination_path, file_nums in
+                        self.started_combinations.items()
+                    },
+                    'completedCombinations':
+                    sorted(self.completed_combinations),
+                }
+                self._last_save = time.time()
+            with open(tmp_progress_file, 'w') as opened_progress_file:
+                json.dump(progress, opened_progress_file)
+            os.replace(tmp_progress_file, self.progress_file)
+
+    def _save_if_due(self):
+        """Internal method for saving the progress at most once every
+            SAVE_INTERVAL_SECONDS.
+
+        Files are created much faster than the progress can be rewritten, so
+        a file that was created just before the program stopped may be created
+        again when it restarts.
+        """
+        if time.time() - self._last_save >= SAVE_INTERVAL_SECONDS:
+            self.save()
+
+    def is_started(self, destination_path):
+        """Checks if the creation of a combination was started.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+                Ex: fileType=csv/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=100/tableSize=10MB/ # pylint: disable=line-too-long
+
+        Returns:
+            True if the combination was started or completed, else False.
+        """
+        with self._lock:
+            return (destination_path in self.started_combinations or
+                    destination_path in self.completed_combinations)
+
+    def is_completed(self, destination_path):
+        """Checks if all files of a combination have been created.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+
+        Returns:
+            True if the combination was completed, else False.
+        """
+        with self._lock:
+            return destination_path in self.completed_combinations
+
+    def get_missing_file_nums(self, destination_path, num_files):
+        """Lists the numbers of the files of a combination not yet created.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+            num_files(int): The number of files in the combination.
+
+        Returns:
+            List of the file numbers, from 1 to num_files, that have not been
+            created.
+        """
+        with self._lock:
+            if destination_path in self.completed_combinations:
+                return []
+            created_file_nums = self.started_combinations.get(
+                destination_path, set())
+        return [
+            n for n in range(1, num_files + 1) if n not in created_file_nums
+        ]
+
+    def start_combination(self, destination_path):
+        """Marks a combination as started and saves the progress.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+        """
+        with self._lock:
+            if destination_path in self.completed_combinations:
+                return
+            self.started_combinations.setdefault(destination_path, set())
+        self.save()
+
+    def complete_combination(self, destination_path):
+        """Marks a combination as completed.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+        """
+        with self._lock:
+            self.started_combinations.pop(destination_path, None)
+            self.completed_combinations.add(destination_path)
+        self._save_if_due()
+
+    def add_file(self, destination_path, file_num, num_files):
+        """Records that a file of a combination has been created.
+
+        Once every file of the combination has been created, the combination
+        is marked as completed.
+
+        Args:
+            destination_path(str): Path shared by the files in the combination.
+            file_num(int): The number of the file that was created.
+            num_files(int): The number of files in the combination.
+        """
+        with self._lock:
+            if destination_path in self.completed_combinations:
+                return
+            file_nums = self.started_combinations.setdefault(
+                destination_path, set())
+            file_nums.add(file_num)
+            if len(file_nums) >= num_files:
+                del self.started_combinations[destination_path]
+                self.completed_combinations.add(destination_path)
+        self._save_if_due()
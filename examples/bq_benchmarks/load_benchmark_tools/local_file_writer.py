@@ -0,0 +1,333 @@
+# Copyright 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import json
+import logging
+import os
+import tempfile
+
+import fastavro
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from google.cloud import bigquery
+from google.cloud import storage
+
+from generic_benchmark_tools import avro_util
+from generic_benchmark_tools import parquet_util
+
+# Number of staging table rows requested from BigQuery at once.
+READ_PAGE_SIZE = 10000
+# Number of synthetic rows generated at once.
+SYNTHETIC_BATCH_SIZE = 10000
+# Uncompressed size targeted for each parquet row group.
+ROW_GROUP_BYTES = 128 * 10**6
+# Approximate size of each avro block.
+AVRO_SYNC_INTERVAL = 10**6
+# Size of each chunk of the resumable uploads. Must be a multiple of 256 KB.
+UPLOAD_CHUNK_SIZE = 100 * 1024 * 1024
+
+# Size that BigQuery counts for each value of a NUMERIC column, and for each
+# STRING value in addition to its length.
+NUMERIC_BYTES = 16
+STRING_OVERHEAD_BYTES = 2
+
+NUMERIC_TYPE = pa.decimal128(38, 9)
+
+
+def get_pa_schema(bq_schema):
+    """Translates a BigQuery schema to the pyarrow schema of the rows.
+
+    Unlike parquet_util.ParquetUtil.get_pa_translated_schema(), NUMERIC
+    columns keep the precision and scale of BigQuery NUMERIC values, so that
+    the rows can be written to both avro and parquet files.
+
+    Args:
+        bq_schema(List[google.cloud.bigquery.schema.SchemaField]): Schema of
+            the rows.
+
+    Returns:
+        The schema of the rows in pyarrow.Schema format.
+    """
+    type_conversions = {
+        'STRING': pa.string(),
+        'NUMERIC': NUMERIC_TYPE,
+    }
+
+    return pa.schema([
+        pa.field(bq_field.name, type_conversions[bq_field.field_type])
+        for bq_field in bq_schema
+    ])
+
+
+def get_staging_record_batches(bq_client, table, page_size=READ_PAGE_SIZE):
+    """Streams the rows of a staging table.
+
+    Args:
+        bq_client(google.cloud.bigquery.client.Client): Client used to read
+            the rows.
+        table(google.cloud.bigquery.table.Table): The staging table.
+        page_size(int): Number of rows requested from BigQuery at once.
+
+    Yields:
+        One pyarrow.RecordBatch for each page of rows.
+    """
+    pa_schema = get_pa_schema(table.schema)
+    rows = bq_client.list_rows(table, page_size=page_size)
+    for page in rows.pages:
+        values = [row.values() for row in page]
+        if not values:
+            continue
+        arrays = [
+            pa.array(column, type=field.type)
+            for column, field in zip(zip(*values), pa_schema)
+        ]
+        yield pa.RecordBatch.from_arrays(arrays, schema=pa_schema)
+
+
+def get_synthetic_record_batches(bq_schema,
+                                 num_rows,
+                                 row_size,
+                                 batch_size=SYNTHETIC_BATCH_SIZE):
+    """Generates random rows that have the size of the staging table rows.
+
+    STRING values are random lowercase strings. Their length is chosen so that
+    each row has approximately row_size bytes, as counted by BigQuery. NUMERIC
+    values are random integers.
+
+    Args:
+        bq_schema(List[google.cloud.bigquery.schema.SchemaField]): Schema of
+            the rows, like the schemas created by
+            generic_benchmark_tools.schema_creator.SchemaCreator.
+        num_rows(int): Number of rows to generate.
+        row_size(float): Size in bytes of each row.
+        batch_size(int): Number of rows generated at once.
+
+    Yields:
+        pyarrow.RecordBatch objects of up to batch_size rows.
+    """
+    pa_schema = get_pa_schema(bq_schema)
+    field_types = [bq_field.field_type for bq_field in bq_schema]
+    num_strings = field_types.count('STRING')
+    string_length = 1
+    if num_strings:
+        string_bytes = row_size - NUMERIC_BYTES * (len(field_types) -
+                                                   num_strings)
+        string_length = max(
+            int(string_bytes / num_strings) - STRING_OVERHEAD_BYTES, 1)
+
+    for start in range(0, num_rows, batch_size):
+        n = min(batch_size, num_rows - start)
+        arrays = []
+        for field_type in field_types:
+            if field_type == 'STRING':
+                # Build the string column straight from its buffers.
+                chars = np.random.randint(ord('a'),
+                                          ord('z') + 1,
+                                          size=n * string_length,
+                                          dtype=np.uint8)
+                offsets = np.arange(0, (n + 1) * string_length,
+                                    string_length,
+                                    dtype=np.int32)
+                arrays.append(
+                    pa.StringArray.from_buffers(n, pa.py_buffer(offsets),
+                                                pa.py_buffer(chars)))
+            else:
+                arrays.append(
+                    pa.array(np.random.randint(0, 10**9, size=n)).cast(
+                        NUMERIC_TYPE))
+        yield pa.RecordBatch.from_arrays(arrays, schema=pa_schema)
+
+
+def get_row_group_size(row_size):
+    """Computes the number of rows in each parquet row group.
+
+    Args:
+        row_size(float): Size in bytes of each row.
+
+    Returns:
+        The number of rows that add up to ROW_GROUP_BYTES.
+    """
+    return max(int(ROW_GROUP_BYTES / max(row_size, 1)), 1)
+
+
+def write_parquet_file(record_batches, pa_schema, file_path, compression,
+                       row_group_size):
+    """Writes rows to a parquet file, one row group at a time.
+
+    Args:
+        record_batches(Iterable[pyarrow.RecordBatch]): The rows to write.
+        pa_schema(pyarrow.Schema): The schema of the parquet file. The rows are
+            cast to it.
+        file_path(str): Path of the local parquet file.
+        compression(str): Compression format of the parquet file. Options are
+            'none', 'snappy' and 'gzip'.
+        row_group_size(int): Number of rows in each row group.
+    """
+
+    def _write_row_group(batches):
+        table = pa.Table.from_batches(batches).cast(pa_schema, safe=False)
+        writer.write_table(table, row_group_size=row_group_size)
+
+    with pq.ParquetWriter(file_path, pa_schema,
+                          compression=compression.upper()) as writer:
+        buffered_batches = []
+        buffered_rows = 0
+        for batch in record_batches:
+            buffered_batches.append(batch)
+            buffered_rows += batch.num_rows
+            if buffered_rows >= row_group_size:
+                _write_row_group(buffered_batches)
+                buffered_batches = []
+                buffered_rows = 0
+        if buffered_batches:
+            _write_row_group(buffered_batches)
+
+
+def get_avro_decimal_array(array):
+    """Encodes a decimal column into the bytes of avro decimal values.
+
+    Avro decimal values are the big-endian two's-complement bytes of the
+    unscaled value, which are the little-endian bytes of the pyarrow decimal
+    values in reverse. Passing the bytes to fastavro is much faster than
+    passing decimal.Decimal objects.
+
+    Args:
+        array(pyarrow.Decimal128Array): The decimal column.
+
+    Returns:
+        A pyarrow.BinaryArray of 16 bytes values.
+    """
+    # Encode the whole buffers, so the validity bitmap still lines up with
+    # the values of a sliced column.
+    n = len(array) + array.offset
+    value_bytes = np.frombuffer(array.buffers()[1],
+                                dtype=np.uint8)[:n * 16].reshape(n, 16)[:, ::-1]
+    offsets = np.arange(0, (n + 1) * 16, 16, dtype=np.int32)
+    buffers = [
+        array.buffers()[0],
+        pa.py_buffer(offsets),
+        pa.py_buffer(np.ascontiguousarray(value_bytes)),
+    ]
+    return pa.Array.from_buffers(pa.binary(),
+                                 len(array),
+                                 buffers,
+                                 offset=array.offset)
+
+
+def write_avro_file(record_batches, avro_schema, file_path, compression):
+    """Writes rows to an avro file, one block at a time.
+
+    Args:
+        record_batches(Iterable[pyarrow.RecordBatch]): The rows to write.
+        avro_schema(avro.schema.RecordSchema): The schema of the avro file.
+        file_path(str): Path of the local avro file.
+        compression(str): Compression format of the avro file. Options are
+            'none', 'snappy', or 'deflate'.
+    """
+    codec = 'null' if compression == 'none' else compression
+    parsed_schema = fastavro.parse_schema(json.loads(str(avro_schema)))
+
+    def _get_records():
+        for batch in record_batches:
+            columns = [
+                get_avro_decimal_array(column)
+                if pa.types.is_decimal(column.type) else column
+                for column in batch.columns
+            ]
+            encoded_batch = pa.RecordBatch.from_arrays(
+                columns, names=batch.schema.names)
+            for record in encoded_batch.to_pylist():
+                yield record
+
+    with open(file_path, 'wb') as opened_file:
+        fastavro.writer(opened_file,
+                        parsed_schema,
+                        _get_records(),
+                        codec=codec,
+                        sync_interval=AVRO_SYNC_INTERVAL)
+
+
+def upload_file(bucket, blob_name, file_path):
+    """Uploads a local file to GCS in chunks of a resumable upload.
+
+    Args:
+        bucket(google.cloud.storage.bucket.Bucket): Bucket that the file will
+            be saved in.
+        blob_name(str): Name of the file (or blob) in the bucket.
+        file_path(str): Path of the local file.
+    """
+    blob = bucket.blob(blob_name, chunk_size=UPLOAD_CHUNK_SIZE)
+    blob.upload_from_filename(file_path)
+
+
+def create_file(project_id,
+                dataset_id,
+                table_id,
+                bucket_name,
+                blob_name,
+                file_type,
+                compression,
+                synthetic_rows=False):
+    """Creates a parquet or avro file from a staging table and stores in GCS.
+
+    The file is written locally, without DataFlow, then uploaded to GCS. It
+    only takes a few BigQuery and GCS clients, so it can be called in a
+    separate process for each file.
+
+    Args:
+        project_id(str): ID of the project that holds the GCS bucket.
+        dataset_id(str): ID of the dataset that holds the staging table.
+        table_id(str): ID of the staging table.
+        bucket_name(str): Name of the bucket that the file will be saved in.
+        blob_name(str): Name of the file (or blob) to be generated. Starts
+            with 'fileType=' and end with the file extension.
+            Ex: fileType=parquet/compression=none/numColumns=10/columnTypes=100_STRING/numFiles=1/tableSize=2147MB/file1.parquet # pylint: disable=line-too-long
+        file_type(str): Either 'parquet' or 'avro'.
+        compression(str): String representing the compression format that
+            the generated file should have.
+        synthetic_rows(bool): If True, the file is written from random rows
+            with the schema, number of rows, and size of the staging table
+            instead of the rows of the staging table.
+    """
+    logging.info('Attempting to create file {0:s}'.format(blob_name))
+    bq_client = bigquery.Client()
+    table = bq_client.get_table(bq_client.dataset(dataset_id).table(table_id))
+    row_size = table.num_bytes / float(max(table.num_rows, 1))
+
+    if synthetic_rows:
+        record_batches = get_synthetic_record_batches(table.schema,
+                                                      table.num_rows, row_size)
+    else:
+        record_batches = get_staging_record_batches(bq_client, table)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, os.path.basename(blob_name))
+        if file_type == 'parquet':
+            pa_schema = parquet_util.ParquetUtil(
+                table.schema).get_pa_translated_schema()
+            write_parquet_file(record_batches, pa_schema, file_path,
+                               compression, get_row_group_size(row_size))
+        else:
+            # Avro names can't start with a digit, like the staging table IDs.
+            avro_schema = avro_util.AvroUtil(
+                bq_schema=table.schema,
+                schema_name='staging_{0:s}'.format(
+                    table_id)).get_avro_translated_schema()
+            write_avro_file(record_batches, avro_schema, file_path,
+                            compression)
+
+        bucket = storage.Client(project=project_id).bucket(bucket_name)
+        upload_file(bucket, blob_name, file_path)
+    logging.info('Created file: {0:s}'.format(blob_name))
@@ -0,0 +1,70 @@
+# Copyright 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import os
+
+from bq_benchmarks.load_benchmark_tools import load_file_progress
+
+
+class TestFileProgress(object):
+    """Tests functionality of load_benchmark_tools.load_file_progress.
+
+    Attributes:
+        progress_file(str): Path to the local progress file used for testing.
+        destination_path(str): Path shared by the files in the test
+            combination.
+    """
+
+    def setup_method(self):
+        """Sets up resources for tests.
+        """
+        abs_path = os.path.abspath(os.path.dirname(__file__))
+        self.progress_file = os.path.join(abs_path, 'test_progress.json')
+        self.destination_path = (
+            'fileType=csv/compression=none/numColumns=10/'
+            'columnTypes=50_STRING_50_NUMERIC/numFiles=3/tableSize=10MB/')
+
+    def test_file_progress(self):
+        """Tests FileProgress's ability to record created files and to restart
+            from its progress file.
+
+        Returns:
+            True if test passes, else False.
+        """
+        progress = load_file_progress.FileProgress(self.progress_file)
+        assert not progress.is_started(self.destination_path)
+
+        progress.start_combination(self.destination_path)
+        progress.add_file(self.destination_path, 2, 3)
+        progress.save()
+
+        # A new instance continues from the saved progress.
+        restarted_progress = load_file_progress.FileProgress(
+            self.progress_file)
+        assert restarted_progress.is_started(self.destination_path)
+        assert not restarted_progress.is_completed(self.destination_path)
+        assert restarted_progress.get_missing_file_nums(
+            self.destination_path, 3) == [1, 3]
+
+        restarted_progress.add_file(self.destination_path, 1, 3)
+        restarted_progress.add_file(self.destination_path, 3, 3)
+        assert restarted_progress.is_completed(self.destination_path)
+        assert restarted_progress.get_missing_file_nums(
+            self.destination_path, 3) == []
+
+    def teardown_method(self):
+        """Tears down resources created in setup_method().
+        """
+        if os.path.exists(self.progress_file):
+            os.remove(self.progress_file)
@@ -0,0 +1,103 @@
+# Copyright 2018 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import decimal
+import os
+import tempfile
+import unittest
+
+import fastavro
+import pyarrow.parquet as pq
+from google.cloud import bigquery
+
+from bq_benchmarks.generic_benchmark_tools import avro_util
+from bq_benchmarks.generic_benchmark_tools import parquet_util
+from bq_benchmarks.load_benchmark_tools import local_file_writer
+
+
+class TestLocalFileWriter(unittest.TestCase):
+    """Tests functionality of load_benchmark_tools.local_file_writer.
+
+    Attributes:
+        bq_schema(List[google.cloud.bigquery.schema.SchemaField]): Schema of
+            the rows written to the test files.
+        tmp_dir(tempfile.TemporaryDirectory): Directory that holds the test
+            files.
+    """
+
+    def setUp(self):
+        """Sets up resources for tests.
+        """
+        self.bq_schema = [
+            bigquery.SchemaField('string1', 'STRING', 'REQUIRED'),
+            bigquery.SchemaField('numeric1', 'NUMERIC', 'REQUIRED')
+        ]
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def test_write_parquet_file(self):
+        """Tests local_file_writer.write_parquet_file().
+
+        Tests the ability to write synthetic rows to a parquet file in row
+            groups of the requested number of rows.
+
+        Returns:
+            True if test passes, else False.
+        """
+        file_path = os.path.join(self.tmp_dir.name, 'file1.parquet')
+        record_batches = local_file_writer.get_synthetic_record_batches(
+            self.bq_schema, num_rows=2500, row_size=50.0, batch_size=500)
+        pa_schema = parquet_util.ParquetUtil(
+            self.bq_schema).get_pa_translated_schema()
+        local_file_writer.write_parquet_file(record_batches,
+                                             pa_schema,
+                                             file_path,
+                                             'none',
+                                             row_group_size=1000)
+
+        parquet_file = pq.ParquetFile(file_path)
+        assert parquet_file.schema_arrow == pa_schema
+        assert parquet_file.metadata.num_rows == 2500
+        assert parquet_file.metadata.num_row_groups == 3
+        # Each string has the length that gives rows of row_size bytes.
+        strings = parquet_file.read().column('string1').to_pylist()
+        assert len(strings[0]) == 50 - 16 - 2
+
+    def test_write_avro_file(self):
+        """Tests local_file_writer.write_avro_file().
+
+        Tests the ability to write synthetic rows to an avro file, with the
+            NUMERIC values encoded as avro decimals.
+
+        Returns:
+            True if test passes, else False.
+        """
+        file_path = os.path.join(self.tmp_dir.name, 'file1.snappy')
+        record_batches = local_file_writer.get_synthetic_record_batches(
+            self.bq_schema, num_rows=2500, row_size=50.0, batch_size=500)
+        avro_schema = avro_util.AvroUtil(
+            bq_schema=self.bq_schema,
+            schema_name='test_schema').get_avro_translated_schema()
+        local_file_writer.write_avro_file(record_batches, avro_schema,
+                                          file_path, 'snappy')
+
+        with open(file_path, 'rb') as opened_file:
+            records = list(fastavro.reader(opened_file))
+        assert len(records) == 2500
+        assert isinstance(records[0]['numeric1'], decimal.Decimal)
+        assert records[0]['numeric1'] == int(records[0]['numeric1'])
+
+    def tearDown(self):
+        """Tears down resources created in setUp().
+        """
+        self.tmp_dir.cleanup()
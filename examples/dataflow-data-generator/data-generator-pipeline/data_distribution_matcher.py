@@ -14,7 +14,7 @@
 """
 A Dataflow pipeline which reads a schema to simulate or "fake" data
 from a json file and writes random data of the schema's shape to a
-BigQuery table or as CSV or AVRO files on GCS. This can be used to
+BigQuery table or as CSV, AVRO or PARQUET files on GCS. This can be used to
 ease apprehension about BQ costs, unblock integration testing before
 real data can be provided by the business, or create dummy datasets
 for stress testing in the event of large data growth.
@@ -26,11 +26,13 @@ import logging
 import apache_beam as beam
 from apache_beam.options.pipeline_options import PipelineOptions
 from data_generator.PerformantDataGenerator import DataGenerator, FakeRowGen, \
-    parse_data_generator_args, validate_data_args, fetch_schema
+    FakeRecordBatchGen, parse_data_generator_args, validate_data_args, \
+    fetch_schema
 import fastavro
 
 from data_generator.CsvUtil import dict_to_csv
 from data_generator.AvroUtil import fix_record_for_avro
+from data_generator.ParquetUtil import get_pyarrow_translated_schema
 
 
 def run(argv=None):
@@ -58,21 +60,44 @@ def run(argv=None):
                              max_float=data_args.max_float,
                              float_precision=data_args.float_precision,
                              write_disp=data_args.write_disp,
-                             key_skew=data_args.key_skew)
+                             key_skew=data_args.key_skew,
+                             key_seed=data_args.key_seed)
 
     # Initiate the pipeline using the pipeline arguments passed in from the
     # command line.  This includes information including where Dataflow should
     # store temp files, and what the project id is and what runner to use.
     p = beam.Pipeline(options=pipeline_options)
-    rows = (
-        p
-        | 'Read Histogram Table.' >> beam.io.Read(
-            beam.io.BigQuerySource(data_gen.hist_bq_table))
-        | 'Generate Data' >> beam.ParDo(FakeRowGen(data_gen))
-        | 'Parse Json Strings' >> beam.FlatMap(lambda row: [json.loads(row)]))
-
-    if data_args.primary_key_cols:
-        rows |= EnforcePrimaryKeys(data_args.primary_key_col)
+    histogram = (p
+                 | 'Read Histogram Table.' >> beam.io.Read(
+                     beam.io.BigQuerySource(data_gen.hist_bq_table)))
+
+    if data_args.write_to_parquet:
+        pa_schema = get_pyarrow_translated_schema(data_gen.schema)
+
+        (histogram
+         # Generate pyarrow Tables straight from the generated columns, each
+         # written as a row group without any per record conversion.
+         | 'Generate Record Batches' >> beam.ParDo(
+             FakeRecordBatchGen(data_gen,
+                                pa_schema,
+                                batch_size=data_args.batch_size))
+         | 'Write to Parquet.' >> beam.io.parquetio.WriteToParquetBatched(
+             file_path_prefix=data_args.output_prefix,
+             codec='none',
+             file_name_suffix='.parquet',
+             schema=pa_schema))
+
+    if data_args.csv_schema_order or data_args.avro_schema_file or \
+            data_args.output_bq_table:
+        rows = (
+            histogram
+            | 'Generate Data' >> beam.ParDo(
+                FakeRowGen(data_gen, batch_size=data_args.batch_size))
+            | 'Parse Json Strings' >> beam.FlatMap(
+                lambda row: [json.loads(row)]))
+
+        if data_args.primary_key_cols:
+            rows |= EnforcePrimaryKeys(data_args.primary_key_col)
 
     if data_args.csv_schema_order:
         (rows
@@ -0,0 +1,172 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+# Above this cardinality, the keys are drawn from their distribution rather
+# than from a table of key weights.
+MAX_TABLE_KEYS = 10**7
+
+# The number of keys drawn at once to serve the single key draws.
+BUFFER_SIZE = 10000
+
+ZIPF_EXPONENT = 1.25
+
+KEY_DISTRIBUTIONS = ('uniform', 'binomial', 'normal', 'zipf')
+
+
+def get_key_weights(n_keys, distribution=None):
+    """
+    This function computes the probability weights of the keys 1 to n_keys
+    for a key skew distribution.
+
+    Arguments:
+        n_keys: (int) The cardinality of the keys.
+        distribution: (str) One of KEY_DISTRIBUTIONS, uniform by default.
+    Returns:
+        weights: (np.ndarray) The weight of each key, or None for uniform keys.
+    """
+    distribution = get_distribution_name(distribution)
+    ranks = np.arange(1, n_keys + 1, dtype=np.float64)
+
+    if distribution == 'uniform':
+        return None
+    elif distribution == 'zipf':
+        return ranks**-ZIPF_EXPONENT
+
+    # Bell curves centered on the middle of the keyset. The binomial
+    # distribution is approximated by its normal limit.
+    mean = n_keys / 2.0
+    if distribution == 'binomial':
+        std = max(np.sqrt(n_keys * .25), 1.0)
+    else:
+        std = max(n_keys / 6.0, 1.0)
+    return np.exp(-.5 * ((ranks - mean) / std)**2)
+
+
+def get_distribution_name(distribution):
+    """
+    This function validates a key skew distribution, None meaning uniform.
+    """
+    if distribution is None or distribution == 'None':
+        return 'uniform'
+    if distribution.lower() not in KEY_DISTRIBUTIONS:
+        raise ValueError('Unsupported key distribution {}, expected one of '
+                         '{}.'.format(distribution,
+                                      ', '.join(KEY_DISTRIBUTIONS)))
+    return distribution.lower()
+
+
+class KeySampler(object):
+    """
+    This class samples keys from a key set with optional weights. The
+    cumulative weights are computed once so that each call draws any number
+    of keys in a single vectorized binary search.
+
+    Attributes:
+        keys: (np.ndarray) The keys to draw from.
+        cdf: (np.ndarray) The cumulative weights of the keys, None for uniform
+            draws.
+    """
+    def __init__(self, keys, weights=None):
+        self.keys = np.asarray(keys)
+        self.cdf = None if weights is None else np.cumsum(weights,
+                                                          dtype=np.float64)
+        self._buffer = []
+
+    @classmethod
+    def for_distribution(cls, n_keys, distribution=None, seed=None):
+        """
+        This method creates a sampler of the keys 1 to n_keys with a key skew
+        distribution.
+
+        Arguments:
+            n_keys: (int) The cardinality of the keys.
+            distribution: (str) One of KEY_DISTRIBUTIONS, uniform by default.
+            seed: (int) When set, the skewed weights are assigned to the keys
+                in an order shuffled with this seed instead of the order of
+                the keys. Every worker and every table generated with the same
+                seed agree on the most frequent keys.
+        """
+        if n_keys > MAX_TABLE_KEYS:
+            return DistributionKeySampler(n_keys, distribution)
+
+        keys = np.arange(1, n_keys + 1)
+        weights = get_key_weights(n_keys, distribution)
+        if seed is not None and weights is not None:
+            keys = np.random.RandomState(int(seed)).permutation(keys)
+        return cls(keys, weights)
+
+    def sample(self, size):
+        """
+        This method draws size keys.
+
+        Returns:
+            keys: (np.ndarray) The drawn keys.
+        """
+        if self.cdf is None:
+            idxs = np.random.randint(0, len(self.keys), size=size)
+        else:
+            idxs = np.searchsorted(self.cdf,
+                                   np.random.random_sample(size) * self.cdf[-1],
+                                   side='right')
+            # A draw that rounds up to the total weight would index past the
+            # last key.
+            idxs = np.minimum(idxs, len(self.keys) - 1)
+        return self.keys[idxs]
+
+    def sample_one(self):
+        """
+        This method draws a single key from a buffer of keys drawn at once.
+
+        Returns:
+            key: The drawn key, as a python object.
+        """
+        if not self._buffer:
+            self._buffer = self.sample(BUFFER_SIZE).tolist()
+        return self._buffer.pop()
+
+
+class DistributionKeySampler(KeySampler):
+    """
+    This class draws the keys 1 to n_keys straight from a key skew
+    distribution, for key sets too large for a table of weights. The keys
+    cover the same range as the keys of KeySampler.for_distribution.
+    """
+    def __init__(self, n_keys, distribution=None):
+        self.n_keys = int(n_keys)
+        self.distribution = get_distribution_name(distribution)
+        self._buffer = []
+
+    def sample(self, size):
+        if self.distribution == 'binomial':
+            keys = np.random.binomial(self.n_keys, p=.5, size=size)
+            return np.clip(keys, 1, self.n_keys)
+        elif self.distribution == 'normal':
+            keys = np.random.normal(self.n_keys / 2.0,
+                                    self.n_keys / 6.0,
+                                    size=size)
+            return np.clip(np.rint(keys), 1, self.n_keys).astype(np.int64)
+        elif self.distribution == 'zipf':
+            keys = np.random.zipf(ZIPF_EXPONENT, size=size)
+            # Redraw the keys out of range until they are all in range.
+            out_of_range = keys > self.n_keys
+            while out_of_range.any():
+                keys[out_of_range] = np.random.zipf(ZIPF_EXPONENT,
+                                                    size=out_of_range.sum())
+                out_of_range = keys > self.n_keys
+            return keys
+        # Shifted after the draw so that the bound fits in an int64 when
+        # n_keys is sys.maxsize.
+        return np.random.randint(0, self.n_keys, size=size) + 1
@@ -18,6 +18,7 @@ import json
 import logging
 import math
 import numpy as np
+import pyarrow as pa
 import random
 import re
 import string
@@ -30,6 +31,7 @@ from faker_schema.faker_schema import FakerSchema
 from google.cloud import bigquery as bq
 from google.cloud import storage as gcs
 from scipy.stats import truncnorm
+from .KeySampler import KeySampler
 from google.cloud.exceptions import NotFound
 import sys
 
@@ -58,6 +60,8 @@ class DataGenerator(object):
         primary_key_cols (str): The primary key for the generated data.
         dest_joining_key_col (str): The name of the key column in the table
             we are generating that joins to source_joining_key_col.
+        key_seed (int): The seed shuffling the skewed key weights, so that
+            tables generated with the same seed agree on the frequent keys.
 
     """
     def __init__(self,
@@ -76,6 +80,7 @@ class DataGenerator(object):
                  key_skew='None',
                  primary_key_cols=None,
                  dest_joining_key_col=None,
+                 key_seed=None,
                  bq_cli=None):
         """
         Args:
@@ -98,6 +103,8 @@ class DataGenerator(object):
         primary_key_cols (str): The primary key for the generated data.
         dest_joining_key_col (str): The name of the key column in the table
             we are generating that joins to source_joining_key_col.
+        key_seed (int): The seed shuffling the skewed key weights, so that
+            tables generated with the same seed agree on the frequent keys.
         """
         if not bq_cli:
             bq_cli = bq.Client()
@@ -160,6 +167,9 @@ class DataGenerator(object):
         self.float_precision = int(float_precision)
         self.key_skew = key_skew
         self.dest_joining_key_col = dest_joining_key_col
+        self.key_seed = None if key_seed is None else int(key_seed)
+        self._joinable_key_set = None
+        self._joinable_key_sampler = None
         # Map the passed string representation of the desired disposition.
         # This will force early error if invalid write disposition.
         write_disp_map = {
@@ -279,7 +289,13 @@ class DataGenerator(object):
             record (dict) The record mutated to have keys in key_col that join
                 to the fact table.
         """
-        record[self.dest_joining_key_col] = np.random.choice(key_set)
+        # The side input is the same list for the records of a worker, so the
+        # keys are indexed once and drawn in bulk.
+        if self._joinable_key_set is not key_set:
+            self._joinable_key_sampler = KeySampler(key_set)
+            self._joinable_key_set = key_set
+        record[self.dest_joining_key_col] = \
+            self._joinable_key_sampler.sample_one()
         return [record]
 
 
@@ -288,7 +304,7 @@ class FakeRowGen(beam.DoFn):
     This class wraps the logic defined in DataGenerator object and generates a
     fake record for each element it is passed.
     """
-    def __init__(self, data_gen):
+    def __init__(self, data_gen, batch_size=None):
         """
         This initiates some properties of the FakeRowGen DoFn including an
         instance of the DataGenerator class and the number of records should be
@@ -297,8 +313,13 @@ class FakeRowGen(beam.DoFn):
         Attributes:
             data_gen(DataGenerator): defines the shape of the data should be
             generated by this DoFn.
+            batch_size(int): When set, the records are generated column by
+            column in batches of this many records with one NumPy call per
+            column, instead of one record at a time.
         """
         self.data_gen = data_gen
+        self._key_samplers = {}
+        self.batch_size = int(batch_size) if batch_size else None
 
     # Helper function to get a single field dictionary from the schema for
     # checking type and mode.
@@ -493,18 +514,227 @@ class FakeRowGen(beam.DoFn):
         a, b = (lower_bound - mu) / sigma, (upper_bound - mu) / sigma
         return truncnorm.rvs(a, b, mu, sigma)
 
+    def get_key_sampler(self, distribution=None):
+        """
+        This method returns the sampler of the n_keys keys for a key skew
+        distribution, built once per distribution.
+        """
+        if distribution not in self._key_samplers:
+            self._key_samplers[distribution] = KeySampler.for_distribution(
+                self.data_gen.n_keys, distribution, seed=self.data_gen.key_seed)
+        return self._key_samplers[distribution]
+
     def get_skewed_key(self, distribution=None):
-        if distribution is None or distribution == 'None':
-            distribution = 'uniform'
-        if distribution.lower() == 'binomial':
-            return np.random.binomial(int(self.data_gen.n_keys), p=.5)
-        elif distribution.lower() == 'zipf':
-            key = np.random.zipf(1.25)
-            while key > self.data_gen.n_keys:
-                key = np.random.zipf(1.25, 1)
-            return int(key)
-        elif distribution.lower() == 'uniform':
-            return int(np.random.randint(1, self.data_gen.n_keys))
+        return self.get_key_sampler(distribution).sample_one()
+
+    def get_skewed_keys(self, size, distribution=None):
+        """
+        This is the vectorized counterpart of get_skewed_key, drawing an array
+        of size keys at once.
+        """
+        return self.get_key_sampler(distribution).sample(size)
+
+    def generate_column_array(self, n_rows, fieldname, fields=None):
+        """
+        This function generates the values of a field for n_rows records with
+        one NumPy call, following the same rules as sanity_check.
+
+        Args:
+            n_rows (int): The number of values to generate.
+            fieldname (str): name of field we are generating with this call.
+            fields (list): The schema of the record containing this field,
+                the table schema by default.
+
+        Returns:
+            values (np.ndarray): The n_rows values of the field, with dates
+                and timestamps as datetime64 values. For a RECORD field, this
+                is a tuple of the number of structs of each record and a list
+                of (name, values, nulls) tuples for the nested fields. None if
+                the field type is not generated.
+            nulls (np.ndarray): A boolean mask of the null values, or None.
+        """
+        field = self.get_field_dict(fieldname, fields=fields)
+        # Uniform variates in [0, 1) play the part of
+        # random_number / sys.maxsize in sanity_check.
+
+        if field['type'] == 'RECORD':
+            # We will fill each array of struct with 0-3 elements, generating
+            # the nested records of the whole batch at once.
+            n_structs = np.random.randint(0, 4, size=n_rows)
+            n_nested_rows = int(n_structs.sum())
+            nested_columns = []
+            for col in field['fields']:
+                col_values, col_nulls = self.generate_column_array(
+                    n_nested_rows, col['name'], fields=field['fields'])
+                nested_columns.append((col['name'], col_values, col_nulls))
+            values = (n_structs, nested_columns)
+        elif field['type'] == 'STRING':
+            # Efficiently generate random string.
+            STRING_LENGTH = 36
+
+            # If the description of the field is a RDMS schema like VARCHAR(255)
+            # then we extract this number and generate a string of this length.
+            if field.get('description'):
+                extracted_numbers = re.findall('\d+', field['description'])
+                if extracted_numbers:
+                    STRING_LENGTH = int(extracted_numbers[0])
+
+            # Draw the characters of every string in a single call and view
+            # each row of characters as one fixed width string.
+            letters = np.frombuffer(string.ascii_letters.encode('ascii'),
+                                    dtype='S1')
+            char_idxs = np.random.randint(0,
+                                          len(string.ascii_letters),
+                                          size=(n_rows, STRING_LENGTH))
+            if STRING_LENGTH:
+                values = np.char.decode(
+                    letters[char_idxs].view(
+                        'S{}'.format(STRING_LENGTH)).ravel(), 'ascii')
+            else:
+                values = np.full(n_rows, '')
+
+        elif field['type'] in ('TIMESTAMP', 'DATETIME'):
+            pcts = np.random.random_sample(n_rows)
+            # Offsets in seconds from the epoch of min_date.
+            start = np.datetime64(self.data_gen.min_date, 's')
+            max_delta = self.data_gen.max_date - self.data_gen.min_date
+            values = start + (pcts * max_delta.total_seconds()).astype(
+                'timedelta64[s]')
+
+        elif field['type'] == 'DATE':
+            pcts = np.random.random_sample(n_rows)
+            # Offsets in days from min_date.
+            start = np.datetime64(self.data_gen.min_date, 'D')
+            max_delta = self.data_gen.max_date - self.data_gen.min_date
+            values = start + (pcts * max_delta.days).astype('timedelta64[D]')
+
+        elif field['type'] == 'INTEGER':
+            pcts = np.random.random_sample(n_rows)
+            max_size = self.data_gen.max_int
+            values = (max_size * pcts).astype(np.int64)
+
+            if '_max_' in field['name'].lower():
+                max_size = int(fieldname[fieldname.find("_max_") +
+                                         5:len(fieldname)])
+            # This implements max and sign constraints.
+            values = np.minimum(values, max_size)
+            if self.data_gen.only_pos:
+                values = np.abs(values)
+
+        elif field['type'] == 'FLOAT' or field['type'] == 'NUMERIC':
+            pcts = np.random.random_sample(n_rows)
+            max_size = float(self.data_gen.max_float)
+
+            if '_max_' in field['name'].lower():
+                max_size = float(fieldname[fieldname.find("_max_") +
+                                           5:len(fieldname)])
+            values = np.round(max_size * pcts, self.data_gen.float_precision)
+            if self.data_gen.only_pos:
+                values = np.abs(values)
+
+        else:
+            # Like sanity_check, other types are left out of the records.
+            return None, None
+
+        # Make some values null based on null_prob.
+        nulls = None
+        if field.get('mode') == 'NULLABLE' and self.data_gen.null_prob > 0:
+            nulls = np.random.random_sample(n_rows) < self.data_gen.null_prob
+
+        # Pick key at random from foreign keys.
+        # Draw key column from [0, n_keys) if has _key in the name.
+        # This forces key column to no contain nulls
+        if '_key' in field['name'].lower() or '_id' in field['name'].lower():
+            values = self.get_skewed_keys(n_rows, self.data_gen.key_skew)
+            nulls = None
+
+            if field['type'] == "STRING":
+                # Assume the key field is of string type.
+                values = values.astype(str)
+
+        return values, nulls
+
+    def column_to_list(self, values, nulls=None):
+        """
+        This function converts the values generated by generate_column_array
+        to the data types BigQuery expects in json records.
+
+        Returns:
+            values (list): The values of the column.
+        """
+        if isinstance(values, tuple):
+            n_structs, nested_columns = values
+            nested_records = [{} for _ in range(int(n_structs.sum()))]
+            for col_name, col_values, col_nulls in nested_columns:
+                if col_values is None:
+                    continue
+                for nested_record, value in zip(
+                        nested_records,
+                        self.column_to_list(col_values, col_nulls)):
+                    nested_record[col_name] = value
+            ends = np.cumsum(n_structs).tolist()
+            values = [
+                nested_records[end - n:end]
+                for n, end in zip(n_structs.tolist(), ends)
+            ]
+        elif np.issubdtype(values.dtype, np.datetime64):
+            values = np.datetime_as_string(values).tolist()
+        else:
+            values = values.tolist()
+
+        if nulls is not None:
+            for i in np.flatnonzero(nulls).tolist():
+                values[i] = None
+        return values
+
+    def column_to_arrow(self, n_rows, values, nulls, pa_type):
+        """
+        This function converts the values generated by generate_column_array
+        to a pyarrow array of pa_type, without going through python objects.
+
+        Returns:
+            array (pa.Array): The values of the column.
+        """
+        if values is None:
+            return pa.nulls(n_rows, type=pa_type)
+
+        if isinstance(values, tuple):
+            n_structs, nested_columns = values
+            struct_type = pa_type.value_type \
+                if pa.types.is_list(pa_type) else pa_type
+            n_nested_rows = int(n_structs.sum())
+            nested_arrays = [
+                self.column_to_arrow(n_nested_rows, col_values, col_nulls,
+                                     struct_type[col_name].type)
+                for col_name, col_values, col_nulls in nested_columns
+            ]
+            structs = pa.StructArray.from_arrays(
+                nested_arrays, fields=list(struct_type))
+            offsets = np.concatenate([[0], np.cumsum(n_structs)])
+            return pa.ListArray.from_arrays(pa.array(offsets, pa.int32()),
+                                            structs)
+
+        array = pa.array(values, mask=nulls)
+        if not array.type.equals(pa_type):
+            # eg. NUMERIC fields are generated as floats but written as
+            # integers.
+            array = array.cast(pa_type, safe=False)
+        return array
+
+    def generate_column(self, n_rows, fieldname, fields=None):
+        """
+        This function generates the values of a field for n_rows records.
+
+        Returns:
+            values (list): The n_rows values of the field, as the data types
+                BigQuery expects, or None if the field type is not generated.
+        """
+        values, nulls = self.generate_column_array(n_rows,
+                                                   fieldname,
+                                                   fields=fields)
+        if values is None:
+            return None
+        return self.column_to_list(values, nulls)
 
     def convert_key_types(self, keys):
         """
@@ -561,6 +791,83 @@ class FakeRowGen(beam.DoFn):
             data.pop('frequency')
         return json.dumps(data)
 
+    def generate_fake_batch(self, fschema, n_rows, key_dict=None):
+        """
+        This method creates n_rows fake records based on the constraints
+        defined in this FakeRowGen instance's data_gen attribute, generating
+        each column of the batch at once.
+
+        Arguments:
+                fschema (dict): Contains a faker_schema (this should be
+                    generated by DataGenerator.get_faker_schema() )
+                n_rows (int): The number of records to generate.
+
+        Returns:
+            rows (list): The n_rows records serialized as json strings.
+        """
+
+        # Drop the key columns because we do not need to randomly generate them.
+        if key_dict:
+            for key in list(key_dict.keys()):
+                fschema.pop(key, None)
+
+        col_names = []
+        columns = []
+        for col_name in list(fschema.keys()):
+            values = self.generate_column(n_rows, col_name)
+            if values is not None:
+                col_names.append(col_name)
+                columns.append(values)
+
+        keys = {}
+        if key_dict:
+            keys = dict(self.convert_key_types(key_dict))
+            keys.pop('frequency', None)
+
+        rows = []
+        for row_values in zip(*columns):
+            data = dict(zip(col_names, row_values))
+            # Join the keys and the rest of the genreated data
+            data.update(keys)
+            rows.append(json.dumps(data))
+        if not columns:
+            rows = [json.dumps(keys)] * n_rows
+        return rows
+
+    def generate_record_batch(self, pa_schema, n_rows, key_dict=None):
+        """
+        This method creates n_rows fake records as a pyarrow RecordBatch,
+        building each column from the generated arrays without any per record
+        conversion.
+
+        Arguments:
+                pa_schema (pa.Schema): The schema of the batch (this should be
+                    generated by get_pyarrow_translated_schema() )
+                n_rows (int): The number of records to generate.
+
+        Returns:
+            batch (pa.RecordBatch): The n_rows records.
+        """
+        keys = {}
+        if key_dict:
+            keys = dict(self.convert_key_types(key_dict))
+            keys.pop('frequency', None)
+
+        arrays = []
+        for pa_field in pa_schema:
+            if pa_field.name in keys:
+                # The key columns are the same for the whole batch.
+                arrays.append(
+                    pa.array([keys[pa_field.name]] * n_rows,
+                             type=pa_field.type))
+            else:
+                values, nulls = self.generate_column_array(
+                    n_rows, pa_field.name)
+                arrays.append(
+                    self.column_to_arrow(n_rows, values, nulls,
+                                         pa_field.type))
+        return pa.RecordBatch.from_arrays(arrays, schema=pa_schema)
+
     def process(self, element, *args, **kwargs):
         """This function creates a random record based on the properties
         of the passed DataGenerator object for each element in prior the
@@ -576,6 +883,16 @@ class FakeRowGen(beam.DoFn):
             # of the histogram table.
             frequency = int(element.get('frequency'))
 
+            if self.batch_size:
+                for start in range(0, frequency, self.batch_size):
+                    rows = self.generate_fake_batch(
+                        fschema=faker_schema,
+                        n_rows=min(self.batch_size, frequency - start),
+                        key_dict=element)
+                    for row in rows:
+                        yield row
+                return
+
             for i in range(frequency):
                 row = self.generate_fake(fschema=faker_schema,
                                          key_dict=element)
@@ -586,6 +903,44 @@ class FakeRowGen(beam.DoFn):
             yield row
 
 
+class FakeRecordBatchGen(FakeRowGen):
+    """
+    This class generates the fake records of each element it is passed as
+    pyarrow Tables of batch_size records, to be written to parquet as row
+    groups.
+    """
+    DEFAULT_BATCH_SIZE = 10000
+
+    def __init__(self, data_gen, pa_schema, batch_size=None):
+        """
+        Attributes:
+            data_gen(DataGenerator): defines the shape of the data should be
+            generated by this DoFn.
+            pa_schema(pa.Schema): The schema of the generated Tables.
+            batch_size(int): The number of records of each Table.
+        """
+        super(FakeRecordBatchGen, self).__init__(
+            data_gen, batch_size=batch_size or self.DEFAULT_BATCH_SIZE)
+        self.pa_schema = pa_schema
+
+    def process(self, element, *args, **kwargs):
+        """This function creates the records of the prior PCollection's
+        element, a row of the histogram table, in Tables of batch_size
+        records.
+
+        Args:
+            element: A single element of the PCollection
+        """
+        frequency = int(element.get('frequency'))
+
+        for start in range(0, frequency, self.batch_size):
+            batch = self.generate_record_batch(
+                self.pa_schema,
+                n_rows=min(self.batch_size, frequency - start),
+                key_dict=element)
+            yield pa.Table.from_batches([batch])
+
+
 def parse_data_generator_args(argv):
     """ This function parses and implements the defaults for the known arguments
     needed to instantiate the DataGenerator class from the command line
@@ -650,10 +1005,20 @@ def parse_data_generator_args(argv):
                         'of rowcount across keys.  '
                         'This also supports "binomial" giving a maximum '
                         'variance bell curve of keys over the range of the'
-                        ' keyset or "zipf" giving a distribution across '
+                        ' keyset, "normal" giving a wider bell curve or '
+                        '"zipf" giving a distribution across '
                         'the keyset according to zipf\'s law',
                         default=None)
 
+    parser.add_argument('--key_seed',
+                        dest='key_seed',
+                        required=False,
+                        help='Seed shuffling which keys are the most frequent '
+                        'with a skewed key distribution. Tables generated '
+                        'with the same seed and n_keys agree on their '
+                        'frequent keys.',
+                        default=None)
+
     parser.add_argument('--min_date',
                         dest='min_date',
                         required=False,
@@ -727,6 +1092,13 @@ def parse_data_generator_args(argv):
                         'data to avro on gcs.',
                         default=None)
 
+    parser.add_argument('--write_to_parquet',
+                        dest='write_to_parquet',
+                        help='This is a flag for writing to parquet on gcs. '
+                        'The records are generated and written in columnar '
+                        'batches of --batch_size records.',
+                        action="store_true")
+
     parser.add_argument('--gcs_output_prefix',
                         dest='output_prefix',
                         help='GCS path for output',
@@ -738,6 +1110,14 @@ def parse_data_generator_args(argv):
                         help='BigQuery Write Disposition.',
                         default='WRITE_APPEND')
 
+    parser.add_argument('--batch_size',
+                        dest='batch_size',
+                        required=False,
+                        help='Number of records to generate at once, column '
+                        'by column. By default records are generated one at '
+                        'a time.',
+                        default=None)
+
     return parser.parse_known_args(argv)
 
 
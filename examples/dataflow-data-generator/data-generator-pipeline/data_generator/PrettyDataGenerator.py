@@ -29,6 +29,7 @@ from faker_schema.faker_schema import FakerSchema
 from google.cloud import bigquery as bq
 from google.cloud import storage as gcs
 from scipy.stats import truncnorm
+from .KeySampler import KeySampler
 from google.cloud.exceptions import NotFound
 import sys
 
@@ -57,6 +58,8 @@ class DataGenerator(object):
         primary_key_cols (str): The primary key for the generated data.
         dest_joining_key_col (str): The name of the key column in the table
             we are generating that joins to source_joining_key_col.
+        key_seed (int): The seed shuffling the skewed key weights, so that
+            tables generated with the same seed agree on the frequent keys.
 
     """
     def __init__(self,
@@ -75,6 +78,7 @@ class DataGenerator(object):
                  key_skew='None',
                  primary_key_cols=None,
                  dest_joining_key_col=None,
+                 key_seed=None,
                  bq_cli=None):
         """
         Args:
@@ -97,6 +101,8 @@ class DataGenerator(object):
         primary_key_cols (str): The primary key for the generated data.
         dest_joining_key_col (str): The name of the key column in the table
             we are generating that joins to source_joining_key_col.
+        key_seed (int): The seed shuffling the skewed key weights, so that
+            tables generated with the same seed agree on the frequent keys.
         """
         if not bq_cli:
             bq_cli = bq.Client()
@@ -158,6 +164,9 @@ class DataGenerator(object):
         self.float_precision = int(float_precision)
         self.key_skew = key_skew
         self.dest_joining_key_col = dest_joining_key_col
+        self.key_seed = None if key_seed is None else int(key_seed)
+        self._joinable_key_set = None
+        self._joinable_key_sampler = None
         # Map the passed string representation of the desired disposition.
         # This will force early error if invalid write disposition.
         write_disp_map = {
@@ -278,7 +287,13 @@ class DataGenerator(object):
             record (dict) The record mutated to have keys in key_col that join
                 to the fact table.
         """
-        record[self.dest_joining_key_col] = np.random.choice(key_set)
+        # The side input is the same list for the records of a worker, so the
+        # keys are indexed once and drawn in bulk.
+        if self._joinable_key_set is not key_set:
+            self._joinable_key_sampler = KeySampler(key_set)
+            self._joinable_key_set = key_set
+        record[self.dest_joining_key_col] = \
+            self._joinable_key_sampler.sample_one()
         return [record]
 
 
@@ -298,6 +313,7 @@ class FakeRowGen(beam.DoFn):
             generated by this DoFn.
         """
         self.data_gen = data_gen
+        self._key_samplers = {}
 
     # Helper function to get a single field dictionary from the schema for
     # checking type and mode.
@@ -492,18 +508,18 @@ class FakeRowGen(beam.DoFn):
         a, b = (lower_bound - mu) / sigma, (upper_bound - mu) / sigma
         return truncnorm.rvs(a, b, mu, sigma)
 
+    def get_key_sampler(self, distribution=None):
+        """
+        This method returns the sampler of the n_keys keys for a key skew
+        distribution, built once per distribution.
+        """
+        if distribution not in self._key_samplers:
+            self._key_samplers[distribution] = KeySampler.for_distribution(
+                self.data_gen.n_keys, distribution, seed=self.data_gen.key_seed)
+        return self._key_samplers[distribution]
+
     def get_skewed_key(self, distribution=None):
-        if distribution is None or distribution == 'None':
-            distribution = 'uniform'
-        if distribution.lower() == 'binomial':
-            return np.random.binomial(int(self.data_gen.n_keys), p=.5)
-        elif distribution.lower() == 'zipf':
-            key = np.random.zipf(1.25)
-            while key > self.data_gen.n_keys:
-                key = np.random.zipf(1.25, 1)
-            return int(key)
-        elif distribution.lower() == 'uniform':
-            return int(np.random.randint(1, self.data_gen.n_keys))
+        return self.get_key_sampler(distribution).sample_one()
 
     def convert_key_types(self, keys):
         """
@@ -647,10 +663,20 @@ def parse_data_generator_args(argv):
                         'of rowcount across keys.  '
                         'This also supports "binomial" giving a maximum '
                         'variance bell curve of keys over the range of the'
-                        ' keyset or "zipf" giving a distribution across '
+                        ' keyset, "normal" giving a wider bell curve or '
+                        '"zipf" giving a distribution across '
                         'the keyset according to zipf\'s law',
                         default=None)
 
+    parser.add_argument('--key_seed',
+                        dest='key_seed',
+                        required=False,
+                        help='Seed shuffling which keys are the most frequent '
+                        'with a skewed key distribution. Tables generated '
+                        'with the same seed and n_keys agree on their '
+                        'frequent keys.',
+                        default=None)
+
     parser.add_argument('--min_date',
                         dest='min_date',
                         required=False,
@@ -71,7 +71,8 @@ def run(argv=None):
         write_disp=data_args.write_disp,
         key_skew=data_args.key_skew,
         primary_key_cols=data_args.primary_key_cols,
-        dest_joining_key_col=data_args.dest_joining_key_col)
+        dest_joining_key_col=data_args.dest_joining_key_col,
+        key_seed=data_args.key_seed)
 
     # Initiate the pipeline using the pipeline arguments passed in from the
     # command line.  This includes information including where Dataflow should
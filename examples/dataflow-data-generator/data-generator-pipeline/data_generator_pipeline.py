@@ -72,7 +72,8 @@ def run(argv=None):
                              float_precision=data_args.float_precision,
                              write_disp=data_args.write_disp,
                              key_skew=data_args.key_skew,
-                             primary_key_cols=data_args.primary_key_cols)
+                             primary_key_cols=data_args.primary_key_cols,
+                             key_seed=data_args.key_seed)
 
     # Initiate the pipeline using the pipeline arguments passed in from the
     # command line.  This includes information including where Dataflow should
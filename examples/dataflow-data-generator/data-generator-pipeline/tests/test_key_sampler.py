@@ -0,0 +1,96 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import sys
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from data_generator.KeySampler import (DistributionKeySampler, KeySampler,
+                                      get_key_weights)
+
+
+class TestKeySampler(unittest.TestCase):
+    def test_sample_from_key_set(self):
+        key_set = ['a', 'b', 'c']
+        sampler = KeySampler(key_set)
+
+        keys = sampler.sample(10000)
+        self.assertEqual(len(keys), 10000)
+        self.assertEqual(set(keys.tolist()), set(key_set))
+
+        # Single keys are served as python objects.
+        self.assertIn(sampler.sample_one(), key_set)
+        self.assertIsInstance(sampler.sample_one(), str)
+
+    def test_sample_with_weights(self):
+        sampler = KeySampler([1, 2, 3], weights=[0.0, 1.0, 3.0])
+
+        keys = sampler.sample(100000)
+        self.assertNotIn(1, keys)
+        # Key 3 is drawn three times as often as key 2.
+        self.assertAlmostEqual(np.mean(keys == 3), 0.75, delta=0.01)
+
+    def test_for_distribution(self):
+        for distribution in [None, 'binomial', 'normal', 'zipf']:
+            sampler = KeySampler.for_distribution(1000, distribution)
+            keys = sampler.sample(10000)
+            self.assertGreaterEqual(keys.min(), 1)
+            self.assertLessEqual(keys.max(), 1000)
+
+        # Zipf keys are skewed towards the first keys.
+        keys = KeySampler.for_distribution(1000, 'zipf').sample(10000)
+        self.assertGreater(np.mean(keys == 1), np.mean(keys == 1000))
+
+        # Key sets too large for a table of weights are drawn directly.
+        sampler = KeySampler.for_distribution(sys.maxsize, 'zipf')
+        self.assertGreaterEqual(sampler.sample(100).min(), 1)
+        self.assertIsInstance(sampler.sample_one(), int)
+
+        with self.assertRaises(ValueError):
+            KeySampler.for_distribution(1000, 'poisson')
+
+    def test_uniform_key_range(self):
+        # Both samplers draw the keys 1 to n_keys.
+        keys = KeySampler.for_distribution(3, None).sample(10000)
+        self.assertEqual(set(keys.tolist()), {1, 2, 3})
+
+        keys = DistributionKeySampler(3, None).sample(10000)
+        self.assertEqual(set(keys.tolist()), {1, 2, 3})
+
+        keys = DistributionKeySampler(sys.maxsize, None).sample(100)
+        self.assertGreaterEqual(keys.min(), 1)
+
+    def test_sample_at_total_weight(self):
+        sampler = KeySampler([1, 2, 3], weights=[1.0, 1.0, 0.0])
+        # A draw equal to the total weight stays on the last key.
+        with mock.patch.object(np.random, 'random_sample',
+                               return_value=np.ones(5)):
+            keys = sampler.sample(5)
+        np.testing.assert_array_equal(keys, [3] * 5)
+
+    def test_seed_agrees_on_frequent_keys(self):
+        sampler = KeySampler.for_distribution(1000, 'zipf', seed=42)
+        other_sampler = KeySampler.for_distribution(1000, 'zipf', seed=42)
+        np.testing.assert_array_equal(sampler.keys, other_sampler.keys)
+
+        most_frequent_key = sampler.keys[np.argmax(get_key_weights(1000,
+                                                                   'zipf'))]
+        keys = other_sampler.sample(10000)
+        self.assertEqual(np.bincount(keys).argmax(), most_frequent_key)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,6 +24,7 @@ from faker_schema.faker_schema import FakerSchema
 from google.cloud import bigquery as bq
 
 from data_generator.PerformantDataGenerator import DataGenerator, FakeRowGen
+from data_generator.ParquetUtil import get_pyarrow_translated_schema
 
 
 class TestPerformantDataGenerator(unittest.TestCase):
@@ -142,6 +143,83 @@ class TestPerformantDataGenerator(unittest.TestCase):
         # Check if record type nesting worked.
         self.assertIsInstance(actual_row['lo_record_field'], list)
 
+    def test_generate_fake_batch(self):
+        """
+        This tests the generate_fake_batch function of the FakeRowGen class which generates
+        a batch of records column by column. The records should obey the same rules as the
+        ones returned by generate_fake.
+        """
+        faker_schema = self.fakerowgen.data_gen.get_faker_schema()
+        key_dict = {'lo_cust_key': 12, 'frequency': 100}
+        actual_rows = [
+            json.loads(row) for row in self.fakerowgen.generate_fake_batch(
+                faker_schema, 100, key_dict=key_dict)
+        ]
+
+        # Check returns the requested number of records.
+        self.assertEqual(len(actual_rows), 100)
+
+        for actual_row in actual_rows:
+            # Check the keys were joined to the generated data.
+            self.assertEqual(actual_row['lo_cust_key'], '12')
+            self.assertNotIn('frequency', actual_row)
+
+            # Check the date in range.
+            actual_date = datetime.datetime.strptime(
+                actual_row['lo_orderdate'], '%Y-%m-%d').date()
+            self.assertGreaterEqual(actual_date, self.data_gen.min_date)
+            self.assertLessEqual(actual_date, self.data_gen.max_date)
+
+            # Check the numbers are in range and strictly positive.
+            self.assertLessEqual(actual_row['lo_linenumber'],
+                                 self.data_gen.max_int)
+            self.assertGreaterEqual(actual_row['lo_linenumber'], 0)
+            self.assertLessEqual(actual_row['lo_tax'],
+                                 self.data_gen.max_float)
+            self.assertGreaterEqual(actual_row['lo_tax'], 0.0)
+
+            # Check string size was parsed and enforced from description fields of lo_recieptfile.
+            self.assertLessEqual(len(actual_row['lo_recieptfile']), 10)
+
+            # Check if record type nesting worked.
+            self.assertIsInstance(actual_row['lo_record_field'], list)
+            self.assertLessEqual(len(actual_row['lo_record_field']), 3)
+
+    def test_generate_record_batch(self):
+        """
+        This tests the generate_record_batch function of the FakeRowGen class which builds a
+        pyarrow RecordBatch with the translated schema from the generated columns.
+        """
+        pa_schema = get_pyarrow_translated_schema(self.data_gen.schema)
+        key_dict = {'lo_cust_key': 12, 'frequency': 100}
+        actual_batch = self.fakerowgen.generate_record_batch(
+            pa_schema, 100, key_dict=key_dict)
+
+        # Check the batch has the translated schema and the requested number of records.
+        self.assertTrue(actual_batch.schema.equals(pa_schema))
+        self.assertEqual(actual_batch.num_rows, 100)
+
+        for actual_row in actual_batch.to_pylist():
+            # Check the keys were set for every record.
+            self.assertEqual(actual_row['lo_cust_key'], '12')
+
+            # Check the date in range.
+            self.assertGreaterEqual(actual_row['lo_orderdate'],
+                                    self.data_gen.min_date)
+            self.assertLessEqual(actual_row['lo_orderdate'],
+                                 self.data_gen.max_date)
+
+            # Check the numbers are in range.
+            self.assertLessEqual(actual_row['lo_linenumber'],
+                                 self.data_gen.max_int)
+            self.assertLessEqual(actual_row['lo_tax'],
+                                 self.data_gen.max_float)
+
+            # Check if record type nesting worked.
+            self.assertLessEqual(len(actual_row['lo_record_field']), 3)
+            for nested_row in actual_row['lo_record_field']:
+                self.assertIsInstance(nested_row['date'], datetime.datetime)
+
     def test_get_field_dict(self):
         """
         This tests the ability of the FakeRowGen.get_field_dict method to extract a single field
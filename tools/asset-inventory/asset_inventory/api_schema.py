@@ -13,13 +13,30 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-"""Generates BigQuery schema from API discovery documents."""
+"""Generates BigQuery schema from API discovery documents.
 
+Discovery documents and the schemas translated from them can also be cached on
+local disk, see `APISchema.configure_disk_cache`. Running this module pre-warms
+that cache with every API in the discovery directory:
+
+    python -m asset_inventory.api_schema --cache_dir /tmp/asset-inventory-cache
+"""
+
+import argparse
+from concurrent import futures
+import hashlib
+import json
+import logging
+import os
 import re
+import tempfile
+import time
 
 from asset_inventory import bigquery_schema
 import requests
 
+DISCOVERY_DIRECTORY_URL = 'https://content.googleapis.com/discovery/v1/apis'
+
 
 class APISchema(object):
     """Convert a CAI asset type to a BigQuery table schema.
@@ -33,6 +50,76 @@ class APISchema(object):
     _discovery_document_cache = dict()
     _schema_cache = {}
 
+    # Directory to persist discovery documents and translated schemas in, none
+    # to only cache in memory.
+    _disk_cache_dir = os.environ.get('ASSET_INVENTORY_SCHEMA_CACHE_DIR')
+    # Seconds before a disk cache entry is evicted.
+    _disk_cache_ttl = 7 * 24 * 60 * 60
+
+    @classmethod
+    def configure_disk_cache(cls, cache_dir, ttl=None):
+        """Persist discovery documents and schemas in the cache_dir.
+
+        Args:
+            cache_dir: Local directory to cache in, None to disable.
+            ttl: Seconds before a cached entry expires.
+        """
+        cls._disk_cache_dir = cache_dir
+        if ttl is not None:
+            cls._disk_cache_ttl = ttl
+
+    @classmethod
+    def _get_disk_cache_path(cls, kind, cache_key):
+        file_name = hashlib.sha1(cache_key.encode('utf-8')).hexdigest()
+        return os.path.join(cls._disk_cache_dir, kind, file_name + '.json')
+
+    @classmethod
+    def _read_disk_cache(cls, kind, cache_key):
+        """Return the cached json value or None if missing or expired."""
+        if not cls._disk_cache_dir:
+            return None
+        path = cls._get_disk_cache_path(kind, cache_key)
+        try:
+            if time.time() - os.path.getmtime(path) > cls._disk_cache_ttl:
+                os.remove(path)
+                return None
+            with open(path) as cache_file:
+                return json.load(cache_file)
+        except (IOError, OSError, ValueError):
+            return None
+
+    @classmethod
+    def _write_disk_cache(cls, kind, cache_key, value):
+        """Atomically write the json value to the disk cache."""
+        if not cls._disk_cache_dir:
+            return
+        path = cls._get_disk_cache_path(kind, cache_key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+        except OSError:
+            # created concurrently.
+            pass
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(handle, 'w') as cache_file:
+            json.dump(value, cache_file)
+        os.rename(temp_path, path)
+
+    @classmethod
+    def evict_expired_disk_cache(cls):
+        """Remove disk cache entries older than the ttl."""
+        if not cls._disk_cache_dir:
+            return
+        now = time.time()
+        for kind in ('discovery', 'schema'):
+            kind_dir = os.path.join(cls._disk_cache_dir, kind)
+            if not os.path.isdir(kind_dir):
+                continue
+            for file_name in os.listdir(kind_dir):
+                path = os.path.join(kind_dir, file_name)
+                if now - os.path.getmtime(path) > cls._disk_cache_ttl:
+                    os.remove(path)
+
     @classmethod
     def _get_discovery_document(cls, dd_url):
         """Retreive and cache a discovery document."""
@@ -41,12 +128,17 @@ class APISchema(object):
         discovery_document = None
         # Ignore discovery document urls that aren't urls.
         if dd_url and dd_url.startswith('http'):
-            response = requests.get(dd_url)
-            if response.status_code == 200:
-                try:
-                    discovery_document = response.json()
-                except ValueError:
-                    pass
+            discovery_document = cls._read_disk_cache('discovery', dd_url)
+            if discovery_document is None:
+                response = requests.get(dd_url)
+                if response.status_code == 200:
+                    try:
+                        discovery_document = response.json()
+                    except ValueError:
+                        pass
+                if discovery_document is not None:
+                    cls._write_disk_cache('discovery', dd_url,
+                                          discovery_document)
         cls._discovery_document_cache[dd_url] = discovery_document
         return discovery_document
 
@@ -86,7 +178,7 @@ class APISchema(object):
         discovery_documents += [dd] if dd else []
         # and discovery documents from other versions of the same API.
         all_discovery_docs = cls._get_discovery_document(
-            'https://content.googleapis.com/discovery/v1/apis')
+            DISCOVERY_DIRECTORY_URL)
         for discovery_doc in all_discovery_docs['items']:
             dru = discovery_doc['discoveryRestUrl']
             if (api_name == discovery_doc['name'] and dru != dd_url):
@@ -257,6 +349,9 @@ class APISchema(object):
     @classmethod
     def _get_cache_key(cls, resource_name, document):
         if 'id' in document:
+            if 'revision' in document:
+                return '{}.{}.{}'.format(document['id'], document['revision'],
+                                         resource_name)
             return '{}.{}'.format(document['id'], resource_name)
         if 'info' in document:
             info = document['info']
@@ -277,13 +372,16 @@ class APISchema(object):
         cache_key = cls._get_cache_key(resource_name, document)
         if cache_key in cls._schema_cache:
             return cls._schema_cache[cache_key]
-        resources = cls._get_document_resources(document)
-        field_list = []
-        if resource_name in resources:
-            resource = resources[resource_name]
-            properties_map = resource['properties']
-            field_list = cls._properties_map_to_field_list(
-                properties_map, resources, {resource_name: True})
+        field_list = cls._read_disk_cache('schema', cache_key)
+        if field_list is None:
+            resources = cls._get_document_resources(document)
+            field_list = []
+            if resource_name in resources:
+                resource = resources[resource_name]
+                properties_map = resource['properties']
+                field_list = cls._properties_map_to_field_list(
+                    properties_map, resources, {resource_name: True})
+            cls._write_disk_cache('schema', cache_key, field_list)
         cls._schema_cache[cache_key] = field_list
         return field_list
 
@@ -456,3 +554,66 @@ class APISchema(object):
             resource_schema, include_resource, include_iam_policy)
         cls._schema_cache[cache_key] = schema
         return schema
+
+
+def _prewarm_discovery_document(dd_url):
+    """Fetch the discovery document and translate all it's resources."""
+    document = APISchema._get_discovery_document(dd_url)
+    if not document:
+        return 0
+    resources = APISchema._get_document_resources(document)
+    for resource_name in resources:
+        APISchema._translate_resource_to_schema(resource_name, document)
+    return len(resources)
+
+
+def prewarm_disk_cache(cache_dir, ttl=None, api_names=None, threads=16):
+    """Populate the disk cache with all discovery documents and schemas.
+
+    Args:
+        cache_dir: Local directory to cache in.
+        ttl: Seconds before a cached entry expires.
+        api_names: Only cache these APIs, None for all APIs.
+        threads: Number of documents to fetch and translate concurrently.
+    Returns:
+        Number of resources translated.
+    """
+    # pylint: disable=protected-access
+    APISchema.configure_disk_cache(cache_dir, ttl)
+    APISchema.evict_expired_disk_cache()
+    directory = APISchema._get_discovery_document(DISCOVERY_DIRECTORY_URL)
+    dd_urls = [item['discoveryRestUrl'] for item in directory['items']
+               if not api_names or item['name'] in api_names]
+    num_resources = 0
+    with futures.ThreadPoolExecutor(max_workers=threads) as executor:
+        future_to_url = {executor.submit(_prewarm_discovery_document, dd_url):
+                         dd_url for dd_url in dd_urls}
+        for future in futures.as_completed(future_to_url):
+            resources = future.result()
+            logging.info('cached %s resources of %s', resources,
+                         future_to_url[future])
+            num_resources += resources
+    return num_resources
+
+
+def main():
+    logging.basicConfig()
+    logging.getLogger().setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(
+        description='Pre-warm the discovery document and schema disk cache.')
+    parser.add_argument('--cache_dir', required=True,
+                        help='Local directory to cache in.')
+    parser.add_argument('--ttl', type=int, default=None,
+                        help='Seconds before a cached entry expires.')
+    parser.add_argument('--api_names', nargs='*', default=None,
+                        help='Only cache these APIs, like "compute".')
+    parser.add_argument('--threads', type=int, default=16,
+                        help='Number of documents to process concurrently.')
+    args = parser.parse_args()
+    num_resources = prewarm_disk_cache(args.cache_dir, args.ttl,
+                                       args.api_names, args.threads)
+    logging.info('cached %s resources in %s', num_resources, args.cache_dir)
+
+
+if __name__ == '__main__':
+    main()
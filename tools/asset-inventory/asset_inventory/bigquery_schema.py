@@ -31,12 +31,21 @@ The entry points are:
     `get_field_by_name` - Returns a field with the supplied name from a list of
     BigQuery field.
 
+    `compile_schema_data_types` - Returns a function that applies
+    `enforce_schema_data_types` for a schema without traversing the schema on
+    every call.
+
+    `schema_fingerprint` - Returns a hash of the properties and value types of a
+    json object, json objects with the same fingerprint translate to the same
+    schema.
+
 This module helps import json documents into BigQuery.
 
 """
 
 import copy
 from collections import defaultdict
+import hashlib
 from numbers import Number
 import re
 
@@ -116,6 +125,41 @@ def translate_json_to_schema(document):
     return schema
 
 
+def _get_schema_signature(property_value):
+    """Nested tuple of the property names and types of a json value."""
+    if isinstance(property_value, dict):
+        return ('RECORD', tuple(
+            (property_name, _get_schema_signature(child_value))
+            for property_name, child_value in property_value.items()))
+    if isinstance(property_value, list):
+        signatures = []
+        seen_signatures = set()
+        for element in property_value:
+            signature = _get_schema_signature(element)
+            if signature not in seen_signatures:
+                seen_signatures.add(signature)
+                signatures.append(signature)
+        return ('REPEATED', tuple(signatures))
+    return _get_bigquery_type_for_property_value(property_value)
+
+
+def schema_fingerprint(document):
+    """Hash the structure of a json object.
+
+    Two json objects with the same property names, in the same order, and
+    with values of the same types have the same fingerprint and therefore
+    translate to the same schema with `translate_json_to_schema`. The
+    fingerprint is stable across processes.
+
+    Args:
+        document: A json object. It's not modified.
+    Returns:
+        String hex digest.
+    """
+    signature = _get_schema_signature(document)
+    return hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()
+
+
 def get_field_by_name(fields, field_name):
     for i, field in enumerate(fields):
         # BigQuery column names are case insensitive.
@@ -210,15 +254,21 @@ def _merge_schema(destination_schema, source_schema):
     if destination_schema == source_schema:
         return destination_schema
     destination_schema_list = list(destination_schema)
+    # index of each field by lower case name, BigQuery column names are case
+    # insensitive.
+    field_index = {}
+    for i, destination_field in enumerate(destination_schema_list):
+        field_index.setdefault(destination_field['name'].lower(), i)
     for source_field in source_schema:
-        i, destination_field = get_field_by_name(destination_schema_list,
-                                                 source_field['name'])
+        field_name = source_field['name'].lower()
+        i = field_index.get(field_name)
         # field with same name exists, merge them.
-        if destination_field:
-            destination_schema_list[i] = _merge_fields(destination_field,
-                                                       source_field)
+        if i is not None:
+            destination_schema_list[i] = _merge_fields(
+                destination_schema_list[i], source_field)
         # otherwise append at the end.
         else:
+            field_index[field_name] = len(destination_schema_list)
             destination_schema_list.append(source_field)
     return destination_schema_list
 
@@ -511,3 +561,130 @@ def enforce_schema_data_types(resource, schema):
                 else:
                     del resource[field_name]
     return resource
+
+
+def _coerce_string(property_value):
+    if not isinstance(property_value, string_types):
+        return str(property_value)
+    return property_value
+
+
+def _coerce_bool(property_value):
+    if not isinstance(property_value, bool):
+        return bool(property_value)
+    return property_value
+
+
+def _coerce_numeric(property_value):
+    if not isinstance(property_value, Number):
+        try:
+            return float(property_value)
+        except (ValueError, TypeError):
+            return None
+    return property_value
+
+
+def _coerce_identity(property_value):
+    return property_value
+
+
+def _regex_coercer(regex):
+    match = regex.match
+
+    def coerce(property_value):
+        if not match(property_value):
+            return None
+        return property_value
+    return coerce
+
+
+_DATA_TYPE_COERCERS = {
+    'STRING': _coerce_string,
+    'BOOL': _coerce_bool,
+    'TIMESTAMP': _regex_coercer(TIMESTAMP_REGEX),
+    'DATE': _regex_coercer(DATE_REGEX),
+    'DATETIME': _regex_coercer(TIMESTAMP_REGEX),
+    'NUMERIC': _coerce_numeric,
+}
+
+
+def _compile_field_coercer(field):
+    """Compiled `enforce_schema_data_type_on_property` for the field."""
+    if field['field_type'] == 'RECORD':
+        enforce_record = compile_schema_data_types(field.get('fields', []))
+
+        def coerce_record(property_value):
+            if isinstance(property_value, dict):
+                return enforce_record(property_value)
+            return None
+        return coerce_record
+    return _DATA_TYPE_COERCERS.get(field['field_type'], _coerce_identity)
+
+
+def _compile_field_enforcer(field):
+    """Returns function enforcing the field's type on a property of a dict."""
+    coerce = _compile_field_coercer(field)
+    if field.get('mode', 'NULLABLE') != 'REPEATED':
+        def enforce_nullable(resource, field_name):
+            value = coerce(resource[field_name])
+            if value is not None:
+                resource[field_name] = value
+            else:
+                del resource[field_name]
+        return enforce_nullable
+
+    is_record = field['field_type'] == 'RECORD'
+
+    def enforce_repeated(resource, field_name):
+        resource_value = resource[field_name]
+        # see enforce_schema_data_types.
+        if is_record and isinstance(resource_value, dict):
+            resource_value = [{'name': key, 'value': val}
+                              for (key, val) in resource_value.items()]
+        elif not isinstance(resource_value, list):
+            resource_value = [resource_value]
+        new_array = []
+        for value in resource_value:
+            value = coerce(value)
+            if value is not None:
+                new_array.append(value)
+        if any(new_array):
+            resource[field_name] = new_array
+        else:
+            del resource[field_name]
+    return enforce_repeated
+
+
+def compile_schema_data_types(schema):
+    """Compile a schema into a function enforcing its data types.
+
+    The returned function behaves like `enforce_schema_data_types` with the
+    supplied schema but the field lookups and type dispatch are resolved once
+    here instead of for every resource.
+
+    Args:
+        schema: BigQuery schema.
+    Returns:
+        Function accepting a resource dictionary, which it modifies, and
+        returning the modified resource.
+    """
+    field_enforcers = {}
+    for field in schema:
+        field_enforcers.setdefault(field['name'],
+                                   _compile_field_enforcer(field))
+    num_fields = len(field_enforcers)
+
+    def enforce(resource):
+        # visit whichever of the resource properties or schema fields is
+        # smaller.
+        if len(resource) < num_fields:
+            for field_name in list(resource):
+                field_enforcer = field_enforcers.get(field_name)
+                if field_enforcer:
+                    field_enforcer(resource, field_name)
+        else:
+            for field_name, field_enforcer in field_enforcers.items():
+                if field_name in resource:
+                    field_enforcer(resource, field_name)
+        return resource
+    return enforce
@@ -26,6 +26,7 @@ from __future__ import print_function
 import argparse
 import logging
 import pprint
+import time
 
 from concurrent import futures
 
@@ -46,8 +47,8 @@ class Clients(object):
         return cls._cloudasset
 
 
-def export_to_gcs(parent, gcs_destination, content_type, asset_types):
-    """Exports assets to GCS destination.
+def start_export_to_gcs(parent, gcs_destination, content_type, asset_types):
+    """Starts an export of assets to GCS destination.
 
     Invoke either the cloudasset.organizations.exportAssets or
     cloudasset.projects.exportAssets method depending on if parent is a project
@@ -60,24 +61,113 @@ def export_to_gcs(parent, gcs_destination, content_type, asset_types):
         asset_types: None for all asset types or a list of asset names to
         export.
     Returns:
-        The result of the successfully completed export operation.
+        The long running export operation.
     """
     output_config = asset_v1.types.OutputConfig()
     output_config.gcs_destination.uri = gcs_destination
-    operation = Clients.cloudasset().export_assets(
+    return Clients.cloudasset().export_assets(
         parent,
         output_config,
         content_type=content_type,
         asset_types=asset_types)
-    return operation.result()
+
+
+def export_to_gcs(parent, gcs_destination, content_type, asset_types):
+    """Exports assets to GCS destination.
+
+    See `start_export_to_gcs` for arguments.
+    Returns:
+        The result of the successfully completed export operation.
+    """
+    return start_export_to_gcs(parent, gcs_destination, content_type,
+                               asset_types).result()
+
+
+def wait_for_operations(operations, initial_delay=5, max_delay=60,
+                        multiplier=2):
+    """Poll long running operations together until they all complete.
+
+    Args:
+        operations: Dict of keys to `google.api_core.operation.Operation`.
+        initial_delay: Seconds to wait before repolling the first time.
+        max_delay: Maximum seconds to wait between polls.
+        multiplier: Factor the delay increases by after each poll.
+    Returns:
+        A dict of the same keys to the operation results.
+    Raises:
+        GoogleCloudError: if any operation failed.
+    """
+    operation_results = {}
+    pending = dict(operations)
+    delay = initial_delay
+    while pending:
+        for key, operation in list(pending.items()):
+            if operation.done():
+                try:
+                    operation_results[key] = operation.result()
+                except GoogleCloudError:
+                    logging.exception('Error exporting %s', key)
+                    raise
+                del pending[key]
+        if pending:
+            logging.info('waiting on %s exports, sleeping %s seconds.',
+                         len(pending), delay)
+            time.sleep(delay)
+            delay = min(delay * multiplier, max_delay)
+    return operation_results
+
+
+def export_to_gcs_concurrently(parent, gcs_destination, content_types,
+                               asset_types, asset_types_per_export=None):
+    """Start all exports at once and wait on them together.
+
+    Each content type is exported separately and, if asset_types are
+    supplied, split into exports of at most asset_types_per_export asset
+    types to the object `<gcs_destination>/<content_type>-<batch#>.json`.
+
+    Args:
+        parent: Project id or organization number.
+        gcs_destination: GCS object prefix to export to (gs://bucket/prefix)
+        content_types: List of content types to export.
+        asset_types: List of asset_types to export. Supply `None` to get
+        everything.
+        asset_types_per_export: Number of asset types in each export.
+    Returns:
+        A manifest dict of each exported GCS object to a dict of it's
+        `content_type`, `asset_types` and operation `result`.
+    """
+    if asset_types and asset_types_per_export:
+        asset_type_batches = [
+            asset_types[i:i + asset_types_per_export]
+            for i in range(0, len(asset_types), asset_types_per_export)]
+    else:
+        asset_type_batches = [asset_types]
+    manifest = {}
+    operations = {}
+    for content_type in content_types:
+        for batch, batch_asset_types in enumerate(asset_type_batches):
+            if len(asset_type_batches) == 1:
+                object_name = '{}.json'.format(content_type)
+            else:
+                object_name = '{}-{:05d}.json'.format(content_type, batch)
+            object_uri = '{}/{}'.format(gcs_destination, object_name)
+            manifest[object_uri] = {'content_type': content_type,
+                                    'asset_types': batch_asset_types}
+            operations[object_uri] = start_export_to_gcs(
+                parent, object_uri, content_type, batch_asset_types)
+    for object_uri, result in wait_for_operations(operations).items():
+        manifest[object_uri]['result'] = result
+    return manifest
 
 
 def export_to_gcs_content_types(parent, gcs_destination, content_types,
-                                asset_types):
+                                asset_types, asset_types_per_export=None):
     """Export each asset type into a GCS object with the GCS prefix.
 
     Will call `export_to_gcs concurrently` to perform an export, once for each
-    content_type.
+    content_type. If asset_types_per_export is supplied, calls
+    `export_to_gcs_concurrently` to also split the asset types into batches
+    and returns it's manifest.
 
     Args:
         parent: Project id or organization number.
@@ -86,6 +176,7 @@ def export_to_gcs_content_types(parent, gcs_destination, content_types,
         Defaults to [RESOURCE, NAME, IAM_POLICY]
         asset_types: List of asset_types to export. Supply `None` to get
         everything.
+        asset_types_per_export: Number of asset types in each export.
     Returns:
         A dict of content_types and export result objects.
 
@@ -97,6 +188,12 @@ def export_to_gcs_content_types(parent, gcs_destination, content_types,
         asset_types = None
     if content_types is None:
         content_types = ['RESOURCE', 'IAM_POLICY']
+    if asset_types_per_export:
+        manifest = export_to_gcs_concurrently(parent, gcs_destination,
+                                              content_types, asset_types,
+                                              asset_types_per_export)
+        logging.info('export manifest: %s', pprint.pformat(manifest))
+        return manifest
     with futures.ThreadPoolExecutor(max_workers=3) as executor:
         export_futures = {
             executor.submit(export_to_gcs, parent, '{}/{}.json'.format(
@@ -178,6 +275,13 @@ def add_argparse_args(ap, required=False):
         type=lambda x: [y.strip() for y in x.split(',')],
         nargs='?')
 
+    ap.add_argument(
+        '--asset-types-per-export',
+        help=('Split --asset-types into exports of this many asset types, '
+              'all started at once and polled together.'),
+        type=int,
+        default=None)
+
 
 def main():
     logging.basicConfig()
@@ -190,7 +294,8 @@ def main():
         args.parent,
         args.gcs_destination,
         args.content_types,
-        asset_types=args.asset_types.split(',') if args.asset_types else None)
+        asset_types=args.asset_types.split(',') if args.asset_types else None,
+        asset_types_per_export=args.asset_types_per_export)
     logging.info('Export results %s.', pprint.pformat(export_result))
 
 
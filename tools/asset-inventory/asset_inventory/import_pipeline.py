@@ -32,11 +32,13 @@ import copy
 from datetime import datetime
 import json
 import logging
+import math
 import pprint
-import random
+import zlib
 
 import apache_beam as beam
 from apache_beam.io import ReadFromText
+from apache_beam.io.filesystem import CompressionTypes
 from apache_beam.io.filesystems import FileSystems
 from apache_beam.options.pipeline_options import PipelineOptions
 from apache_beam.options.value_provider import StaticValueProvider
@@ -75,67 +77,142 @@ class AssignGroupByKey(beam.DoFn):
 
     - NAME for when merging the iam_policy and the resource together as an
       intermediary step prior to load.
+
+    Assets are assigned to a shard of their key by a stable hash of the asset
+    name so that reruns over the same export produce the same shards. The
+    number of shards for a key is either supplied explicitly in num_shards or,
+    when target_shard_bytes is set, derived from the key sizes computed by
+    `EstimateKeySize` so that each shard holds roughly target_shard_bytes of
+    json.
     """
 
-    def __init__(self, group_by, num_shards):
+    def __init__(self, group_by, num_shards, target_shard_bytes=''):
         if isinstance(group_by, string_types):
             group_by = StaticValueProvider(str, group_by)
         if isinstance(num_shards, str):
             num_shards = StaticValueProvider(str, num_shards)
+        if target_shard_bytes is None:
+            target_shard_bytes = ''
+        if isinstance(target_shard_bytes, string_types):
+            target_shard_bytes = StaticValueProvider(str, target_shard_bytes)
 
         self.num_shards = num_shards
         self.group_by = group_by
+        self.target_shard_bytes = target_shard_bytes
         self.shard_map = None
 
-    def apply_shard(self, key):
+    def get_shard_map(self):
         if self.shard_map is None:
             self.shard_map = {
                 k: int(v) for (k, v) in
                 [sc.split('=') for sc in self.num_shards.get().split(',')]}
-        key_shards = self.shard_map.get(key)
-        if key_shards is None:
-            key_shards = self.shard_map.get('*')
-        if key_shards is None:
-            key_shards = 1
-        shard = random.randint(0, key_shards - 1)
+        return self.shard_map
+
+    def get_target_shard_bytes(self):
+        target_shard_bytes = self.target_shard_bytes.get()
+        if target_shard_bytes:
+            return int(target_shard_bytes)
+        return 0
+
+    def get_key_shards(self, key, key_sizes=None):
+        """Number of shards to split the key into.
+
+        An explicit count for the key in num_shards wins, then a count sized
+        from key_sizes to target_shard_bytes, then the num_shards '*' default.
+        """
+        shard_map = self.get_shard_map()
+        key_shards = shard_map.get(key)
+        if key_shards is not None:
+            return key_shards
+        target_shard_bytes = self.get_target_shard_bytes()
+        if target_shard_bytes and key_sizes and key in key_sizes:
+            return max(1, int(math.ceil(
+                float(key_sizes[key]) / target_shard_bytes)))
+        return shard_map.get('*', 1)
+
+    @classmethod
+    def stable_hash(cls, value):
+        """Hash that doesn't change between processes like `hash` does."""
+        return zlib.crc32(value.encode('utf-8')) & 0xffffffff
+
+    def apply_shard(self, key, name='', key_sizes=None):
+        key_shards = self.get_key_shards(key, key_sizes)
+        shard = self.stable_hash(name) % key_shards
         return key + '.' + str(shard)
 
     @classmethod
     def remove_shard(cls, key):
         return key[:key.rfind('.')]
 
-    def process(self, element):
-        key = 'ASSET_TYPE'
+    def get_group_key(self, element):
+        """Key of the element before sharding, doesn't modify the element."""
         group_by = self.group_by.get()
         if group_by == 'NAME':
-            key = element['asset_type'] + '.' + element['name']
+            return element['asset_type'] + '.' + element['name']
         elif group_by == 'NONE':
-            key = self.apply_shard(element.pop('_group_by', 'resource'))
+            return element.get('_group_by', 'resource')
         elif group_by == 'ASSET_TYPE':
             # use group_by element override if present.
-            key = self.apply_shard(element.pop('_group_by',
-                                               element['asset_type']))
+            return element.get('_group_by', element['asset_type'])
         elif group_by == 'ASSET_TYPE_VERSION':
-            version = ''
+            key = 'ASSET_TYPE'
             if 'resource' in element:
                 version = element['resource']['version']
                 key = element['asset_type'] + '.' + version
-            key = element.pop('_group_by', key)
-            key = self.apply_shard(key)
+            return element.get('_group_by', key)
+        return 'ASSET_TYPE'
+
+    def process(self, element, key_sizes=None):
+        key = self.get_group_key(element)
+        if self.group_by.get() != 'NAME':
+            if '_group_by' in element:
+                # copy as the element is also read by EstimateKeySize.
+                element = dict(element)
+                element.pop('_group_by')
+            key = self.apply_shard(key, element.get('name', ''), key_sizes)
         yield (key, element)
 
 
+class EstimateKeySize(AssignGroupByKey):
+    """Emit the json size of each element under its unsharded group key.
+
+    Summed per key this is the first pass used by `AssignGroupByKey` to size
+    shards to target_shard_bytes. Emits nothing when target_shard_bytes isn't
+    set so the pass is cheap when unused.
+    """
+
+    def __init__(self, group_by, target_shard_bytes):
+        # Can't use super().
+        # https://issues.apache.org/jira/browse/BEAM-6158?focusedCommentId=16919945
+        AssignGroupByKey.__init__(self, group_by, '*=1', target_shard_bytes)
+
+    def process(self, element, key_sizes=None):
+        if self.get_target_shard_bytes():
+            yield (self.get_group_key(element), len(json.dumps(element)))
+
+
 class BigQuerySchemaCombineFn(core.CombineFn):
-    """Reduce a list of schemas into a single schema."""
+    """Reduce a list of schemas into a single schema.
+
+    Most assets of a type have the same shape, so the accumulator tracks the
+    fingerprints of the elements already merged into the schema and skips
+    schema translation for any element with a known fingerprint.
+    """
 
     def create_accumulator(self):
-        return []
+        return {'schema': [], 'fingerprints': set()}
 
     def merge_accumulators(self, accumulators):
-        return bigquery_schema.merge_schemas(accumulators)
+        accumulators = list(accumulators)
+        fingerprints = set()
+        for accumulator in accumulators:
+            fingerprints.update(accumulator['fingerprints'])
+        return {'schema': bigquery_schema.merge_schemas(
+            [accumulator['schema'] for accumulator in accumulators]),
+                'fingerprints': fingerprints}
 
-    def extract_output(self, schema):
-        return schema
+    def extract_output(self, accumulator):
+        return accumulator['schema']
 
     def element_to_schema(self, element):
         element_resource = element.get('resource', {})
@@ -146,11 +223,24 @@ class BigQuerySchemaCombineFn(core.CombineFn):
             'data' in element_resource,
             'iam_policy' in element)
 
-    def add_input(self, schema, element):
+    def element_fingerprint(self, element):
+        """Fingerprint of the element and its API resource schema."""
+        element_resource = element.get('resource', {})
+        return (element['asset_type'],
+                element_resource.get('discovery_name', None),
+                element_resource.get('discovery_document_uri', None),
+                bigquery_schema.schema_fingerprint(element))
+
+    def add_input(self, accumulator, element):
+        fingerprint = self.element_fingerprint(element)
+        if fingerprint in accumulator['fingerprints']:
+            return accumulator
         resource_schema = self.element_to_schema(element)
         json_schema = bigquery_schema.translate_json_to_schema(element)
-        return bigquery_schema.merge_schemas([schema, resource_schema,
-                                              json_schema])
+        accumulator['schema'] = bigquery_schema.merge_schemas(
+            [accumulator['schema'], resource_schema, json_schema])
+        accumulator['fingerprints'].add(fingerprint)
+        return accumulator
 
 
 class BigQuerySanitize(beam.DoFn):
@@ -204,17 +294,30 @@ class AddLoadTime(beam.DoFn):
 class EnforceSchemaDataTypes(beam.DoFn):
     """Convert values to match schema types.
     Change json values to match the expected types of the input schema.
+    The schema of each key is compiled once and reused for every element.
     """
 
+    def __init__(self):
+        self.enforcers = {}
+
+    def get_enforcer(self, key_name, schema):
+        """Compiled enforcer for the key, recompiled if the schema changed."""
+        compiled = self.enforcers.get(key_name)
+        if compiled is None or compiled[0] is not schema:
+            compiled = (schema,
+                        bigquery_schema.compile_schema_data_types(schema))
+            self.enforcers[key_name] = compiled
+        return compiled[1]
+
     def process(self, element, schemas):
         """Enforce the datatypes of the input schema on the element data."""
         key_name = element[0]
         elements = element[1]
-        schema = schemas[key_name]
+        enforce = self.get_enforcer(key_name, schemas[key_name])
         for elem in elements:
             resource_data = elem.get('resource', {}).get('data', {})
             if resource_data:
-                bigquery_schema.enforce_schema_data_types(elem, schema)
+                enforce(elem)
             yield (key_name, elem)
 
 
@@ -243,52 +346,119 @@ class WriteToGCS(beam.DoFn):
 
     All written objects are prefixed by the input stage_dir and loadtime. There
     is an object for each group-key, either an object per asset type, or for
-    each asset type version.
+    each asset type version. When stage_file_bytes is set, an object is rolled
+    over to a new one `<key>-<n>.json` once it holds that many bytes of json.
+    Objects are gzip compressed (and suffixed with .gz) when stage_compression
+    is GZIP which BigQuery can load directly.
+
+    Every staged object is emitted as a (key, path) pair, which grouped by key
+    is the manifest of objects each BigQuery load job reads.
 
     There is nothing cleaning up these objects so it might be prudent to have a
     lifecycle policy on the GCS destination bucket to purge old files.
 
     """
 
-    def __init__(self, stage_dir, load_time):
+    # Serialized lines are buffered and written in chunks of this size.
+    WRITE_BUFFER_BYTES = 8 * 1024 * 1024
+
+    def __init__(self, stage_dir, load_time, stage_compression='NONE',
+                 stage_file_bytes=''):
         if isinstance(stage_dir, string_types):
             stage_dir = StaticValueProvider(str, stage_dir)
         if isinstance(load_time, string_types):
             load_time = StaticValueProvider(str, load_time)
+        if stage_compression is None:
+            stage_compression = 'NONE'
+        if isinstance(stage_compression, string_types):
+            stage_compression = StaticValueProvider(str, stage_compression)
+        if stage_file_bytes is None:
+            stage_file_bytes = ''
+        if isinstance(stage_file_bytes, string_types):
+            stage_file_bytes = StaticValueProvider(str, stage_file_bytes)
 
         self.stage_dir = stage_dir
         self.load_time = load_time
+        self.stage_compression = stage_compression
+        self.stage_file_bytes = stage_file_bytes
         self.open_files = {}
 
-    def get_path_for_key_name(self, key_name):
+    def is_compressed(self):
+        stage_compression = self.stage_compression.get()
+        return bool(stage_compression) and stage_compression.upper() == 'GZIP'
+
+    def get_max_file_bytes(self):
+        stage_file_bytes = self.stage_file_bytes.get()
+        if stage_file_bytes:
+            return int(stage_file_bytes)
+        return 0
+
+    def get_path_for_key_name(self, key_name, file_index=0):
         stage_dir = self.stage_dir.get()
         load_time = self.load_time.get()
-        return FileSystems.join(stage_dir, load_time, key_name + '.json')
+        file_name = key_name
+        if file_index:
+            file_name += '-{:05d}'.format(file_index)
+        file_name += '.json'
+        if self.is_compressed():
+            file_name += '.gz'
+        return FileSystems.join(stage_dir, load_time, file_name)
 
     def start_bundle(self):
         self.open_files = {}
 
-    def _get_file_for_element(self, element):
-        key_name = element[0]
-        if key_name in self.open_files:
-            return self.open_files[key_name], None
-        file_path = self.get_path_for_key_name(key_name)
-        file_handle = FileSystems.create(file_path, mime_type='text/json')
-        self.open_files[key_name] = file_handle
-        return file_handle, file_path
+    def _open_file(self, key_name, file_index):
+        """Create the staging object and track it as the key's open file."""
+        file_path = self.get_path_for_key_name(key_name, file_index)
+        compression_type = CompressionTypes.UNCOMPRESSED
+        if self.is_compressed():
+            compression_type = CompressionTypes.GZIP
+        file_handle = FileSystems.create(file_path, mime_type='text/json',
+                                         compression_type=compression_type)
+        # file handle, bytes written, index of the file for the key.
+        self.open_files[key_name] = [file_handle, 0, file_index]
+        return file_path
+
+    def _write_lines(self, key_name, lines, num_bytes):
+        open_file = self.open_files[key_name]
+        open_file[0].write(b''.join(lines))
+        open_file[1] += num_bytes
 
     def process(self, element):
-        file_handle, created_file_path = self._get_file_for_element(element)
+        key_name = element[0]
+        created_file_paths = []
+        if key_name not in self.open_files:
+            created_file_paths.append(self._open_file(key_name, 0))
+        max_file_bytes = self.get_max_file_bytes()
+        lines = []
+        lines_bytes = 0
         for asset_line in element[1]:
-            file_handle.write(json.dumps(asset_line).encode())
-            file_handle.write(b'\n')
-        if created_file_path:
-            yield (element[0], created_file_path)
+            line = json.dumps(asset_line).encode() + b'\n'
+            open_file = self.open_files[key_name]
+            file_bytes = open_file[1] + lines_bytes
+            if max_file_bytes and file_bytes and (
+                    file_bytes + len(line) > max_file_bytes):
+                self._write_lines(key_name, lines, lines_bytes)
+                lines = []
+                lines_bytes = 0
+                open_file[0].close()
+                created_file_paths.append(
+                    self._open_file(key_name, open_file[2] + 1))
+            lines.append(line)
+            lines_bytes += len(line)
+            if lines_bytes >= self.WRITE_BUFFER_BYTES:
+                self._write_lines(key_name, lines, lines_bytes)
+                lines = []
+                lines_bytes = 0
+        if lines:
+            self._write_lines(key_name, lines, lines_bytes)
+        for created_file_path in created_file_paths:
+            yield (key_name, created_file_path)
 
     def finish_bundle(self):
-        for _, file_handle in self.open_files.items():
+        for _, open_file in self.open_files.items():
             logging.info('finish bundle')
-            file_handle.close()
+            open_file[0].close()
 
 
 class BigQueryDoFn(beam.DoFn):
@@ -373,8 +543,14 @@ class LoadToBigQuery(BigQueryDoFn):
     """Load each writen GCS object to BigQuery.
     The Beam python SDK doesn't support dynamic BigQuery destinations yet so
     this must be done within the workers.
+
+    All the staged objects of a key are loaded by a single multi-uri load job
+    unless there are more than a load job accepts.
     """
 
+    # Maximum number of source URIs in a single BigQuery load job.
+    MAX_SOURCE_URIS = 10000
+
     def __init__(self, dataset, add_load_date_suffix, load_time):
         # Can't use super().
         # https://issues.apache.org/jira/browse/BEAM-6158?focusedCommentId=16919945
@@ -407,19 +583,21 @@ class LoadToBigQuery(BigQueryDoFn):
             field='timestamp')
         job_config.schema = self.to_bigquery_schema(schemas[sharded_key_name])
         job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
-        try:
-            load_job = self.bigquery_client.load_table_from_uri(
-                object_paths,
-                table_ref,
-                location=self.dataset_location,
-                job_config=job_config)
-            self.load_jobs[key_name] = load_job
-        except BadRequest as e:
-            logging.error('error in load_job %s, %s, %s, %s',
-                          str(object_paths), str(table_ref),
-                          str(self.dataset_location),
-                          str(job_config.to_api_repr()))
-            raise e
+        for start in range(0, len(object_paths), self.MAX_SOURCE_URIS):
+            source_uris = object_paths[start:start + self.MAX_SOURCE_URIS]
+            try:
+                load_job = self.bigquery_client.load_table_from_uri(
+                    source_uris,
+                    table_ref,
+                    location=self.dataset_location,
+                    job_config=job_config)
+                self.load_jobs[(sharded_key_name, start)] = load_job
+            except BadRequest as e:
+                logging.error('error in load_job %s, %s, %s, %s',
+                              str(source_uris), str(table_ref),
+                              str(self.dataset_location),
+                              str(job_config.to_api_repr()))
+                raise e
 
     def finish_bundle(self):
         self.bigquery_client = None
@@ -464,10 +642,30 @@ class ImportAssetOptions(PipelineOptions):
                 ' For example "google.compute.VpnTunnel=1,*=10"'),
             default='*=1')
 
+        parser.add_value_provider_argument(
+            '--target_shard_bytes', help=(
+                'Size the number of shards of each key so that each shard'
+                ' holds roughly this many bytes of json. Explicit counts for'
+                ' a key in --num_shards take precedence.'
+                ' For example "500000000"'),
+            default='')
+
         parser.add_value_provider_argument(
             '--stage',
             help='GCS location to write intermediary BigQuery load files.')
 
+        parser.add_value_provider_argument(
+            '--stage_compression',
+            default='NONE',
+            choices=['NONE', 'GZIP'],
+            help='Compression of the intermediary BigQuery load files.')
+
+        parser.add_value_provider_argument(
+            '--stage_file_bytes',
+            default='',
+            help=('Roll over to a new intermediary load file after writing'
+                  ' this many bytes of json. Unbounded if not supplied.'))
+
         parser.add_value_provider_argument(
             '--load_time',
             default=datetime.now().isoformat(),
@@ -503,9 +701,17 @@ def run(argv=None):
         | 'group_by_name' >> beam.GroupByKey()
         | 'combine_policy' >> beam.ParDo(CombinePolicyResource()))
 
+    # Size of each key for sizing shards, empty unless target_shard_bytes.
+    key_sizes = (
+        merged_iam | 'estimate_key_size' >> beam.ParDo(
+            EstimateKeySize(options.group_by, options.target_shard_bytes))
+        | 'sum_key_size' >> beam.CombinePerKey(sum))
+
     # split into BigQuery tables.
     keyed_assets = merged_iam | 'assign_group_by_key' >> beam.ParDo(
-        AssignGroupByKey(options.group_by, options.num_shards))
+        AssignGroupByKey(options.group_by, options.num_shards,
+                         options.target_shard_bytes),
+        beam.pvalue.AsDict(key_sizes))
 
     # Generate BigQuery schema for each table.
     schemas = keyed_assets | 'to_schema' >> core.CombinePerKey(
@@ -520,7 +726,8 @@ def run(argv=None):
      | 'enforce_schema' >> beam.ParDo(EnforceSchemaDataTypes(), pvalue_schemas)
      | 'group_by_key_before_write' >> beam.GroupByKey()
      | 'write_to_gcs' >> beam.ParDo(
-         WriteToGCS(options.stage, options.load_time))
+         WriteToGCS(options.stage, options.load_time,
+                    options.stage_compression, options.stage_file_bytes))
      | 'group_written_objects_by_key' >> beam.GroupByKey()
      | 'delete_tables' >> beam.ParDo(
          DeleteDataSetTables(options.dataset, options.add_load_date_suffix,
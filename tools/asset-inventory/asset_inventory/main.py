@@ -150,7 +150,8 @@ def main():
     if not args.skip_export:
         export.export_to_gcs_content_types(args.parent, args.gcs_destination,
                                            args.content_types,
-                                           args.asset_types)
+                                           args.asset_types,
+                                           args.asset_types_per_export)
 
     # Perform the import, via template or beam runner.
     launch_location = args.template_job_launch_location
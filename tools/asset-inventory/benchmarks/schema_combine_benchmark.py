@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+#
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Microbenchmark of BigQuerySchemaCombineFn over a synthetic CAI export.
+
+Compares translating and merging the schema of every element, as done before
+schema fingerprints, with `import_pipeline.BigQuerySchemaCombineFn`. Run from
+the tools/asset-inventory directory:
+
+    python benchmarks/schema_combine_benchmark.py --num_assets 100000
+"""
+
+import argparse
+import random
+import timeit
+
+from asset_inventory import bigquery_schema
+from asset_inventory import import_pipeline
+from asset_inventory.api_schema import APISchema
+
+ASSET_TYPES = ['google.compute.Instance', 'google.compute.Disk',
+               'google.storage.Bucket']
+
+
+def synthetic_asset(asset_type, i):
+    """A CAI export line with a few optional properties."""
+    data = {
+        'id': str(i),
+        'name': 'asset-{}'.format(i),
+        'creationTimestamp': '2019-01-01T00:00:00Z',
+        'labels': [{'name': 'env', 'value': 'prod'}],
+        'status': {'state': 'RUNNING', 'sizeGb': i % 100},
+        'networkInterfaces': [{'network': 'default',
+                               'accessConfigs': [{'natIP': '10.0.0.1'}]}],
+    }
+    # a small number of distinct shapes like a real export.
+    if i % 7 == 0:
+        data['description'] = 'asset description'
+    if i % 11 == 0:
+        data['status']['deleted'] = False
+    return {
+        'name': '//{}/{}'.format(asset_type, i),
+        'asset_type': asset_type,
+        'resource': {'version': 'v1',
+                     'discovery_document_uri': 'not-a-url',
+                     'discovery_name': asset_type.split('.')[-1],
+                     'parent': '//projects/p',
+                     'data': data}
+    }
+
+
+def synthetic_export(num_assets):
+    return [synthetic_asset(random.choice(ASSET_TYPES), i)
+            for i in range(num_assets)]
+
+
+def combine_without_fingerprints(combine_fn, elements):
+    schema = []
+    for element in elements:
+        resource_schema = combine_fn.element_to_schema(element)
+        json_schema = bigquery_schema.translate_json_to_schema(element)
+        schema = bigquery_schema.merge_schemas([schema, resource_schema,
+                                                json_schema])
+    return schema
+
+
+def combine_with_fingerprints(combine_fn, elements):
+    accumulator = combine_fn.create_accumulator()
+    for element in elements:
+        accumulator = combine_fn.add_input(accumulator, element)
+    return combine_fn.extract_output(accumulator)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--num_assets', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    random.seed(0)
+    elements = synthetic_export(args.num_assets)
+    # don't fetch discovery documents during the benchmark.
+    for asset_type in ASSET_TYPES:
+        APISchema._schema_cache['{}.True.False'.format(asset_type)] = []
+    combine_fn = import_pipeline.BigQuerySchemaCombineFn()
+
+    baseline = combine_without_fingerprints(combine_fn, elements)
+    fingerprinted = combine_with_fingerprints(combine_fn, elements)
+    assert baseline == fingerprinted, 'schemas differ'
+
+    for name, function in [('translate every element',
+                            combine_without_fingerprints),
+                           ('schema fingerprints',
+                            combine_with_fingerprints)]:
+        seconds = min(timeit.repeat(lambda: function(combine_fn, elements),
+                                    number=1, repeat=args.repeat))
+        print('{:<25} {:8.3f}s {:10.0f} assets/s'.format(
+            name, seconds, args.num_assets / seconds))
+
+
+if __name__ == '__main__':
+    main()
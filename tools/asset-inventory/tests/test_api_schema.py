@@ -15,8 +15,13 @@
 # limitations under the License.
 """Test construction of a BigQuery schema from an API discovery document.."""
 
+import os
+import shutil
+import tempfile
+import time
 import unittest
 from asset_inventory.api_schema  import APISchema
+import mock
 
 
 # pylint:disable=protected-access
@@ -36,6 +41,8 @@ class TestApiSchema(unittest.TestCase):
 
     def tearDown(self):
         APISchema._discovery_document_cache = {}
+        APISchema._schema_cache = {}
+        APISchema.configure_disk_cache(None)
 
     def test_simple_properties(self):
         api_properties = {
@@ -343,3 +350,52 @@ class TestApiSchema(unittest.TestCase):
                                       'field_type': 'STRING',
                                       'description': 'description-2.',
                                       'mode': 'NULLABLE'}]}]}])
+
+    @mock.patch('asset_inventory.api_schema.requests.get')
+    def test_disk_cache(self, mock_get):
+        discovery_document = {
+            'id': 'compute:v1',
+            'revision': '20200101',
+            'schemas': {
+                'Instance': {
+                    'properties': {
+                        'property-1': {'type': 'string'}}}}}
+        mock_get.return_value.status_code = 200
+        mock_get.return_value.json.return_value = discovery_document
+        dd_url = 'https://www.googleapis.com/discovery/v1/apis/compute/v1/rest'
+        cache_dir = tempfile.mkdtemp()
+        try:
+            APISchema.configure_disk_cache(cache_dir, 60)
+            self.assertEqual(APISchema._get_discovery_document(dd_url),
+                             discovery_document)
+            schema = APISchema._translate_resource_to_schema(
+                'Instance', discovery_document)
+            self.assertEqual(mock_get.call_count, 1)
+
+            # a new process reads from disk.
+            APISchema._discovery_document_cache = {}
+            APISchema._schema_cache = {}
+            with mock.patch.object(APISchema,
+                                   '_properties_map_to_field_list') as translate:
+                self.assertEqual(APISchema._get_discovery_document(dd_url),
+                                 discovery_document)
+                self.assertEqual(APISchema._translate_resource_to_schema(
+                    'Instance', discovery_document), schema)
+                translate.assert_not_called()
+            self.assertEqual(mock_get.call_count, 1)
+
+            # expired entries are evicted and fetched again.
+            APISchema._discovery_document_cache = {}
+            expired = time.time() - 120
+            for root, _, files in os.walk(cache_dir):
+                for file_name in files:
+                    os.utime(os.path.join(root, file_name),
+                             (expired, expired))
+            APISchema._get_discovery_document(dd_url)
+            self.assertEqual(mock_get.call_count, 2)
+            APISchema.evict_expired_disk_cache()
+            self.assertEqual(os.listdir(os.path.join(cache_dir, 'schema')), [])
+            self.assertEqual(
+                len(os.listdir(os.path.join(cache_dir, 'discovery'))), 1)
+        finally:
+            shutil.rmtree(cache_dir)
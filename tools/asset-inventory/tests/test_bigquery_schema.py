@@ -16,6 +16,7 @@
 
 """Test BigQuery schema translation from JSON objects."""
 
+import copy
 import unittest
 from asset_inventory import bigquery_schema
 
@@ -433,6 +434,104 @@ class TestBigQuerySchema(unittest.TestCase):
               'field_type': 'STRING',
               'mode': 'NULLABLE'}])
 
+    def test_schema_fingerprint(self):
+        document = {'string_field': 'string_value',
+                    'record_field': {'number_field': 1},
+                    'array_field': [{'bool_field': True}]}
+        same_shape = {'string_field': 'other_value',
+                      'record_field': {'number_field': 2.5},
+                      'array_field': [{'bool_field': False},
+                                      {'bool_field': True}]}
+        other_type = {'string_field': 'string_value',
+                      'record_field': {'number_field': '1'},
+                      'array_field': [{'bool_field': True}]}
+        other_property = {'string_field': 'string_value',
+                          'record_field': {'number_field': 1},
+                          'array_field': [{'bool_field': True,
+                                           'extra_field': 'value'}]}
+        fingerprint = bigquery_schema.schema_fingerprint(document)
+        self.assertEqual(fingerprint,
+                         bigquery_schema.schema_fingerprint(same_shape))
+        self.assertNotEqual(fingerprint,
+                            bigquery_schema.schema_fingerprint(other_type))
+        self.assertNotEqual(fingerprint,
+                            bigquery_schema.schema_fingerprint(other_property))
+
+    def test_merge_schemas_case_insensitive(self):
+        schema_1 = [{'name': 'Field',
+                     'field_type': 'NUMERIC',
+                     'mode': 'NULLABLE'}]
+        schema_2 = [{'name': 'other_field',
+                     'field_type': 'STRING',
+                     'mode': 'NULLABLE'},
+                    {'name': 'field',
+                     'field_type': 'STRING',
+                     'mode': 'NULLABLE'}]
+        merged_schema = bigquery_schema.merge_schemas([schema_1, schema_2])
+        self.assertEqual(merged_schema, [{'name': 'Field',
+                                          'field_type': 'STRING',
+                                          'mode': 'NULLABLE'},
+                                         {'name': 'other_field',
+                                          'field_type': 'STRING',
+                                          'mode': 'NULLABLE'}])
+
+    def test_compile_schema_data_types(self):
+        schema = [{'name': 'property_1',
+                   'field_type': 'NUMERIC',
+                   'mode': 'NULLABLE'},
+                  {'name': 'property_2',
+                   'field_type': 'STRING',
+                   'mode': 'NULLABLE'},
+                  {'name': 'property_3',
+                   'field_type': 'DATE',
+                   'mode': 'NULLABLE'},
+                  {'name': 'property_4',
+                   'field_type': 'TIMESTAMP',
+                   'mode': 'NULLABLE'},
+                  {'name': 'property_5',
+                   'field_type': 'BOOL',
+                   'mode': 'NULLABLE'},
+                  {'name': 'property_6',
+                   'field_type': 'NUMERIC',
+                   'mode': 'REPEATED'},
+                  {'name': 'property_7',
+                   'field_type': 'RECORD',
+                   'mode': 'REPEATED',
+                   'fields': [
+                       {'name': 'name',
+                        'field_type': 'STRING',
+                        'description': 'additionalProperties name',
+                        'mode': 'NULLABLE'},
+                       {'name': 'value',
+                        'field_type': 'NUMERIC',
+                        'mode': 'NULLABLE'}]},
+                  {'name': 'property_8',
+                   'field_type': 'RECORD',
+                   'mode': 'NULLABLE',
+                   'fields': [
+                       {'name': 'property_1',
+                        'field_type': 'BOOL',
+                        'mode': 'NULLABLE'}]}]
+        documents = [
+            {'property_1': '333', 'property_2': 33, 'extra': 'value'},
+            {'property_1': 'notanumber', 'property_3': 'invaliddate'},
+            {'property_3': '2019-01-01', 'property_4': '2019-01-01 00:01:00'},
+            {'property_4': 'invalid', 'property_5': 'True', 'property_6': 3},
+            {'property_5': 0, 'property_6': ['33', 'invalid']},
+            {'property_6': ['invalid']},
+            {'property_7': {'key_1': '1', 'key_2': 'invalid'}},
+            {'property_7': [{'name': 'key', 'value': 1}, 33]},
+            {'property_8': {'property_1': 'yes', 'extra': 1}},
+            {'property_8': 'notarecord'},
+            dict(('property_{}'.format(i), str(i)) for i in range(1, 9)),
+        ]
+        enforce = bigquery_schema.compile_schema_data_types(schema)
+        for document in documents:
+            self.assertEqual(
+                enforce(copy.deepcopy(document)),
+                bigquery_schema.enforce_schema_data_types(
+                    copy.deepcopy(document), schema))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -44,6 +44,38 @@ class TestExport(unittest.TestCase):
         export.export_to_gcs_content_types('parent', 'gcs_prefix', None, None)
         self.assertEqual(mock_export_to_gcs.call_count, 2)
 
+    @mock.patch('asset_inventory.export.time.sleep')
+    @mock.patch('asset_inventory.export.start_export_to_gcs')
+    def test_export_to_gcs_concurrently(self, mock_start_export_to_gcs,
+                                        mock_sleep):
+        operations = {}
+
+        def start_export(parent, gcs_destination, content_type, asset_types):
+            operation = mock.Mock()
+            # each operation completes on the second poll.
+            operation.done.side_effect = [False, True]
+            operation.result.return_value = (parent, content_type,
+                                             asset_types)
+            operations[gcs_destination] = operation
+            return operation
+        mock_start_export_to_gcs.side_effect = start_export
+
+        manifest = export.export_to_gcs_content_types(
+            'parent', 'gcs_prefix', ['RESOURCE', 'IAM_POLICY'],
+            ['a', 'b', 'c'], asset_types_per_export=2)
+        self.assertEqual(mock_start_export_to_gcs.call_count, 4)
+        self.assertEqual(sorted(manifest), [
+            'gcs_prefix/IAM_POLICY-00000.json',
+            'gcs_prefix/IAM_POLICY-00001.json',
+            'gcs_prefix/RESOURCE-00000.json',
+            'gcs_prefix/RESOURCE-00001.json'])
+        self.assertEqual(manifest['gcs_prefix/RESOURCE-00001.json'],
+                         {'content_type': 'RESOURCE',
+                          'asset_types': ['c'],
+                          'result': ('parent', 'RESOURCE', ['c'])})
+        # all operations are polled together.
+        self.assertEqual(mock_sleep.call_count, 1)
+
     def test_parse_args_1(self):
         ap = argparse.ArgumentParser()
         export.add_argparse_args(ap)
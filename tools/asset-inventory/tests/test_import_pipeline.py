@@ -16,6 +16,7 @@
 """Test import beam pipeline."""
 
 import glob
+import gzip
 import json
 import os
 import unittest
@@ -122,6 +123,102 @@ class TestImportPipeline(unittest.TestCase):
             self.assertIsInstance(resource_properties, string_types)
             self.assertNotIn('data', instance_row['resource'])
 
+    def test_stable_shard_assignment(self):
+        assign = import_pipeline.AssignGroupByKey('ASSET_TYPE', '*=10')
+        element = {'asset_type': 'google.compute.Instance',
+                   'name': '//compute.googleapis.com/projects/p/instances/i'}
+        first_key = next(assign.process(dict(element)))[0]
+        for _ in range(5):
+            other = import_pipeline.AssignGroupByKey('ASSET_TYPE', '*=10')
+            self.assertEqual(next(other.process(dict(element)))[0], first_key)
+        self.assertEqual(
+            import_pipeline.AssignGroupByKey.remove_shard(first_key),
+            'google.compute.Instance')
+
+    def test_shards_sized_to_target_bytes(self):
+        assign = import_pipeline.AssignGroupByKey(
+            'ASSET_TYPE', 'google.compute.Disk=3,*=1', '100')
+        key_sizes = {'google.compute.Instance': 950,
+                     'google.compute.Network': 10,
+                     'google.compute.Disk': 10000}
+        self.assertEqual(
+            assign.get_key_shards('google.compute.Instance', key_sizes), 10)
+        self.assertEqual(
+            assign.get_key_shards('google.compute.Network', key_sizes), 1)
+        # explicit counts win over sizes.
+        self.assertEqual(
+            assign.get_key_shards('google.compute.Disk', key_sizes), 3)
+        # unknown keys use the default.
+        self.assertEqual(
+            assign.get_key_shards('google.compute.Subnetwork', key_sizes), 1)
+        shards = set()
+        for i in range(200):
+            key, _ = next(assign.process(
+                {'asset_type': 'google.compute.Instance',
+                 'name': 'instance-{}'.format(i)}, key_sizes))
+            shards.add(key)
+        self.assertEqual(len(shards), 10)
+
+    def test_estimate_key_size(self):
+        element = {'asset_type': 'google.compute.Instance', 'name': 'i',
+                   '_group_by': 'resource'}
+        estimate = import_pipeline.EstimateKeySize('ASSET_TYPE', '')
+        self.assertEqual(list(estimate.process(element)), [])
+        estimate = import_pipeline.EstimateKeySize('ASSET_TYPE', '100')
+        self.assertEqual(list(estimate.process(element)),
+                         [('resource', len(json.dumps(element)))])
+
+    def test_write_to_gcs_rolls_over_files(self):
+        write_to_gcs = import_pipeline.WriteToGCS(STAGE_PATH, '', 'NONE',
+                                                  '120')
+        rows = [{'name': 'asset-{}'.format(i), 'padding': 'x' * 20}
+                for i in range(10)]
+        write_to_gcs.start_bundle()
+        written = list(write_to_gcs.process(('google.compute.Instance.0',
+                                             rows)))
+        write_to_gcs.finish_bundle()
+        self.assertEqual(len(written), 5)
+        self.assertEqual(written[0][1], os.path.join(
+            STAGE_PATH, 'google.compute.Instance.0.json'))
+        self.assertEqual(written[1][1], os.path.join(
+            STAGE_PATH, 'google.compute.Instance.0-00001.json'))
+        read_rows = []
+        for _, path in written:
+            self.assertLessEqual(os.path.getsize(path), 120)
+            with open(path) as f:
+                read_rows.extend(json.loads(line) for line in f)
+        self.assertEqual(read_rows, rows)
+
+    def test_write_to_gcs_gzip(self):
+        write_to_gcs = import_pipeline.WriteToGCS(STAGE_PATH, '', 'GZIP')
+        rows = [{'name': 'asset-{}'.format(i)} for i in range(10)]
+        write_to_gcs.start_bundle()
+        written = list(write_to_gcs.process(('resource.0', rows)))
+        write_to_gcs.finish_bundle()
+        self.assertEqual(written, [
+            ('resource.0', os.path.join(STAGE_PATH, 'resource.0.json.gz'))])
+        with gzip.open(written[0][1], 'rt') as f:
+            self.assertEqual([json.loads(line) for line in f], rows)
+
+    def test_schema_combine_skips_known_fingerprints(self):
+        combine = import_pipeline.BigQuerySchemaCombineFn()
+        accumulator = combine.create_accumulator()
+        for i in range(3):
+            accumulator = combine.add_input(
+                accumulator, {'asset_type': 'google.cloud.billing.Account',
+                              'name': 'account-{}'.format(i)})
+        self.assertEqual(len(accumulator['fingerprints']), 1)
+        other = combine.add_input(
+            combine.create_accumulator(),
+            {'asset_type': 'google.cloud.billing.Account',
+             'name': 'account', 'iam_policy': {'etag': 'etag'}})
+        merged = combine.merge_accumulators([accumulator, other])
+        self.assertEqual(len(merged['fingerprints']), 2)
+        field_names = [field['name'] for field
+                       in combine.extract_output(merged)]
+        self.assertIn('name', field_names)
+        self.assertIn('iam_policy', field_names)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -23,9 +23,15 @@ import json
 import copy
 import traceback
 import io
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 from google.cloud import bigquery, datacatalog_v1
-from google.api_core.exceptions import MethodNotImplemented, NotFound
+from google.api_core.exceptions import (
+    GoogleAPICallError,
+    MethodNotImplemented,
+    NotFound,
+)
 import google.auth
 
 __all__ = ["BQTableView"]
@@ -55,6 +61,10 @@ def get_logger(name, fmt):
 
 LOGGER = get_logger("bqtag", FORMAT)
 
+# SQL of nested columns is cached up to the maximum nesting depth supported
+# by BigQuery, the cached SQL of a column including the SQL of its children
+FRAGMENT_CACHE_MAX_DEPTH = 15
+
 
 #############################################################################
 # Classes to create tree structure to create SQL query for nested columns
@@ -66,12 +76,15 @@ class ColumnNode:
     Class to represent a BQ column in a tree
     """
 
-    def __init__(self, name="", parent="", column_json=None, children=None):
+    def __init__(self, name="", parent="", column_json=None, children=None, path=""):
         self.name = name
         self.json = column_json
         self.children = children
         self.parent = parent
         self.mode = ""
+        self.path = path
+        # Tags of the columns under this node, in the order they were added
+        self.tags = dict()
 
 
 class ColumnTree:
@@ -79,14 +92,21 @@ class ColumnTree:
     Class to represent a tree of columns for a BQ table
     """
 
-    def __init__(self):
+    def __init__(self, fragment_cache: dict = None):
+        """
+        :param fragment_cache: Optional dictionary to reuse the SQL of the
+                               subtrees across views of the same table. Columns
+                               have to be added with their tag when it is used.
+        """
         self.root = ColumnNode(
             name="Root", column_json=copy.copy({}), children=copy.copy({})
         )
+        self.fragment_cache = fragment_cache
 
-    def add_node(self, node_json: dict()):
+    def add_node(self, node_json: dict(), tag: str = None):
 
         cur_node = self.root
+        cur_node.tags[tag] = None
 
         path = node_json["name"].split(".")
         parents = path[:-1]
@@ -102,10 +122,12 @@ class ColumnTree:
                     parent=cur_node.name,
                     column_json=copy.copy({}),
                     children=copy.copy({}),
+                    path=cur_node.path + "." + parent if cur_node.path else parent,
                 )
 
                 cur_node.children[parent] = new_node
                 cur_node = new_node
+            cur_node.tags[tag] = None
 
         if node_name in cur_node.children:
             cur_node.children[node_name].json = node_json
@@ -116,95 +138,113 @@ class ColumnTree:
                 parent=cur_node.name,
                 column_json=copy.copy(node_json),
                 children=copy.copy({}),
+                path=node_json["name"],
             )
             cur_node.mode = node_json["parent_mode"]
 
     def generate_query(self):
         """
         Main function to generate SQL query for columns stored in tree.
+
+        Walks the tree iteratively, so that deeply nested schemas do not hit
+        the recursion limit, and appends the SQL to a single list joined at
+        the end. The SQL of a nested column depends only on its path, the name
+        it is referenced by and the tags of the columns it contains, hence it
+        is stored in fragment_cache, if any, and reused by the next views.
         """
-        return_str = ""
         start = self.root
 
-        if start.children:
-            return_lst = self._rec_generate_query(start.children, "")
-            return_str = ", ".join(return_lst)
-
-        return return_str
+        if not start.children:
+            return ""
 
-    def _rec_generate_query(self, children, parent_name):
-        """
-        Recursive function to generate SQL query for columns stored in tree.
-        """
-        db = []
+        buffer = []
+        # Each frame holds a nested column, the name its columns are
+        # referenced by, an iterator over its columns, the position of its
+        # SQL in the buffer and the number of its columns already visited.
+        stack = [[None, "", iter(start.children.values()), 0, 0]]
+
+        while stack:
+            frame = stack[-1]
+            node, parent_name, children = frame[0], frame[1], frame[2]
+            child = next(children, None)
+
+            if child is None:
+                stack.pop()
+                if node is not None:
+                    buffer.append(self._close_struct(node, stack[-1][1]))
+                    if len(stack) <= FRAGMENT_CACHE_MAX_DEPTH:
+                        self._cache_fragment(
+                            node, stack[-1][1], "".join(buffer[frame[3] :])
+                        )
+                continue
 
-        for _, child in children.items():
+            if frame[4]:
+                buffer.append(", ")
+            frame[4] += 1
 
             if len(child.children) == 0:
                 if parent_name == "":
-                    db.append(child.name)
+                    buffer.append(child.name)
                 else:
-                    db.append(parent_name + "." + child.name)
+                    buffer.append(parent_name + "." + child.name)
+                continue
+
+            if len(stack) <= FRAGMENT_CACHE_MAX_DEPTH:
+                fragment = self._get_cached_fragment(child, parent_name)
+                if fragment is not None:
+                    buffer.append(fragment)
+                    continue
+
+            if child.mode == "REPEATED" or parent_name == "":
+                child_parent_name = child.name
             else:
-                if child.mode == "REPEATED":
-                    if parent_name == "":
-                        db.append(
-                            "Array(SELECT AS VALUE STRUCT("
-                            + ", ".join(
-                                self._rec_generate_query(
-                                    children=child.children, parent_name=child.name
-                                )
-                            )
-                            + ") FROM UNNEST("
-                            + child.name
-                            + ") as "
-                            + child.name
-                            + ")  as "
-                            + child.name
-                        )
-                    else:
-                        db.append(
-                            "Array(SELECT AS VALUE STRUCT("
-                            + ", ".join(
-                                self._rec_generate_query(
-                                    children=child.children, parent_name=child.name
-                                )
-                            )
-                            + ") FROM UNNEST("
-                            + parent_name
-                            + "."
-                            + child.name
-                            + ") as "
-                            + child.name
-                            + ")  as "
-                            + child.name
-                        )
-                else:
-                    if parent_name == "":
-                        db.append(
-                            "STRUCT("
-                            + ", ".join(
-                                self._rec_generate_query(
-                                    children=child.children, parent_name=child.name
-                                )
-                            )
-                            + ")  as "
-                            + child.name
-                        )
-                    else:
-                        db.append(
-                            "STRUCT("
-                            + ", ".join(
-                                self._rec_generate_query(
-                                    children=child.children,
-                                    parent_name=parent_name + "." + child.name,
-                                )
-                            )
-                            + ")  as "
-                            + child.name
-                        )
+                child_parent_name = parent_name + "." + child.name
+            stack.append(
+                [
+                    child,
+                    child_parent_name,
+                    iter(child.children.values()),
+                    len(buffer),
+                    0,
+                ]
+            )
+            if child.mode == "REPEATED":
+                buffer.append("Array(SELECT AS VALUE STRUCT(")
+            else:
+                buffer.append("STRUCT(")
+
+        return "".join(buffer)
+
+    @staticmethod
+    def _close_struct(node, parent_name):
+        """
+        Returns the SQL closing a nested or repeated column.
+        """
+        if node.mode == "REPEATED":
+            if parent_name == "":
+                source = node.name
+            else:
+                source = parent_name + "." + node.name
+            return (
+                ") FROM UNNEST(" + source + ") as " + node.name + ")  as " + node.name
+            )
+
+        return ")  as " + node.name
 
-        return db
+    def _get_cached_fragment(self, node, parent_name):
+        """
+        Returns the SQL of a subtree generated for a previous view, if any.
+        """
+        if self.fragment_cache is None:
+            return None
+        return self.fragment_cache.get((node.path, parent_name, tuple(node.tags)))
+
+    def _cache_fragment(self, node, parent_name, fragment):
+        """
+        Stores the SQL of a subtree for the next views.
+        """
+        if self.fragment_cache is not None:
+            self.fragment_cache[(node.path, parent_name, tuple(node.tags))] = fragment
 
 
 ###########################################################################
@@ -239,6 +279,9 @@ class BQTableView:
         self.bq = None
         self.dc = None
 
+        # SQL of nested columns reused across the views of a table
+        self._fragment_caches = dict()
+
         self._get_bq_client()
         self._get_catalog_client()
 
@@ -464,47 +507,37 @@ class BQTableView:
         return table_schema
 
     # Create a view from tags
-    def create_view(self, table_name: str, view_name: str, tags: list) -> str:
+    def create_view(
+        self, table_name: str, view_name: str, tags: list, table_schema: str = None
+    ) -> str:
         """
         Create a new View with columns having specfied tags.
         :param table_name: Name of the source table
         :param view_name: Name of the View to create
         :param tags: List of tags to include in view
+        :param table_schema: Tagged schema of the source table, as returned by
+                             create_table. Downloaded if not provided.
         :return: SQL query of the created view
         """
-        LOGGER.debug("Start Downloading BQ Schema.")
-
-        # Download Table Schema using API
-        try:
-            table = self.bq.get_table(
-                ".".join([self.bq_project, self.dataset, table_name])
-            )
-        except (MethodNotImplemented, NotFound) as e:
-            LOGGER.error("Could not download source table schema: %s", str(e))
-            LOGGER.error(traceback.format_exc())
-            return ""
-
-        f = io.StringIO("")
-        self.bq.schema_to_json(table.schema, f)
-        table_schema = f.getvalue()
-
-        LOGGER.info("Table schema downloaded. Started View Creation.")
+        if not table_schema:
+            table_schema = self._download_schema(table_name)
+            if not table_schema:
+                return ""
 
         # Create a map of tags to columms
         tag_column_map = self._create_tag_column_map(schema=table_schema)
 
-        # Find columns having tag in tags
-        columns = []
+        # Create column tree with columns having tag in tags and generate
+        # query for the view, reusing the SQL of the nested columns generated
+        # for the previous views of the table
+        column_tree = ColumnTree(
+            fragment_cache=self._get_fragment_cache(table_name, table_schema)
+        )
 
         for tag in tags:
             if tag in tag_column_map:
-                columns += tag_column_map[tag]
-
-        # Create column tree and generate query for the view
-        column_tree = ColumnTree()
-
-        for column in columns:
-            column_tree.add_node(column)
+                for column in tag_column_map[tag]:
+                    column_tree.add_node(column, tag)
 
         query_columns = column_tree.generate_query()
 
@@ -540,6 +573,163 @@ class BQTableView:
 
         return query
 
+    # Internal function to download the schema of a table
+    def _download_schema(self, table_name: str) -> str:
+        """
+        Download the tagged schema of a table.
+        :param table_name: Name of the table
+        :return: json containing schema of the table, empty if failure
+        """
+        LOGGER.debug("Start Downloading BQ Schema.")
+
+        # Download Table Schema using API
+        try:
+            table = self.bq.get_table(
+                ".".join([self.bq_project, self.dataset, table_name])
+            )
+        except (MethodNotImplemented, NotFound) as e:
+            LOGGER.error("Could not download source table schema: %s", str(e))
+            LOGGER.error(traceback.format_exc())
+            return ""
+
+        f = io.StringIO("")
+        self.bq.schema_to_json(table.schema, f)
+        table_schema = f.getvalue()
+
+        LOGGER.info("Table schema downloaded. Started View Creation.")
+
+        return table_schema
+
+    # Create tagged tables and views for many tables
+    def create_tables_and_views(self, manifest: list, max_workers: int = 16) -> list:
+        """
+        Create tagged tables and views for all the tables of a manifest.
+        Policy tags are fetched once and the tables are processed in parallel.
+
+        :param manifest: List of tables to process. Each table is
+                         represented as dictionary -
+                         {
+                           "table_name": "Name of the table",
+                           "table_schema": "Schema of the table to
+                                            create (optional)",
+                           "table_tag_map": "Mapping of Tags to
+                                             Columns (optional)",
+                           "views": "Mapping of names of views to
+                                     create to their list of tags
+                                     (optional)"
+                         }
+        :param max_workers: Maximum number of tables processed in parallel
+        :return: List of results, in the order of the manifest. Each result
+                 is represented as dictionary -
+                 {
+                   "table_name": "Name of the table",
+                   "table_schema": "Schema of the table created",
+                   "views": "Mapping of names of views to their
+                             SQL query",
+                   "success": "True if the table and all its views
+                               were created",
+                   "latency": "Time taken in seconds"
+                 }
+        """
+        if not self.policy_tags and not self.fetch_policy_tags():
+            LOGGER.error("Could not fetch Policy Tags. Tables not processed.")
+            return []
+
+        start = time.time()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(self._create_table_and_views, manifest))
+
+        LOGGER.info(
+            "%s of %s tables processed successfully in %.2f seconds.",
+            str(sum(result["success"] for result in results)),
+            str(len(results)),
+            time.time() - start,
+        )
+
+        return results
+
+    # Internal function to create the table and views of a manifest entry
+    def _create_table_and_views(self, table: dict) -> dict:
+        """
+        Create the tagged table, if a schema is provided, and the views of a
+        table.
+
+        :param table: Table to process, as described in
+                      create_tables_and_views
+        :return: Result of the table, as described in create_tables_and_views
+        """
+        start = time.time()
+        table_name = table["table_name"]
+        result = {
+            "table_name": table_name,
+            "table_schema": None,
+            "views": dict(),
+            "success": True,
+            "latency": 0.0,
+        }
+
+        try:
+            table_schema = None
+
+            if table.get("table_schema"):
+                table_schema = self.create_table(
+                    table_name, table["table_schema"], table.get("table_tag_map")
+                )
+                if table_schema == "{}":
+                    table_schema = None
+                    result["success"] = False
+                result["table_schema"] = table_schema
+            elif table.get("views"):
+                # Download the schema once for all the views
+                table_schema = self._download_schema(table_name)
+                if not table_schema:
+                    result["success"] = False
+
+            if result["success"]:
+                for view_name, tags in table.get("views", dict()).items():
+                    query = self.create_view(
+                        table_name, view_name, tags, table_schema=table_schema
+                    )
+                    result["views"][view_name] = query
+                    if not query:
+                        result["success"] = False
+        except GoogleAPICallError as e:
+            LOGGER.error("Could not process table %s: %s", table_name, str(e))
+            LOGGER.error(traceback.format_exc())
+            result["success"] = False
+
+        result["latency"] = time.time() - start
+
+        LOGGER.info(
+            "Table %s processed in %.2f seconds. Success: %s",
+            table_name,
+            result["latency"],
+            str(result["success"]),
+        )
+
+        return result
+
+    # Internal function to get the cache of SQL fragments of a table
+    def _get_fragment_cache(self, table_name: str, table_schema: str) -> dict:
+        """
+        Get the cache of SQL fragments for the views of a table. The cache
+        is reset if the schema of the table has changed.
+
+        :param table_name: Name of the source table
+        :param table_schema: Schema of the source table
+        :return: Cache of SQL fragments
+        """
+        cached_schema, fragment_cache = self._fragment_caches.get(
+            table_name, (None, None)
+        )
+
+        if cached_schema != table_schema:
+            fragment_cache = dict()
+            self._fragment_caches[table_name] = (table_schema, fragment_cache)
+
+        return fragment_cache
+
     # Internal Function to detemine the tagged schema
     def _process_schema(self, table_schema: str, table_tag_map: dict) -> None:
         """
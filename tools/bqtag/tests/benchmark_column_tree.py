@@ -0,0 +1,125 @@
+# Copyright 2021 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Benchmark of the view query generation of ColumnTree over synthetic schemas.
+
+- Wide schema: nested and repeated records with more than 10k leaf columns.
+- Deep schema: columns nested deeper than the Python recursion limit.
+
+Run from the bqtag folder: python -m tests.benchmark_column_tree
+"""
+
+import argparse
+import sys
+import time
+
+from bqtag.bqtag import ColumnTree
+
+TAGS = ["low", "medium", "high", "restricted"]
+
+
+def wide_columns(n_records: int, n_leaves: int) -> list:
+    """
+    Columns of records holding two levels of nested records, tagged in turn.
+    """
+    columns = []
+    for i in range(n_records):
+        for j in range(n_leaves):
+            parent = "record{}.nested{}".format(i, j % 10)
+            columns.append(
+                {
+                    "name": "{}.column{}".format(parent, j),
+                    "type": "STRING",
+                    "parent": parent,
+                    "parent_mode": "REPEATED" if j % 10 < 3 else "",
+                    "tag": TAGS[(i + j) % len(TAGS)],
+                }
+            )
+    return columns
+
+
+def deep_columns(depth: int) -> list:
+    """
+    Columns with a leaf at every level of a chain of nested records.
+    """
+    columns = []
+    parent = ""
+    for level in range(depth):
+        parent = parent + ".level{}".format(level) if parent else "level0"
+        columns.append(
+            {
+                "name": "{}.column{}".format(parent, level),
+                "type": "STRING",
+                "parent": parent,
+                "parent_mode": "REPEATED" if level % 2 else "",
+                "tag": TAGS[level % len(TAGS)],
+            }
+        )
+    return columns
+
+
+def generate_views(columns: list, views: list, fragment_cache: dict = None) -> tuple:
+    """
+    Generates the query of every view and returns the time taken to build
+    the column trees and to generate the queries.
+    """
+    tag_columns = {tag: [] for tag in TAGS}
+    for column in columns:
+        tag_columns[column["tag"]].append(column)
+
+    build_time = query_time = 0.0
+    for tags in views:
+        start = time.perf_counter()
+        column_tree = ColumnTree(fragment_cache=fragment_cache)
+        for tag in tags:
+            for column in tag_columns[tag]:
+                column_tree.add_node(column, tag)
+        built = time.perf_counter()
+        column_tree.generate_query()
+        build_time += built - start
+        query_time += time.perf_counter() - built
+    return build_time, query_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--records", type=int, default=50)
+    parser.add_argument("--leaves", type=int, default=250)
+    parser.add_argument("--depth", type=int, default=2 * sys.getrecursionlimit())
+    args = parser.parse_args()
+
+    views = [TAGS[:n] for n in range(1, len(TAGS) + 1)] * 5
+
+    for name, columns in [
+        ("wide", wide_columns(args.records, args.leaves)),
+        ("deep", deep_columns(args.depth)),
+    ]:
+        build_time, query_time = generate_views(columns, views)
+        _, cached_query_time = generate_views(columns, views, fragment_cache=dict())
+        print(
+            "{} schema, {} leaves, {} views: trees built in {:.3f}s, queries "
+            "generated in {:.3f}s, {:.3f}s with fragment cache".format(
+                name,
+                len(columns),
+                len(views),
+                build_time,
+                query_time,
+                cached_query_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -20,7 +20,10 @@
 
 import unittest
 import json
+import sys
+from unittest import mock
 from bqtag import BQTableView
+from bqtag.bqtag import ColumnTree
 
 BQ_PROJECT = None  # Update this with BQ Project Value
 CATALOG_PROJECT = None  # Update this with Data Catalog Project Value
@@ -198,5 +201,105 @@ class TestQueryParameters(unittest.TestCase):
         )
 
 
+class TestColumnTree(unittest.TestCase):
+    @staticmethod
+    def column(name, parent_mode=""):
+        return {
+            "name": name,
+            "type": "STRING",
+            "parent": name.rpartition(".")[0],
+            "parent_mode": parent_mode,
+        }
+
+    def test_nested_and_repeated_columns(self):
+        """
+        Test query generation for nested and repeated columns.
+        """
+        column_tree = ColumnTree()
+        column_tree.add_node(self.column("column1"))
+        column_tree.add_node(self.column("parent.nested1"))
+        column_tree.add_node(self.column("parent.items.item1", "REPEATED"))
+        column_tree.add_node(self.column("parent.items.item2", "REPEATED"))
+
+        self.assertEqual(
+            column_tree.generate_query(),
+            "column1, STRUCT(parent.nested1, Array(SELECT AS VALUE "
+            "STRUCT(items.item1, items.item2) FROM UNNEST(parent.items) as "
+            "items)  as items)  as parent",
+        )
+
+    def test_deep_nesting_and_fragment_cache(self):
+        """
+        Test query generation beyond the recursion limit and reuse of cached
+        SQL of nested columns.
+        """
+        depth = sys.getrecursionlimit() + 100
+        name = ".".join("level{}".format(i) for i in range(depth))
+        fragment_cache = dict()
+
+        column_tree = ColumnTree(fragment_cache=fragment_cache)
+        column_tree.add_node(self.column(name + ".column1"), "low")
+        query = column_tree.generate_query()
+
+        self.assertTrue(query.startswith("STRUCT(" * depth + name + ".column1)"))
+        self.assertEqual(fragment_cache[("level0", "", ("low",))], query)
+
+        # The next view with the same tags reuses the cached SQL
+        fragment_cache[("level0", "", ("low",))] = "cached"
+        column_tree = ColumnTree(fragment_cache=fragment_cache)
+        column_tree.add_node(self.column(name + ".column1"), "low")
+        self.assertEqual(column_tree.generate_query(), "cached")
+
+
+class TestBatch(unittest.TestCase):
+    def test_create_tables_and_views(self):
+        """
+        Test that policy tags are fetched once and all the tables of the
+        manifest are processed.
+        """
+        with mock.patch.object(BQTableView, "_get_bq_client"), mock.patch.object(
+            BQTableView, "_get_catalog_client"
+        ):
+            bq = BQTableView(bq_dataset=BQ_DATASET, catalog_taxonomy="taxonomy")
+
+        def fetch_policy_tags():
+            bq.policy_tags = {"low": "tags/1"}
+            bq.policy_tags_rev = {"tags/1": "low"}
+            return True
+
+        schema = json.dumps(
+            [{"name": "column1", "type": "STRING", "policyTags": {"names": ["tags/1"]}}]
+        )
+        manifest = [
+            {
+                "table_name": "table{}".format(i),
+                "table_schema": schema,
+                "views": {"view{}".format(i): ["low"]},
+            }
+            for i in range(5)
+        ]
+
+        with mock.patch.object(
+            bq, "fetch_policy_tags", side_effect=fetch_policy_tags
+        ) as fetch, mock.patch.object(
+            bq, "create_table", return_value=schema
+        ), mock.patch.object(
+            bq, "bq", create=True
+        ):
+            bq.bq_project = "project"
+            results = bq.create_tables_and_views(manifest, max_workers=2)
+
+        fetch.assert_called_once_with()
+        self.assertEqual(
+            [r["table_name"] for r in results],
+            ["table0", "table1", "table2", "table3", "table4"],
+        )
+        self.assertTrue(all(r["success"] for r in results))
+        self.assertEqual(
+            results[3]["views"]["view3"],
+            "SELECT column1 FROM `project.{}.table3`".format(BQ_DATASET),
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,34 @@
+# Copyright 2018 Google LLC. All rights reserved. Licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+#
+# Any software provided by Google hereunder is distributed "AS IS", WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, and is not intended for production use.
+"""Phase of a bucket move run by the bucket mover orchestrator"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from enum import Enum
+
+
+class BucketMovePhase(Enum):
+    """Last completed phase of a bucket move, saved in the state file by its value"""
+    pending = 'pending'
+    locked = 'locked'
+    created = 'created'
+    copying = 'copying'
+    copied = 'copied'
+    source_deleted = 'source_deleted'
+    recreated = 'recreated'
+    copying_back = 'copying_back'
+    copied_back = 'copied_back'
+    temp_deleted = 'temp_deleted'
+    done = 'done'
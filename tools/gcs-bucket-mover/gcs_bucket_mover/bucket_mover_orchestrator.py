@@ -0,0 +1,767 @@
+# Copyright 2018 Google LLC. All rights reserved. Licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+#
+# Any software provided by Google hereunder is distributed "AS IS", WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, and is not intended for production use.
+"""Moves a list of buckets concurrently, saving the phase of each bucket move to a state file.
+
+Each bucket move is a state machine going through the same steps as a single bucket move: lock
+down the source bucket, create the temp (or renamed target) bucket, run the STS job, verify that
+the source bucket is empty and delete it, and for a move to the same name, re-create the bucket in
+the target project and run the STS job back from the temp bucket. The blocking API calls of each
+step run in a thread pool, while the STS jobs of all buckets are polled together from the main
+thread, so a bucket waiting on its STS job doesn't hold a thread.
+
+The phase of every bucket is saved after each step, along with the IAM policy and ACLs of the
+source bucket before it is locked down, so an interrupted run can be resumed by running the tool
+again with the same bucket list and state file.
+"""
+
+# The orchestrator reuses the helpers of the single bucket mover.
+# pylint: disable=protected-access
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import collections
+import json
+import os
+import threading
+import time
+from concurrent import futures
+
+import attr
+from attr import attrs, attrib
+
+from google.api_core import iam as api_core_iam
+from google.cloud import exceptions
+from google.cloud.storage import acl as storage_acl
+from googleapiclient import discovery
+
+from gcs_bucket_mover import bucket_details
+from gcs_bucket_mover import bucket_mover_service
+from gcs_bucket_mover import configuration
+from gcs_bucket_mover import sts_job_status
+from gcs_bucket_mover.bucket_move_phase import BucketMovePhase
+
+DEFAULT_MAX_CONCURRENT_MOVES = 10
+DEFAULT_STATE_FILE = 'bucket_mover_state.json'
+
+_STS_POLL_INTERVAL_SECONDS = 10
+# Same limits as the retries of a single bucket move
+_MAX_ATTEMPTS = 10
+_RETRY_WAIT_SECONDS = 10
+_RETRY_WAIT_MAX_SECONDS = 120
+
+_TRANSFER_PHASES = (BucketMovePhase.copying, BucketMovePhase.copying_back)
+# Phases of the transfer back from the temp bucket
+_BACK_TRANSFER_PHASES = (BucketMovePhase.recreated,
+                         BucketMovePhase.copying_back,
+                         BucketMovePhase.copied_back)
+
+
+@attrs  # This is a data class. pylint: disable=too-few-public-methods
+class BucketMoveState(object):
+    """The progress of the move of one bucket, as saved in the state file."""
+    bucket_name = attrib()
+    target_bucket_name = attrib()
+    temp_bucket_name = attrib()
+    is_rename = attrib()
+    phase = attrib(default=BucketMovePhase.pending)
+    sts_account_email = attrib(default=None)
+    # The STS jobs of the current transfer, and the objects each of them transfers
+    sts_job_names = attrib(default=attr.Factory(list))
+    sts_object_conditions = attrib(default=attr.Factory(list))
+    # The IAM policy and ACLs of the source bucket before it was locked down
+    iam_policy = attrib(default=None)
+    acl_entities = attrib(default=None)
+    default_obj_acl_entities = attrib(default=None)
+    # Failed attempts of the current phase, and the time to try it again
+    attempts = attrib(default=0)
+    retry_at = attrib(default=0)
+    error = attrib(default=None)
+
+    def to_dict(self):
+        """Get the state as a JSON serializable dict."""
+        state = attr.asdict(self)
+        state['phase'] = self.phase.value
+        return state
+
+    @classmethod
+    def from_dict(cls, state):
+        """Load a state saved with to_dict.
+
+        Args:
+            state: A dict returned by to_dict
+        """
+        state = dict(state, phase=BucketMovePhase(state['phase']))
+        return cls(**state)
+
+
+class BucketMoverOrchestrator(object):
+    """Runs the moves of a list of buckets as concurrent state machines."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self,
+                 config,
+                 parsed_args,
+                 cloud_logger,
+                 state_file_path=DEFAULT_STATE_FILE,
+                 max_concurrent_moves=DEFAULT_MAX_CONCURRENT_MOVES,
+                 poll_interval=_STS_POLL_INTERVAL_SECONDS):
+        """Init the orchestrator.
+
+        Args:
+            config: A Configuration object with all of the config values needed for the script to
+                run, its bucket names are replaced for each bucket
+            parsed_args: the configargparser parsing of command line options
+            cloud_logger: A GCP logging client instance
+            state_file_path: The local path of the JSON file the phase of each bucket is saved to
+            max_concurrent_moves: The maximum number of buckets being moved at the same time
+            poll_interval: The number of seconds between two checks of the STS jobs
+        """
+
+        self._config = config
+        self._parsed_args = parsed_args
+        self._cloud_logger = cloud_logger
+        self._state_file_path = state_file_path
+        self._max_concurrent_moves = max_concurrent_moves
+        self._poll_interval = poll_interval
+        self._states = collections.OrderedDict()
+        self._outputs = {}
+        # Saved moves of buckets that are not in the bucket list of this run
+        self._other_states = {}
+        self._state_lock = threading.Lock()
+        # The STS discovery client is not thread safe, so each thread builds its own
+        self._thread_local = threading.local()
+
+    def run(self, buckets):
+        """Move the buckets, resuming the moves saved in the state file.
+
+        Args:
+            buckets: A list of (bucket_name, rename_bucket_to) tuples, rename_bucket_to being None
+                unless the bucket is renamed
+
+        Returns:
+            The list of BucketMoveState of the buckets, with their error set if they failed
+        """
+
+        self._cloud_logger.log_text('Starting GCS Bucket Mover')
+        self._load_states(buckets)
+        bucket_mover_service._print_and_log(
+            self._cloud_logger,
+            'Moving {} buckets from project {} to project {}, {} at a time'.format(
+                len(self._states), self._config.source_project,
+                self._config.target_project, self._max_concurrent_moves))
+
+        queue = collections.deque(
+            name for name, state in self._states.items()
+            if state.phase != BucketMovePhase.done)
+        active = set()
+        running = {}
+        next_poll = 0
+
+        with futures.ThreadPoolExecutor(
+                max_workers=self._max_concurrent_moves) as executor:
+            while queue or active:
+                for future in [future for future in running if future.done()]:
+                    del running[future]
+                    future.result()
+
+                while queue and len(active) < self._max_concurrent_moves:
+                    active.add(queue.popleft())
+
+                now = time.time()
+                busy = set(running.values())
+                transferring = []
+                wake_times = []
+                for name in active - busy:
+                    state = self._states[name]
+                    if state.phase == BucketMovePhase.done or state.error:
+                        active.discard(name)
+                    elif state.phase in _TRANSFER_PHASES:
+                        transferring.append(state)
+                    elif state.retry_at > now:
+                        wake_times.append(state.retry_at)
+                    else:
+                        running[executor.submit(self._run_step, state)] = name
+
+                if transferring:
+                    if now >= next_poll:
+                        self._poll_sts_jobs(transferring)
+                        next_poll = now + self._poll_interval
+                        continue
+                    wake_times.append(next_poll)
+
+                timeout = max(0, min(wake_times) - now) if wake_times else None
+                if running:
+                    futures.wait(
+                        list(running),
+                        timeout=timeout,
+                        return_when=futures.FIRST_COMPLETED)
+                elif timeout:
+                    time.sleep(timeout)
+
+        return self._print_summary()
+
+    def _load_states(self, buckets):
+        """Load the saved state of the buckets, or start a new move for the ones not saved.
+
+        Buckets that failed in a previous run are tried again from the phase they failed in.
+
+        Args:
+            buckets: A list of (bucket_name, rename_bucket_to) tuples
+        """
+
+        saved_states = {}
+        if os.path.exists(self._state_file_path):
+            with open(self._state_file_path) as state_file:
+                saved_states = json.load(state_file)['buckets']
+
+        for bucket_name, rename_bucket_to in buckets:
+            if bucket_name in saved_states:
+                state = BucketMoveState.from_dict(saved_states.pop(bucket_name))
+                state.attempts = 0
+                state.retry_at = 0
+                state.error = None
+            else:
+                target_bucket_name, temp_bucket_name, is_rename = configuration.get_bucket_names(
+                    bucket_name, rename_bucket_to)
+                state = BucketMoveState(
+                    bucket_name=bucket_name,
+                    target_bucket_name=target_bucket_name,
+                    temp_bucket_name=temp_bucket_name,
+                    is_rename=is_rename)
+            self._states[bucket_name] = state
+            self._outputs[bucket_name] = _BucketOutput(bucket_name,
+                                                       self._cloud_logger)
+
+        self._other_states = saved_states
+        self._save_states()
+
+    def _save_states(self):
+        """Write the state of every bucket to the state file.
+
+        The file is replaced in one rename, so an interruption can't leave it half written.
+        """
+
+        with self._state_lock:
+            states = dict(self._other_states)
+            for bucket_name, state in self._states.items():
+                states[bucket_name] = state.to_dict()
+
+            temp_path = self._state_file_path + '.tmp'
+            with open(temp_path, 'w') as state_file:
+                json.dump({'buckets': states}, state_file, indent=2, sort_keys=True)
+            os.rename(temp_path, self._state_file_path)
+
+    def _print_summary(self):
+        """Print the buckets that could not be moved.
+
+        Returns:
+            The list of BucketMoveState of the buckets
+        """
+
+        states = list(self._states.values())
+        failed_states = [state for state in states if state.error]
+        for state in failed_states:
+            bucket_mover_service._print_and_log(
+                self._cloud_logger,
+                'Failed to move bucket {} after phase {}: {}'.format(
+                    state.bucket_name, state.phase.value, state.error))
+        bucket_mover_service._print_and_log(
+            self._cloud_logger,
+            'Completed GCS Bucket Mover: {} buckets moved, {} failed'.format(
+                len(states) - len(failed_states), len(failed_states)))
+        return states
+
+    def _get_sts_client(self):
+        """Get the STS client of the current thread."""
+        if not hasattr(self._thread_local, 'sts_client'):
+            self._thread_local.sts_client = discovery.build(
+                'storagetransfer',
+                'v1',
+                credentials=self._config.target_project_credentials)
+        return self._thread_local.sts_client
+
+    def _get_transfer_storage_client(self, state):
+        """Get the storage client of the source bucket of the current transfer."""
+        if state.phase in _BACK_TRANSFER_PHASES:
+            return self._config.target_storage_client
+        return self._config.source_storage_client
+
+    def _get_bucket_config(self, state):
+        """Get a copy of the configuration with the bucket names of a bucket move.
+
+        Args:
+            state: The BucketMoveState of the bucket
+
+        Returns:
+            A Configuration object
+        """
+
+        return attr.evolve(
+            self._config,
+            bucket_name=state.bucket_name,
+            target_bucket_name=state.target_bucket_name,
+            temp_bucket_name=state.temp_bucket_name,
+            is_rename=state.is_rename)
+
+    def _get_step(self, state):
+        """Get the method running the step that follows the current phase of a bucket move."""
+        if state.phase == BucketMovePhase.source_deleted and state.is_rename:
+            return self._remove_sts_permissions
+
+        return {
+            BucketMovePhase.pending: self._lock_source_bucket,
+            BucketMovePhase.locked: self._create_target_bucket,
+            BucketMovePhase.created: self._start_transfer,
+            BucketMovePhase.copied: self._delete_transferred_bucket,
+            BucketMovePhase.source_deleted: self._recreate_source_bucket,
+            BucketMovePhase.recreated: self._start_transfer,
+            BucketMovePhase.copied_back: self._delete_transferred_bucket,
+            BucketMovePhase.temp_deleted: self._remove_sts_permissions,
+        }[state.phase]
+
+    def _run_step(self, state):
+        """Run the next step of a bucket move and save its state.
+
+        Errors are retried with an exponential backoff, except the SystemExit raised when the
+        bucket can't be moved, like when the lock file exists.
+
+        Args:
+            state: The BucketMoveState of the bucket
+        """
+
+        output = self._outputs[state.bucket_name]
+        try:
+            self._get_step(state)(state, output)
+        except SystemExit as ex:
+            self._fail(state, str(ex))
+        except Exception as ex:  # pylint: disable=broad-except
+            self._retry_later(state, repr(ex))
+        self._save_states()
+
+    def _advance(self, state, phase):
+        """Record that a bucket move has completed a phase."""
+        state.phase = phase
+        state.attempts = 0
+        self._outputs[state.bucket_name].log_text('Completed phase ' +
+                                                  phase.value)
+
+    def _retry_later(self, state, message):
+        """Record a failed attempt of the current phase of a bucket move.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            message: The error message
+        """
+
+        state.attempts += 1
+        if state.attempts >= _MAX_ATTEMPTS:
+            self._fail(state, message)
+            return
+
+        wait = min(_RETRY_WAIT_SECONDS * 2**(state.attempts - 1),
+                   _RETRY_WAIT_MAX_SECONDS)
+        state.retry_at = time.time() + wait
+        self._outputs[state.bucket_name].print_and_log(
+            '{}. Trying again in {} seconds.'.format(message, wait))
+
+    def _fail(self, state, message):
+        """Stop a bucket move, which is resumed from its current phase by the next run."""
+        state.error = message
+        self._outputs[state.bucket_name].print_and_log(
+            'Failed after phase {}: {}. Run the tool again to resume the move, or clean the'
+            ' buckets up manually.'.format(state.phase.value, message))
+
+    def _lock_source_bucket(self, state, output):
+        """Save the IAM policy and ACLs of the source bucket and lock it down.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        config = self._get_bucket_config(state)
+        source_bucket = config.source_storage_client.lookup_bucket(  # pylint: disable=no-member
+            state.bucket_name)
+        if source_bucket is None:
+            raise SystemExit(
+                'The source bucket does not exist, so we cannot continue')
+
+        # The settings are only saved once, a bucket locked down by an interrupted run no longer
+        # has them
+        if state.iam_policy is None:
+            state.iam_policy = source_bucket.get_iam_policy().to_api_repr()
+            state.acl_entities = _get_acl_snapshot(
+                source_bucket.acl.get_entities())
+            state.default_obj_acl_entities = _get_acl_snapshot(
+                source_bucket.default_object_acl.get_entities())
+            self._save_states()
+
+        if not config.disable_bucket_lock:
+            output.text = 'Confirming that lock file {} does not exist'.format(
+                config.lock_file_name)
+            output.log_text(output.text)
+            output.log_text(json.dumps(state.iam_policy))
+            for entity in state.acl_entities:
+                output.log_text(json.dumps(entity))
+
+            bucket_mover_service._lock_down_bucket(
+                output, output, source_bucket, config.lock_file_name,
+                config.source_project_credentials.service_account_email)  # pylint: disable=no-member
+            output.ok(bucket_mover_service._CHECKMARK)
+
+        self._advance(state, BucketMovePhase.locked)
+
+    def _create_target_bucket(self, state, output):
+        """Create the temp bucket, or the target bucket of a rename, and give STS access to it.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        config = self._get_bucket_config(state)
+        source_bucket = config.source_storage_client.lookup_bucket(  # pylint: disable=no-member
+            state.bucket_name)
+        if source_bucket is None:
+            raise SystemExit('The source bucket no longer exists')
+
+        bucket_name = state.target_bucket_name if state.is_rename else state.temp_bucket_name
+        output.print_and_log('Creating {} bucket {} in project {}'.format(
+            'target' if state.is_rename else 'temp target', bucket_name,
+            config.target_project))
+        self._create_bucket(state, output, config, bucket_name, source_bucket)
+
+        sts_account_email = bucket_mover_service._get_sts_iam_account_email(
+            self._get_sts_client(), config.target_project)
+        output.print_and_log(
+            'STS service account for IAM usage: {}'.format(sts_account_email))
+        bucket_mover_service._assign_sts_iam_roles(
+            sts_account_email, config.source_storage_client,
+            config.source_project, state.bucket_name, True)
+        bucket_mover_service._assign_sts_iam_roles(
+            sts_account_email, config.target_storage_client,
+            config.target_project, bucket_name, True)
+        state.sts_account_email = sts_account_email
+
+        self._advance(state, BucketMovePhase.created)
+
+    def _recreate_source_bucket(self, state, output):
+        """Re-create the deleted source bucket in the target project with the temp bucket settings.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        config = self._get_bucket_config(state)
+        temp_bucket = config.target_storage_client.lookup_bucket(  # pylint: disable=no-member
+            state.temp_bucket_name)
+        if temp_bucket is None:
+            raise SystemExit('The temp bucket {} does not exist'.format(
+                state.temp_bucket_name))
+
+        output.print_and_log('Re-creating source bucket in target project')
+        self._create_bucket(state, output, config, state.bucket_name,
+                            temp_bucket)
+        bucket_mover_service._assign_sts_iam_roles(
+            state.sts_account_email, config.target_storage_client,
+            config.target_project, state.bucket_name, False)
+
+        self._advance(state, BucketMovePhase.recreated)
+
+    def _create_bucket(self, state, output, config, bucket_name,
+                       settings_bucket):
+        """Create a bucket with the settings of an existing bucket and the saved IAM and ACLs.
+
+        A bucket that already exists is assumed to have been created by an interrupted run.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+            config: The Configuration object of the bucket
+            bucket_name: The name of the bucket to create
+            settings_bucket: The bucket to copy the other settings from
+        """
+
+        details = bucket_details.BucketDetails(
+            conf=self._parsed_args, source_bucket=settings_bucket)
+        details.iam_policy = api_core_iam.Policy.from_api_repr(state.iam_policy)
+        details.acl_entities = _get_acl_entities(state.acl_entities)
+        details.default_obj_acl_entities = _get_acl_entities(
+            state.default_obj_acl_entities)
+
+        try:
+            bucket_mover_service._create_bucket(output, output, config,
+                                                bucket_name, details)
+        except exceptions.Conflict:
+            if config.target_storage_client.lookup_bucket(bucket_name) is None:  # pylint: disable=no-member
+                raise
+            output.print_and_log(
+                'Bucket {} already exists, it was created by a previous run'.format(
+                    bucket_name))
+            return
+
+        output.print_and_log('Bucket {} created in target project {}'.format(
+            bucket_name, config.target_project))
+
+    def _start_transfer(self, state, output):
+        """Create the STS jobs of the transfer that follows the current phase.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        source_bucket_name, sink_bucket_name = _get_transfer_bucket_names(state)
+        output.print_and_log('Moving from bucket {} to {}'.format(
+            source_bucket_name, sink_bucket_name))
+        state.sts_object_conditions = bucket_mover_service._get_sts_object_conditions(
+            self._get_transfer_storage_client(state).bucket(source_bucket_name),
+            self._config.sts_job_count)
+        state.sts_job_names = [
+            bucket_mover_service._execute_sts_job(
+                self._get_sts_client(), self._config.target_project,
+                source_bucket_name, sink_bucket_name, conditions)
+            for conditions in state.sts_object_conditions
+        ]
+        output.text = 'Checking status of {} STS job(s)'.format(
+            len(state.sts_job_names))
+
+        if state.phase == BucketMovePhase.created:
+            self._advance(state, BucketMovePhase.copying)
+        else:
+            self._advance(state, BucketMovePhase.copying_back)
+
+    def _poll_sts_jobs(self, states):
+        """Check the STS jobs of the buckets being transferred and advance the completed ones.
+
+        The operations of the jobs of all of the buckets are listed together, instead of one
+        request per job.
+
+        Args:
+            states: The BucketMoveState of the buckets in a transfer phase
+        """
+
+        job_names = sorted(
+            job_name for state in states for job_name in state.sts_job_names)
+        try:
+            operations = bucket_mover_service._list_sts_operations(
+                self._get_sts_client(), self._config.target_project, job_names)
+        except Exception as ex:  # pylint: disable=broad-except
+            # A failed check is just tried again at the next poll
+            bucket_mover_service._print_and_log(
+                self._cloud_logger,
+                'Failed to check the status of the STS jobs: {!r}'.format(ex))
+            return
+
+        for state in states:
+            output = self._outputs[state.bucket_name]
+            status, counters = bucket_mover_service._get_sts_jobs_status(
+                operations, state.sts_job_names)
+            if status == sts_job_status.StsJobStatus.in_progress:
+                bucket_mover_service._print_sts_counters(
+                    output, output, counters, False)
+            elif status == sts_job_status.StsJobStatus.success:
+                bucket_mover_service._print_sts_counters(
+                    output, output, counters, True)
+                output.ok(bucket_mover_service._CHECKMARK)
+                if state.phase == BucketMovePhase.copying:
+                    self._advance(state, BucketMovePhase.copied)
+                else:
+                    self._advance(state, BucketMovePhase.copied_back)
+            else:
+                output.fail('X')
+                state.phase = _get_phase_before_transfer(state)
+                self._retry_later(
+                    state, 'The STS job(s) {} failed'.format(', '.join(
+                        state.sts_job_names)))
+
+        self._save_states()
+
+    def _delete_transferred_bucket(self, state, output):
+        """Verify that the source bucket of the completed transfer is empty and delete it.
+
+        The bucket is verified prefix by prefix of the STS jobs. If objects are left in the
+        bucket, the transfer is run again.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        source_bucket_name, _ = _get_transfer_bucket_names(state)
+        if state.phase == BucketMovePhase.copied:
+            next_phase = BucketMovePhase.source_deleted
+        else:
+            next_phase = BucketMovePhase.temp_deleted
+
+        bucket = self._get_transfer_storage_client(state).lookup_bucket(
+            source_bucket_name)
+        incomplete_prefixes = []
+        if bucket is not None:
+            incomplete_prefixes = bucket_mover_service._get_incomplete_prefixes(
+                bucket, state.sts_object_conditions or [{}])
+
+        if bucket is None:
+            output.print_and_log(
+                'Bucket {} was already deleted'.format(source_bucket_name))
+        elif incomplete_prefixes:
+            state.phase = _get_phase_before_transfer(state)
+            self._retry_later(
+                state, 'Bucket {} is not empty after the STS jobs, objects are left in {}'.
+                format(
+                    source_bucket_name, ', '.join(
+                        prefix or 'the top level'
+                        for prefix in incomplete_prefixes)))
+            return
+        else:
+            output.text = 'Deleting empty bucket {}'.format(source_bucket_name)
+            output.log_text(output.text)
+            bucket.delete()
+            output.ok(bucket_mover_service._CHECKMARK)
+
+        self._advance(state, next_phase)
+
+    def _remove_sts_permissions(self, state, output):
+        """Remove the STS permissions from the target bucket, completing the move.
+
+        Args:
+            state: The BucketMoveState of the bucket
+            output: The _BucketOutput of the bucket
+        """
+
+        output.text = 'Removing STS permissions from bucket {}'.format(
+            state.target_bucket_name)
+        output.log_text(output.text)
+        bucket_mover_service._remove_sts_iam_roles(
+            state.sts_account_email, self._config.target_storage_client,
+            state.target_bucket_name)
+        output.ok(bucket_mover_service._CHECKMARK)
+
+        self._advance(state, BucketMovePhase.done)
+        output.print_and_log('Bucket moved to {} in project {}'.format(
+            state.target_bucket_name, self._config.target_project))
+
+
+class _BucketOutput(object):
+    """Console and cloud logging output of one bucket move.
+
+    Stands in for both the spinner and the cloud logger of the single bucket mover helpers, as
+    spinners can't be shown for concurrent moves. Every message is prefixed with the bucket name.
+    """
+
+    _print_lock = threading.Lock()
+
+    def __init__(self, bucket_name, cloud_logger):
+        self._prefix = '[{}] '.format(bucket_name)
+        self._cloud_logger = cloud_logger
+        self.text = ''
+
+    def write(self, message):
+        """Print a message to the console."""
+        if message:
+            with self._print_lock:
+                print(self._prefix + message)
+
+    def ok(self, mark):  # pylint: disable=invalid-name
+        """Print the current text as completed."""
+        self.write(u'{} {}'.format(_decode(mark), self.text))
+
+    def fail(self, mark):
+        """Print the current text as failed."""
+        self.write(u'{} {}'.format(_decode(mark), self.text))
+
+    def log_text(self, message):
+        """Log a message to the cloud."""
+        self._cloud_logger.log_text(self._prefix + message)
+
+    def print_and_log(self, message):
+        """Print the message and log it to the cloud."""
+        self.write(message)
+        self.log_text(message)
+
+
+def _decode(mark):
+    """Get the check mark encoded by bucket_mover_service as text."""
+    return mark.decode('utf8') if isinstance(mark, bytes) else mark
+
+
+def _get_acl_snapshot(entities):
+    """Get ACL entities as a JSON serializable list of entity/role dicts."""
+    return [{
+        'entity': str(entity),
+        'role': role
+    } for entity in entities for role in sorted(entity.get_roles())]
+
+
+def _get_acl_entities(snapshot):
+    """Get the ACL entities saved with _get_acl_snapshot."""
+    acl = storage_acl.ACL()
+    acl.loaded = True
+    for entity in snapshot:
+        acl.entity_from_dict(entity)
+    return acl.get_entities()
+
+
+def _get_transfer_bucket_names(state):
+    """Get the source and sink bucket names of the transfer of the current phase.
+
+    Args:
+        state: The BucketMoveState of the bucket
+
+    Returns:
+        A tuple of the source bucket name and the sink bucket name
+    """
+
+    if state.phase in _BACK_TRANSFER_PHASES:
+        return state.temp_bucket_name, state.bucket_name
+    if state.is_rename:
+        return state.bucket_name, state.target_bucket_name
+    return state.bucket_name, state.temp_bucket_name
+
+
+def _get_phase_before_transfer(state):
+    """Get the phase to go back to in order to run the transfer of the current phase again."""
+    if state.phase in _BACK_TRANSFER_PHASES:
+        return BucketMovePhase.recreated
+    return BucketMovePhase.created
+
+
+def read_bucket_list(path):
+    """Read the buckets to move from a file.
+
+    The file has one bucket name per line, followed by the new name of the bucket if it is
+    renamed. Empty lines and lines starting with # are skipped.
+
+    Args:
+        path: The local path of the bucket list file
+
+    Returns:
+        A list of (bucket_name, rename_bucket_to) tuples, rename_bucket_to being None unless the
+        bucket is renamed
+    """
+
+    buckets = []
+    with open(path) as bucket_list_file:
+        for line in bucket_list_file:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            if len(fields) > 2:
+                raise SystemExit(
+                    'Invalid line in the bucket list file: {}'.format(line))
+            buckets.append((fields[0], fields[1] if len(fields) > 1 else None))
+    return buckets
@@ -18,6 +18,7 @@ from __future__ import division
 from __future__ import print_function
 import datetime
 import json
+from concurrent import futures
 from time import sleep
 from retrying import retry
 from yaspin import yaspin
@@ -34,6 +35,19 @@ from gcs_bucket_mover import sts_job_status
 
 _CHECKMARK = u'\u2713'.encode('utf8')
 
+# STS limit of the number of prefixes in the include or exclude list of a job
+_MAX_STS_PREFIXES = 1000
+# Number of objects listed to estimate the size of a prefix
+_PREFIX_SAMPLE_SIZE = 1000
+# STS throughput on small objects is bound by the number of objects rather than bytes, so each
+# object weighs as much as this number of bytes when balancing the prefixes between jobs
+_STS_OBJECT_WEIGHT_BYTES = 1024 * 1024
+# Pages of top level objects listed before giving up on splitting a bucket into prefixes
+_MAX_TOP_LEVEL_PAGES = 100
+_PREFIX_WORKERS = 16
+# Number of STS jobs whose operations are listed in a single request
+_MAX_JOB_NAMES_PER_LIST = 50
+
 
 def main(config, parsed_args, cloud_logger):
     """Main entry point for the bucket mover tool
@@ -96,7 +110,8 @@ def _rename_bucket(cloud_logger, config, source_bucket, source_bucket_details,
                                                 config, target_bucket)
     _run_and_wait_for_sts_job(sts_client, config.target_project,
                               config.bucket_name, config.target_bucket_name,
-                              cloud_logger)
+                              cloud_logger, config.source_storage_client,
+                              config.sts_job_count)
 
     _delete_empty_source_bucket(cloud_logger, source_bucket)
     _remove_sts_permissions(cloud_logger, sts_account_email, config,
@@ -123,7 +138,8 @@ def _move_bucket(cloud_logger, config, source_bucket, source_bucket_details,
                                                 config, target_temp_bucket)
     _run_and_wait_for_sts_job(sts_client, config.target_project,
                               config.bucket_name, config.temp_bucket_name,
-                              cloud_logger)
+                              cloud_logger, config.source_storage_client,
+                              config.sts_job_count)
 
     _delete_empty_source_bucket(cloud_logger, source_bucket)
     _recreate_source_bucket(cloud_logger, config, source_bucket_details)
@@ -131,7 +147,8 @@ def _move_bucket(cloud_logger, config, source_bucket, source_bucket_details,
                                           config)
     _run_and_wait_for_sts_job(sts_client, config.target_project,
                               config.temp_bucket_name, config.bucket_name,
-                              cloud_logger)
+                              cloud_logger, config.target_storage_client,
+                              config.sts_job_count)
 
     _delete_empty_temp_bucket(cloud_logger, target_temp_bucket)
     _remove_sts_permissions(cloud_logger, sts_account_email, config,
@@ -724,9 +741,14 @@ def _assign_target_project_to_topic(spinner, cloud_logger, config, topic_name,
     wait_exponential_multiplier=10000,
     wait_exponential_max=120000,
     stop_max_attempt_number=10)
-def _run_and_wait_for_sts_job(sts_client, target_project, source_bucket_name,
-                              sink_bucket_name, cloud_logger):
-    """Kick off the STS job and wait for it to complete. Retry if it fails.
+def _run_and_wait_for_sts_job(sts_client,
+                              target_project,
+                              source_bucket_name,
+                              sink_bucket_name,
+                              cloud_logger,
+                              source_storage_client,
+                              sts_job_count=1):
+    """Kick off the STS jobs and wait for them to complete. Retry if one fails.
 
     Args:
         sts_client: The STS client object to be used
@@ -734,9 +756,11 @@ def _run_and_wait_for_sts_job(sts_client, target_project, source_bucket_name,
         source_bucket_name: The name of the bucket where the STS job will transfer from
         sink_bucket_name: The name of the bucket where the STS job will transfer to
         cloud_logger: A GCP logging client instance
+        source_storage_client: The storage client object used to access the source bucket
+        sts_job_count: The number of STS jobs to split the bucket's top level prefixes between
 
     Returns:
-        True if the STS job completed successfully, False if it failed for any reason
+        True if the STS jobs completed successfully, False if they failed for any reason
     """
 
     # Note that this routine is in a @retry decorator, so non-True exits
@@ -746,31 +770,55 @@ def _run_and_wait_for_sts_job(sts_client, target_project, source_bucket_name,
                                                sink_bucket_name)
     _print_and_log(cloud_logger, msg)
 
-    spinner_text = 'Creating STS job'
+    source_bucket = source_storage_client.bucket(source_bucket_name)
+    object_conditions = [{}]
+    if sts_job_count > 1:
+        spinner_text = 'Splitting the bucket prefixes between {} STS jobs'.format(
+            sts_job_count)
+        cloud_logger.log_text(spinner_text)
+        with yaspin(text=spinner_text) as spinner:
+            object_conditions = _get_sts_object_conditions(
+                source_bucket, sts_job_count)
+            spinner.ok(_CHECKMARK)
+
+    spinner_text = 'Creating {} STS job(s)'.format(len(object_conditions))
     cloud_logger.log_text(spinner_text)
     with yaspin(text=spinner_text) as spinner:
-        sts_job_name = _execute_sts_job(sts_client, target_project,
-                                        source_bucket_name, sink_bucket_name)
+        sts_job_names = [
+            _execute_sts_job(sts_client, target_project, source_bucket_name,
+                             sink_bucket_name, conditions)
+            for conditions in object_conditions
+        ]
         spinner.ok(_CHECKMARK)
 
-    # Check every 10 seconds until STS job is complete
+    # Check every 10 seconds until the STS jobs are complete
     with yaspin(text='Checking STS job status') as spinner:
         while True:
-            job_status = _check_sts_job(spinner, cloud_logger, sts_client,
-                                        target_project, sts_job_name)
+            job_status = _check_sts_jobs(spinner, cloud_logger, sts_client,
+                                         target_project, sts_job_names)
             if job_status != sts_job_status.StsJobStatus.in_progress:
                 break
             sleep(10)
 
     if job_status == sts_job_status.StsJobStatus.success:
         print()
-        return True
+        incomplete_prefixes = _get_incomplete_prefixes(source_bucket,
+                                                       object_conditions)
+        if not incomplete_prefixes:
+            return True
+
+        for prefix in incomplete_prefixes:
+            _print_and_log(
+                cloud_logger,
+                'Objects are left in {} after the STS jobs'.format(
+                    'prefix ' + prefix if prefix else 'the bucket'))
+    else:
+        # Execution will only reach this code if something went wrong with the STS job
+        _print_and_log(
+            cloud_logger,
+            'There was an unexpected failure with the STS job. You can view the'
+            ' details in the cloud console.')
 
-    # Execution will only reach this code if something went wrong with the STS job
-    _print_and_log(
-        cloud_logger,
-        'There was an unexpected failure with the STS job. You can view the'
-        ' details in the cloud console.')
     _print_and_log(
         cloud_logger,
         'Waiting for a period of time and then trying again. If you choose to'
@@ -778,8 +826,11 @@ def _run_and_wait_for_sts_job(sts_client, target_project, source_bucket_name,
     return False
 
 
-def _execute_sts_job(sts_client, target_project, source_bucket_name,
-                     sink_bucket_name):
+def _execute_sts_job(sts_client,
+                     target_project,
+                     source_bucket_name,
+                     sink_bucket_name,
+                     object_conditions=None):
     """Start the STS job.
 
     Args:
@@ -787,6 +838,8 @@ def _execute_sts_job(sts_client, target_project, source_bucket_name,
         target_project: The name of the target project where the STS job will be created
         source_bucket_name: The name of the bucket where the STS job will transfer from
         sink_bucket_name: The name of the bucket where the STS job will transfer to
+        object_conditions: The STS object conditions selecting the objects to transfer, or None
+            to transfer the whole bucket
 
     Returns:
         The name of the STS job as a string
@@ -823,51 +876,247 @@ def _execute_sts_job(sts_client, target_project, source_bucket_name,
             }
         }
     }
+    if object_conditions:
+        transfer_job['transferSpec']['objectConditions'] = object_conditions
     result = sts_client.transferJobs().create(body=transfer_job).execute(
         num_retries=5)
     return result['name']
 
 
-def _check_sts_job(spinner, cloud_logger, sts_client, target_project, job_name):
-    """Check on the status of the STS job.
+def _get_sts_object_conditions(bucket, job_count):
+    """Split the objects of a bucket between STS jobs by top level prefix.
+
+    The size of each prefix is estimated from a sample of its objects, and the prefixes are
+    balanced between the jobs from the largest one. All but one job get a list of prefixes to
+    include, while the last job excludes all of them, transferring the top level objects and any
+    prefix left out by the STS limit on the number of prefixes. Buckets with no top level prefixes
+    or too many top level objects are transferred by a single job.
+
+    Args:
+        bucket: The bucket object to transfer from
+        job_count: The maximum number of STS jobs
+
+    Returns:
+        A list of STS object conditions dicts, one per job
+    """
+
+    if job_count < 2:
+        return [{}]
+
+    prefixes, top_level_size = _list_top_level_prefixes(bucket)
+    if not prefixes:
+        return [{}]
+
+    sizes = dict(
+        zip(prefixes,
+            _map_prefixes(lambda prefix: _sample_prefix_size(bucket, prefix),
+                          prefixes)))
+    prefixes.sort(key=lambda prefix: sizes[prefix], reverse=True)
+
+    # The first group is the job excluding the other groups' prefixes
+    weights = [
+        top_level_size +
+        sum(sizes[prefix] for prefix in prefixes[_MAX_STS_PREFIXES:])
+    ] + [0] * (job_count - 1)
+    groups = [[] for _ in range(job_count)]
+    for prefix in prefixes[:_MAX_STS_PREFIXES]:
+        index = weights.index(min(weights))
+        groups[index].append(prefix)
+        weights[index] += sizes[prefix]
+
+    include_groups = [sorted(group) for group in groups[1:] if group]
+    if not include_groups:
+        return [{}]
+
+    object_conditions = [{
+        'includePrefixes': group
+    } for group in include_groups]
+    object_conditions.append({
+        'excludePrefixes':
+        sorted(prefix for group in include_groups for prefix in group)
+    })
+    return object_conditions
+
+
+def _list_top_level_prefixes(bucket):
+    """List the top level prefixes of a bucket.
+
+    Args:
+        bucket: The bucket object to list
+
+    Returns:
+        A tuple of the list of prefixes and the estimated size of the top level objects. The list
+        is empty if the bucket has too many top level objects to list.
+    """
+
+    iterator = bucket.list_blobs(delimiter='/')
+    top_level_size = 0
+    for page_number, page in enumerate(iterator.pages):
+        if page_number == _MAX_TOP_LEVEL_PAGES:
+            return [], 0
+        for blob in page:
+            top_level_size += (blob.size or 0) + _STS_OBJECT_WEIGHT_BYTES
+    return sorted(iterator.prefixes), top_level_size
+
+
+def _sample_prefix_size(bucket, prefix):
+    """Estimate the size of a prefix from a sample of its objects.
+
+    Args:
+        bucket: The bucket object to list
+        prefix: The prefix to estimate the size of
+
+    Returns:
+        The weight of the prefix in bytes, for balancing prefixes between STS jobs
+    """
+
+    blobs = list(bucket.list_blobs(prefix=prefix, max_results=_PREFIX_SAMPLE_SIZE))
+    return sum(blob.size or 0
+               for blob in blobs) + len(blobs) * _STS_OBJECT_WEIGHT_BYTES
+
+
+def _get_incomplete_prefixes(bucket, object_conditions):
+    """Verify that the STS jobs transferred every object of the bucket, prefix by prefix.
+
+    Args:
+        bucket: The bucket object the STS jobs transferred from
+        object_conditions: The list of STS object conditions of the jobs
+
+    Returns:
+        The list of included prefixes that still have objects, with an empty string added if
+        objects outside of the included prefixes are left
+    """
+
+    included_prefixes = [
+        prefix for conditions in object_conditions
+        for prefix in conditions.get('includePrefixes', [])
+    ]
+    prefixes_have_objects = _map_prefixes(
+        lambda prefix: _has_objects(bucket, prefix), included_prefixes)
+    incomplete_prefixes = [
+        prefix
+        for prefix, has_objects in zip(included_prefixes, prefixes_have_objects)
+        if has_objects
+    ]
+
+    included_prefixes = set(included_prefixes)
+    iterator = bucket.list_blobs(delimiter='/')
+    for page in iterator.pages:
+        if any(True for _ in page) or iterator.prefixes - included_prefixes:
+            incomplete_prefixes.append('')
+            break
+    return incomplete_prefixes
+
+
+def _has_objects(bucket, prefix):
+    """Return True if the bucket has objects under the prefix"""
+    return any(True for _ in bucket.list_blobs(prefix=prefix, max_results=1))
+
+
+def _map_prefixes(function, prefixes):
+    """Call the function on each prefix concurrently and return the list of results"""
+    if len(prefixes) < 2:
+        return [function(prefix) for prefix in prefixes]
+    with futures.ThreadPoolExecutor(max_workers=_PREFIX_WORKERS) as executor:
+        return list(executor.map(function, prefixes))
+
+
+def _check_sts_jobs(spinner, cloud_logger, sts_client, target_project,
+                    job_names):
+    """Check on the status of the STS jobs.
 
     Args:
         spinner: The spinner displayed in the console
         cloud_logger: A GCP logging client instance
         sts_client: The STS client object to be used
-        target_project: The name of the target project where the STS job will be created
-        job_name: The name of the STS job that was created
+        target_project: The name of the target project where the STS jobs were created
+        job_names: The names of the STS jobs that were created
+
+    Returns:
+        The status of the jobs as an StsJobStatus enum
+    """
+
+    operations = _list_sts_operations(sts_client, target_project, job_names)
+    status, counters = _get_sts_jobs_status(operations, job_names)
+
+    if status == sts_job_status.StsJobStatus.failed:
+        spinner.fail('X')
+    elif status == sts_job_status.StsJobStatus.success:
+        _print_sts_counters(spinner, cloud_logger, counters, True)
+        spinner.ok(_CHECKMARK)
+    else:
+        # Update the status of the copy
+        _print_sts_counters(spinner, cloud_logger, counters, False)
+
+    return status
+
+
+def _list_sts_operations(sts_client, project_id, job_names):
+    """List the operations of STS jobs.
+
+    Args:
+        sts_client: The STS client object to be used
+        project_id: The id of the project the STS jobs were created in
+        job_names: The names of the STS jobs
 
     Returns:
-        The status of the job as an StsJobStatus enum
+        A dict of the operation of each job that has started, by job name
     """
 
-    filter_string = (
-        '{{"project_id": "{project_id}", "job_names": ["{job_name}"]}}').format(
-            project_id=target_project, job_name=job_name)
+    operations = {}
+    for start in range(0, len(job_names), _MAX_JOB_NAMES_PER_LIST):
+        filter_string = json.dumps({
+            'project_id': project_id,
+            'job_names': job_names[start:start + _MAX_JOB_NAMES_PER_LIST]
+        })
+        transfer_operations = sts_client.transferOperations()
+        request = transfer_operations.list(
+            name='transferOperations', filter=filter_string)
+        while request is not None:
+            result = request.execute(num_retries=5)
+            for operation in result.get('operations', []):
+                operations[operation['metadata']['transferJobName']] = operation
+            request = transfer_operations.list_next(request, result)
+    return operations
+
 
-    result = sts_client.transferOperations().list(
-        name='transferOperations', filter=filter_string).execute(num_retries=5)
+def _get_sts_jobs_status(operations, job_names):
+    """Get the combined status and counters of STS jobs.
+
+    The jobs are in progress until all of them are done, and failed if any of them failed.
+
+    Args:
+        operations: The dict of operations by job name returned by _list_sts_operations
+        job_names: The names of the STS jobs
+
+    Returns:
+        A tuple of the status of the jobs as an StsJobStatus enum and the sum of their counters
+    """
+
+    statuses = set()
+    counters = {}
+    for job_name in job_names:
+        operation = operations.get(job_name)
+        if operation is None:
+            statuses.add(sts_job_status.StsJobStatus.in_progress)
+            continue
 
-    if result:
-        operation = result['operations'][0]
         metadata = operation['metadata']
-        if operation.get('done'):
-            if metadata['status'] != 'SUCCESS':
-                spinner.fail('X')
-                return sts_job_status.StsJobStatus.failed
+        for counter, value in metadata.get('counters', {}).items():
+            counters[counter] = counters.get(counter, 0) + int(value)
 
-            _print_sts_counters(spinner, cloud_logger, metadata['counters'],
-                                True)
-            spinner.ok(_CHECKMARK)
-            return sts_job_status.StsJobStatus.success
+        if not operation.get('done'):
+            statuses.add(sts_job_status.StsJobStatus.in_progress)
+        elif metadata['status'] != 'SUCCESS':
+            statuses.add(sts_job_status.StsJobStatus.failed)
         else:
-            # Update the status of the copy
-            if 'counters' in metadata:
-                _print_sts_counters(spinner, cloud_logger, metadata['counters'],
-                                    False)
+            statuses.add(sts_job_status.StsJobStatus.success)
 
-    return sts_job_status.StsJobStatus.in_progress
+    for status in (sts_job_status.StsJobStatus.in_progress,
+                   sts_job_status.StsJobStatus.failed):
+        if status in statuses:
+            return status, counters
+    return sts_job_status.StsJobStatus.success, counters
 
 
 def _print_sts_counters(spinner, cloud_logger, counters, is_job_done):
@@ -22,6 +22,7 @@ import textwrap
 import configargparse
 import yaml
 
+from gcs_bucket_mover import bucket_mover_orchestrator
 from gcs_bucket_mover import bucket_mover_service
 from gcs_bucket_mover import bucket_mover_tester
 from gcs_bucket_mover import configuration
@@ -48,7 +49,9 @@ def _get_parsed_args():
         help='The path to the local config file')
 
     parser.add_argument(
-        'bucket_name', help='The name of the bucket to be moved.')
+        'bucket_name',
+        nargs='?',
+        help='The name of the bucket to be moved. Omitted with --bucket_list_file.')
     parser.add_argument(
         'source_project',
         help='The project id that the bucket is currently in.')
@@ -90,6 +93,31 @@ def _get_parsed_args():
     parser.add_argument(
         '--temp_bucket_name',
         help='The temporary bucket name to use in the target project.')
+    parser.add_argument(
+        '--bucket_list_file',
+        help=textwrap.dedent('''\
+        Moves all of the buckets listed in this file concurrently, instead of a single bucket.
+        The file has one bucket name per line, optionally followed by a new name to rename the
+        bucket to.'''))
+    parser.add_argument(
+        '--max_concurrent_moves',
+        type=int,
+        default=bucket_mover_orchestrator.DEFAULT_MAX_CONCURRENT_MOVES,
+        help='The maximum number of buckets from the bucket list file moved at the same time.')
+    parser.add_argument(
+        '--state_file',
+        default=bucket_mover_orchestrator.DEFAULT_STATE_FILE,
+        help=textwrap.dedent('''\
+        The local file the phase of each bucket from the bucket list file is saved to. Running
+        the tool again with the same state file resumes the interrupted and failed moves.'''))
+    parser.add_argument(
+        '--sts_job_count',
+        type=int,
+        default=1,
+        help=textwrap.dedent('''\
+        Splits the top level prefixes of each bucket between up to this number of STS jobs run
+        in parallel, balanced by their estimated size. Speeds up the move of buckets with a
+        large number of objects.'''))
     parser.add_argument(
         '--location',
         help='Specify a different location for the target bucket.')
@@ -176,7 +204,16 @@ def _get_parsed_args():
         '--test_topic_name',
         help='A topic name to set up a notification for on the test bucket')
 
-    return parser.parse_args()
+    parsed_args = parser.parse_args()
+    if parsed_args.bucket_list_file:
+        if (parsed_args.bucket_name or parsed_args.test or
+                parsed_args.rename_bucket_to or parsed_args.temp_bucket_name):
+            parser.error(
+                '--bucket_list_file cannot be used with bucket_name, --test, --rename_bucket_to'
+                ' or --temp_bucket_name')
+    elif not parsed_args.bucket_name:
+        parser.error('bucket_name is required unless --bucket_list_file is set')
+    return parsed_args
 
 
 def _parse_yaml_file(path):
@@ -206,6 +243,17 @@ def main():
     # Create the cloud logging client that will be passed to all other modules.
     cloud_logger = config.target_logging_client.logger('gcs-bucket-mover')  # pylint: disable=no-member
 
+    if parsed_args.bucket_list_file:
+        orchestrator = bucket_mover_orchestrator.BucketMoverOrchestrator(
+            config, parsed_args, cloud_logger, parsed_args.state_file,
+            parsed_args.max_concurrent_moves)
+        states = orchestrator.run(
+            bucket_mover_orchestrator.read_bucket_list(
+                parsed_args.bucket_list_file))
+        if any(state.error for state in states):
+            raise SystemExit('Some of the buckets could not be moved')
+        return
+
     if parsed_args.test:
         test_bucket_name = bucket_mover_tester.set_up_test_bucket(
             config, parsed_args)
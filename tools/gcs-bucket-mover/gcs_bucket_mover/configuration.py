@@ -43,6 +43,7 @@ class Configuration(object):
     disable_bucket_lock = attrib()
     lock_file_name = attrib()
     is_rename = attrib()
+    sts_job_count = attrib(default=1)
 
     @classmethod
     def from_conf(cls, conf):
@@ -54,16 +55,13 @@ class Configuration(object):
             conf: the configargparser parsing of command line options
         """
 
-        temp_bucket_name = conf.bucket_name + '-temp'
-        if conf.temp_bucket_name:
-            temp_bucket_name = conf.temp_bucket_name
-
-        target_bucket_name = conf.bucket_name
+        target_bucket_name = temp_bucket_name = None
         is_rename = False
-        if conf.rename_bucket_to:
-            target_bucket_name = conf.rename_bucket_to
-            if target_bucket_name != conf.bucket_name:
-                is_rename = True
+        # The bucket name is not set when moving a list of buckets, in which case the names are
+        # set for each bucket with get_bucket_names
+        if conf.bucket_name:
+            target_bucket_name, temp_bucket_name, is_rename = get_bucket_names(
+                conf.bucket_name, conf.rename_bucket_to, conf.temp_bucket_name)
 
         # Decide whether to use user supplied service account key
         # files or the default GOOGLE_APPLICATION_CREDENTIALS value.
@@ -99,4 +97,31 @@ class Configuration(object):
             temp_bucket_name=temp_bucket_name,
             is_rename=is_rename,
             disable_bucket_lock=conf.disable_bucket_lock,
-            lock_file_name=conf.lock_file_name)
+            lock_file_name=conf.lock_file_name,
+            sts_job_count=conf.sts_job_count)
+
+
+def get_bucket_names(bucket_name, rename_bucket_to=None, temp_bucket_name=None):
+    """Get the names of the target and temp buckets of a bucket move.
+
+    Args:
+        bucket_name: The name of the bucket to be moved
+        rename_bucket_to: The new name of the bucket if it is renamed, or None
+        temp_bucket_name: The temporary bucket name to use in the target project, or None to use
+            the bucket name with a -temp suffix
+
+    Returns:
+        A tuple of the target bucket name, the temp bucket name and True if the bucket is renamed
+    """
+
+    if not temp_bucket_name:
+        temp_bucket_name = bucket_name + '-temp'
+
+    target_bucket_name = bucket_name
+    is_rename = False
+    if rename_bucket_to:
+        target_bucket_name = rename_bucket_to
+        if target_bucket_name != bucket_name:
+            is_rename = True
+
+    return target_bucket_name, temp_bucket_name, is_rename
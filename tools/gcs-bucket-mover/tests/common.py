@@ -30,6 +30,7 @@ def get_mock_args():
     args.rename_bucket_to = None
     args.disable_bucket_lock = False
     args.lock_file_name = 'my-lock-file'
+    args.sts_job_count = 1
     args.gcp_source_project_service_account_key = './data/fake_source_keyjson'
     args.gcp_target_project_service_account_key = './data/fake_target_keyjson'
 
@@ -70,3 +71,12 @@ def get_mock_source_bucket():
     bucket.versioning_enabled = 'bucket_versioning'
     bucket.list_notifications.return_value = ['bucket_notifications']
     return bucket
+
+
+def get_mock_blob_iterator(blobs=(), prefixes=()):
+    """Builds an object representing the iterator returned when listing blobs."""
+    iterator = mock.MagicMock()
+    iterator.__iter__.side_effect = lambda: iter(list(blobs))
+    iterator.pages = [list(blobs)]
+    iterator.prefixes = set(prefixes)
+    return iterator
@@ -0,0 +1,298 @@
+# Copyright 2018 Google LLC. All rights reserved. Licensed under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software distributed under the License
+# is distributed on an "AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express
+# or implied. See the License for the specific language governing permissions and limitations under
+# the License.
+#
+# Any software provided by Google hereunder is distributed "AS IS", WITHOUT WARRANTIES OR
+# CONDITIONS OF ANY KIND, and is not intended for production use.
+"""Tests for the bucket_mover_orchestrator.py file"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+import mock
+from google.api_core import iam as api_core_iam
+
+from gcs_bucket_mover import bucket_mover_orchestrator
+from gcs_bucket_mover import configuration
+from gcs_bucket_mover.bucket_move_phase import BucketMovePhase
+from tests import common
+
+
+def _get_operations(sts_client, project_id, job_names, status='SUCCESS'):  # pylint: disable=unused-argument
+    """Builds the STS operations returned for completed jobs."""
+    return {
+        job_name: {
+            'done': True,
+            'metadata': {
+                'status': status,
+                'counters': {}
+            }
+        } for job_name in job_names
+    }
+
+
+@mock.patch('googleapiclient.discovery.build', mock.MagicMock())
+@mock.patch('gcs_bucket_mover.bucket_mover_service._print_sts_counters',
+            mock.MagicMock())
+@mock.patch('gcs_bucket_mover.bucket_mover_service._assign_sts_iam_roles',
+            mock.MagicMock())
+@mock.patch('gcs_bucket_mover.bucket_mover_service._get_sts_iam_account_email',
+            mock.MagicMock(return_value='sts@example.com'))
+@mock.patch('gcs_bucket_mover.bucket_mover_service._create_bucket',
+            mock.MagicMock())
+@mock.patch('gcs_bucket_mover.bucket_mover_service._remove_sts_iam_roles')
+@mock.patch('gcs_bucket_mover.bucket_mover_service._lock_down_bucket')
+@mock.patch('gcs_bucket_mover.bucket_mover_service._list_sts_operations')
+@mock.patch('gcs_bucket_mover.bucket_mover_service._execute_sts_job')
+class TestBucketMoverOrchestrator(unittest.TestCase):
+    """Tests for the logic in the BucketMoverOrchestrator class."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.state_file_path = os.path.join(self.temp_dir, 'state.json')
+        self.parsed_args = common.get_mock_args()
+        self.parsed_args.bucket_name = None
+
+        self.bucket = mock.MagicMock()
+        self.bucket.get_iam_policy.return_value = api_core_iam.Policy()
+        self.bucket.acl.get_entities.return_value = []
+        self.bucket.default_object_acl.get_entities.return_value = []
+        self.bucket.list_blobs.return_value = common.get_mock_blob_iterator()
+        storage_client = mock.MagicMock()
+        storage_client.lookup_bucket.return_value = self.bucket
+
+        self.config = configuration.Configuration(
+            source_project_credentials=mock.MagicMock(),
+            target_project_credentials=mock.MagicMock(),
+            source_storage_client=storage_client,
+            target_storage_client=storage_client,
+            target_logging_client=mock.MagicMock(),
+            source_project='my-source-project',
+            target_project='my-target-project',
+            bucket_name=None,
+            target_bucket_name=None,
+            temp_bucket_name=None,
+            disable_bucket_lock=False,
+            lock_file_name='my-lock-file',
+            is_rename=False)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _run(self, buckets, max_concurrent_moves=2):
+        orchestrator = bucket_mover_orchestrator.BucketMoverOrchestrator(
+            self.config,
+            self.parsed_args,
+            mock.MagicMock(),
+            self.state_file_path,
+            max_concurrent_moves=max_concurrent_moves,
+            poll_interval=0)
+        return orchestrator.run(buckets)
+
+    def _get_saved_states(self):
+        with open(self.state_file_path) as state_file:
+            return json.load(state_file)['buckets']
+
+    def test_move_and_rename_buckets(self, mock_execute_sts_job,
+                                     mock_list_sts_operations,
+                                     mock_lock_down_bucket,
+                                     mock_remove_sts_iam_roles):
+        """Tests that buckets are moved or renamed through all of their phases."""
+        mock_execute_sts_job.side_effect = (
+            lambda client, project, source, sink, conditions: source + '>' + sink)
+        mock_list_sts_operations.side_effect = _get_operations
+
+        states = self._run([('bucket-a', None), ('bucket-b', 'bucket-c')])
+
+        self.assertEqual([BucketMovePhase.done] * 2,
+                         [state.phase for state in states])
+        self.assertFalse(any(state.error for state in states))
+        self.assertEqual(2, mock_lock_down_bucket.call_count)
+        self.assertEqual(
+            sorted([
+                mock.call(mock.ANY, 'my-target-project', 'bucket-a',
+                          'bucket-a-temp', {}),
+                mock.call(mock.ANY, 'my-target-project', 'bucket-a-temp',
+                          'bucket-a', {}),
+                mock.call(mock.ANY, 'my-target-project', 'bucket-b',
+                          'bucket-c', {})
+            ]), sorted(mock_execute_sts_job.call_args_list))
+        self.assertEqual(3, self.bucket.delete.call_count)
+        mock_remove_sts_iam_roles.assert_has_calls([
+            mock.call('sts@example.com', mock.ANY, 'bucket-a'),
+            mock.call('sts@example.com', mock.ANY, 'bucket-c')
+        ], any_order=True)
+
+        saved_states = self._get_saved_states()
+        self.assertEqual('done', saved_states['bucket-a']['phase'])
+        self.assertEqual('done', saved_states['bucket-b']['phase'])
+        self.assertEqual({}, saved_states['bucket-b']['iam_policy'])
+
+    def test_concurrency_limit(self, mock_execute_sts_job,
+                               mock_list_sts_operations, mock_lock_down_bucket,
+                               mock_remove_sts_iam_roles):
+        """Tests that no more than max_concurrent_moves buckets are moved at the same time."""
+        mock_execute_sts_job.side_effect = (
+            lambda client, project, source, sink, conditions: source + '>' + sink)
+        mock_list_sts_operations.side_effect = _get_operations
+        counts = {'active': 0, 'max_active': 0}
+        lock = threading.Lock()
+
+        def start(*args):  # pylint: disable=unused-argument
+            with lock:
+                counts['active'] += 1
+                counts['max_active'] = max(counts['max_active'],
+                                           counts['active'])
+
+        def finish(*args):  # pylint: disable=unused-argument
+            with lock:
+                counts['active'] -= 1
+
+        mock_lock_down_bucket.side_effect = start
+        mock_remove_sts_iam_roles.side_effect = finish
+
+        states = self._run([('bucket-{}'.format(i), None) for i in range(7)],
+                           max_concurrent_moves=3)
+
+        self.assertEqual([BucketMovePhase.done] * 7,
+                         [state.phase for state in states])
+        self.assertEqual(7, mock_lock_down_bucket.call_count)
+        self.assertEqual(3, counts['max_active'])
+
+    def test_resume_saved_move(self, mock_execute_sts_job,
+                               mock_list_sts_operations, mock_lock_down_bucket,
+                               mock_remove_sts_iam_roles):
+        """Tests that a saved move is resumed from its phase, polling its STS job."""
+        with open(self.state_file_path, 'w') as state_file:
+            json.dump({
+                'buckets': {
+                    'bucket-a': {
+                        'bucket_name': 'bucket-a',
+                        'target_bucket_name': 'bucket-a',
+                        'temp_bucket_name': 'bucket-a-temp',
+                        'is_rename': False,
+                        'phase': 'copying',
+                        'sts_account_email': 'sts@example.com',
+                        'sts_job_names': ['transferJobs/1'],
+                        'sts_object_conditions': [{}],
+                        'iam_policy': {},
+                        'acl_entities': [],
+                        'default_obj_acl_entities': [],
+                        'attempts': 3,
+                        'retry_at': 0,
+                        'error': 'interrupted'
+                    },
+                    'bucket-z': {
+                        'phase': 'done'
+                    }
+                }
+            }, state_file)
+        mock_execute_sts_job.return_value = 'transferJobs/2'
+        mock_list_sts_operations.side_effect = _get_operations
+
+        states = self._run([('bucket-a', None)])
+
+        self.assertEqual(BucketMovePhase.done, states[0].phase)
+        self.assertIsNone(states[0].error)
+        mock_lock_down_bucket.assert_not_called()
+        self.assertEqual(['transferJobs/1'],
+                         mock_list_sts_operations.call_args_list[0][0][2])
+        mock_execute_sts_job.assert_called_once_with(
+            mock.ANY, 'my-target-project', 'bucket-a-temp', 'bucket-a', {})
+        mock_remove_sts_iam_roles.assert_called_once()
+
+        saved_states = self._get_saved_states()
+        self.assertEqual('done', saved_states['bucket-a']['phase'])
+        self.assertEqual({'phase': 'done'}, saved_states['bucket-z'])
+
+    def test_lock_file_fails_bucket(self, mock_execute_sts_job,
+                                    mock_list_sts_operations,
+                                    mock_lock_down_bucket,
+                                    mock_remove_sts_iam_roles):
+        """Tests that a bucket with a lock file fails without stopping the other moves."""
+        mock_execute_sts_job.side_effect = (
+            lambda client, project, source, sink, conditions: source + '>' + sink)
+        mock_list_sts_operations.side_effect = _get_operations
+        mock_lock_down_bucket.side_effect = [SystemExit('lock file exists'), None]
+
+        states = self._run([('bucket-a', None), ('bucket-b', None)],
+                           max_concurrent_moves=1)
+
+        self.assertEqual(BucketMovePhase.pending, states[0].phase)
+        self.assertEqual('lock file exists', states[0].error)
+        self.assertEqual(BucketMovePhase.done, states[1].phase)
+        mock_remove_sts_iam_roles.assert_called_once()
+        self.assertEqual('lock file exists',
+                         self._get_saved_states()['bucket-a']['error'])
+
+    @mock.patch('gcs_bucket_mover.bucket_mover_orchestrator._RETRY_WAIT_SECONDS',
+                0)
+    def test_failed_sts_job_is_run_again(self, mock_execute_sts_job,
+                                         mock_list_sts_operations,
+                                         mock_lock_down_bucket,
+                                         mock_remove_sts_iam_roles):
+        """Tests that the transfer of a failed STS job is run again."""
+        mock_execute_sts_job.side_effect = ['transferJobs/1', 'transferJobs/2']
+        mock_list_sts_operations.side_effect = [
+            _get_operations(None, None, ['transferJobs/1'], status='FAILED'),
+            _get_operations(None, None, ['transferJobs/2'])
+        ]
+
+        states = self._run([('bucket-a', 'bucket-b')])
+
+        self.assertEqual(BucketMovePhase.done, states[0].phase)
+        self.assertEqual(2, mock_execute_sts_job.call_count)
+        mock_lock_down_bucket.assert_called_once()
+        mock_remove_sts_iam_roles.assert_called_once()
+
+    def test_non_empty_bucket_is_not_deleted(
+            self, mock_execute_sts_job, mock_list_sts_operations,
+            mock_lock_down_bucket, mock_remove_sts_iam_roles):  # pylint: disable=unused-argument
+        """Tests that a bucket with objects left after the STS job is not deleted."""
+        mock_execute_sts_job.return_value = 'transferJobs/1'
+        mock_list_sts_operations.side_effect = _get_operations
+        self.bucket.list_blobs.return_value = common.get_mock_blob_iterator(
+            ['object'])
+
+        with mock.patch(
+                'gcs_bucket_mover.bucket_mover_orchestrator._MAX_ATTEMPTS', 1):
+            states = self._run([('bucket-a', 'bucket-b')])
+
+        self.assertEqual(BucketMovePhase.created, states[0].phase)
+        self.assertIn('not empty', states[0].error)
+        self.bucket.delete.assert_not_called()
+
+
+class TestReadBucketList(unittest.TestCase):
+    """Tests for the read_bucket_list function."""
+
+    def test_read_bucket_list(self):
+        """Tests that bucket names and new names are read, skipping comments."""
+        with tempfile.NamedTemporaryFile('w', delete=False) as bucket_list_file:
+            bucket_list_file.write('# buckets\nbucket-a\n\n bucket-b  bucket-c \n')
+        try:
+            buckets = bucket_mover_orchestrator.read_bucket_list(
+                bucket_list_file.name)
+        finally:
+            os.remove(bucket_list_file.name)
+
+        self.assertEqual([('bucket-a', None), ('bucket-b', 'bucket-c')],
+                         buckets)
+
+
+if __name__ == '__main__':
+    unittest.main()
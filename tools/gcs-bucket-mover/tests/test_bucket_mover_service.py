@@ -24,6 +24,7 @@ from retrying import RetryError
 
 from gcs_bucket_mover import bucket_details
 from gcs_bucket_mover import bucket_mover_service
+from gcs_bucket_mover import sts_job_status
 from tests import common
 
 
@@ -418,9 +419,120 @@ class TestBucketMoverService(unittest.TestCase):
     def test_run_and_wait_for_sts_job_logic(self):
         self.assertTrue(True)
 
-    @unittest.skip('Not implemented')
-    def test_check_sts_job_logic(self):
-        self.assertTrue(True)
+    @mock.patch('gcs_bucket_mover.bucket_mover_service._STS_OBJECT_WEIGHT_BYTES',
+                0)
+    def test_get_sts_object_conditions(self):
+        """Tests that the top level prefixes are balanced between the STS jobs."""
+        sizes = {'a/': [60, 40], 'b/': [60], 'c/': [50], 'd/': [10]}
+
+        def list_blobs(delimiter=None, prefix=None, max_results=None):  # pylint: disable=unused-argument
+            if delimiter:
+                return common.get_mock_blob_iterator(
+                    [mock.MagicMock(size=10)], sizes.keys())
+            return [mock.MagicMock(size=size) for size in sizes[prefix]]
+
+        bucket = mock.MagicMock()
+        bucket.list_blobs.side_effect = list_blobs
+
+        object_conditions = bucket_mover_service._get_sts_object_conditions(
+            bucket, 3)
+
+        # The job excluding the other prefixes also transfers c/, d/ and the top level object
+        self.assertEqual([{
+            'includePrefixes': ['a/']
+        }, {
+            'includePrefixes': ['b/']
+        }, {
+            'excludePrefixes': ['a/', 'b/']
+        }], object_conditions)
+
+    def test_get_sts_object_conditions_single_job(self):
+        """Tests that a bucket is transferred by one job without prefixes to split."""
+        bucket = mock.MagicMock()
+        bucket.list_blobs.return_value = common.get_mock_blob_iterator(
+            [mock.MagicMock(size=10)])
+
+        self.assertEqual([{}],
+                         bucket_mover_service._get_sts_object_conditions(
+                             bucket, 1))
+        bucket.list_blobs.assert_not_called()
+        self.assertEqual([{}],
+                         bucket_mover_service._get_sts_object_conditions(
+                             bucket, 4))
+
+    def test_get_incomplete_prefixes(self):
+        """Tests that the objects left after the STS jobs are found per prefix."""
+        object_conditions = [{
+            'includePrefixes': ['a/', 'b/']
+        }, {
+            'excludePrefixes': ['a/', 'b/']
+        }]
+        bucket = mock.MagicMock()
+
+        def list_blobs(delimiter=None, prefix=None, max_results=None):  # pylint: disable=unused-argument
+            if delimiter:
+                return common.get_mock_blob_iterator(prefixes=['b/', 'c/'])
+            return ['object'] if prefix == 'b/' else []
+
+        bucket.list_blobs.side_effect = list_blobs
+        self.assertEqual(['b/', ''],
+                         bucket_mover_service._get_incomplete_prefixes(
+                             bucket, object_conditions))
+
+        bucket.list_blobs.side_effect = None
+        bucket.list_blobs.return_value = common.get_mock_blob_iterator()
+        self.assertEqual([],
+                         bucket_mover_service._get_incomplete_prefixes(
+                             bucket, object_conditions))
+
+    def test_get_sts_jobs_status(self):
+        """Tests that the status and counters of the STS jobs are combined."""
+        operations = {
+            'job1': {
+                'done': True,
+                'metadata': {
+                    'status': 'SUCCESS',
+                    'counters': {
+                        'bytesCopiedToSink': '100',
+                        'objectsCopiedToSink': '2'
+                    }
+                }
+            },
+            'job2': {
+                'metadata': {
+                    'status': 'IN_PROGRESS',
+                    'counters': {
+                        'bytesCopiedToSink': '50'
+                    }
+                }
+            },
+            'job3': {
+                'done': True,
+                'metadata': {
+                    'status': 'FAILED'
+                }
+            }
+        }
+
+        self.assertEqual(
+            (sts_job_status.StsJobStatus.in_progress, {
+                'bytesCopiedToSink': 150,
+                'objectsCopiedToSink': 2
+            }),
+            bucket_mover_service._get_sts_jobs_status(operations,
+                                                      ['job1', 'job2']))
+        self.assertEqual(
+            sts_job_status.StsJobStatus.in_progress,
+            bucket_mover_service._get_sts_jobs_status(
+                operations, ['job1', 'job4'])[0])
+        self.assertEqual(
+            sts_job_status.StsJobStatus.failed,
+            bucket_mover_service._get_sts_jobs_status(
+                operations, ['job1', 'job3'])[0])
+        self.assertEqual(
+            sts_job_status.StsJobStatus.success,
+            bucket_mover_service._get_sts_jobs_status(operations,
+                                                      ['job1'])[0])
 
     @unittest.skip('Not implemented')
     def test_print_sts_counters_logic(self):
@@ -27,20 +27,22 @@ from hive_to_bigquery import kms_component
 from hive_to_bigquery.mysql_component import MySQLComponent
 from hive_to_bigquery.properties_reader import PropertiesReader
 from hive_to_bigquery.resource_validator import ResourceValidator
+from hive_to_bigquery.sqlite_component import SQLiteComponent
+from hive_to_bigquery.table_validator import TableValidator
 from hive_to_bigquery import init_script
 
 logger = logging.getLogger('Hive2BigQuery')
 
 
-def compare_row_counts(bq_component, hive_component, gcs_component,
-                       hive_table_model, bq_table_model):
-    """Compares the number of rows in Hive and BigQuery tables.
+def validate_data(bq_component, hive_component, gcs_component,
+                  hive_table_model, bq_table_model):
+    """Compares the data in Hive and BigQuery tables.
 
-     Once all the load jobs are finished, queries on the Hive and BigQuery
-     tables and compares the number of rows. If matches, calls the function
-     to write comparison metrics to BigQuery. If there is a mismatch in case
-     of a partition table, compares the number of rows in every partition and
-     gets information about the mismatched partitions.
+     Once all the load jobs are finished, computes the number of rows and
+     aggregates of every column, for all the partitions, in the Hive and
+     BigQuery tables concurrently and compares them. If matches, calls the
+     function to write comparison metrics to BigQuery. Otherwise logs the
+     mismatched partitions and columns.
 
      Args:
         bq_component (:class:`BigQueryComponent`): Instance of
@@ -55,50 +57,38 @@ def compare_row_counts(bq_component, hive_component, gcs_component,
             table details.
     """
 
-    logger.info("Comparing rows...")
-    hive_table_rows = hive_component.get_hive_table_row_count(hive_table_model)
-    bq_table_rows = bq_component.get_bq_table_row_count(bq_table_model)
-    logger.debug("BigQuery row count %s Hive table row count %s",
-                 bq_table_rows, hive_table_rows)
+    logger.info("Validating data...")
+    mismatches = TableValidator(hive_component, bq_component,
+                                hive_table_model, bq_table_model).validate()
 
-    if hive_table_rows == bq_table_rows:
-        logger.info("Number of rows matching in BigQuery and Hive tables")
+    if not mismatches:
+        logger.info("Data matching in BigQuery and Hive tables")
         if PropertiesReader.get('create_validation_table'):
             bq_component.write_metrics_to_bigquery(gcs_component,
                                                    hive_table_model,
                                                    bq_table_model)
 
     else:
-        logger.error("Number of rows not matching in BigQuery and Hive tables")
-        # If table is partitioned, compares rows in each partition and
-        # provide suggestions whether to redo that partition.
+        logger.error("Data not matching in BigQuery and Hive tables")
+        clauses = []
+        for mismatch in mismatches:
+            logger.error(
+                "Mismatch {} column {} {} - Hive {} BigQuery {}".format(
+                    mismatch['clause'], mismatch['column'], mismatch['metric'],
+                    mismatch['hive'], mismatch['bigquery']))
+            if mismatch['clause'] not in clauses:
+                clauses.append(mismatch['clause'])
+        # If table is partitioned, provides suggestions whether to redo the
+        # mismatched partitions.
         if hive_table_model.is_partitioned:
-            partition_data = hive_component.list_partitions(
-                hive_table_model.db_name, hive_table_model.table_name)
-            for data in partition_data:
-                clause = data['clause']
-                bq_table_rows = bq_component.get_bq_table_row_count(
-                    bq_table_model, clause)
-                hive_table_rows = hive_component.get_hive_table_row_count(
-                    hive_table_model, clause)
-                logger.debug("BigQuery row count %s Hive table row count %s",
-                             bq_table_rows, hive_table_rows)
-
-                if bq_table_rows == hive_table_rows:
-                    logger.debug(
-                        "Number of rows matching in BigQuery and Hive tables %s",
-                        clause)
-                else:
-                    logger.error(
-                        "Number of rows not matching in BigQuery and Hive "
-                        "tables {}".format(clause))
-                    logger.error(
-                        "You may want to delete data {} and reload it".format(
-                            clause))
+            for clause in clauses:
+                logger.error(
+                    "You may want to delete data {} and reload it".format(
+                        clause))
         else:
             logger.error(
-                "You may want to redo the migration since number of rows are "
-                "not matching")
+                "You may want to redo the migration since data is not "
+                "matching")
 
 
 def rollback(mysql_component, hive_table_model):
@@ -121,20 +111,27 @@ def initialize_components():
     # Initializes the components to connect to MySQL, GCS, BigQuery and Hive.
     gcs_component = GCSStorageComponent(PropertiesReader.get('project_id'))
 
-    encrypted_password = gcs_component.download_file_as_string(
-        PropertiesReader.get('tracking_db_password_path'))
-    decrypted_password = kms_component.decrypt_symmetric(
-        PropertiesReader.get('project_id'),
-        PropertiesReader.get('location_id'),
-        PropertiesReader.get('key_ring_id'),
-        PropertiesReader.get('crypto_key_id'), encrypted_password)
-
-    mysql_component = MySQLComponent(
-        host=PropertiesReader.get('tracking_database_host'),
-        port=PropertiesReader.get('tracking_database_port'),
-        user=PropertiesReader.get('tracking_database_user'),
-        password=decrypted_password,
-        database=PropertiesReader.get('tracking_database_db_name'))
+    if PropertiesReader.get('tracking_database_type') == 'sqlite':
+        mysql_component = SQLiteComponent(
+            database=PropertiesReader.get('tracking_database_db_name'))
+    else:
+        encrypted_password = gcs_component.download_file_as_string(
+            PropertiesReader.get('tracking_db_password_path'))
+        decrypted_password = kms_component.decrypt_symmetric(
+            PropertiesReader.get('project_id'),
+            PropertiesReader.get('location_id'),
+            PropertiesReader.get('key_ring_id'),
+            PropertiesReader.get('crypto_key_id'), encrypted_password)
+
+        mysql_component = MySQLComponent(
+            host=PropertiesReader.get('tracking_database_host'),
+            port=PropertiesReader.get('tracking_database_port'),
+            user=PropertiesReader.get('tracking_database_user'),
+            password=decrypted_password,
+            database=PropertiesReader.get('tracking_database_db_name'),
+            # Every partition worker can hold a connection, plus the main
+            # thread.
+            pool_size=PropertiesReader.get('partition_workers') + 1)
 
     bq_component = BigQueryComponent(PropertiesReader.get('project_id'))
     hive_component = HiveComponent(
@@ -304,11 +301,12 @@ def main():
         except custom_exceptions.MySQLExecutionError as error:
             raise RuntimeError from error
     try:
-        # Compares the number of rows in BigQuery and Hive tables and
-        # creates metrics table if there is a match.
-        compare_row_counts(bq_component, hive_component, gcs_component,
-                           hive_table_model, bq_table_model)
-    except custom_exceptions.HiveExecutionError as error:
+        # Compares the data in BigQuery and Hive tables and creates metrics
+        # table if there is a match.
+        validate_data(bq_component, hive_component, gcs_component,
+                      hive_table_model, bq_table_model)
+    except (custom_exceptions.HiveExecutionError,
+            exceptions.GoogleAPICallError) as error:
         raise RuntimeError from error
 
 
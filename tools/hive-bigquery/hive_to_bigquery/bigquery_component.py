@@ -19,6 +19,7 @@ import csv
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from uuid import uuid4
 
 from google.api_core import exceptions
@@ -32,6 +33,14 @@ from hive_to_bigquery.properties_reader import PropertiesReader
 
 logger = logging.getLogger('Hive2BigQuery')
 
+# Number of BigQuery jobs polled concurrently.
+BQ_JOB_POLL_WORKERS = 16
+# Bounds, in seconds, of the interval between two polls of the running jobs.
+BQ_JOB_POLL_MIN_INTERVAL = 2
+BQ_JOB_POLL_MAX_INTERVAL = 60
+# Maximum number of jobs updated by a single tracking table statement.
+BQ_JOB_UPDATE_BATCH_SIZE = 500
+
 
 class BigQueryComponent(GCPService):
     """Creates BigQuery client and provides various utility functions.
@@ -274,8 +283,24 @@ class BigQueryComponent(GCPService):
             n_rows = row.n_rows
             return n_rows
 
-    def load_gcs_to_bq(self, mysql_component, hive_table_model,
-                       bq_table_model):
+    def execute_query(self, query):
+        """Runs a BigQuery query and returns the results.
+
+        Args:
+            query (str): Standard SQL query.
+
+        Returns:
+            List: Rows of the results, as tuples.
+        """
+
+        query_job = self.client.query(query)
+        return [tuple(row.values()) for row in query_job.result()]
+
+    def load_gcs_to_bq(self,
+                       mysql_component,
+                       hive_table_model,
+                       bq_table_model,
+                       table_name=None):
         """Loads data from GCS to BigQuery.
 
         Queries the tracking table and fetches information about the files
@@ -290,6 +315,8 @@ class BigQueryComponent(GCPService):
                 details.
             bq_table_model (:class:`BigQueryTableModel`): Wrapper to BigQuery
                 table details.
+            table_name (str): Staging table name, to load only the files of
+                this table. All the pending files are loaded if None.
         """
 
         logger.info(
@@ -298,7 +325,11 @@ class BigQueryComponent(GCPService):
         query = "SELECT gcs_file_path FROM {} WHERE gcs_copy_status='DONE' " \
                 "AND bq_job_status='TODO'".format(
                     hive_table_model.tracking_table_name)
-        results = mysql_component.execute_query(query)
+        params = None
+        if table_name is not None:
+            query += " AND table_name=%s"
+            params = (table_name,)
+        results = mysql_component.execute_query(query, params)
         if not results:
             logger.info("No gcs files to load to BigQuery")
 
@@ -308,26 +339,48 @@ class BigQueryComponent(GCPService):
             # Starts the load job asynchronously.
             self.start_load_job(bq_table_model, gcs_source_uri, bq_job_id)
             # Updates the job status as RUNNING.
-            query = "UPDATE {0} SET bq_job_id='{1}',bq_job_status='RUNNING' " \
-                    "WHERE gcs_file_path='{2}'".format(
-                        hive_table_model.tracking_table_name,
-                        bq_job_id, gcs_source_uri)
-            mysql_component.execute_transaction(query)
+            query = "UPDATE {} SET bq_job_id=%s,bq_job_status='RUNNING' " \
+                    "WHERE gcs_file_path=%s".format(
+                        hive_table_model.tracking_table_name)
+            mysql_component.execute_transaction(query,
+                                                (bq_job_id, gcs_source_uri))
             logger.info(
                 "Updated BigQuery load job ID {} status TODO --> RUNNING for "
                 "file path {}".format(bq_job_id, gcs_source_uri))
 
+    def poll_bq_jobs(self, job_ids, location):
+        """Fetches the state of BigQuery jobs concurrently.
+
+        Args:
+            job_ids (List): BigQuery job IDs.
+            location (str): Location of the jobs.
+
+        Returns:
+            dict: BigQuery jobs keyed by job ID.
+        """
+
+        if not job_ids:
+            return {}
+        n_workers = min(BQ_JOB_POLL_WORKERS, len(job_ids))
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            jobs = executor.map(
+                lambda job_id: self.client.get_job(job_id, location=location),
+                job_ids)
+            return dict(zip(job_ids, jobs))
+
     def update_bq_job_status(self, mysql_component, gcs_component,
                              hive_table_model, bq_table_model,
                              gcs_bucket_name):
         """Updates the status of running BigQuery load jobs.
 
         Queries the tracking table and fetches information about the load
-        jobs that are 'RUNNING 'and polls the job status. If the job has
-        finished successfully with no errors, updates the status as 'DONE'.
-        In case of job completion with errors, it updates the status to
-        'TODO' and increases the bq_job_retries count by 1. Waits for 1
-        minute and polls the job status again, until all the load jobs finish.
+        jobs that are 'RUNNING' and polls their status concurrently. The jobs
+        which finished successfully with no errors are updated as 'DONE' in a
+        single statement. The ones which finished with errors are updated to
+        'TODO' and their bq_job_retries count increased by 1, or to 'FAILED'
+        once they reach the maximum number of retries. Polls the jobs still
+        running again, every few seconds while jobs keep finishing and
+        backing off up to 1 minute otherwise, until all the load jobs finish.
 
         Args:
             mysql_component (:class:`MySQLComponent`): Instance of
@@ -353,75 +406,99 @@ class BigQueryComponent(GCPService):
         if not results:
             logger.info(
                 "No BigQuery job is in RUNNING state. No values to update")
+            return
+
+        # Running jobs keyed by job ID.
+        running_jobs = {row[1]: row for row in results}
+        location = self.get_dataset_location(bq_table_model.dataset_id)
+        poll_interval = BQ_JOB_POLL_MIN_INTERVAL
 
         # Waits till all the load jobs finish.
-        while results:
-            count = 0
-            for row in results:
-                gcs_file_path, bq_job_id, bq_job_retries = row
-                # Gets information about the running job.
-                job = self.client.get_job(bq_job_id,
-                                          location=self.get_dataset_location(
-                                              bq_table_model.dataset_id))
-
-                if job.state == 'DONE':
-                    # Job finished successfully.
-                    if job.errors is None:
-                        query = "UPDATE {0} SET bq_job_status='DONE' WHERE " \
-                                "bq_job_id='{1}'".format(
-                                    hive_table_model.tracking_table_name,
-                                    bq_job_id)
-                        mysql_component.execute_transaction(query)
-                        logger.info(
-                            "Updated BigQuery load job {} status RUNNING --> "
-                            "DONE".format(bq_job_id))
-                        # Deletes the data file in GCS.
-                        gcs_component.delete_file(gcs_bucket_name,
-                                                  gcs_file_path)
-                    # Job finished with error.
-                    elif job.errors is not None:
-
-                        if bq_job_retries == bq_load_job_max_retries:
-                            query = "UPDATE {0} SET bq_job_status='FAILED' " \
-                                    "WHERE bq_job_id='{1}'".format(
-                                        hive_table_model.tracking_table_name,
-                                        bq_job_id)
-                            mysql_component.execute_transaction(query)
-                            logger.info(
-                                "BigQuery job {} failed.Tried for a maximum "
-                                "of 3 times.Updated status RUNNING --> "
-                                "FAILED".format(bq_job_id))
-                        else:
-                            query = "UPDATE {0} SET bq_job_status='TODO'," \
-                                    "bq_job_retries={1} WHERE " \
-                                    "bq_job_id='{2}'".format(
-                                        hive_table_model.tracking_table_name,
-                                        bq_job_retries + 1, bq_job_id)
-                            mysql_component.execute_transaction(query)
-                            logger.info(
-                                "BigQuery job {} failed.Updated status "
-                                "RUNNING --> TODO & increased retries count "
-                                "by 1".format(bq_job_id))
-
-                elif job.state == 'RUNNING':
-                    # Count of jobs which are still in running state.
-                    count += 1
+        while running_jobs:
+            jobs = self.poll_bq_jobs(list(running_jobs), location)
+            done_jobs, retry_jobs, failed_jobs = [], [], []
+            for bq_job_id, job in jobs.items():
+                if job.state != 'DONE':
+                    if job.state != 'RUNNING':
+                        logger.debug("job id %s job state %s", bq_job_id,
+                                     job.state)
+                    continue
+                gcs_file_path, _, bq_job_retries = running_jobs.pop(bq_job_id)
+                # Job finished successfully.
+                if job.errors is None:
+                    done_jobs.append((bq_job_id, gcs_file_path))
+                # Job finished with error.
+                elif bq_job_retries >= bq_load_job_max_retries:
+                    failed_jobs.append(bq_job_id)
                 else:
-                    logger.debug("job id %s job state %s", bq_job_id,
-                                 job.state)
-            if count == 0:
+                    retry_jobs.append(bq_job_id)
+
+            if done_jobs:
+                self.set_bq_jobs_status(
+                    mysql_component, hive_table_model,
+                    [bq_job_id for bq_job_id, _ in done_jobs],
+                    "bq_job_status='DONE'")
+                logger.info(
+                    "Updated {} BigQuery load jobs status RUNNING --> "
+                    "DONE".format(len(done_jobs)))
+                # Deletes the data files in GCS.
+                with ThreadPoolExecutor(max_workers=min(
+                        BQ_JOB_POLL_WORKERS, len(done_jobs))) as executor:
+                    list(
+                        executor.map(
+                            lambda item: gcs_component.delete_file(
+                                gcs_bucket_name, item[1]), done_jobs))
+            if failed_jobs:
+                self.set_bq_jobs_status(mysql_component, hive_table_model,
+                                        failed_jobs, "bq_job_status='FAILED'")
+                logger.info(
+                    "BigQuery jobs {} failed.Tried for a maximum of {} "
+                    "times.Updated status RUNNING --> FAILED".format(
+                        ', '.join(failed_jobs), bq_load_job_max_retries))
+            if retry_jobs:
+                self.set_bq_jobs_status(
+                    mysql_component, hive_table_model, retry_jobs,
+                    "bq_job_status='TODO',bq_job_retries=bq_job_retries+1")
+                logger.info(
+                    "BigQuery jobs {} failed.Updated status RUNNING --> TODO "
+                    "& increased retries count by 1".format(
+                        ', '.join(retry_jobs)))
+
+            if not running_jobs:
                 logger.info(
                     "No BigQuery job is in RUNNING state. No values to update")
                 break
-            logger.info("Waiting for 1 min..")
-            time.sleep(60)
-            logger.info(
-                "Fetching information about BigQuery load jobs from tracking "
-                "table...")
-            query = "SELECT gcs_file_path,bq_job_id,bq_job_retries FROM {} " \
-                    "WHERE bq_job_status='RUNNING'".format(
-                        hive_table_model.tracking_table_name)
-            results = mysql_component.execute_query(query)
+            # Polls again shortly while jobs keep finishing, backs off
+            # otherwise.
+            if done_jobs or failed_jobs or retry_jobs:
+                poll_interval = BQ_JOB_POLL_MIN_INTERVAL
+            else:
+                poll_interval = min(poll_interval * 2,
+                                    BQ_JOB_POLL_MAX_INTERVAL)
+            logger.info("{} BigQuery jobs running. Waiting for {} sec..".format(
+                len(running_jobs), poll_interval))
+            time.sleep(poll_interval)
+
+    @staticmethod
+    def set_bq_jobs_status(mysql_component, hive_table_model, job_ids,
+                           assignments):
+        """Updates the tracking table rows of several BigQuery jobs at once.
+
+        Args:
+            mysql_component (:class:`MySQLComponent`): Instance of
+                MySQLComponent to connect to MySQL.
+            hive_table_model (:class:`HiveTableModel`): Wrapper to Hive table
+                details.
+            job_ids (List): BigQuery job IDs.
+            assignments (str): SET clause of the UPDATE statement.
+        """
+
+        for i in range(0, len(job_ids), BQ_JOB_UPDATE_BATCH_SIZE):
+            batch = job_ids[i:i + BQ_JOB_UPDATE_BATCH_SIZE]
+            query = "UPDATE {0} SET {1} WHERE bq_job_id IN ({2})".format(
+                hive_table_model.tracking_table_name, assignments,
+                ','.join(['%s'] * len(batch)))
+            mysql_component.execute_transaction(query, tuple(batch))
 
     @staticmethod
     def generate_metrics_table_schema(columns_list):
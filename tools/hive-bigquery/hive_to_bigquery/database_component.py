@@ -34,6 +34,26 @@ class DatabaseComponent:
 
         self.connection = self.get_connection()
 
+    def clone(self):
+        """Creates a new component with the same parameters and its own
+        connection, for use by another thread since the connections are not
+        thread safe.
+
+        Returns:
+            DatabaseComponent: Instance of the same class.
+        """
+
+        return self.__class__(host=self.host,
+                              port=self.port,
+                              user=self.user,
+                              password=self.password,
+                              database=self.database)
+
+    def close(self):
+        """Closes the connection to the database."""
+
+        self.connection.close()
+
     @abstractmethod
     def get_connection(self):
         """Establish connection to the database."""
@@ -16,7 +16,9 @@ client, uploading/downloading/deleting a file, check whether a file exists etc."
 
 import logging
 import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from uuid import uuid4
 
 from google.api_core import exceptions as api_exceptions
@@ -27,9 +29,22 @@ from hive_to_bigquery import client_info
 from hive_to_bigquery import custom_exceptions
 from hive_to_bigquery.utilities import calculate_time, execute_command
 from hive_to_bigquery.gcp_service import GCPService
+from hive_to_bigquery.hdfs_component import get_hdfs_component
+from hive_to_bigquery.transfer_manifest import TransferManifest
 
 logger = logging.getLogger('Hive2BigQuery')
 
+# Number of threads copying files from HDFS to GCS.
+GCS_TRANSFER_WORKERS = 16
+# Minimum number of bytes copied by a task, small files being grouped.
+SMALL_FILES_GROUP_BYTES = 64 * 1024 * 1024
+# Files larger than this are uploaded in parts composed into one object.
+COMPOSITE_UPLOAD_THRESHOLD = 256 * 1024 * 1024
+# Maximum number of objects GCS composes in a single request.
+MAX_COMPOSE_COMPONENTS = 32
+# Size of the chunks of the resumable uploads, a multiple of 256 KB.
+UPLOAD_CHUNK_BYTES = 32 * 1024 * 1024
+
 
 class GCSStorageComponent(GCPService):
     """GCS component to handle functions related to it.
@@ -45,6 +60,8 @@ class GCSStorageComponent(GCPService):
     def __init__(self, project_id):
 
         logger.debug("Initializing GCS Component")
+        self._lock = threading.Lock()
+        self._manifests = {}
         super(GCSStorageComponent, self).__init__(project_id, "Cloud Storage")
 
     def get_client(self):
@@ -150,13 +167,19 @@ class GCSStorageComponent(GCPService):
         logger.debug("File %s doesn't exist", gcs_uri)
         return False
 
-    def stage_to_gcs(self, mysql_component, bq_component, hive_table_model,
-                     bq_table_model, gcs_bucket_name):
+    def stage_to_gcs(self,
+                     mysql_component,
+                     bq_component,
+                     hive_table_model,
+                     bq_table_model,
+                     gcs_bucket_name,
+                     table_name=None):
         """Copies staged files to GCS.
 
         Queries the tracking table, fetches information about the files to
-        copy to GCS, runs a distcp job to copy multiple files, and checks
-        whether the files have been successfully copied. If copied
+        copy to GCS, copies them in parallel through the native HDFS client,
+        or runs a distcp job to copy multiple files if it isn't available,
+        and checks whether the files have been successfully copied. If copied
         successfully, updates the gcs_copy_status to 'DONE' else retries
         copying.
 
@@ -170,6 +193,8 @@ class GCSStorageComponent(GCPService):
             bq_table_model (:class:`BigQueryTableModel`): Wrapper to BigQuery
                 table details.
             gcs_bucket_name (str): GCS bucket name.
+            table_name (str): Staging table name, to copy only the files of
+                this table. All the pending files are copied if None.
         """
 
         logger.debug(
@@ -178,11 +203,16 @@ class GCSStorageComponent(GCPService):
         select_query = "SELECT table_name,file_path FROM {} WHERE " \
                        "gcs_copy_status='TODO'".format(
                            hive_table_model.tracking_table_name)
-        results = mysql_component.execute_query(select_query)
+        params = None
+        if table_name is not None:
+            select_query += " AND table_name=%s"
+            params = (table_name,)
+        results = mysql_component.execute_query(select_query, params)
 
         if not results:
             logger.debug("No file paths to copy to GCS")
 
+        hdfs_component = get_hdfs_component()
         while results:
             file_info = {}
             for row in results:
@@ -190,61 +220,282 @@ class GCSStorageComponent(GCPService):
                 file_name = source_location.split('/')[-1]
                 if file_name not in file_info.keys():
                     file_info[file_name] = source_location
-            source_locations = ' '.join(file_info.values())
-            filename = "file_info_{}.json".format(uuid4())
-            # Dictionary of file names and their locations
-            with open(filename, "w") as file_content:
-                file_content.write(str(file_info))
 
             target_blob = "BQ_staging/{}/{}/{}/".format(
                 hive_table_model.db_name, hive_table_model.table_name.lower(),
                 str(uuid4()).replace("-", "_"))
-            # Uploads file to create a folder like structure in GCS
-            self.upload_file(gcs_bucket_name, filename, target_blob + filename)
-            os.remove(filename)
-
-            target_folder_location = "gs://{}/{}".format(
-                gcs_bucket_name, target_blob)
-
-            logger.debug(
-                "Copying data from location %s to GCS Staging location %s "
-                "....", source_locations, target_folder_location)
-            # Hadoop distcp command to copy multiple files in one operation
-            cmd_copy_gcs = ['hadoop', 'distcp']
-            for value in file_info.values():
-                cmd_copy_gcs.append(value)
-            cmd_copy_gcs.append(target_folder_location)
-            logger.info("Running {}".format(" ".join(cmd_copy_gcs)))
 
             start = time.time()
-            execute_command(cmd_copy_gcs)
+            if hdfs_component.client is None:
+                copied_files = self.copy_with_distcp(file_info,
+                                                     gcs_bucket_name,
+                                                     target_blob)
+            else:
+                copied_files = self.copy_with_hdfs_client(
+                    hdfs_component,
+                    self.get_transfer_manifest(
+                        hive_table_model.tracking_table_name),
+                    list(file_info.values()), gcs_bucket_name, target_blob)
             logger.debug("Time taken - %s", calculate_time(start, time.time()))
 
-            # Iterates though the dict and checks whether the distcp
-            # operation is successful or partially completed
-            for file_name, source_location in file_info.items():
-                target_file_location = target_folder_location + file_name
-                # Checks whether the copied file is present at the GCS location
-                if self.check_file_exists(gcs_bucket_name,
-                                          target_file_location):
-                    logger.error(
+            copied_rows = []
+            for source_location in file_info.values():
+                if source_location in copied_files:
+                    target_file_location = copied_files[source_location]
+                    logger.debug(
                         "Finished copying data from location %s to GCS "
                         "Staging location %s", source_location,
                         target_file_location)
-                    query = "UPDATE {0} SET gcs_copy_status='DONE'," \
-                            "gcs_file_path='{1}' WHERE file_path='{2}'".format(
-                                hive_table_model.tracking_table_name,
-                                target_file_location, source_location)
-                    mysql_component.execute_transaction(query)
-                    logger.debug(
-                        "Updated GCS copy status TODO --> DONE for file path "
-                        "%s", source_location)
+                    copied_rows.append((target_file_location, source_location))
                 else:
                     logger.error(
                         "Failed copying data from location %s to GCS Staging "
-                        "location %s", source_location, target_file_location)
+                        "location %s", source_location, target_blob)
+            query = "UPDATE {} SET gcs_copy_status='DONE',gcs_file_path=%s " \
+                    "WHERE file_path=%s".format(
+                        hive_table_model.tracking_table_name)
+            mysql_component.execute_many(query, copied_rows)
+            logger.debug("Updated GCS copy status TODO --> DONE for %s files",
+                         len(copied_rows))
             # Starts loading the copied files
             bq_component.load_gcs_to_bq(mysql_component, hive_table_model,
-                                        bq_table_model)
+                                        bq_table_model, table_name)
+
+            results = mysql_component.execute_query(select_query, params)
+
+    def copy_with_distcp(self, file_info, gcs_bucket_name, target_blob):
+        """Copies HDFS files to a GCS folder with a Hadoop distcp job.
+
+        Args:
+            file_info (dict): HDFS file paths keyed by file name.
+            gcs_bucket_name (str): GCS bucket name.
+            target_blob (str): Path of the GCS folder.
+
+        Returns:
+            dict: GCS URIs of the files successfully copied, keyed by HDFS
+            file path.
+        """
+
+        source_locations = ' '.join(file_info.values())
+        filename = "file_info_{}.json".format(uuid4())
+        # Dictionary of file names and their locations
+        with open(filename, "w") as file_content:
+            file_content.write(str(file_info))
+        # Uploads file to create a folder like structure in GCS
+        self.upload_file(gcs_bucket_name, filename, target_blob + filename)
+        os.remove(filename)
+
+        target_folder_location = "gs://{}/{}".format(gcs_bucket_name,
+                                                     target_blob)
+
+        logger.debug(
+            "Copying data from location %s to GCS Staging location %s "
+            "....", source_locations, target_folder_location)
+        # Hadoop distcp command to copy multiple files in one operation
+        cmd_copy_gcs = ['hadoop', 'distcp']
+        for value in file_info.values():
+            cmd_copy_gcs.append(value)
+        cmd_copy_gcs.append(target_folder_location)
+        logger.info("Running {}".format(" ".join(cmd_copy_gcs)))
+        execute_command(cmd_copy_gcs)
+
+        # Iterates though the dict and checks whether the distcp
+        # operation is successful or partially completed
+        copied_files = {}
+        for file_name, source_location in file_info.items():
+            target_file_location = target_folder_location + file_name
+            # Checks whether the copied file is present at the GCS location
+            if self.check_file_exists(gcs_bucket_name, target_file_location):
+                copied_files[source_location] = target_file_location
+        return copied_files
+
+    def copy_with_hdfs_client(self, hdfs_component, manifest, file_paths,
+                              gcs_bucket_name, target_blob):
+        """Copies HDFS files to a GCS folder with a pool of threads streaming
+        them through the native HDFS client.
+
+        Skips the files already copied according to the transfer manifest.
+        Small files are grouped so that every task copies at least
+        SMALL_FILES_GROUP_BYTES, and files larger than
+        COMPOSITE_UPLOAD_THRESHOLD are split into parts uploaded in parallel
+        and composed into a single object. Every copy is checked against the
+        size of its source and recorded in the manifest.
+
+        Args:
+            hdfs_component (:class:`HDFSComponent`): Instance of
+                HDFSComponent to read HDFS files.
+            manifest (:class:`TransferManifest`): Manifest of the copied
+                files.
+            file_paths (List): HDFS file paths, with distinct file names.
+            gcs_bucket_name (str): GCS bucket name.
+            target_blob (str): Path of the GCS folder.
+
+        Returns:
+            dict: GCS URIs of the files successfully copied, keyed by HDFS
+            file path.
+        """
+
+        bucket = self.client.get_bucket(gcs_bucket_name)
+        copied_files = {}
+        sources = {}
+        for source in hdfs_component.get_files_info(file_paths):
+            gcs_file_path = manifest.get_copied_file(self, gcs_bucket_name,
+                                                     source)
+            if gcs_file_path is not None:
+                logger.debug("File %s already copied to %s", source['path'],
+                             gcs_file_path)
+                copied_files[source['path']] = gcs_file_path
+            else:
+                sources[source['path']] = source
+
+        # Tasks are (function, arguments) tuples.
+        tasks = []
+        # Parts of the large files, keyed by HDFS file path.
+        composites = {}
+        group, group_size = [], 0
+        for source in sorted(sources.values(), key=lambda item: item['size']):
+            blob = bucket.blob(target_blob + source['path'].split('/')[-1],
+                               chunk_size=UPLOAD_CHUNK_BYTES)
+            if source['size'] > COMPOSITE_UPLOAD_THRESHOLD:
+                n_parts = min(
+                    MAX_COMPOSE_COMPONENTS,
+                    -(-source['size'] // COMPOSITE_UPLOAD_THRESHOLD))
+                part_size = -(-source['size'] // n_parts)
+                parts = []
+                for i in range(n_parts):
+                    part = bucket.blob("{}.part{:02d}".format(blob.name, i),
+                                       chunk_size=UPLOAD_CHUNK_BYTES)
+                    offset = i * part_size
+                    tasks.append((self.upload_hdfs_file_part,
+                                  (hdfs_component, source['path'], part,
+                                   offset,
+                                   min(part_size, source['size'] - offset))))
+                    parts.append(part)
+                composites[source['path']] = (blob, parts)
+            else:
+                group.append((source['path'], blob, source['size']))
+                group_size += source['size']
+                if group_size >= SMALL_FILES_GROUP_BYTES:
+                    tasks.append((self.upload_hdfs_files,
+                                  (hdfs_component, group)))
+                    group, group_size = [], 0
+        if group:
+            tasks.append((self.upload_hdfs_files, (hdfs_component, group)))
+
+        logger.info("Copying {} files to GCS Staging location gs://{}/{} with "
+                    "{} tasks....".format(len(sources), gcs_bucket_name,
+                                          target_blob, len(tasks)))
+        uploaded_blobs = {}
+        failed_parts = set()
+        with ThreadPoolExecutor(max_workers=GCS_TRANSFER_WORKERS) as executor:
+            futures = {
+                executor.submit(function, *args): args
+                for function, args in tasks
+            }
+            for future in as_completed(futures):
+                args = futures[future]
+                try:
+                    result = future.result()
+                except Exception as error:
+                    # Only parts of large files raise, the file is copied
+                    # again in the next iteration.
+                    logger.error("Failed copying part of file %s", args[1])
+                    logger.exception(error)
+                    failed_parts.add(args[1])
+                    continue
+                if result is not None:
+                    uploaded_blobs.update(result)
+
+        for file_path, (blob, parts) in composites.items():
+            if file_path in failed_parts:
+                for part in parts:
+                    if part.exists():
+                        part.delete()
+                continue
+            blob.compose(parts)
+            for part in parts:
+                part.delete()
+            uploaded_blobs[file_path] = blob
+
+        for file_path, blob in uploaded_blobs.items():
+            if blob.size != sources[file_path]['size']:
+                logger.error("Size of the copy of %s doesn't match", file_path)
+                continue
+            gcs_file_path = "gs://{}/{}".format(gcs_bucket_name, blob.name)
+            manifest.add(sources[file_path], gcs_file_path, blob.crc32c)
+            copied_files[file_path] = gcs_file_path
+        return copied_files
+
+    @staticmethod
+    def upload_hdfs_files(hdfs_component, files):
+        """Uploads HDFS files to GCS one after another.
+
+        Args:
+            hdfs_component (:class:`HDFSComponent`): Instance of
+                HDFSComponent to read HDFS files.
+            files (List): Tuples of the HDFS file path, of the target blob
+                and of the file size.
+
+        Returns:
+            dict: Blobs successfully uploaded keyed by HDFS file path.
+        """
+
+        uploaded_blobs = {}
+        for file_path, blob, size in files:
+            try:
+                with hdfs_component.open_input_file(file_path) as file_obj:
+                    blob.upload_from_file(file_obj, size=size)
+                uploaded_blobs[file_path] = blob
+            except Exception as error:
+                logger.error("Failed copying file %s", file_path)
+                logger.exception(error)
+        return uploaded_blobs
+
+    @staticmethod
+    def upload_hdfs_file_part(hdfs_component, file_path, blob, offset, size):
+        """Uploads a byte range of an HDFS file to GCS.
+
+        Args:
+            hdfs_component (:class:`HDFSComponent`): Instance of
+                HDFSComponent to read HDFS files.
+            file_path (str): HDFS file path.
+            blob (google.cloud.storage.blob.Blob): Target blob of the part.
+            offset (int): Offset of the part in the file.
+            size (int): Size of the part.
+        """
+
+        with hdfs_component.open_input_file(file_path) as file_obj:
+            file_obj.seek(offset)
+            blob.upload_from_file(file_obj, size=size)
+
+    def get_blob(self, bucket_name, gcs_uri):
+        """Gets the metadata of a GCS file.
+
+        Args:
+            bucket_name (str): GCS bucket name.
+            gcs_uri (str): GCS URI of the file.
+
+        Returns:
+            google.cloud.storage.blob.Blob: Blob, None if it doesn't exist.
+        """
+
+        bucket = self.client.bucket(bucket_name)
+        blob_name = gcs_uri.split('gs://{}/'.format(bucket_name))[1]
+        return bucket.get_blob(blob_name)
+
+    def get_transfer_manifest(self, tracking_table_name):
+        """Returns the transfer manifest of a tracking table, shared by all
+        the threads copying its files.
+
+        Args:
+            tracking_table_name (str): Tracking table name.
+
+        Returns:
+            :class:`TransferManifest`: Manifest of the copied files.
+        """
 
-            results = mysql_component.execute_query(select_query)
+        with self._lock:
+            if tracking_table_name not in self._manifests:
+                self._manifests[tracking_table_name] = TransferManifest(
+                    "{}_transfer_manifest.json".format(tracking_table_name))
+            return self._manifests[tracking_table_name]
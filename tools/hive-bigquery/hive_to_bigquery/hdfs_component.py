@@ -0,0 +1,200 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Module to handle HDFS related utilities like listing the files under a
+location and reading them, using the native libhdfs client of pyarrow when
+available and the hdfs command line otherwise."""
+
+import logging
+import os
+import subprocess
+import threading
+from urllib.parse import urlparse
+
+from hive_to_bigquery import custom_exceptions
+
+try:
+    from pyarrow import fs as pyarrow_fs
+except ImportError:
+    pyarrow_fs = None
+
+logger = logging.getLogger('Hive2BigQuery')
+
+
+class HDFSComponent(object):
+    """HDFS component to handle functions related to it.
+
+    Connects once to HDFS through the JNI client of pyarrow, which avoids
+    starting a JVM for every hdfs command and lets the files be streamed
+    directly to GCS. Falls back to the hdfs command line if pyarrow or
+    libhdfs are not available, in which case client is None.
+
+    Attributes:
+        host (str): Name node host, 'default' to use fs.defaultFS.
+        port (int): Name node port, 0 to use fs.defaultFS.
+        client (pyarrow.fs.HadoopFileSystem): Native HDFS client.
+    """
+    def __init__(self, host='default', port=0):
+
+        logger.debug("Initializing HDFS Component")
+        self.host = host
+        self.port = port
+        self.client = self.get_client()
+
+    def get_client(self):
+        """Connects to HDFS through libhdfs.
+
+        Returns:
+            pyarrow.fs.HadoopFileSystem: Native HDFS client, None if it
+            cannot be used.
+        """
+
+        if pyarrow_fs is None:
+            logger.info("pyarrow is not installed, using hdfs commands")
+            return None
+        try:
+            # libhdfs needs the Hadoop jars in the CLASSPATH.
+            if 'CLASSPATH' not in os.environ:
+                os.environ['CLASSPATH'] = subprocess.check_output(
+                    ['hadoop', 'classpath', '--glob']).decode().strip()
+            return pyarrow_fs.HadoopFileSystem(self.host, self.port)
+        except (OSError, subprocess.CalledProcessError) as error:
+            logger.info("Failed to load libhdfs, using hdfs commands")
+            logger.debug(error)
+            return None
+
+    def list_files(self, location):
+        """Lists the files with non-zero size under the location.
+
+        Args:
+            location (str): HDFS directory, e.g. the Hive table location.
+
+        Returns:
+            List: A list of dict elements with the path, size and
+                modification time of every file.
+        """
+
+        if self.client is None:
+            return self.list_files_with_command(location)
+
+        selector = pyarrow_fs.FileSelector(urlparse(location).path)
+        try:
+            infos = self.client.get_file_info(selector)
+        except OSError as error:
+            logger.error("Failed to list HDFS location %s", location)
+            raise custom_exceptions.HDFSCommandError from error
+
+        files = []
+        for info in infos:
+            if info.type == pyarrow_fs.FileType.File and info.size:
+                files.append({
+                    'path': self.get_uri(location, info.path),
+                    'size': info.size,
+                    'mtime': str(info.mtime_ns)
+                })
+        return files
+
+    def get_files_info(self, file_paths):
+        """Gets the size and modification time of HDFS files.
+
+        Args:
+            file_paths (List): HDFS file paths.
+
+        Returns:
+            List: A list of dict elements with the path, size and
+                modification time of every file.
+        """
+
+        infos = self.client.get_file_info(
+            [urlparse(file_path).path for file_path in file_paths])
+        return [{
+            'path': file_path,
+            'size': info.size,
+            'mtime': str(info.mtime_ns)
+        } for file_path, info in zip(file_paths, infos)]
+
+    @staticmethod
+    def get_uri(location, path):
+        """Prefixes the path with the scheme and authority of the location,
+        like the hdfs dfs -ls output."""
+
+        parsed = urlparse(location)
+        if parsed.scheme:
+            return "{}://{}{}".format(parsed.scheme, parsed.netloc, path)
+        return path
+
+    @staticmethod
+    def list_files_with_command(location):
+        """Lists the files with non-zero size by parsing the output of the
+        hdfs dfs -ls command.
+
+        Args:
+            location (str): HDFS directory, e.g. the Hive table location.
+
+        Returns:
+            List: A list of dict elements with the path, size and
+                modification time of every file.
+        """
+
+        try:
+            content = subprocess.check_output(
+                ['hdfs', 'dfs', '-ls', location]).decode().splitlines()
+        except (OSError, subprocess.CalledProcessError) as error:
+            logger.error("hdfs command execution failed")
+            raise custom_exceptions.HDFSCommandError from error
+
+        files = []
+        i = 0
+        for i, line in enumerate(content):
+            if line.startswith("Found "):
+                break
+        for line in content[i + 1:]:
+            fields = line.split()
+            if fields[4] != '0':
+                files.append({
+                    'path': fields[-1],
+                    'size': int(fields[4]),
+                    'mtime': "{} {}".format(fields[5], fields[6])
+                })
+        return files
+
+    def open_input_file(self, file_path):
+        """Opens an HDFS file for random access reads.
+
+        Args:
+            file_path (str): HDFS file path.
+
+        Returns:
+            pyarrow.NativeFile: Readable file object.
+        """
+
+        return self.client.open_input_file(urlparse(file_path).path)
+
+
+_hdfs_component = None
+_lock = threading.Lock()
+
+
+def get_hdfs_component():
+    """Returns the HDFSComponent shared by all the threads, the native client
+    being thread safe.
+
+    Returns:
+        :class:`HDFSComponent`: Instance of HDFSComponent.
+    """
+
+    global _hdfs_component
+    with _lock:
+        if _hdfs_component is None:
+            _hdfs_component = HDFSComponent()
+    return _hdfs_component
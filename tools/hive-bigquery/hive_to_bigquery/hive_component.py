@@ -17,8 +17,9 @@ exists etc."""
 
 import json
 import logging
-import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dateutil.parser import parse
 from uuid import uuid4
 
@@ -28,6 +29,8 @@ from thrift.transport import TTransport
 from hive_to_bigquery import custom_exceptions
 from hive_to_bigquery.utilities import calculate_time
 from hive_to_bigquery.database_component import DatabaseComponent
+from hive_to_bigquery.hdfs_component import get_hdfs_component
+from hive_to_bigquery.properties_reader import PropertiesReader
 
 logger = logging.getLogger('Hive2BigQuery')
 
@@ -173,26 +176,8 @@ class HiveComponent(DatabaseComponent):
             List: List of the underlying data files.
         """
 
-        file_name = "hdfs_files_{}.txt".format(uuid4())
-        status_code = os.system("hdfs dfs -ls {0} > {1}".format(
-            location, file_name))
-        if status_code:
-            logger.error("hdfs command execution failed")
-            raise custom_exceptions.HDFSCommandError
-        with open(file_name, "r") as file_content:
-            content = file_content.readlines()
-        os.remove(file_name)
-        hdfs_files_list = []
-        i = 0
-        for i, line in enumerate(content):
-            if line.startswith("Found "):
-                break
-        for j in range(i + 1, len(content)):
-            size = content[j].split()[4]
-            if size != '0':
-                hdfs_files_list.append(content[j].split()[-1])
-
-        return hdfs_files_list
+        hdfs_component = get_hdfs_component()
+        return [item['path'] for item in hdfs_component.list_files(location)]
 
     def list_partitions(self, database_name, table_name):
         """Gets information about the different partitions.
@@ -595,25 +580,24 @@ class HiveComponent(DatabaseComponent):
         # Lists underlying HDFS files.
         hdfs_files_list = self.list_hdfs_files(source_location)
         logger.info("Updating file paths in the tracking table..")
-        for file_path in hdfs_files_list:
-            if hive_table_model.is_inc_col_present:
-                query = "INSERT INTO {0} (id,table_name,inc_col_min," \
-                        "inc_col_max,clause,file_path,gcs_copy_status," \
-                        "bq_job_id,bq_job_retries,bq_job_status) VALUES({1}," \
-                        "'{2}','{3}','{4}','{5}','{6}','TODO','TODO',0," \
-                        "'TODO')".format(
-                            hive_table_model.tracking_table_name, identifier,
-                            table_name, inc_col_min, inc_col_max, clause,
-                            file_path)
-            else:
-                query = "INSERT INTO {0} (table_name,clause,file_path," \
-                        "gcs_copy_status,bq_job_id,bq_job_retries," \
-                        "bq_job_status) VALUES('{1}','{2}','{3}','TODO'," \
-                        "'TODO',0,'TODO')".format(
-                            hive_table_model.tracking_table_name, table_name,
-                            clause, file_path)
-            # Commits information about the staging files.
-            mysql_component.execute_transaction(query)
+        if hive_table_model.is_inc_col_present:
+            query = "INSERT INTO {} (id,table_name,inc_col_min,inc_col_max," \
+                    "clause,file_path,gcs_copy_status,bq_job_id," \
+                    "bq_job_retries,bq_job_status) VALUES(%s,%s,%s,%s,%s," \
+                    "%s,%s,%s,%s,%s)".format(
+                        hive_table_model.tracking_table_name)
+            rows = [(identifier, table_name, inc_col_min, inc_col_max, clause,
+                     file_path, 'TODO', 'TODO', 0, 'TODO')
+                    for file_path in hdfs_files_list]
+        else:
+            query = "INSERT INTO {} (table_name,clause,file_path," \
+                    "gcs_copy_status,bq_job_id,bq_job_retries," \
+                    "bq_job_status) VALUES(%s,%s,%s,%s,%s,%s,%s)".format(
+                        hive_table_model.tracking_table_name)
+            rows = [(table_name, clause, file_path, 'TODO', 'TODO', 0, 'TODO')
+                    for file_path in hdfs_files_list]
+        # Commits information about the staging files.
+        mysql_component.execute_many(query, rows)
         # Copies files from HDFS to GCS.
         gcs_component.stage_to_gcs(mysql_component, bq_component,
                                    hive_table_model, bq_table_model,
@@ -624,10 +608,114 @@ class HiveComponent(DatabaseComponent):
                                 bq_table_model, gcs_bucket_name, table_data):
         """Migrates Hive data in case of a partition table.
 
+        Inserts a row for every partition in the tracking table and migrates
+        the partitions with a bounded pool of workers, whose size is given by
+        the partition_workers property. Each worker invokes the function
+        migrate_partition, so that the Hive staging inserts, the HDFS to GCS
+        copies and the BigQuery load job submissions of different partitions
+        overlap. Since the Hive connections are not thread safe, every worker
+        uses its own connection, while the MySQL connections are borrowed
+        from the pool of the shared MySQLComponent.
+
+        Args:
+            mysql_component (:class:`MySQLComponent`): Instance of
+                MySQLComponent to connect to MySQL.
+            bq_component (:class:`BigQueryComponent`): Instance of
+                BigQueryComponent to do BigQuery operations.
+            gcs_component (:class:`GCSStorageComponent`): Instance of
+                GCSStorageComponent to do GCS operations.
+            hive_table_model (:class:`HiveTableModel`): Wrapper to Hive table
+                details.
+            bq_table_model (:class:`BigQueryTableModel`): Wrapper to BigQuery
+                table details.
+            gcs_bucket_name (str): GCS bucket name.
+            table_data (List): Information of data to migrate.
+        """
+
+        if hive_table_model.is_inc_col_present:
+            insert_query = "INSERT INTO {} (id,table_name,inc_col_min," \
+                           "inc_col_max,clause,file_path) VALUES(%s,%s,%s," \
+                           "%s,%s,%s)".format(
+                               hive_table_model.tracking_table_name)
+            rows = [(data['id'], data['table_name'], data['inc_col_min'],
+                     data['inc_col_max'], data['clause'], 'TODO')
+                    for data in table_data]
+        else:
+            insert_query = "INSERT INTO {} (table_name,clause,file_path) " \
+                           "VALUES(%s,%s,%s)".format(
+                               hive_table_model.tracking_table_name)
+            rows = [(data['table_name'], data['clause'], 'TODO')
+                    for data in table_data]
+        # Inserts a row in the tracking table for every partition.
+        mysql_component.execute_many(insert_query, rows)
+
+        if hive_table_model.is_inc_col_present:
+            select_query = "SELECT id,table_name,inc_col_min,inc_col_max," \
+                           "clause FROM {} WHERE file_path='TODO'".format(
+                               hive_table_model.tracking_table_name)
+        else:
+            select_query = "SELECT table_name,clause FROM {} WHERE " \
+                           "file_path='TODO'".format(
+                               hive_table_model.tracking_table_name)
+        # Also picks up the partitions left over by an interrupted run.
+        results = mysql_component.execute_query(select_query)
+        if not results:
+            return
+
+        n_workers = max(
+            1, min(PropertiesReader.get('partition_workers'), len(results)))
+        logger.info("Migrating {} partitions using {} workers...".format(
+            len(results), n_workers))
+
+        thread_data = threading.local()
+        thread_components = []
+        lock = threading.Lock()
+
+        def get_hive_component():
+            """Returns the Hive component of the current worker."""
+
+            if not hasattr(thread_data, 'hive_component'):
+                thread_data.hive_component = self.clone()
+                with lock:
+                    thread_components.append(thread_data.hive_component)
+            return thread_data.hive_component
+
+        def migrate(row):
+            get_hive_component().migrate_partition(
+                mysql_component, bq_component, gcs_component,
+                hive_table_model, bq_table_model, gcs_bucket_name, row)
+
+        start = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                futures = [executor.submit(migrate, row) for row in results]
+                for n_done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        future.result()
+                    except Exception:
+                        # Lets the running partitions finish and skips the
+                        # others, which stay in the tracking table to be
+                        # picked up by the next run.
+                        for pending in futures:
+                            pending.cancel()
+                        raise
+                    logger.info("Migrated {}/{} partitions".format(
+                        n_done, len(futures)))
+        finally:
+            for component in thread_components:
+                component.close()
+        logger.debug("Migrated partitions - Time taken - %s",
+                     calculate_time(start, time.time()))
+
+    def migrate_partition(self, mysql_component, bq_component, gcs_component,
+                          hive_table_model, bq_table_model, gcs_bucket_name,
+                          row):
+        """Migrates a single partition recorded in the tracking table.
+
         Invokes the function to create and load stage table, gets the staging
         table location, and lists down the underneath HDFS files. Updates the
         file paths in the tracking table and calls the function stage_to_gcs
-        to copy files to GCS.
+        to copy the files of this partition to GCS and load them to BigQuery.
 
         Args:
             mysql_component (:class:`MySQLComponent`): Instance of
@@ -641,90 +729,56 @@ class HiveComponent(DatabaseComponent):
             bq_table_model (:class:`BigQueryTableModel`): Wrapper to BigQuery
                 table details.
             gcs_bucket_name (str): GCS bucket name.
-            table_data (List): Information of data to migrate.
+            row (tuple): Row of the partition in the tracking table.
         """
 
-        for data in table_data:
-            if hive_table_model.is_inc_col_present:
-                insert_query = "INSERT INTO {0} (id,table_name,inc_col_min," \
-                               "inc_col_max,clause,file_path) VALUES('{1}'," \
-                               "'{2}','{3}','{4}','{5}','TODO')".format(
-                                   hive_table_model.tracking_table_name,
-                                   data['id'], data['table_name'],
-                                   data['inc_col_min'], data['inc_col_max'],
-                                   data['clause'])
-                select_query = "SELECT id,table_name,inc_col_min,inc_col_max," \
-                               "clause FROM {} WHERE file_path='TODO'".format(
-                                   hive_table_model.tracking_table_name)
+        if hive_table_model.is_inc_col_present:
+            identifier, table_name, inc_col_min, inc_col_max, clause = row
+            if identifier == 1:
+                insert_clause = "{0} and {1}>='{2}' and {1}<='{3}'".format(
+                    clause, hive_table_model.inc_col, inc_col_min, inc_col_max)
             else:
-                insert_query = "INSERT INTO {0} (table_name,clause," \
-                               "file_path)VALUES('{1}','{2}','TODO')".format(
-                                   hive_table_model.tracking_table_name,
-                                   data['table_name'], data['clause'])
-                select_query = "SELECT table_name,clause FROM {} WHERE " \
-                               "file_path='TODO'".format(
-                                   hive_table_model.tracking_table_name)
-            # Inserts a row in the tracking table for every partition.
-            mysql_component.execute_transaction(insert_query)
-            results = mysql_component.execute_query(select_query)
-
-            for row in results:
-                if hive_table_model.is_inc_col_present:
-                    identifier, table_name, inc_col_min, inc_col_max, clause \
-                        = row
-                    if identifier == 1:
-                        insert_clause = "{0} and {1}>='{2}' and " \
-                                        "{1}<='{3}'".format(
-                                            clause, hive_table_model.inc_col,
-                                            inc_col_min, inc_col_max)
-                    else:
-                        insert_clause = "{0} and {1}>'{2}' and " \
-                                        "{1}<='{3}'".format(
-                                            clause, hive_table_model.inc_col,
-                                            inc_col_min, inc_col_max)
-                else:
-                    table_name, clause = row
-                    insert_clause = clause
-                # Creates staging table and inserting data.
-                self.create_and_load_stage_table(hive_table_model, table_name,
-                                                 insert_clause)
-                # Gets table location
-                source_location = self.get_table_location(
-                    "default", table_name)
-                # Lists underlying HDFS files.
-                hdfs_files_list = self.list_hdfs_files(source_location)
-
-                logger.info("Updating file paths in the tracking table..")
-                for file_path in hdfs_files_list:
-                    if hive_table_model.is_inc_col_present:
-                        query = "INSERT INTO {0} (id,table_name,inc_col_min," \
-                                "inc_col_max,clause,file_path," \
-                                "gcs_copy_status,bq_job_id,bq_job_retries," \
-                                "bq_job_status) VALUES('{1}','{2}','{3}'," \
-                                "'{4}','{5}','{6}','TODO','TODO',0," \
-                                "'TODO')".format(
-                                    hive_table_model.tracking_table_name,
-                                    identifier, table_name, inc_col_min,
-                                    inc_col_max, clause, file_path)
-                    else:
-                        query = "INSERT INTO {0} (table_name,clause," \
-                                "file_path,gcs_copy_status,bq_job_id," \
-                                "bq_job_retries,bq_job_status) VALUES('{1}'," \
-                                "'{2}','{3}','TODO','TODO',0,'TODO')".format(
-                                    hive_table_model.tracking_table_name,
-                                    table_name, clause, file_path)
-                    # Commits information about the staging files.
-                    mysql_component.execute_transaction(query)
-
-                query = "DELETE FROM {0} WHERE table_name='{1}' AND clause " \
-                        "='{2}' AND file_path='TODO'".format(
-                            hive_table_model.tracking_table_name,
-                            table_name, clause)
-                mysql_component.execute_transaction(query)
-                # Copies files from HDFS to GCS.
-                gcs_component.stage_to_gcs(mysql_component, bq_component,
-                                           hive_table_model, bq_table_model,
-                                           gcs_bucket_name)
+                insert_clause = "{0} and {1}>'{2}' and {1}<='{3}'".format(
+                    clause, hive_table_model.inc_col, inc_col_min, inc_col_max)
+        else:
+            table_name, clause = row
+            insert_clause = clause
+        # Creates staging table and inserting data.
+        self.create_and_load_stage_table(hive_table_model, table_name,
+                                         insert_clause)
+        # Gets table location
+        source_location = self.get_table_location("default", table_name)
+        # Lists underlying HDFS files.
+        hdfs_files_list = self.list_hdfs_files(source_location)
+
+        logger.info("Updating file paths in the tracking table for {}..".format(
+            table_name))
+        if hive_table_model.is_inc_col_present:
+            query = "INSERT INTO {} (id,table_name,inc_col_min,inc_col_max," \
+                    "clause,file_path,gcs_copy_status,bq_job_id," \
+                    "bq_job_retries,bq_job_status) VALUES(%s,%s,%s,%s,%s," \
+                    "%s,%s,%s,%s,%s)".format(
+                        hive_table_model.tracking_table_name)
+            rows = [(identifier, table_name, inc_col_min, inc_col_max, clause,
+                     file_path, 'TODO', 'TODO', 0, 'TODO')
+                    for file_path in hdfs_files_list]
+        else:
+            query = "INSERT INTO {} (table_name,clause,file_path," \
+                    "gcs_copy_status,bq_job_id,bq_job_retries," \
+                    "bq_job_status) VALUES(%s,%s,%s,%s,%s,%s,%s)".format(
+                        hive_table_model.tracking_table_name)
+            rows = [(table_name, clause, file_path, 'TODO', 'TODO', 0, 'TODO')
+                    for file_path in hdfs_files_list]
+        # Commits information about the staging files.
+        mysql_component.execute_many(query, rows)
+
+        query = "DELETE FROM {} WHERE table_name=%s AND clause=%s AND " \
+                "file_path='TODO'".format(hive_table_model.tracking_table_name)
+        mysql_component.execute_transaction(query, (table_name, clause))
+        # Copies files of this partition from HDFS to GCS.
+        gcs_component.stage_to_gcs(mysql_component, bq_component,
+                                   hive_table_model, bq_table_model,
+                                   gcs_bucket_name, table_name)
 
     @staticmethod
     def compare_max_values(hive_table_model, old_max, new_max):
@@ -873,24 +927,25 @@ class HiveComponent(DatabaseComponent):
             results = mysql_component.execute_query(
                 "SELECT file_path FROM {}".format(
                     hive_table_model.tracking_table_name))
-            old_file_paths = [row[0] for row in results]
+            old_file_paths = {row[0] for row in results}
             new_file_paths = self.list_hdfs_files(
                 self.get_table_location(hive_table_model.db_name,
                                         hive_table_model.table_name))
 
-            new_data_exists = False
+            new_file_paths = [
+                file_path for file_path in new_file_paths
+                if file_path not in old_file_paths
+            ]
             for file_path in new_file_paths:
-                if file_path not in old_file_paths:
-                    # Updates the tracking table with new file paths.
-                    new_data_exists = True
-                    logger.debug("Found new data at file path %s", file_path)
-                    query = "INSERT INTO {0} (table_name,file_path," \
-                            "gcs_copy_status,bq_job_id,bq_job_retries," \
-                            "bq_job_status) VALUES('{1}','{2}','TODO','TODO'," \
-                            "0,'TODO')".format(
-                                hive_table_model.tracking_table_name,
-                                hive_table_model.table_name, file_path)
-                    mysql_component.execute_transaction(query)
+                logger.debug("Found new data at file path %s", file_path)
+            # Updates the tracking table with new file paths.
+            query = "INSERT INTO {} (table_name,file_path,gcs_copy_status," \
+                    "bq_job_id,bq_job_retries,bq_job_status) VALUES(%s,%s," \
+                    "%s,%s,%s,%s)".format(hive_table_model.tracking_table_name)
+            mysql_component.execute_many(
+                query, [(hive_table_model.table_name, file_path, 'TODO',
+                         'TODO', 0, 'TODO') for file_path in new_file_paths])
+            new_data_exists = bool(new_file_paths)
             # Copies the new files to GCS.
             if new_data_exists:
                 logger.info("New files found in source table")
@@ -112,18 +112,30 @@ def validate_config_parameters(data):
         use_clustering = data['BigQuery']['use_clustering']
         bq_write_mode = data['BigQuery']['write_mode']
 
-        tracking_db_host = data['Tracking_DB']['host']
-        tracking_db_port = data['Tracking_DB']['port']
-        tracking_db_user = data['Tracking_DB']['user']
+        # Either mysql (Cloud SQL) or sqlite, a local database file for test
+        # runs which needs no host, credentials or KMS key.
+        tracking_db_type = data['Tracking_DB'].get('type', 'mysql')
         tracking_db_name = data['Tracking_DB']['database']
-        tracking_db_password_path = data['Tracking_DB']['password_file_path']
-
-        kms_location = data['KMS']['location_id']
-        kms_key_ring_id = data['KMS']['key_ring_id']
-        kms_crypto_key_id = data['KMS']['crypto_key_id']
+        if tracking_db_type == 'mysql':
+            tracking_db_host = data['Tracking_DB']['host']
+            tracking_db_port = data['Tracking_DB']['port']
+            tracking_db_user = data['Tracking_DB']['user']
+            tracking_db_password_path = data['Tracking_DB'][
+                'password_file_path']
+
+            kms_location = data['KMS']['location_id']
+            kms_key_ring_id = data['KMS']['key_ring_id']
+            kms_crypto_key_id = data['KMS']['crypto_key_id']
+        else:
+            tracking_db_host = tracking_db_port = tracking_db_user = None
+            tracking_db_password_path = None
+            kms_location = kms_key_ring_id = kms_crypto_key_id = None
 
         create_validation_table = data['create_validation_table']
 
+        # Number of partitions migrated concurrently.
+        partition_workers = data.get('partition_workers', 4)
+
     except KeyError:
         raise
 
@@ -136,15 +148,22 @@ def validate_config_parameters(data):
     if not isinstance(hive_port, int):
         raise TypeError("Hive port must be an integer")
 
-    if not isinstance(tracking_db_port, int):
+    if tracking_db_type not in ('mysql', 'sqlite'):
+        raise ValueError("Tracking database type must be mysql or sqlite")
+
+    if tracking_db_type == 'mysql' and not isinstance(tracking_db_port, int):
         raise TypeError("Tracking database port must be an integer")
 
+    if not isinstance(partition_workers, int) or partition_workers < 1:
+        raise TypeError("Partition workers must be a positive integer")
+
     if gcs_bucket_name.startswith('gs://'):
         gcs_bucket_name = gcs_bucket_name.split('gs://')[1]
     if gcs_bucket_name[-1] == '/':
         gcs_bucket_name = gcs_bucket_name[:-1]
 
-    if not tracking_db_password_path.startswith('gs://'):
+    if tracking_db_type == 'mysql' and \
+            not tracking_db_password_path.startswith('gs://'):
         raise ValueError(
             "Tracking database password path must start with gs://")
 
@@ -168,6 +187,7 @@ def validate_config_parameters(data):
         "bq_table": bq_table,
         "bq_table_write_mode": bq_write_mode,
         "use_clustering": use_clustering,
+        "tracking_database_type": tracking_db_type,
         "tracking_database_host": tracking_db_host,
         "tracking_database_port": tracking_db_port,
         "tracking_database_user": tracking_db_user,
@@ -178,6 +198,7 @@ def validate_config_parameters(data):
         "key_ring_id": kms_key_ring_id,
         "crypto_key_id": kms_crypto_key_id,
         "create_validation_table": create_validation_table,
+        "partition_workers": partition_workers,
         "hive_bq_comparison_csv": hive_bq_comparison_csv,
         "hive_bq_comparison_table": hive_bq_comparison_table,
         "log_file_name": LOG_FILE_NAME
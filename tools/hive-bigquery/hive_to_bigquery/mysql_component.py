@@ -14,6 +14,9 @@
 """Module to handle MySQL related utilities."""
 
 import logging
+import queue
+import threading
+from contextlib import contextmanager
 
 import pymysql
 
@@ -23,13 +26,20 @@ from hive_to_bigquery.properties_reader import PropertiesReader
 
 logger = logging.getLogger('Hive2BigQuery')
 
+# Maximum number of connections opened to the Cloud SQL instance.
+DEFAULT_POOL_SIZE = 8
+# Number of rows committed by a single executemany call.
+EXECUTE_MANY_BATCH_SIZE = 1000
+
 
 class MySQLComponent(DatabaseComponent):
     """MySQL component to handle functions related to it.
 
     Has utilities which perform MySQL operations using the pymysql
     connection, such as creating table, dropping a table, executing a query,
-    executing a transaction etc.
+    executing a transaction etc. The connections are kept in a pool shared
+    by the threads migrating the table, and the statements take their values
+    as parameters escaped by the driver.
 
     Attributes:
         host (str): Hostname of the Cloud SQL instance.
@@ -39,12 +49,21 @@ class MySQLComponent(DatabaseComponent):
         port (int): Port to be used.
         connection (pymysql.connections.Connection): Connection to Cloud SQL
         instance.
+        pool_size (int): Maximum number of connections of the pool.
 
     """
+    # Errors raised by the driver when a statement fails.
+    operational_errors = (pymysql.err.OperationalError,)
+
     def __init__(self, **kwargs):
 
         logger.debug("Initializing Cloud SQL Component")
+        self.pool_size = kwargs.pop('pool_size', DEFAULT_POOL_SIZE)
+        self._pool = queue.LifoQueue()
+        self._pool_lock = threading.Lock()
+        self._n_connections = 1
         super(MySQLComponent, self).__init__(**kwargs)
+        self._pool.put(self.connection)
 
     def __str__(self):
         return "MySQL - Host {0} username {1} database {2} port {3}".format(
@@ -80,41 +99,156 @@ class MySQLComponent(DatabaseComponent):
         cursor = self.connection.cursor()
         return cursor
 
-    def execute_transaction(self, query):
+    @contextmanager
+    def pooled_connection(self):
+        """Borrows a connection from the pool, opening a new one if all of
+        them are in use and the pool is not full.
+
+        Yields:
+            pymysql.connections.Connection: pymysql connection object.
+        """
+
+        try:
+            connection = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_connect = self._n_connections < self.pool_size
+                if can_connect:
+                    self._n_connections += 1
+            if can_connect:
+                try:
+                    connection = self.get_connection()
+                except custom_exceptions.ConnectionError:
+                    with self._pool_lock:
+                        self._n_connections -= 1
+                    raise
+            else:
+                connection = self._pool.get()
+        try:
+            self.check_connection(connection)
+            yield connection
+        finally:
+            self._pool.put(connection)
+
+    @staticmethod
+    def check_connection(connection):
+        """Reconnects if the server closed the connection since its last use.
+
+        Args:
+            connection (pymysql.connections.Connection): pymysql connection
+                object.
+        """
+
+        connection.ping(reconnect=True)
+
+    def format_query(self, query):
+        """Adapts a query using %s placeholders to the driver.
+
+        Args:
+            query (str): Query to be executed.
+
+        Returns:
+            str: Query to be executed.
+        """
+
+        return query
+
+    def execute_transaction(self, query, params=None):
         """Executes a transaction and commits to the database.
 
         Args:
-            query (str): Transaction query to be executed.
+            query (str): Transaction query to be executed, with %s
+                placeholders for the parameters, if any.
+            params (tuple): Parameters of the query, escaped by the driver.
         """
 
-        try:
-            cursor = self.get_cursor()
-            cursor.execute(query)
-            self.connection.commit()
-        except pymysql.err.OperationalError as error:
-            self.connection.rollback()
-            logger.error("Failed to commit transaction {} to Cloud SQL "
-                         "table".format(query))
-            raise custom_exceptions.MySQLExecutionError from error
-
-    def execute_query(self, query):
+        with self.pooled_connection() as connection:
+            try:
+                cursor = connection.cursor()
+                if params is None:
+                    cursor.execute(self.format_query(query))
+                else:
+                    cursor.execute(self.format_query(query), params)
+                connection.commit()
+            except self.operational_errors as error:
+                connection.rollback()
+                logger.error("Failed to commit transaction {} to Cloud SQL "
+                             "table".format(query))
+                raise custom_exceptions.MySQLExecutionError from error
+
+    def execute_many(self, query, params_list):
+        """Executes a statement for every set of parameters and commits to
+        the database in batches. INSERT statements whose values are all
+        placeholders are sent as multi-row inserts.
+
+        Args:
+            query (str): Transaction query to be executed, with %s
+                placeholders for the parameters.
+            params_list (List[tuple]): Parameters of every execution.
+        """
+
+        params_list = list(params_list)
+        with self.pooled_connection() as connection:
+            for i in range(0, len(params_list), EXECUTE_MANY_BATCH_SIZE):
+                try:
+                    cursor = connection.cursor()
+                    cursor.executemany(
+                        self.format_query(query),
+                        params_list[i:i + EXECUTE_MANY_BATCH_SIZE])
+                    connection.commit()
+                except self.operational_errors as error:
+                    connection.rollback()
+                    logger.error("Failed to commit transaction {} to Cloud "
+                                 "SQL table".format(query))
+                    raise custom_exceptions.MySQLExecutionError from error
+
+    def execute_query(self, query, params=None):
         """Executes query and returns the results.
 
         Args:
-            query (str): Query to be executed.
+            query (str): Query to be executed, with %s placeholders for the
+                parameters, if any.
+            params (tuple): Parameters of the query, escaped by the driver.
 
         Returns:
             List: Results of the query.
         """
 
-        cursor = self.get_cursor()
-        try:
-            cursor.execute(query)
-            return cursor.fetchall()
-        except pymysql.err.OperationalError as error:
-            logger.error(
-                "Failed in querying Cloud SQL table - {}".format(query))
-            raise custom_exceptions.MySQLExecutionError from error
+        with self.pooled_connection() as connection:
+            try:
+                cursor = connection.cursor()
+                if params is None:
+                    cursor.execute(self.format_query(query))
+                else:
+                    cursor.execute(self.format_query(query), params)
+                results = cursor.fetchall()
+                # Ends the transaction so that the next queries on this
+                # connection see the changes committed by the others.
+                connection.commit()
+                return results
+            except self.operational_errors as error:
+                logger.error(
+                    "Failed in querying Cloud SQL table - {}".format(query))
+                raise custom_exceptions.MySQLExecutionError from error
+
+    def clone(self):
+        """Returns the component itself, whose connection pool can be shared
+        by several threads.
+
+        Returns:
+            MySQLComponent: Instance of MySQLComponent.
+        """
+
+        return self
+
+    def close(self):
+        """Closes all the connections of the pool."""
+
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
 
     def check_table_exists(self, table_name):
         """Checks whether the provided MySQL table exists.
@@ -136,15 +270,13 @@ class MySQLComponent(DatabaseComponent):
             table_name (str): MySQL table name.
         """
 
-        cursor = self.get_cursor()
-
         if self.check_table_exists(table_name):
             try:
-                cursor.execute("DROP TABLE {}".format(table_name))
+                self.execute_transaction("DROP TABLE {}".format(table_name))
                 logger.debug("Dropped table %s", table_name)
-            except pymysql.err.DatabaseError as error:
+            except custom_exceptions.MySQLExecutionError:
                 logger.error("Failed dropping table %s", table_name)
-                raise custom_exceptions.MySQLExecutionError from error
+                raise
 
     def drop_table_if_empty(self, table_name):
         """Drops tracking table if empty.
@@ -177,11 +309,11 @@ class MySQLComponent(DatabaseComponent):
 
         results = self.execute_query(
             "SELECT tracking_table_name,inc_col_present,inc_col_name,"
-            "inc_col_type from {} WHERE hive_database='{}' AND "
-            "hive_table='{}' AND bq_table='{}'".format(
-                PropertiesReader.get('tracking_metatable_name'),
-                hive_table_model.db_name, hive_table_model.table_name,
-                hive_table_model.bq_table_name))
+            "inc_col_type from {} WHERE hive_database=%s AND "
+            "hive_table=%s AND bq_table=%s".format(
+                PropertiesReader.get('tracking_metatable_name')),
+            (hive_table_model.db_name, hive_table_model.table_name,
+             hive_table_model.bq_table_name))
         if results:
             hive_table_model.is_first_run = False
             hive_table_model.tracking_table_name = results[0][0]
@@ -203,22 +335,22 @@ class MySQLComponent(DatabaseComponent):
         if mode == "INSERT":
             query = "INSERT INTO {} (hive_database,hive_table,bq_table," \
                     "tracking_table_name,inc_col_present,inc_col_name," \
-                    "inc_col_type) VALUES('{}','{}','{}','{}',{},'{}'," \
-                    "'{}')".format(
-                PropertiesReader.get('tracking_metatable_name'),
-                hive_table_model.db_name, hive_table_model.table_name,
-                hive_table_model.bq_table_name,
-                hive_table_model.tracking_table_name,
-                hive_table_model.is_inc_col_present, hive_table_model.inc_col,
-                hive_table_model.inc_col_type)
+                    "inc_col_type) VALUES(%s,%s,%s,%s,%s,%s,%s)".format(
+                PropertiesReader.get('tracking_metatable_name'))
+            params = (hive_table_model.db_name, hive_table_model.table_name,
+                      hive_table_model.bq_table_name,
+                      hive_table_model.tracking_table_name,
+                      hive_table_model.is_inc_col_present,
+                      str(hive_table_model.inc_col),
+                      str(hive_table_model.inc_col_type))
 
         if mode == "DELETE":
-            query = "DELETE FROM {} WHERE hive_database='{}' AND " \
-                    "hive_table='{}' AND bq_table='{}'".format(
-                PropertiesReader.get('tracking_metatable_name'),
-                hive_table_model.db_name, hive_table_model.table_name,
-                hive_table_model.bq_table_name)
-        self.execute_query(query)
+            query = "DELETE FROM {} WHERE hive_database=%s AND " \
+                    "hive_table=%s AND bq_table=%s".format(
+                PropertiesReader.get('tracking_metatable_name'))
+            params = (hive_table_model.db_name, hive_table_model.table_name,
+                      hive_table_model.bq_table_name)
+        self.execute_transaction(query, params)
 
     def create_tracking_table(self, hive_table_model):
         """Creates tracking table in CloudSQL instance.
@@ -271,6 +403,6 @@ class MySQLComponent(DatabaseComponent):
                 bq_job_status VARCHAR(10) COMMENT 'Status of BigQuery load job'
                 )""".format(hive_table_model.tracking_table_name)
 
-        self.execute_query(query)
+        self.execute_transaction(query)
         logger.info("Tracking table {} is created".format(
             hive_table_model.tracking_table_name))
@@ -0,0 +1,114 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Module to keep the tracking tables in a local SQLite database, for test
+runs without a Cloud SQL instance."""
+
+import logging
+import re
+import sqlite3
+
+from hive_to_bigquery import custom_exceptions
+from hive_to_bigquery.mysql_component import MySQLComponent
+from hive_to_bigquery.properties_reader import PropertiesReader
+
+logger = logging.getLogger('Hive2BigQuery')
+
+# Column comments of the MySQL DDL, not supported by SQLite.
+COMMENT_PATTERN = re.compile(r"\s+COMMENT\s+'[^']*'")
+
+
+class SQLiteComponent(MySQLComponent):
+    """SQLite component storing the tracking tables in a local file.
+
+    Runs the statements of MySQLComponent on a single SQLite connection,
+    SQLite serializing the writes anyway, and creates the tracking metatable
+    if it doesn't exist.
+
+    Attributes:
+        database (str): Path of the SQLite database file.
+        connection (sqlite3.Connection): Connection to the SQLite database.
+    """
+    operational_errors = (sqlite3.OperationalError,)
+
+    def __init__(self, **kwargs):
+
+        kwargs.setdefault('host', None)
+        kwargs.setdefault('port', None)
+        kwargs.setdefault('user', None)
+        kwargs.setdefault('password', None)
+        kwargs['pool_size'] = 1
+        super(SQLiteComponent, self).__init__(**kwargs)
+        self.create_tracking_meta_table()
+
+    def __str__(self):
+        return "SQLite - database {0}".format(self.database)
+
+    def get_connection(self):
+        """Connects to the SQLite database.
+
+        Returns:
+            sqlite3.Connection: sqlite3 connection object.
+        """
+
+        logger.debug("Getting SQLite Connection")
+        try:
+            # The connection is shared by the threads through the pool.
+            return sqlite3.connect(self.database, check_same_thread=False)
+        except sqlite3.DatabaseError as error:
+            raise custom_exceptions.ConnectionError from error
+
+    @staticmethod
+    def check_connection(connection):
+        """SQLite connections don't time out."""
+
+        pass
+
+    def format_query(self, query):
+        """Replaces the %s placeholders with the SQLite ones and removes the
+        column comments.
+
+        Args:
+            query (str): Query to be executed.
+
+        Returns:
+            str: Query to be executed.
+        """
+
+        return COMMENT_PATTERN.sub('', query.replace('%s', '?'))
+
+    def check_table_exists(self, table_name):
+        """Checks whether the provided SQLite table exists.
+
+        Args:
+            table_name (str): SQLite table name.
+        """
+
+        results = self.execute_query(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name=%s",
+            (table_name,))
+        return bool(results)
+
+    def create_tracking_meta_table(self):
+        """Creates the tracking metatable, like the
+        prerequisites/tracking_table.sql file does in Cloud SQL."""
+
+        self.execute_transaction("""CREATE TABLE IF NOT EXISTS {} (
+            hive_database VARCHAR(255),
+            hive_table VARCHAR(255),
+            bq_table VARCHAR(1024),
+            tracking_table_name VARCHAR(64),
+            inc_col_present BOOLEAN,
+            inc_col_name VARCHAR(255),
+            inc_col_type VARCHAR(25)
+            )""".format(PropertiesReader.get('tracking_metatable_name')))
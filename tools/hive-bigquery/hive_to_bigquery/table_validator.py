@@ -0,0 +1,292 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Module to validate the data migrated from Hive to BigQuery by comparing
+aggregates of the Hive and BigQuery tables."""
+
+import datetime
+import decimal
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dateutil.parser import parse
+
+from hive_to_bigquery.utilities import calculate_time
+
+logger = logging.getLogger('Hive2BigQuery')
+
+# Metrics computed for the columns of every type, the hash of the values
+# being restricted to the types cast to the same string by Hive and BigQuery.
+INTEGER_METRICS = ['min', 'max', 'nulls', 'hash_sum']
+FLOAT_METRICS = ['min', 'max', 'nulls']
+STRING_METRICS = ['min', 'max', 'nulls', 'hash_sum']
+DATE_METRICS = ['min', 'max', 'nulls', 'hash_sum']
+TIMESTAMP_METRICS = ['min', 'max', 'nulls']
+OTHER_METRICS = ['nulls']
+
+# Number of hexadecimal digits of the MD5 hash summed up, 7 digits keep the
+# sum within 64 bits for up to 2^35 rows.
+HASH_DIGITS = 7
+
+# Relative tolerance of the comparison of floating point values.
+FLOAT_TOLERANCE = 1e-9
+
+
+def get_column_metrics(col_type):
+    """Gets the metrics to compute for a column.
+
+    Args:
+        col_type (str): Hive data type of the column.
+
+    Returns:
+        List: Names of the metrics.
+    """
+
+    col_type = col_type.lower()
+    if col_type in ["tinyint", "smallint", "int", "bigint"]:
+        return INTEGER_METRICS
+    if col_type in ["float", "double"] or col_type.startswith("decimal"):
+        return FLOAT_METRICS
+    if col_type == "string" or col_type.startswith("varchar"):
+        return STRING_METRICS
+    if col_type == "boolean":
+        return STRING_METRICS
+    if col_type == "date":
+        return DATE_METRICS
+    if col_type == "timestamp":
+        return TIMESTAMP_METRICS
+    # Complex types, char (padded differently) and binary.
+    return OTHER_METRICS
+
+
+def normalize_value(value):
+    """Converts a value returned by Hive or BigQuery to a comparable form.
+
+    Args:
+        value: Value of a partition column or of an aggregate.
+
+    Returns:
+        Normalized value.
+    """
+
+    if isinstance(value, datetime.datetime):
+        return value.replace(tzinfo=None)
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    return value
+
+
+def values_match(metric, hive_value, bq_value):
+    """Compares the values of a metric computed by Hive and BigQuery.
+
+    Args:
+        metric (str): Name of the metric.
+        hive_value: Value computed by Hive.
+        bq_value: Value computed by BigQuery.
+
+    Returns:
+        boolean: True if the values match, else False.
+    """
+
+    hive_value = normalize_value(hive_value)
+    bq_value = normalize_value(bq_value)
+    if hive_value is None or bq_value is None:
+        return hive_value is None and bq_value is None
+    if isinstance(bq_value, datetime.datetime):
+        # Hive returns timestamps as strings.
+        try:
+            return parse(str(hive_value)) == bq_value
+        except ValueError:
+            return False
+    if isinstance(hive_value, float) or isinstance(bq_value, float):
+        try:
+            return math.isclose(float(hive_value),
+                                float(bq_value),
+                                rel_tol=FLOAT_TOLERANCE)
+        except (TypeError, ValueError):
+            return False
+    if metric in ['count', 'nulls', 'hash_sum']:
+        return int(hive_value) == int(bq_value)
+    return str(hive_value) == str(bq_value)
+
+
+class TableValidator(object):
+    """Validates the migrated data by comparing the Hive and BigQuery tables.
+
+    Generates one aggregate query per table, computing for every partition at
+    once the number of rows and, for every column, its minimum, maximum,
+    number of nulls and the sum of the hashes of its values, depending on the
+    data type. Runs the Hive and BigQuery queries concurrently and compares
+    the results in memory.
+
+    Attributes:
+        hive_component (:class:`HiveComponent`): Instance of HiveComponent to
+            connect to Hive.
+        bq_component (:class:`BigQueryComponent`): Instance of
+            BigQueryComponent to do BigQuery operations.
+        hive_table_model (:class:`HiveTableModel`): Wrapper to Hive table
+            details.
+        bq_table_model (:class:`BigQueryTableModel`): Wrapper to BigQuery
+            table details.
+    """
+    def __init__(self, hive_component, bq_component, hive_table_model,
+                 bq_table_model):
+
+        self.hive_component = hive_component
+        self.bq_component = bq_component
+        self.hive_table_model = hive_table_model
+        self.bq_table_model = bq_table_model
+        self._partition_columns = list(hive_table_model.partition_info.keys())
+        # List of (column name, metric name) tuples, in the order of the
+        # aggregates of the queries.
+        self._metrics = [(None, 'count')]
+        for name, col_type in hive_table_model.schema.items():
+            if name not in self._partition_columns:
+                for metric in get_column_metrics(col_type):
+                    self._metrics.append((name, metric))
+
+    @staticmethod
+    def get_hive_aggregate(column, metric):
+        """Hive expression computing a metric of a column."""
+
+        if metric == 'count':
+            return "COUNT(*)"
+        if metric == 'nulls':
+            return "SUM(CASE WHEN `{0}` IS NULL THEN 1 ELSE 0 END)".format(
+                column)
+        if metric == 'hash_sum':
+            return "SUM(CAST(CONV(SUBSTR(MD5(CAST(`{0}` AS STRING)),1,{1})," \
+                   "16,10) AS BIGINT))".format(column, HASH_DIGITS)
+        return "{0}(`{1}`)".format(metric.upper(), column)
+
+    @staticmethod
+    def get_bq_aggregate(column, metric):
+        """BigQuery expression computing a metric of a column."""
+
+        if metric == 'count':
+            return "COUNT(*)"
+        if metric == 'nulls':
+            return "COUNTIF(`{0}` IS NULL)".format(column)
+        if metric == 'hash_sum':
+            return "SUM(CAST(CONCAT('0x',SUBSTR(TO_HEX(MD5(CAST(`{0}` AS " \
+                   "STRING))),1,{1})) AS INT64))".format(column, HASH_DIGITS)
+        return "{0}(`{1}`)".format(metric.upper(), column)
+
+    def build_query(self, table_name, get_aggregate):
+        """Builds the aggregate query grouping the table by partition.
+
+        Args:
+            table_name (str): Fully qualified table name.
+            get_aggregate (function): Function returning the expression
+                computing a metric of a column.
+
+        Returns:
+            str: Aggregate query.
+        """
+
+        select_list = ["`{}`".format(col) for col in self._partition_columns]
+        select_list += [
+            get_aggregate(column, metric) for column, metric in self._metrics
+        ]
+        query = "SELECT {0} FROM {1}".format(",".join(select_list), table_name)
+        if self._partition_columns:
+            query += " GROUP BY {}".format(",".join(
+                "`{}`".format(col) for col in self._partition_columns))
+        return query
+
+    def get_hive_query(self):
+        """Returns the aggregate query of the Hive table."""
+
+        return self.build_query(
+            "{}.{}".format(self.hive_table_model.db_name,
+                           self.hive_table_model.table_name),
+            self.get_hive_aggregate)
+
+    def get_bq_query(self):
+        """Returns the aggregate query of the BigQuery table."""
+
+        return self.build_query(
+            "`{}.{}`".format(self.bq_table_model.dataset_id,
+                             self.bq_table_model.table_name),
+            self.get_bq_aggregate)
+
+    def group_by_partition(self, rows):
+        """Keys the aggregates by partition clause.
+
+        Args:
+            rows (List): Rows of the aggregate query.
+
+        Returns:
+            dict: Aggregates keyed by the WHERE clause of the partition.
+        """
+
+        n_keys = len(self._partition_columns)
+        results = {}
+        for row in rows:
+            row = tuple(row)
+            clause = ' AND '.join(
+                '{}="{}"'.format(col, normalize_value(value))
+                for col, value in zip(self._partition_columns, row[:n_keys]))
+            if clause:
+                clause = 'WHERE ' + clause
+            results[clause] = row[n_keys:]
+        return results
+
+    def validate(self):
+        """Compares the aggregates of the Hive and BigQuery tables.
+
+        Returns:
+            List: A list of dict elements describing every mismatch, with the
+                partition clause, column, metric and values from Hive and
+                BigQuery. Empty if the tables match.
+        """
+
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            hive_future = executor.submit(self.hive_component.execute_query,
+                                          self.get_hive_query())
+            bq_future = executor.submit(self.bq_component.execute_query,
+                                        self.get_bq_query())
+            hive_results = self.group_by_partition(hive_future.result())
+            bq_results = self.group_by_partition(bq_future.result())
+        logger.debug("Computed Hive and BigQuery aggregates - Time taken - %s",
+                     calculate_time(start, time.time()))
+
+        mismatches = []
+        for clause in sorted(set(hive_results) | set(bq_results)):
+            hive_values = hive_results.get(clause)
+            bq_values = bq_results.get(clause)
+            if hive_values is None or bq_values is None:
+                mismatches.append({
+                    'clause': clause,
+                    'column': None,
+                    'metric': 'count',
+                    'hive': hive_values[0] if hive_values else 0,
+                    'bigquery': bq_values[0] if bq_values else 0
+                })
+                continue
+            for (column, metric), hive_value, bq_value in zip(
+                    self._metrics, hive_values, bq_values):
+                if not values_match(metric, hive_value, bq_value):
+                    mismatches.append({
+                        'clause': clause,
+                        'column': column,
+                        'metric': metric,
+                        'hive': hive_value,
+                        'bigquery': bq_value
+                    })
+        return mismatches
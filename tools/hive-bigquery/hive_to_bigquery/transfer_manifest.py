@@ -0,0 +1,95 @@
+# Copyright 2019 Google Inc.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Manifest of the files copied from HDFS to GCS."""
+
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger('Hive2BigQuery')
+
+
+class TransferManifest(object):
+    """Records every file copied from HDFS to GCS along with the size and
+    modification time of the source and the CRC32C checksum of the copy.
+
+    The records are appended as JSON lines to a local file, so that a rerun
+    skips the files which were copied but not yet marked as copied in the
+    tracking table, as long as neither the source nor the copy changed.
+
+    Attributes:
+        file_name (str): Path of the manifest file.
+    """
+    def __init__(self, file_name):
+
+        self.file_name = file_name
+        self._lock = threading.Lock()
+        self._entries = {}
+        if os.path.exists(file_name):
+            with open(file_name, "r") as file_content:
+                for line in file_content:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Ignores a line partially written by an interrupted
+                        # run.
+                        continue
+                    self._entries[entry['file_path']] = entry
+            logger.debug("Loaded %d entries from the transfer manifest %s",
+                         len(self._entries), file_name)
+
+    def get_copied_file(self, gcs_component, gcs_bucket_name, source):
+        """Looks up the copy of an HDFS file.
+
+        Args:
+            gcs_component (:class:`GCSStorageComponent`): Instance of
+                GCSStorageComponent to do GCS operations.
+            gcs_bucket_name (str): GCS bucket name.
+            source (dict): Path, size and modification time of the HDFS file.
+
+        Returns:
+            str: GCS URI of the copy, None if the file was not copied or if
+            either the source or the copy changed since.
+        """
+
+        entry = self._entries.get(source['path'])
+        if entry is None or entry['size'] != source['size'] or \
+                entry['mtime'] != source['mtime']:
+            return None
+        blob = gcs_component.get_blob(gcs_bucket_name, entry['gcs_file_path'])
+        if blob is None or blob.crc32c != entry['crc32c']:
+            return None
+        return entry['gcs_file_path']
+
+    def add(self, source, gcs_file_path, crc32c):
+        """Records the copy of an HDFS file.
+
+        Args:
+            source (dict): Path, size and modification time of the HDFS file.
+            gcs_file_path (str): GCS URI of the copy.
+            crc32c (str): Base64 encoded CRC32C checksum of the copy.
+        """
+
+        entry = {
+            'file_path': source['path'],
+            'size': source['size'],
+            'mtime': source['mtime'],
+            'gcs_file_path': gcs_file_path,
+            'crc32c': crc32c
+        }
+        with self._lock:
+            self._entries[source['path']] = entry
+            with open(self.file_name, "a") as file_content:
+                file_content.write(json.dumps(entry) + "\n")
@@ -51,5 +51,9 @@ setup(
     ],
     packages=find_packages(where=str(here)),
     python_requires='>=3.5, <4',
-    install_requires=requirements
+    install_requires=requirements,
+    extras_require={
+        # Native HDFS client, through libhdfs, to copy files to GCS.
+        'native-hdfs': ['pyarrow >= 0.17.0'],
+    }
 )
@@ -42,3 +42,43 @@ def test_get_client(object_under_test, mock_bigquery_client):
     mock_bigquery_client.assert_called_once_with(
         project=PROJECT_ID, client_info=mock.ANY
     )
+
+
+def test_update_bq_job_status_batches_updates(object_under_test,
+                                              mock_bigquery_client):
+    jobs = {
+        "job-done": mock.Mock(state="DONE", errors=None),
+        "job-retry": mock.Mock(state="DONE", errors=["error"]),
+        "job-failed": mock.Mock(state="DONE", errors=["error"]),
+    }
+    mock_bigquery_client.get_job.side_effect = \
+        lambda job_id, location: jobs[job_id]
+    mysql_component = mock.Mock()
+    mysql_component.execute_query.return_value = [
+        ("gs://bucket/done", "job-done", 0),
+        ("gs://bucket/retry", "job-retry", 1),
+        ("gs://bucket/failed", "job-failed", 3),
+    ]
+    gcs_component = mock.Mock()
+    hive_table_model = mock.Mock(tracking_table_name="tracking")
+    bq_table_model = mock.Mock(dataset_id="dataset")
+
+    object_under_test.update_bq_job_status(mysql_component, gcs_component,
+                                           hive_table_model, bq_table_model,
+                                           "bucket")
+
+    mock_bigquery_client.get_dataset.assert_called_once()
+    calls = [
+        call[0] for call in mysql_component.execute_transaction.call_args_list
+    ]
+    assert calls == [
+        ("UPDATE tracking SET bq_job_status='DONE' WHERE bq_job_id IN (%s)",
+         ("job-done",)),
+        ("UPDATE tracking SET bq_job_status='FAILED' WHERE bq_job_id IN (%s)",
+         ("job-failed",)),
+        ("UPDATE tracking SET bq_job_status='TODO',"
+         "bq_job_retries=bq_job_retries+1 WHERE bq_job_id IN (%s)",
+         ("job-retry",)),
+    ]
+    gcs_component.delete_file.assert_called_once_with("bucket",
+                                                      "gs://bucket/done")
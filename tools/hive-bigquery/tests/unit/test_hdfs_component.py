@@ -0,0 +1,66 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import pytest
+
+
+HDFS_LS_OUTPUT = b"""Found 2 items
+-rw-r--r--   1 hive hadoop       1024 2020-01-01 10:00 hdfs://nn:8020/data/000000_0
+-rw-r--r--   1 hive hadoop          0 2020-01-01 10:00 hdfs://nn:8020/data/_SUCCESS
+"""
+
+
+@pytest.fixture
+def module_under_test():
+    from hive_to_bigquery import hdfs_component
+
+    return hdfs_component
+
+
+def test_list_files_with_command(module_under_test):
+    with mock.patch.object(module_under_test.subprocess, "check_output",
+                           return_value=HDFS_LS_OUTPUT) as check_output:
+        files = module_under_test.HDFSComponent.list_files_with_command(
+            "hdfs://nn:8020/data")
+
+    check_output.assert_called_once_with(
+        ["hdfs", "dfs", "-ls", "hdfs://nn:8020/data"])
+    assert files == [{
+        "path": "hdfs://nn:8020/data/000000_0",
+        "size": 1024,
+        "mtime": "2020-01-01 10:00"
+    }]
+
+
+def test_transfer_manifest_skips_unchanged_files(tmp_path):
+    from hive_to_bigquery.transfer_manifest import TransferManifest
+
+    source = {"path": "hdfs://nn:8020/data/000000_0", "size": 1024,
+              "mtime": "1"}
+    gcs_component = mock.Mock()
+    gcs_component.get_blob.return_value = mock.Mock(crc32c="abc==")
+
+    manifest = TransferManifest(str(tmp_path / "manifest.json"))
+    manifest.add(source, "gs://bucket/000000_0", "abc==")
+    # Reloads the manifest as a rerun would.
+    manifest = TransferManifest(str(tmp_path / "manifest.json"))
+
+    assert manifest.get_copied_file(gcs_component, "bucket",
+                                    source) == "gs://bucket/000000_0"
+    assert manifest.get_copied_file(gcs_component, "bucket",
+                                    dict(source, mtime="2")) is None
+    gcs_component.get_blob.return_value = mock.Mock(crc32c="def==")
+    assert manifest.get_copied_file(gcs_component, "bucket", source) is None
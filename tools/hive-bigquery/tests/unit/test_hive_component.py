@@ -0,0 +1,142 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture
+def module_under_test():
+    from hive_to_bigquery import hive_component
+
+    return hive_component
+
+
+@pytest.fixture
+def hive(module_under_test, monkeypatch):
+    from hive_to_bigquery.properties_reader import PropertiesReader
+
+    monkeypatch.setattr(PropertiesReader, "properties",
+                        {"partition_workers": 3})
+    # Every component gets its own mock connection.
+    monkeypatch.setattr(module_under_test.HiveComponent, "get_connection",
+                        lambda self: mock.Mock())
+    return module_under_test.HiveComponent(host="localhost",
+                                           port=10000,
+                                           user="hive",
+                                           password=None,
+                                           database="default")
+
+
+@pytest.fixture
+def clones(hive, monkeypatch):
+    """Records the components cloned from the Hive component."""
+    cloned = []
+    clone = type(hive).clone
+
+    def record_clone(self):
+        component = clone(self)
+        cloned.append(component)
+        return component
+
+    monkeypatch.setattr(type(hive), "clone", record_clone)
+    return cloned
+
+
+def migrate_partition_table(hive, mysql_component):
+    hive_table_model = mock.Mock(is_inc_col_present=False,
+                                 tracking_table_name="tracking_table")
+    table_data = [{"table_name": "stage_new", "clause": "WHERE part=new"}]
+    hive.migrate_partition_table(mysql_component, mock.Mock(), mock.Mock(),
+                                 hive_table_model, mock.Mock(), "bucket",
+                                 table_data)
+
+
+def test_migrate_partition_table(hive, clones, monkeypatch):
+    # Rows left over by an interrupted run are picked up with the new one.
+    rows = [("stage_{}".format(i), "WHERE part={}".format(i))
+            for i in range(8)]
+    mysql_component = mock.Mock()
+    mysql_component.execute_query.return_value = rows
+
+    migrated = []
+    lock = threading.Lock()
+
+    def migrate_partition(self, mysql_component, bq_component, gcs_component,
+                          hive_table_model, bq_table_model, gcs_bucket_name,
+                          row):
+        # Keeps the workers busy so that the partitions are spread out.
+        time.sleep(0.01)
+        with lock:
+            migrated.append((self, threading.current_thread(), row))
+
+    monkeypatch.setattr(type(hive), "migrate_partition", migrate_partition)
+
+    migrate_partition_table(hive, mysql_component)
+
+    mysql_component.execute_many.assert_called_once_with(
+        "INSERT INTO tracking_table (table_name,clause,file_path) "
+        "VALUES(%s,%s,%s)", [("stage_new", "WHERE part=new", "TODO")])
+    assert sorted(row for _, _, row in migrated) == sorted(rows)
+
+    # Each worker migrates its partitions with its own clone.
+    assert 1 < len(clones) <= 3
+    assert all(component in clones for component, _, _ in migrated)
+    components_by_thread = {}
+    for component, thread, _ in migrated:
+        assert components_by_thread.setdefault(thread, component) is component
+    assert len(set(map(id, components_by_thread.values()))) == \
+        len(components_by_thread)
+
+    # Every clone is closed, and the shared connection is left open.
+    for component in clones:
+        component.connection.close.assert_called_once_with()
+    hive.connection.close.assert_not_called()
+
+
+def test_migrate_partition_table_failure(hive, clones, monkeypatch):
+    from hive_to_bigquery.properties_reader import PropertiesReader
+
+    monkeypatch.setattr(PropertiesReader, "properties",
+                        {"partition_workers": 1})
+    rows = [("stage_{}".format(i), "WHERE part={}".format(i))
+            for i in range(5)]
+    mysql_component = mock.Mock()
+    mysql_component.execute_query.return_value = rows
+
+    migrated = []
+
+    def migrate_partition(self, mysql_component, bq_component, gcs_component,
+                          hive_table_model, bq_table_model, gcs_bucket_name,
+                          row):
+        if row == rows[0]:
+            raise RuntimeError("Failed to migrate {}".format(row[0]))
+        time.sleep(0.05)
+        migrated.append(row)
+
+    monkeypatch.setattr(type(hive), "migrate_partition", migrate_partition)
+
+    with pytest.raises(RuntimeError, match="stage_0"):
+        migrate_partition_table(hive, mysql_component)
+
+    # The pending partitions are cancelled, and stay in the tracking table.
+    # At most the partition that was running when the failure was seen
+    # finishes.
+    assert len(migrated) <= 1
+    assert len(clones) == 1
+    clones[0].connection.close.assert_called_once_with()
+
@@ -0,0 +1,83 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def properties():
+    from hive_to_bigquery.properties_reader import PropertiesReader
+
+    PropertiesReader({"tracking_metatable_name": "tracking_table_info"})
+
+
+@pytest.fixture
+def object_under_test(tmp_path):
+    from hive_to_bigquery.sqlite_component import SQLiteComponent
+
+    component = SQLiteComponent(database=str(tmp_path / "tracking.db"))
+    yield component
+    component.close()
+
+
+@pytest.fixture
+def hive_table_model():
+    return mock.Mock(db_name="db",
+                     table_name="sales",
+                     bq_table_name="sales",
+                     tracking_table_name="tracking_sales",
+                     is_first_run=True,
+                     is_inc_col_present=False,
+                     inc_col=None,
+                     inc_col_type=None)
+
+
+def test_create_tracking_table(object_under_test, hive_table_model):
+    object_under_test.create_tracking_table(hive_table_model)
+
+    assert object_under_test.check_table_exists("tracking_sales")
+    object_under_test.check_tracking_table_exists(hive_table_model)
+    assert hive_table_model.is_first_run is False
+    assert hive_table_model.inc_col is None
+
+    object_under_test.update_tracking_meta_table(hive_table_model, "DELETE")
+    object_under_test.drop_table_if_empty("tracking_sales")
+    assert not object_under_test.check_table_exists("tracking_sales")
+    assert object_under_test.execute_query(
+        "SELECT COUNT(*) FROM tracking_table_info") == [(0,)]
+
+
+def test_execute_many_from_several_threads(object_under_test,
+                                           hive_table_model):
+    object_under_test.create_tracking_table(hive_table_model)
+    query = "INSERT INTO tracking_sales (table_name,clause,file_path," \
+            "gcs_copy_status) VALUES(%s,%s,%s,'TODO')"
+
+    def insert(partition):
+        object_under_test.execute_many(
+            query, [("stage_{}".format(partition), "WHERE dt='{}'".format(
+                partition), "hdfs://data/{}/{}".format(partition, i))
+                    for i in range(1500)])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(insert, range(4)))
+
+    assert object_under_test.execute_query(
+        "SELECT COUNT(*) FROM tracking_sales WHERE table_name=%s",
+        ("stage_2",)) == [(1500,)]
+    assert object_under_test.execute_query(
+        "SELECT COUNT(DISTINCT file_path) FROM tracking_sales") == [(6000,)]
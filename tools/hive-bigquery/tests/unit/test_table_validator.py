@@ -0,0 +1,86 @@
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import collections
+import datetime
+import decimal
+from unittest import mock
+
+import pytest
+
+
+@pytest.fixture
+def module_under_test():
+    from hive_to_bigquery import table_validator
+
+    return table_validator
+
+
+@pytest.fixture
+def hive_table_model():
+    schema = collections.OrderedDict([("id", "int"), ("price", "double"),
+                                      ("created", "timestamp"),
+                                      ("dt", "date")])
+    return mock.Mock(db_name="db",
+                     table_name="sales",
+                     schema=schema,
+                     partition_info=collections.OrderedDict([("dt", "date")]))
+
+
+def test_queries_group_by_partition(module_under_test, hive_table_model):
+    validator = module_under_test.TableValidator(
+        mock.Mock(), mock.Mock(), hive_table_model,
+        mock.Mock(dataset_id="dataset", table_name="sales"))
+
+    hive_query = validator.get_hive_query()
+    bq_query = validator.get_bq_query()
+
+    assert hive_query.startswith("SELECT `dt`,COUNT(*),MIN(`id`),MAX(`id`),")
+    assert hive_query.endswith("FROM db.sales GROUP BY `dt`")
+    assert "CONV(SUBSTR(MD5(CAST(`id` AS STRING)),1,7),16,10)" in hive_query
+    assert bq_query.endswith("FROM `dataset.sales` GROUP BY `dt`")
+    assert "COUNTIF(`price` IS NULL)" in bq_query
+    # Timestamps are not cast to the same strings, hence not hashed.
+    assert "MD5(CAST(`created`" not in bq_query
+
+
+def test_validate_reports_mismatches(module_under_test, hive_table_model):
+    hive_component = mock.Mock()
+    hive_component.execute_query.return_value = [
+        ("2020-01-01", 2, 1, 5, 0, 35, 1.5, 2.5, 0,
+         "2020-01-01 10:00:00", "2020-01-01 11:00:00", 0),
+        ("2020-01-02", 1, 7, 7, 0, 9, 3.0, 3.0, 0,
+         "2020-01-02 10:00:00", "2020-01-02 10:00:00", 0),
+    ]
+    bq_component = mock.Mock()
+    bq_component.execute_query.return_value = [
+        (datetime.date(2020, 1, 1), 2, 1, 5, 0, 35, decimal.Decimal("1.5"),
+         2.5, 0, datetime.datetime(2020, 1, 1, 10, tzinfo=datetime.timezone.utc),
+         datetime.datetime(2020, 1, 1, 11, tzinfo=datetime.timezone.utc), 0),
+        (datetime.date(2020, 1, 2), 1, 7, 7, 0, 8, 3.0, 3.0, 0,
+         datetime.datetime(2020, 1, 2, 10), datetime.datetime(2020, 1, 2, 10),
+         0),
+    ]
+    validator = module_under_test.TableValidator(hive_component, bq_component,
+                                                 hive_table_model, mock.Mock())
+
+    mismatches = validator.validate()
+
+    assert mismatches == [{
+        "clause": 'WHERE dt="2020-01-02"',
+        "column": "id",
+        "metric": "hash_sum",
+        "hive": 9,
+        "bigquery": 8
+    }]
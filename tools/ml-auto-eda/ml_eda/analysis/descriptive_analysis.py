@@ -19,7 +19,9 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 import logging
-from typing import Iterator, Dict, Callable, List, Tuple
+from typing import Iterator, Dict, Callable, List, Optional, Tuple
+
+import pandas as pd
 
 from ml_eda.analysis import descriptive_analyzer
 from ml_eda.analysis import utils
@@ -81,29 +83,23 @@ class DescriptiveAnalysis:
           metric_values=metric_values
       )
 
-  # TODO: need allow change the number of bins
-  def _run_single_numerical_histogram(
-      self,
+  @staticmethod
+  def _histogram_to_proto(
       numerical_attribute: analysis_entity_pb2.Attribute,
-      num_bins: int
+      histogram_df: pd.DataFrame
   ) -> analysis_entity_pb2.Analysis:
-    """Generate histogram for numerical attribute.
-
-    Each attribute will generate one analysis_entity_pb2.Analysis.
+    """helper function to convert the histogram of a numerical attribute to
+    analysis_entity_pb2.Analysis
 
     Args:
         numerical_attribute: (analysis_entity_pb2.Attribute)
+        histogram_df: (pd.DataFrame), bins and frequencies of the attribute
 
     Returns:
         analysis_entity_pb2.Analysis
     """
     numerical_column = numerical_attribute.name
 
-    histogram_df = self._data_extractor.extract_numerical_histogram_data(
-        numerical_column=numerical_column,
-        num_bins=num_bins
-    )
-
     # pylint: disable-msg=logging-format-interpolation
     logging.info(
         'The histogram of numerical column {column_name} are: {result}'
@@ -118,28 +114,24 @@ class DescriptiveAnalysis:
             numerical_column + '_' + query_constants.NH_BIN_POSTFIX).T]
     )
 
-  def _run_single_value_counts(
-      self,
+  @staticmethod
+  def _value_counts_to_proto(
       categorical_attribute: analysis_entity_pb2.Attribute,
-      cardinality_limits: int
+      value_counts_df: pd.DataFrame
   ) -> analysis_entity_pb2.Analysis:
-    """Compute value counts for categorical attribute.
-
-    Each attribute will generate one analysis_entity_pb2.Analysis.
+    """helper function to convert the value counts of a categorical attribute
+    to analysis_entity_pb2.Analysis
 
     Args:
         categorical_attribute: (analysis_entity_pb2.Attribute)
+        value_counts_df: (pd.DataFrame), values and frequencies of the
+        attribute
 
     Returns:
         analysis_entity_pb2.Analysis
     """
     categorical_column = categorical_attribute.name
 
-    value_counts_df = self._data_extractor.extract_value_counts_data(
-        categorical_column=categorical_column,
-        limit=cardinality_limits
-    )
-
     # pylint: disable-msg=logging-format-interpolation
     logging.info(
         'The value counts of categorical attribute {name} are: {result}'
@@ -153,17 +145,95 @@ class DescriptiveAnalysis:
         metric_dfs=[value_counts_df.set_index(categorical_column).T]
     )
 
-  def run_numerical_descriptive(self) -> Iterator[analysis_entity_pb2.Analysis]:
+  @staticmethod
+  def _chunk_attributes(
+      attributes: List[analysis_entity_pb2.Attribute],
+      max_columns: Optional[int]
+  ) -> List[List[analysis_entity_pb2.Attribute]]:
+    """Split the attributes into groups analysed by a single fused query
+
+    Args:
+        attributes: (List[analysis_entity_pb2.Attribute])
+        max_columns: (int), maximum number of attributes per group, no limit
+        if None
+
+    Returns:
+        List[List[analysis_entity_pb2.Attribute]]
+    """
+    attributes = list(attributes)
+    if not max_columns:
+      return [attributes] if attributes else []
+    return [attributes[i:i + max_columns]
+            for i in range(0, len(attributes), max_columns)]
+
+  # TODO: need allow change the number of bins
+  def _run_single_numerical_histogram(
+      self,
+      numerical_attribute: analysis_entity_pb2.Attribute,
+      num_bins: int
+  ) -> analysis_entity_pb2.Analysis:
+    """Generate histogram for numerical attribute.
+
+    Each attribute will generate one analysis_entity_pb2.Analysis.
+
+    Args:
+        numerical_attribute: (analysis_entity_pb2.Attribute)
+
+    Returns:
+        analysis_entity_pb2.Analysis
+    """
+    numerical_column = numerical_attribute.name
+
+    histogram_df = self._data_extractor.extract_numerical_histogram_data(
+        numerical_column=numerical_column,
+        num_bins=num_bins
+    )
+
+    return self._histogram_to_proto(numerical_attribute, histogram_df)
+
+  def _run_single_value_counts(
+      self,
+      categorical_attribute: analysis_entity_pb2.Attribute,
+      cardinality_limits: int
+  ) -> analysis_entity_pb2.Analysis:
+    """Compute value counts for categorical attribute.
+
+    Each attribute will generate one analysis_entity_pb2.Analysis.
+
+    Args:
+        categorical_attribute: (analysis_entity_pb2.Attribute)
+
+    Returns:
+        analysis_entity_pb2.Analysis
+    """
+    categorical_column = categorical_attribute.name
+
+    value_counts_df = self._data_extractor.extract_value_counts_data(
+        categorical_column=categorical_column,
+        limit=cardinality_limits
+    )
+
+    return self._value_counts_to_proto(categorical_attribute, value_counts_df)
+
+  def run_numerical_descriptive(
+      self,
+      numerical_attributes: List[analysis_entity_pb2.Attribute] = None
+  ) -> Iterator[analysis_entity_pb2.Analysis]:
     """Running numerical descriptive analysis for numerical attributes.
 
     Each attribute will generate one analysis_entity_pb2.Analysis with multiple
     metrics result inside.
 
+    Args:
+        numerical_attributes: (List[analysis_entity_pb2.Attribute]), subset
+        of the numerical attributes to analyse, all of them if None
+
     Returns:
         Iterator[analysis_entity_pb2.Analysis]
     """
-    name_proto_dict = {item.name: item for item in
-                       self._data_def.numerical_attributes}
+    if numerical_attributes is None:
+      numerical_attributes = self._data_def.numerical_attributes
+    name_proto_dict = {item.name: item for item in numerical_attributes}
 
     descriptive_df = \
       self._data_extractor.extract_numerical_descriptive_data(
@@ -181,11 +251,22 @@ class DescriptiveAnalysis:
     return self._descriptive_result_to_proto(descriptive_result,
                                              name_proto_dict)
 
-  def numerical_descriptive_tasks(self) -> List[Tuple[Callable, Tuple]]:
+  def numerical_descriptive_tasks(
+      self,
+      max_columns: Optional[int] = None
+  ) -> List[Tuple[Callable, Tuple]]:
     """Return the (func, params) tuple list for the job, which will be
-    feed to ThreadPoolExecutor for parallel execution
+    feed to ThreadPoolExecutor for parallel execution. Each task covers at
+    most max_columns attributes.
     """
-    return [(self.run_numerical_descriptive, ())]
+    if not max_columns:
+      return [(self.run_numerical_descriptive, (),
+               len(self._data_def.numerical_attributes))]
+    return [
+        (self.run_numerical_descriptive, (attributes,))
+        for attributes in self._chunk_attributes(
+            self._data_def.numerical_attributes, max_columns)
+    ]
 
   def run_numerical_histograms(
       self, num_bins: int = 10
@@ -213,19 +294,67 @@ class DescriptiveAnalysis:
     ]
     return tasks
 
+  def _run_fused_numerical_histograms(
+      self,
+      numerical_attributes: List[analysis_entity_pb2.Attribute],
+      num_bins: int
+  ) -> List[analysis_entity_pb2.Analysis]:
+    """Generate the histograms of several numerical attributes with a single
+    fused query.
+
+    Each attribute will generate one analysis_entity_pb2.Analysis.
+
+    Args:
+        numerical_attributes: (List[analysis_entity_pb2.Attribute])
+        num_bins: (int), number of bins
+
+    Returns:
+        List[analysis_entity_pb2.Analysis]
+    """
+    histograms = self._data_extractor.extract_numerical_histograms_data(
+        numerical_columns=[attribute.name
+                           for attribute in numerical_attributes],
+        num_bins=num_bins
+    )
+
+    return [self._histogram_to_proto(attribute, histograms[attribute.name])
+            for attribute in numerical_attributes]
+
+  def numerical_histograms_fused_tasks(
+      self,
+      num_bins: int = 10,
+      max_columns: Optional[int] = None
+  ) -> List[Tuple[Callable, Tuple]]:
+    """Return the (func, params) tuple list for the job, which will be
+    feed to ThreadPoolExecutor for parallel execution. Each task computes
+    the histograms of at most max_columns attributes in one query.
+    """
+    tasks = [
+        (self._run_fused_numerical_histograms, (attributes, num_bins))
+        for attributes in self._chunk_attributes(
+            self._data_def.numerical_attributes, max_columns)
+    ]
+    return tasks
+
   def run_categorical_descriptive(
-      self
+      self,
+      categorical_attributes: List[analysis_entity_pb2.Attribute] = None
   ) -> Iterator[analysis_entity_pb2.Analysis]:
     """Running categorical descriptive analysis for categorical attributes
 
     Each attribute will generate one analysis_entity_pb2.Analysis with multiple
     metrics result inside.
 
+    Args:
+        categorical_attributes: (List[analysis_entity_pb2.Attribute]), subset
+        of the categorical attributes to analyse, all of them if None
+
     Returns:
         Iterator[analysis_entity_pb2.Analysis]
     """
-    name_proto_dict = {item.name: item for item in
-                       self._data_def.categorical_attributes}
+    if categorical_attributes is None:
+      categorical_attributes = self._data_def.categorical_attributes
+    name_proto_dict = {item.name: item for item in categorical_attributes}
 
     descriptive_df = \
       self._data_extractor.extract_categorical_descriptive_data(
@@ -243,11 +372,22 @@ class DescriptiveAnalysis:
     return self._descriptive_result_to_proto(descriptive_result,
                                              name_proto_dict)
 
-  def categorical_descriptive_tasks(self) -> List[Tuple[Callable, Tuple]]:
+  def categorical_descriptive_tasks(
+      self,
+      max_columns: Optional[int] = None
+  ) -> List[Tuple[Callable, Tuple]]:
     """Return the (func, params) tuple list for the job, which will be
-    feed to ThreadPoolExecutor for parallel execution
+    feed to ThreadPoolExecutor for parallel execution. Each task covers at
+    most max_columns attributes.
     """
-    return [(self.run_categorical_descriptive, ())]
+    if not max_columns:
+      return [(self.run_categorical_descriptive, (),
+               len(self._data_def.categorical_attributes))]
+    return [
+        (self.run_categorical_descriptive, (attributes,))
+        for attributes in self._chunk_attributes(
+            self._data_def.categorical_attributes, max_columns)
+    ]
 
   def run_value_counts(
       self,
@@ -276,3 +416,45 @@ class DescriptiveAnalysis:
         for attribute in self._data_def.categorical_attributes
     ]
     return tasks
+
+  def _run_fused_value_counts(
+      self,
+      categorical_attributes: List[analysis_entity_pb2.Attribute],
+      cardinality_limits: int
+  ) -> List[analysis_entity_pb2.Analysis]:
+    """Compute the value counts of several categorical attributes with a
+    single fused query.
+
+    Each attribute will generate one analysis_entity_pb2.Analysis.
+
+    Args:
+        categorical_attributes: (List[analysis_entity_pb2.Attribute])
+        cardinality_limits: (int), number of top values kept per attribute
+
+    Returns:
+        List[analysis_entity_pb2.Analysis]
+    """
+    value_counts = self._data_extractor.extract_categorical_value_counts_data(
+        categorical_columns=[attribute.name
+                             for attribute in categorical_attributes],
+        limit=cardinality_limits
+    )
+
+    return [self._value_counts_to_proto(attribute, value_counts[attribute.name])
+            for attribute in categorical_attributes]
+
+  def value_counts_fused_tasks(
+      self,
+      cardinality_limits: int = 100,
+      max_columns: Optional[int] = None
+  ) -> List[Tuple[Callable, Tuple]]:
+    """Return the (func, params) tuple list for the job, which will be
+    feed to ThreadPoolExecutor for parallel execution. Each task computes
+    the value counts of at most max_columns attributes in one query.
+    """
+    tasks = [
+        (self._run_fused_value_counts, (attributes, cardinality_limits))
+        for attributes in self._chunk_attributes(
+            self._data_def.categorical_attributes, max_columns)
+    ]
+    return tasks
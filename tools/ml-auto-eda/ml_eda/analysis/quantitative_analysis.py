@@ -211,7 +211,8 @@ class QuantitativeAnalysis:
     """Return the (func, params) tuple list for the job, which will be
     feed to ThreadPoolExecutor for parallel execution
     """
-    return [(self.run_pearson_correlation, (sampling_rate,))]
+    return [(self.run_pearson_correlation, (sampling_rate,),
+             len(self._data_def.numerical_attributes))]
 
   def run_anova(
       self,
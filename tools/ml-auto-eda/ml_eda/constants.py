@@ -33,6 +33,7 @@ c = ConstantsHolder()
 # Data source types
 c.datasources.BIGQUERY = 'BIGQUERY'
 c.datasources.CSV = 'CSV'
+c.datasources.PARQUET = 'PARQUET'
 
 # Metadata keys
 # pylint: disable-msg=attribute-defined-outside-init
@@ -22,55 +22,47 @@ import os
 import logging
 import configparser
 import argparse
+from typing import List
+
+import pandas as pd
 
 from ml_eda.constants import c
 from ml_eda.preprocessing.preprocessors.bigquery import bq_client
 from ml_eda.preprocessing.preprocessors.bigquery import bq_constants
+from ml_eda.preprocessing.preprocessors.local import data_reader
 from ml_eda.job_config_util import job_config
 
 
-def _generate_job_config_from_bq_table(
-    config_params: argparse.ArgumentParser):
-  """Generate job_config.ini from BigQuery table directly with configurations
-  filled with default values
+def _write_job_config(
+    config_params: argparse.ArgumentParser,
+    datasource_type: str,
+    datasource_location: str,
+    numerical_attributes: List[str],
+    categorical_attributes: List[str],
+    integer_attributes: List[str]):
+  """Write job_config.ini with configurations filled with default values
 
   Args:
       config_params: (argparse.ArgumentParser)
+      datasource_type: (string), type of the data source
+      datasource_location: (string), location of the data source
+      numerical_attributes: (List[string]), names of numerical attributes
+      categorical_attributes: (List[string]), names of categorical attributes
+      integer_attributes: (List[string]), names of the numerical attributes
+      of integer type
 
   Returns:
     None
   """
-  # pylint: disable-msg=logging-format-interpolation
-  logging.info(
-      'Reading schema of the BQ table : {}'.format(config_params.bq_table))
-
-  bigquery_client = bq_client.BqClient(key_file=config_params.key_file)
-  columns = bigquery_client.get_table_columns(config_params.bq_table)
-
   # Data source information
   config = configparser.ConfigParser()
   config[c.DATASOURCE] = dict()
-  config[c.DATASOURCE][c.datasource.TYPE] = c.datasources.BIGQUERY
-  config[c.DATASOURCE][c.datasource.LOCATION] = config_params.bq_table
+  config[c.DATASOURCE][c.datasource.TYPE] = datasource_type
+  config[c.DATASOURCE][c.datasource.LOCATION] = datasource_location
 
   # Table schema
   config[c.SCHEMA] = dict()
 
-  numerical_attributes = list()
-  categorical_attributes = list()
-  name_type_buffer = dict()
-  # Parse numerical and categorical attributes from the schema
-  for column in columns:
-    name_type_buffer[column.name] = column.field_type
-    if column.field_type in bq_constants.NUMERICAL_TYPES:
-      numerical_attributes.append(column.name)
-    elif column.field_type in bq_constants.CATEGORICAL_TYPES:
-      categorical_attributes.append(column.name)
-    else:
-      logging.warning(
-          'BigQuery column {} of type {} not supported! It is excluded '
-          'from the analysis'.format(column.name, column.field_type))
-
   all_attributes = numerical_attributes + categorical_attributes
   target_name = config_params.target_name
   if target_name in all_attributes:
@@ -78,11 +70,12 @@ def _generate_job_config_from_bq_table(
 
     # Adjust for the case of classification on integer target
     if (config_params.target_type == c.datasource.TYPE_CATEGORICAL
-        and name_type_buffer[target_name] == bq_constants.INTEGER):
+        and target_name in integer_attributes):
       numerical_attributes.remove(target_name)
       categorical_attributes.append(target_name)
   else:
     if target_name != c.schema.NULL:
+      # pylint: disable-msg=logging-format-interpolation
       logging.warning('The specified target name {} can not be found '
                       'in the table.'.format(target_name))
     config[c.SCHEMA][c.schema.TARGET] = c.schema.NULL
@@ -110,18 +103,111 @@ def _generate_job_config_from_bq_table(
   config[c.ANALYSIS_CONFIG][c.analysis_config.GENERAL_CARDINALITY_LIMIT] = '15'
 
   # Write the generated metadata to job_config.ini
+  # pylint: disable-msg=logging-format-interpolation
   logging.info(
-      'Writing BigQuery bootstrapped job configuration to file: {}'
+      'Writing bootstrapped job configuration to file: {}'
         .format(config_params.job_config))
   with open(config_params.job_config, 'w') as job_config_file:
     config.write(job_config_file)
 
 
+def _generate_job_config_from_bq_table(
+    config_params: argparse.ArgumentParser):
+  """Generate job_config.ini from BigQuery table directly with configurations
+  filled with default values
+
+  Args:
+      config_params: (argparse.ArgumentParser)
+
+  Returns:
+    None
+  """
+  # pylint: disable-msg=logging-format-interpolation
+  logging.info(
+      'Reading schema of the BQ table : {}'.format(config_params.bq_table))
+
+  bigquery_client = bq_client.BqClient(key_file=config_params.key_file)
+  columns = bigquery_client.get_table_columns(config_params.bq_table)
+
+  numerical_attributes = list()
+  categorical_attributes = list()
+  integer_attributes = list()
+  # Parse numerical and categorical attributes from the schema
+  for column in columns:
+    if column.field_type in bq_constants.NUMERICAL_TYPES:
+      numerical_attributes.append(column.name)
+    elif column.field_type in bq_constants.CATEGORICAL_TYPES:
+      categorical_attributes.append(column.name)
+    else:
+      logging.warning(
+          'BigQuery column {} of type {} not supported! It is excluded '
+          'from the analysis'.format(column.name, column.field_type))
+    if column.field_type == bq_constants.INTEGER:
+      integer_attributes.append(column.name)
+
+  _write_job_config(
+      config_params=config_params,
+      datasource_type=c.datasources.BIGQUERY,
+      datasource_location=config_params.bq_table,
+      numerical_attributes=numerical_attributes,
+      categorical_attributes=categorical_attributes,
+      integer_attributes=integer_attributes)
+
+
+def _generate_job_config_from_files(
+    config_params: argparse.ArgumentParser):
+  """Generate job_config.ini from local CSV or Parquet files with
+  configurations filled with default values. Column types are inferred
+  from the first rows of the first file.
+
+  Args:
+      config_params: (argparse.ArgumentParser)
+
+  Returns:
+    None
+  """
+  # pylint: disable-msg=logging-format-interpolation
+  logging.info(
+      'Inferring schema of the files : {}'.format(config_params.data_path))
+
+  dtypes = data_reader.read_schema(config_params.data_path)
+
+  numerical_attributes = list()
+  categorical_attributes = list()
+  integer_attributes = list()
+  for name, dtype in dtypes.items():
+    if pd.api.types.is_bool_dtype(dtype):
+      categorical_attributes.append(name)
+    elif pd.api.types.is_numeric_dtype(dtype):
+      numerical_attributes.append(name)
+      if pd.api.types.is_integer_dtype(dtype):
+        integer_attributes.append(name)
+    elif (pd.api.types.is_string_dtype(dtype)
+          or pd.api.types.is_object_dtype(dtype)
+          or isinstance(dtype, pd.CategoricalDtype)):
+      categorical_attributes.append(name)
+    else:
+      logging.warning(
+          'Column {} of type {} not supported! It is excluded '
+          'from the analysis'.format(name, dtype))
+
+  _write_job_config(
+      config_params=config_params,
+      datasource_type=config_params.data_source,
+      datasource_location=config_params.data_path,
+      numerical_attributes=numerical_attributes,
+      categorical_attributes=categorical_attributes,
+      integer_attributes=integer_attributes)
+
+
 def _generate_job_config_from_datasource(
     config_params: argparse.ArgumentParser):
   """Generate job config file from data source."""
   if config_params.data_source == c.datasources.BIGQUERY:
     _generate_job_config_from_bq_table(config_params)
+  elif config_params.data_source in (c.datasources.CSV,
+                                     c.datasources.PARQUET):
+    _generate_job_config_from_files(config_params)
   else:
     raise ValueError('Data source type {} not supported yet.'.format(
         config_params.data_source))
@@ -25,8 +25,6 @@ import time
 import pickle
 from shutil import which
 from subprocess import call
-from typing import Iterator, Callable, Tuple, List, Union
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from ml_eda.analysis import qualitative_analysis
 from ml_eda.analysis import quantitative_analysis
@@ -35,6 +33,7 @@ from ml_eda.job_config_util import job_config_loader
 from ml_eda.proto import analysis_entity_pb2
 from ml_eda.preprocessing import preprocessor_factory
 from ml_eda.orchestration.analysis_tracker import AnalysisTracker
+from ml_eda.orchestration import task_scheduler
 from ml_eda.reporting import report_generator
 
 Analysis = analysis_entity_pb2.Analysis
@@ -46,34 +45,6 @@ PDF_FILE_NAME = 'analysis_report.pdf'
 AR_FILE_NAME = 'analysis_result.pkl'
 
 
-def _parallel_runner(
-    tasks: List[Tuple[Callable, Tuple]],
-    num_parallel: int = 10
-) -> List[Union[Analysis, Iterator[Analysis]]]:
-  """Run multiple queries in parallel with ThreadPoolExecutor.
-
-  Args:
-    tasks: the tuples of (task_function, task_parameters)
-    num_parallel: number of queries to be run in parallel. This is also hard
-    constrained by the concurrency quota of backend processor e.g. BigQuery.
-
-  Returns:
-    The output of each task will be collected in a List.
-  """
-  threads = []
-  results = []
-
-  executor = ThreadPoolExecutor(num_parallel)
-
-  for func, param in tasks:
-    threads.append(executor.submit(func, *param))
-
-  for future in as_completed(threads):
-    results.append(future.result())
-
-  return results
-
-
 class AnalysisRun:
   """Class of main interface for running analysis"""
   _analysis_run_metadata = analysis_entity_pb2.AnalysisRun()
@@ -87,6 +58,8 @@ class AnalysisRun:
     self._job_config = job_config_loader.load_job_config(self._config_params)
     self._analysis_run_metadata.datasource.CopyFrom(self._job_config.datasource)
     self.tracker = AnalysisTracker(self._job_config)
+    # latency and bytes processed of every analysis task
+    self.task_metrics = list()
 
     self.report_path = self._config_params.report_path
     self.figure_path = os.path.join(os.path.dirname(self.report_path), 'figure')
@@ -96,20 +69,14 @@ class AnalysisRun:
     logging.info(self._job_config.datasource)
 
   def run_parallel_analysis_tasks(self, analysis_task):
-    """Run parallel analysis task."""
-    task_result = _parallel_runner(
-        tasks=analysis_task,
-        num_parallel=self._config_params.parallel_thread)
-
-    analysis_list = list()
-    for result in task_result:
-      if isinstance(result, Analysis):
-        analysis_list.append(result)
-      else:
-        analysis_list.extend(result)
-
-    for analysis in analysis_list:
-      self.tracker.add_analysis(analysis)
+    """Run parallel analysis task. The analyses are added to the tracker as
+    soon as their task completes."""
+    scheduler = task_scheduler.AdaptiveTaskScheduler(
+        max_parallel=int(self._config_params.parallel_thread),
+        max_retries=int(self._config_params.max_task_retries),
+        on_result=self.tracker.add_analysis)
+    analysis_list = scheduler.run(analysis_task)
+    self.task_metrics.extend(scheduler.task_metrics)
 
     return analysis_list
 
@@ -122,15 +89,24 @@ class AnalysisRun:
             self._config_params))
 
     analysis_tasks = list()
-    analysis_tasks.extend(analyzer.numerical_descriptive_tasks())
-
     h_bin = self._job_config.histogram_bin
-    analysis_tasks.extend(analyzer.numerical_histograms_tasks(h_bin))
-
-    analysis_tasks.extend(analyzer.categorical_descriptive_tasks())
-
     vc_limit = self._job_config.value_counts_limit
-    analysis_tasks.extend(analyzer.value_counts_tasks(vc_limit))
+
+    if self._config_params.fuse_queries:
+      # Scan the table once per group of columns instead of once per column
+      max_columns = self._config_params.max_fused_columns
+      analysis_tasks.extend(analyzer.numerical_descriptive_tasks(max_columns))
+      analysis_tasks.extend(
+          analyzer.numerical_histograms_fused_tasks(h_bin, max_columns))
+      analysis_tasks.extend(
+          analyzer.categorical_descriptive_tasks(max_columns))
+      analysis_tasks.extend(
+          analyzer.value_counts_fused_tasks(vc_limit, max_columns))
+    else:
+      analysis_tasks.extend(analyzer.numerical_descriptive_tasks())
+      analysis_tasks.extend(analyzer.numerical_histograms_tasks(h_bin))
+      analysis_tasks.extend(analyzer.categorical_descriptive_tasks())
+      analysis_tasks.extend(analyzer.value_counts_tasks(vc_limit))
 
     return self.run_parallel_analysis_tasks(analysis_tasks)
 
@@ -202,7 +178,8 @@ class AnalysisRun:
     md_report = report_generator.create_md_report(
         analysis_tracker=self.tracker,
         figure_base_path=self.figure_path,
-        config_params=self._config_params)
+        config_params=self._config_params,
+        task_metrics=self.task_metrics)
     md_report_path = os.path.join(self.report_path, MD_FILE_NAME)
     # write report to a file
     with open(md_report_path, 'w') as wf:
@@ -0,0 +1,210 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Scheduler running the analysis tasks in parallel within the concurrency
+quota of the processing backend"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import heapq
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, List, Optional, Sequence, Text, Tuple
+
+from ml_eda.preprocessing import query_stats
+from ml_eda.preprocessing.preprocessors import data_preprocessor
+from ml_eda.proto import analysis_entity_pb2
+
+Analysis = analysis_entity_pb2.Analysis
+Attribute = analysis_entity_pb2.Attribute
+
+# Task metric keys
+TASK_NAME = 'task'
+LATENCY = 'latency_sec'
+RETRIES = 'retries'
+
+INITIAL_BACKOFF_SEC = 1.0
+MAX_BACKOFF_SEC = 60.0
+
+
+def _estimate_cost(params: Sequence[Any]) -> int:
+  """Estimate the cost of a task as the number of attributes it scans
+
+  Args:
+      params: parameters of the task
+
+  Returns:
+      int
+  """
+  cost = 0
+  for param in params:
+    if isinstance(param, Attribute):
+      cost += 1
+    elif isinstance(param, (list, tuple)):
+      cost += _estimate_cost(param)
+  return cost
+
+
+def describe_task(func: Callable, params: Sequence[Any]) -> Text:
+  """Human readable name of a task, e.g. _run_single_anova(cat, num)
+
+  Args:
+      func: function of the task
+      params: parameters of the task
+
+  Returns:
+      string
+  """
+  names = list()
+  for param in params:
+    if isinstance(param, Attribute):
+      names.append(param.name)
+    elif isinstance(param, (list, tuple)):
+      names.extend(item.name for item in param
+                   if isinstance(item, Attribute))
+  name = getattr(func, '__name__', str(func))
+  if len(names) > 3:
+    names = names[:2] + ['... {} attributes'.format(len(names))]
+  return '{}({})'.format(name, ', '.join(names))
+
+
+def _run_task(func: Callable, params: Sequence[Any]) -> Tuple[Any, Dict]:
+  """Run a task in a worker thread, collecting its latency and the
+  statistics of its queries
+
+  Args:
+      func: function of the task
+      params: parameters of the task
+
+  Returns:
+      The analysis results, materialized as a list if needed, and the metrics
+  """
+  query_stats.reset()
+  start = time.perf_counter()
+  result = func(*params)
+  if not isinstance(result, Analysis):
+    result = list(result)
+  metrics = query_stats.get()
+  metrics[LATENCY] = time.perf_counter() - start
+  return result, metrics
+
+
+class AdaptiveTaskScheduler:
+  """Run tasks in parallel, largest first, with a concurrency limit adapted
+  to the throttling of the processing backend.
+
+  The limit follows an additive increase / multiplicative decrease policy:
+  it grows by one task every `limit` successful tasks and halves whenever
+  the backend rejects a query for quota reasons. Throttled tasks are retried
+  with exponential backoff.
+  """
+
+  def __init__(self,
+               max_parallel: int = 10,
+               min_parallel: int = 1,
+               max_retries: int = 5,
+               on_result: Optional[Callable[[Analysis], None]] = None):
+    """
+    Args:
+        max_parallel: (int), upper bound of the concurrency limit, the
+        concurrency quota of the backend, e.g. BigQuery, should be above
+        min_parallel: (int), lower bound of the concurrency limit
+        max_retries: (int), number of retries of a throttled task
+        on_result: callback receiving each analysis as soon as its task
+        completes
+    """
+    self._max_parallel = max(1, int(max_parallel))
+    self._min_parallel = max(1, min(int(min_parallel), self._max_parallel))
+    self._max_retries = max_retries
+    self._on_result = on_result
+    self._limit = float(self._max_parallel)
+    self.task_metrics = list()
+
+  def _on_success(self):
+    self._limit = min(float(self._max_parallel),
+                      self._limit + 1 / self._limit)
+
+  def _on_throttled(self):
+    self._limit = max(float(self._min_parallel), self._limit / 2)
+
+  def run(self, tasks: List[Tuple]) -> List[Analysis]:
+    """Run the tasks and return the analyses in completion order.
+
+    Args:
+        tasks: (func, params) or (func, params, estimated_cost) tuples, the
+        cost defaults to the number of attributes in params
+
+    Returns:
+        List[analysis_entity_pb2.Analysis]
+    """
+    # heap of (ready_time, -cost, sequence, retries, func, params)
+    pending = list()
+    for sequence, task in enumerate(tasks):
+      func, params = task[0], task[1]
+      cost = task[2] if len(task) > 2 else _estimate_cost(params)
+      pending.append((0.0, -cost, sequence, 0, func, params))
+    heapq.heapify(pending)
+
+    results = list()
+    running = dict()
+    with ThreadPoolExecutor(self._max_parallel) as executor:
+      while pending or running:
+        now = time.monotonic()
+        while (pending and pending[0][0] <= now
+               and len(running) < int(self._limit)):
+          entry = heapq.heappop(pending)
+          future = executor.submit(_run_task, entry[4], entry[5])
+          running[future] = entry
+
+        if not running:
+          # Every pending task is backing off
+          time.sleep(max(0.0, pending[0][0] - now))
+          continue
+
+        timeout = max(0.0, pending[0][0] - now) if pending else None
+        done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+        for future in done:
+          _, neg_cost, sequence, retries, func, params = running.pop(future)
+          name = describe_task(func, params)
+          try:
+            result, metrics = future.result()
+          except data_preprocessor.BackendThrottlingError:
+            self._on_throttled()
+            if retries >= self._max_retries:
+              raise
+            backoff = min(MAX_BACKOFF_SEC, INITIAL_BACKOFF_SEC * 2 ** retries)
+            # pylint: disable-msg=logging-format-interpolation
+            logging.warning(
+                'Task {} throttled by the backend, retrying in {}s with a '
+                'concurrency limit of {}'.format(
+                    name, backoff, int(self._limit)))
+            heapq.heappush(pending, (time.monotonic() + backoff, neg_cost,
+                                     sequence, retries + 1, func, params))
+            continue
+
+          self._on_success()
+          metrics[TASK_NAME] = name
+          metrics[RETRIES] = retries
+          self.task_metrics.append(metrics)
+
+          analyses = [result] if isinstance(result, Analysis) else result
+          for analysis in analyses:
+            if self._on_result is not None:
+              self._on_result(analysis)
+            results.append(analysis)
+
+    return results
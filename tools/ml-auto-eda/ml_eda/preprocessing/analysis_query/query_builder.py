@@ -41,6 +41,59 @@ def _build_not_null_string(column_names: List[Text]) -> Text:
   return not_null_string
 
 
+def _build_histogram_case_string(
+    numerical_column: Text,
+    num_bins: int,
+    min_value: Text,
+    step_value: Text
+) -> Text:
+  """Construct the CASE WHEN branches assigning a value to a histogram bin
+
+  Args:
+      numerical_column: (string), name of the numerical column
+      num_bins: (int), number of bins
+      min_value: (string), name of the field holding the minimum value
+      step_value: (string), name of the field holding the bin width
+
+  Returns:
+      string
+  """
+  case_when_template = query_templates.HISTOGRAM_WHEN_TEMPLATE
+  case_else_template = query_templates.HISTOGRAM_ELSE_TEMPLATE
+
+  threshold_template = "ROUND({min_value}+{step}*{step_value}, 3)"
+
+  case_string_list = []
+  for i in range(num_bins - 1):
+    lower_threshold = threshold_template.format(
+        min_value=min_value,
+        step_value=step_value,
+        step=i
+    )
+    upper_threshold = threshold_template.format(
+        min_value=min_value,
+        step_value=step_value,
+        step=i + 1
+    )
+    case_string_list.append(case_when_template.format(
+        column_name=numerical_column,
+        lower_threshold=lower_threshold,
+        upper_threshold=upper_threshold
+    ))
+
+  case_string_list.append(
+      case_else_template.format(
+          lower_threshold=threshold_template.format(
+              min_value=min_value,
+              step_value=step_value,
+              step=num_bins - 1
+          )
+      )
+  )
+
+  return ''.join(case_string_list)
+
+
 def add_random_sampling(sampling_rate: float) -> Text:
   """Add random sampling to end of query.
 
@@ -389,41 +442,13 @@ def build_numerical_histogram_query(
   """
 
   template = query_templates.HISTOGRAM_TEMPLATE
-  case_when_template = query_templates.HISTOGRAM_WHEN_TEMPLATE
-  case_else_template = query_templates.HISTOGRAM_ELSE_TEMPLATE
-
-  threshold_template = "ROUND({min_value}+{step}*{step_value}, 3)"
-
-  case_string_list = []
-  for i in range(num_bins - 1):
-    lower_threshold = threshold_template.format(
-        min_value=query_constants.NH_MIN_VALUE,
-        step_value=query_constants.NH_STEP_VALUE,
-        step=i
-    )
-    upper_threshold = threshold_template.format(
-        min_value=query_constants.NH_MIN_VALUE,
-        step_value=query_constants.NH_STEP_VALUE,
-        step=i + 1
-    )
-    case_string_list.append(case_when_template.format(
-        column_name=numerical_column,
-        lower_threshold=lower_threshold,
-        upper_threshold=upper_threshold
-    ))
-
-  case_string_list.append(
-      case_else_template.format(
-          lower_threshold=threshold_template.format(
-              min_value=query_constants.NH_MIN_VALUE,
-              step_value=query_constants.NH_STEP_VALUE,
-              step=num_bins - 1
-          )
-      )
+  case_string = _build_histogram_case_string(
+      numerical_column=numerical_column,
+      num_bins=num_bins,
+      min_value=query_constants.NH_MIN_VALUE,
+      step_value=query_constants.NH_STEP_VALUE
   )
 
-  case_string = ''.join(case_string_list)
-
   if sampling_rate < 1:
     where_condition = add_random_sampling(sampling_rate)
   else:
@@ -491,5 +516,294 @@ def build_value_counts_query(
   return query
 
 
+def fused_column_prefix(index: int) -> Text:
+  """Alias prefix of the aggregates of the index-th column in a fused query.
+
+  Column names are not used directly since the aliases of all the columns
+  share the namespace of a single SELECT.
+
+  Args:
+      index: (int), position of the column in the fused query
+
+  Returns:
+      string
+  """
+  return 'col{}'.format(index)
+
+
+def _build_where_condition(sampling_rate: float) -> Text:
+  """Construct the WHERE condition implementing the sampling rate
+
+  Args:
+      sampling_rate: (float), sampling rate
+
+  Returns:
+      string
+  """
+  if sampling_rate < 1:
+    return add_random_sampling(sampling_rate)
+  return DUMMY_WHERE
+
+
+def build_fused_numerical_descriptive_query(
+    table: Text,
+    numerical_columns: List[Text],
+    sampling_rate: float = 1
+) -> Text:
+  """Build a single scan query computing the descriptive analysis of
+  several numerical columns. The result is one wide row, the aggregates of
+  the i-th column being prefixed by fused_column_prefix(i). Quantiles are
+  returned as one APPROX_QUANTILES array per column.
+
+  Examples:
+      SELECT
+          COUNTIF(column_a IS NULL) AS `col0_MISSING`,
+          COUNT(*) AS `col0_TOTAL_COUNT`,
+          ...
+          APPROX_QUANTILES(column_a, 20) AS `col0_QUANTILES`,
+          MAX(column_a) AS `col0_MAX`,
+          COUNTIF(column_b IS NULL) AS `col1_MISSING`,
+          ...
+      FROM
+          Table
+
+  Args:
+      table: (string), full path of the table
+      numerical_columns: (List[string]), names of the numerical columns
+      sampling_rate: (float), sampling rate
+
+  Returns:
+      string
+  """
+  template = query_templates.FUSED_NUMERICAL_STATS_TEMPLATE
+
+  select_expressions = list()
+  for index, column in enumerate(numerical_columns):
+    select_expressions.append(template.format(
+        column_name=column,
+        prefix=fused_column_prefix(index),
+        missing_header=query_constants.MISSING,
+        total_header=query_constants.TOTAL_COUNT,
+        mean_header=query_constants.ND_MEAN,
+        std_header=query_constants.ND_STD,
+        min_header=query_constants.ND_MIN,
+        quantiles_header=query_constants.FUSED_QUANTILES,
+        num_quantiles=query_constants.FUSED_NUM_QUANTILES,
+        max_header=query_constants.ND_MAX
+    ))
+
+  query = query_templates.FUSED_AGGREGATE_TEMPLATE.format(
+      table=table,
+      select_expressions=','.join(select_expressions),
+      where_condition=_build_where_condition(sampling_rate)
+  )
+
+  return query
+
+
+def build_fused_categorical_descriptive_query(
+    table: Text,
+    categorical_columns: List[Text],
+    sampling_rate: float = 1
+) -> Text:
+  """Build a single scan query computing the descriptive analysis of
+  several categorical columns. The result is one wide row, the aggregates of
+  the i-th column being prefixed by fused_column_prefix(i).
+
+  Examples:
+      SELECT
+          COUNTIF(column_a IS NULL) AS `col0_MISSING`,
+          COUNT(*) AS `col0_TOTAL_COUNT`,
+          COUNT(DISTINCT column_a) AS `col0_CARDINALITY`,
+          COUNTIF(column_b IS NULL) AS `col1_MISSING`,
+          ...
+      FROM
+          Table
+
+  Args:
+      table: (string), full path of the table
+      categorical_columns: (List[string]), names of the categorical columns
+      sampling_rate: (float), sampling rate
+
+  Returns:
+      string
+  """
+  template = query_templates.FUSED_CATEGORICAL_STATS_TEMPLATE
+
+  select_expressions = list()
+  for index, column in enumerate(categorical_columns):
+    select_expressions.append(template.format(
+        column_name=column,
+        prefix=fused_column_prefix(index),
+        missing_header=query_constants.MISSING,
+        total_header=query_constants.TOTAL_COUNT,
+        cardinality_header=query_constants.CD_CARDINALITY
+    ))
+
+  query = query_templates.FUSED_AGGREGATE_TEMPLATE.format(
+      table=table,
+      select_expressions=','.join(select_expressions),
+      where_condition=_build_where_condition(sampling_rate)
+  )
+
+  return query
+
+
+def build_fused_histogram_query(
+    table: Text,
+    numerical_columns: List[Text],
+    num_bins: int,
+    sampling_rate: float = 1
+) -> Text:
+  # pylint: disable-msg=line-too-long
+  """Build a query generating the histograms of several numerical columns
+  with one pass for the boundaries and one bucketed pass over the table.
+  Each row is cross joined with one (column_index, bin) struct per column
+  so that a single GROUP BY yields the frequency of every bin.
+
+  Examples:
+      WITH boundary AS (
+      SELECT
+          MIN(column_a) AS min_value_0,
+          (MAX(column_a) - MIN(column_a)) / {num_bins} AS step_value_0,
+          ...
+      FROM
+          `{table}`
+      )
+
+      SELECT
+          bins.column_index AS column_index,
+          bins.bin AS bin,
+          COUNT(*) AS frequency
+      FROM
+          `{table}`, boundary,
+          UNNEST([
+          STRUCT(0 AS column_index, CASE ... END AS bin),
+          STRUCT(1 AS column_index, CASE ... END AS bin),
+          ...
+          ]) AS bins
+      GROUP BY
+          column_index, bin
+
+  Args:
+      table: (string), full path of the table
+      numerical_columns: (List[string]), names of the numerical columns
+      num_bins: (int), number of bins
+      sampling_rate: (float), sampling rate
+
+  Returns:
+      string
+  """
+  boundary_template = query_templates.FUSED_HISTOGRAM_BOUNDARY_TEMPLATE
+  bin_template = query_templates.FUSED_HISTOGRAM_BIN_TEMPLATE
+
+  boundary_expressions = list()
+  bin_structs = list()
+  for index, column in enumerate(numerical_columns):
+    min_value = '{}_{}'.format(query_constants.NH_MIN_VALUE, index)
+    step_value = '{}_{}'.format(query_constants.NH_STEP_VALUE, index)
+    boundary_expressions.append(boundary_template.format(
+        column_name=column,
+        min_value=min_value,
+        step_value=step_value,
+        num_bins=num_bins
+    ))
+    bin_structs.append(bin_template.format(
+        index=index,
+        column_index=query_constants.FUSED_COLUMN_INDEX,
+        bin=query_constants.FUSED_BIN,
+        histogram_case_when=_build_histogram_case_string(
+            numerical_column=column,
+            num_bins=num_bins,
+            min_value=min_value,
+            step_value=step_value
+        )
+    ))
+
+  query = query_templates.FUSED_HISTOGRAM_TEMPLATE.format(
+      table=table,
+      boundary_expressions=','.join(boundary_expressions),
+      bin_structs=','.join(bin_structs),
+      column_index=query_constants.FUSED_COLUMN_INDEX,
+      bin=query_constants.FUSED_BIN,
+      frequency=query_constants.FREQUENCY,
+      where_condition=_build_where_condition(sampling_rate)
+  )
+
+  return query
+
+
+def build_fused_value_counts_query(
+    table: Text,
+    categorical_columns: List[Text],
+    limit: int,
+    sampling_rate: float = 1
+) -> Text:
+  """Build a single scan query computing the top value counts of several
+  categorical columns. Values are cast to STRING so that columns of
+  different types share the value field of the result.
+
+  Examples:
+      SELECT
+          column_index, value, frequency
+      FROM (
+          SELECT
+              column_index, value, frequency,
+              ROW_NUMBER() OVER (
+                  PARTITION BY column_index ORDER BY frequency DESC
+              ) AS frequency_rank
+          FROM (
+              SELECT
+                  counts.column_index AS column_index,
+                  counts.value AS value,
+                  COUNT(*) AS frequency
+              FROM
+                  `{table}`,
+                  UNNEST([
+                  STRUCT(0 AS column_index, CAST(column_a AS STRING) AS value),
+                  ...
+                  ]) AS counts
+              WHERE
+                  counts.value IS NOT NULL
+              GROUP BY
+                  column_index, value
+          )
+      )
+      WHERE
+          frequency_rank <= {limit}
+
+  Args:
+      table: (string), full path of the table
+      categorical_columns: (List[string]), names of the categorical columns
+      limit: (int), return the top counts of each column
+      sampling_rate: (float), sampling rate
+
+  Returns:
+      string
+  """
+  struct_template = query_templates.FUSED_VALUE_COUNTS_STRUCT_TEMPLATE
+
+  value_structs = list()
+  for index, column in enumerate(categorical_columns):
+    value_structs.append(struct_template.format(
+        index=index,
+        column_name=column,
+        column_index=query_constants.FUSED_COLUMN_INDEX,
+        value=query_constants.FUSED_VALUE
+    ))
+
+  query = query_templates.FUSED_VALUE_COUNTS_TEMPLATE.format(
+      table=table,
+      value_structs=','.join(value_structs),
+      column_index=query_constants.FUSED_COLUMN_INDEX,
+      value=query_constants.FUSED_VALUE,
+      frequency=query_constants.FREQUENCY,
+      limit=limit,
+      where_condition=_build_where_condition(sampling_rate)
+  )
+
+  return query
+
+
 if __name__ == '__main__':
   pass
@@ -51,3 +51,17 @@ CATEGORICAL_ORDER = [CD_CARDINALITY]
 NH_MIN_VALUE = 'min_value'
 NH_STEP_VALUE = 'step_value'
 NH_BIN_POSTFIX = 'bin'
+
+# Fused queries
+FUSED_COLUMN_INDEX = 'column_index'
+FUSED_QUANTILES = 'QUANTILES'
+FUSED_NUM_QUANTILES = 20
+FUSED_QUANTILE_OFFSETS = {
+    ND_QUANTILE_25: 5,
+    ND_MEDIAN: 10,
+    ND_QUANTILE_75: 15,
+    ND_QUANTILE_95: 19
+}
+FUSED_BIN = 'bin'
+FUSED_VALUE = 'value'
+FREQUENCY = 'frequency'
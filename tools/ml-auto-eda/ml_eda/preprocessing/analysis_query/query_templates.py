@@ -168,3 +168,99 @@ HISTOGRAM_WHEN_TEMPLATE = """
 HISTOGRAM_ELSE_TEMPLATE = """
     ELSE CONCAT('[', CAST({lower_threshold} AS String), ', ', 'Inf)')
 """
+
+# template to compute aggregates of many columns in a single scan
+FUSED_AGGREGATE_TEMPLATE = """
+SELECT
+    {select_expressions}
+FROM
+    `{table}`
+WHERE
+    {where_condition}
+"""
+
+# per column aggregates of the numerical descriptive analysis in a fused scan
+FUSED_NUMERICAL_STATS_TEMPLATE = """
+    COUNTIF({column_name} IS NULL) AS `{prefix}_{missing_header}`,
+    COUNT(*) AS `{prefix}_{total_header}`,
+    AVG({column_name}) AS `{prefix}_{mean_header}`,
+    STDDEV({column_name}) AS `{prefix}_{std_header}`,
+    MIN({column_name}) AS `{prefix}_{min_header}`,
+    APPROX_QUANTILES({column_name}, {num_quantiles}) AS `{prefix}_{quantiles_header}`,
+    MAX({column_name}) AS `{prefix}_{max_header}`"""
+
+# per column aggregates of the categorical descriptive analysis in a fused scan
+FUSED_CATEGORICAL_STATS_TEMPLATE = """
+    COUNTIF({column_name} IS NULL) AS `{prefix}_{missing_header}`,
+    COUNT(*) AS `{prefix}_{total_header}`,
+    COUNT(DISTINCT {column_name}) AS `{prefix}_{cardinality_header}`"""
+
+# template to generate histograms of multiple numerical attributes in one query
+# pylint: disable-msg=anomalous-backslash-in-string
+FUSED_HISTOGRAM_TEMPLATE = """
+WITH boundary AS (
+SELECT
+    {boundary_expressions}
+FROM
+    `{table}`
+)
+
+SELECT
+    bins.{column_index} AS {column_index},
+    bins.{bin} AS {bin},
+    COUNT(*) AS {frequency}
+FROM
+    `{table}`, boundary,
+    UNNEST([
+    {bin_structs}
+    ]) AS bins
+WHERE
+    {where_condition}
+GROUP BY
+    {column_index}, {bin}
+"""
+
+FUSED_HISTOGRAM_BOUNDARY_TEMPLATE = """
+    MIN({column_name}) AS {min_value},
+    (MAX({column_name}) - MIN({column_name})) / {num_bins} AS {step_value}"""
+
+FUSED_HISTOGRAM_BIN_TEMPLATE = """
+    STRUCT({index} AS {column_index}, CASE {histogram_case_when} END AS {bin})"""
+
+# template to compute the value counts of multiple categorical attributes in
+# one query
+FUSED_VALUE_COUNTS_TEMPLATE = """
+SELECT
+    {column_index},
+    {value},
+    {frequency}
+FROM (
+    SELECT
+        {column_index},
+        {value},
+        {frequency},
+        ROW_NUMBER() OVER (
+            PARTITION BY {column_index} ORDER BY {frequency} DESC
+        ) AS frequency_rank
+    FROM (
+        SELECT
+            counts.{column_index} AS {column_index},
+            counts.{value} AS {value},
+            COUNT(*) AS {frequency}
+        FROM
+            `{table}`,
+            UNNEST([
+            {value_structs}
+            ]) AS counts
+        WHERE
+            {where_condition} AND counts.{value} IS NOT NULL
+        GROUP BY
+            {column_index}, {value}
+    )
+)
+WHERE
+    frequency_rank <= {limit}
+"""
+
+FUSED_VALUE_COUNTS_STRUCT_TEMPLATE = """
+    STRUCT({index} AS {column_index}, CAST({column_name} AS STRING) AS {value})"""
@@ -19,10 +19,12 @@ from __future__ import absolute_import
 from __future__ import print_function
 
 from ml_eda.preprocessing.preprocessors.bigquery import bq_preprocessor
+from ml_eda.preprocessing.preprocessors.local import local_preprocessor
 
 # Preprocessing backends
 BIGQUERY = 'BIGQUERY'
 DATAFLOW = 'DATAFLOW'
+LOCAL = 'LOCAL'
 
 
 class PreprocessorFactory:
@@ -33,6 +35,8 @@ class PreprocessorFactory:
     """Creat new preprocessor instance"""
     if config.preprocessing_backend == 'BIGQUERY':
       return bq_preprocessor.BqPreprocessor(config)
+    if config.preprocessing_backend == LOCAL:
+      return local_preprocessor.LocalPreprocessor(config)
 
     raise ValueError('Preprocessor type {} not supported yet.'.format(
         config.preprocessing_backend))
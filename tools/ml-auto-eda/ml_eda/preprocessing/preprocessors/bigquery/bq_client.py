@@ -21,9 +21,34 @@ from __future__ import print_function
 from typing import Text
 import re
 import logging
+from google.api_core import exceptions
 from google.cloud import bigquery
 
+from ml_eda.preprocessing import query_stats
+
 BQ_TABLE_NAME_REGEX = r'^([^.]+)\.([^.]+)\.([^.]+)$'
+# Error reasons returned when a quota on the number or rate of jobs is hit
+THROTTLING_REASONS = {'rateLimitExceeded', 'jobRateLimitExceeded',
+                      'quotaExceeded'}
+
+
+def is_throttling_error(error: Exception) -> bool:
+  """Whether an error is caused by the BigQuery quotas on the number or rate
+  of concurrent queries, i.e. the query can be retried later.
+
+  Args:
+      error: (Exception), error raised by the client
+
+  Returns:
+      bool
+  """
+  if isinstance(error, exceptions.TooManyRequests):
+    return True
+  if isinstance(error, exceptions.GoogleAPICallError):
+    reasons = {item.get('reason') for item in (error.errors or [])
+               if isinstance(item, dict)}
+    return bool(reasons & THROTTLING_REASONS)
+  return False
 
 
 class BqClient:
@@ -55,6 +80,7 @@ class BqClient:
     logging.info(query)
     query_job = self._bq_client.query(query)
     rows = query_job.result()
+    query_stats.record_query(bytes_processed=query_job.total_bytes_processed)
     return rows
 
   @staticmethod
@@ -69,3 +95,22 @@ class BqClient:
     table_ref = dataset_ref.table(table)
     table = self._bq_client.get_table(table_ref)
     return table.schema
+
+  def get_table_snapshot(self, table_name: Text) -> Text:
+    """Describe the version of the content of a BigQuery table, which
+    changes whenever the table is modified.
+
+    Args:
+        table_name: (string), full name of the table
+
+    Returns:
+        string
+    """
+    (project, dataset, table) = self._get_table_name_components(table_name)
+    dataset_ref = self._bq_client.dataset(dataset, project=project)
+    table = self._bq_client.get_table(dataset_ref.table(table))
+    streaming_buffer = table.streaming_buffer
+    return '{}:{}:{}'.format(
+        table.modified.isoformat() if table.modified else None,
+        table.num_rows,
+        streaming_buffer.estimated_rows if streaming_buffer else 0)
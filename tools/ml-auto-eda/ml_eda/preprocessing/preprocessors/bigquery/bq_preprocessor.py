@@ -18,15 +18,153 @@
 from __future__ import absolute_import
 from __future__ import print_function
 
+import re
 import sys
 import logging
-from typing import List, Text
+import threading
+from typing import Dict, List, Text
 
 import pandas as pd
 
 from ml_eda.preprocessing.preprocessors.bigquery import bq_client
 from ml_eda.preprocessing.preprocessors import data_preprocessor
 from ml_eda.preprocessing.analysis_query import query_builder
+from ml_eda.preprocessing.analysis_query import query_constants
+from ml_eda.preprocessing import query_stats
+from ml_eda.preprocessing import result_cache
+
+# pylint: disable-msg=anomalous-backslash-in-string
+_BIN_LOWER_BOUND_REGEX = re.compile(r"\d+\.?\d*")
+
+
+def _bin_sort_key(bin_label: Text) -> float:
+  """Same ordering as the ORDER BY clause of the histogram query, i.e. the
+  first number appearing in the label of the bin. NULL labels, given to
+  every bin of a column without any non NULL value, are sorted last.
+
+  Args:
+      bin_label: (string), label of the bin, e.g. [0.5, 1.0)
+
+  Returns:
+      float
+  """
+  if not isinstance(bin_label, str):
+    return float('inf')
+  match = _BIN_LOWER_BOUND_REGEX.search(bin_label)
+  return float(match.group()) if match else float('inf')
+
+
+def unfuse_descriptive_data(
+    fused_df: pd.DataFrame,
+    columns: List[Text],
+    metrics: List[Text],
+    column_header: Text
+) -> pd.DataFrame:
+  """Turn the single wide row of a fused descriptive query into one row per
+  column, as returned by the UNION ALL descriptive queries. The QUANTILES
+  array, if any, is expanded into the quantile metrics.
+
+  Args:
+      fused_df: (pandas.DataFrame), result of the fused query
+      columns: (List[string]), the columns in the order of the fused query
+      metrics: (List[string]), names of the fused aggregates
+      column_header: (string), header holding the column name
+
+  Returns:
+      pandas.DataFrame
+  """
+  if fused_df.empty:
+    return pd.DataFrame()
+
+  fused_row = fused_df.iloc[0]
+  records = list()
+  for index, column in enumerate(columns):
+    prefix = query_builder.fused_column_prefix(index)
+    record = {column_header: column}
+    for metric in metrics:
+      value = fused_row['{}_{}'.format(prefix, metric)]
+      if metric == query_constants.FUSED_QUANTILES:
+        for quantile, offset in \
+            query_constants.FUSED_QUANTILE_OFFSETS.items():
+          record[quantile] = value[offset] \
+            if value is not None and len(value) > offset else None
+      else:
+        record[metric] = value
+    records.append(record)
+
+  return pd.DataFrame(records)
+
+
+def unfuse_histogram_data(
+    fused_df: pd.DataFrame,
+    columns: List[Text]
+) -> Dict[Text, pd.DataFrame]:
+  """Split the result of a fused histogram query into one DataFrame per
+  column, shaped as the result of the single column histogram query.
+
+  Args:
+      fused_df: (pandas.DataFrame), result of the fused query
+      columns: (List[string]), the columns in the order of the fused query
+
+  Returns:
+      Dict[string, pandas.DataFrame]
+  """
+  histograms = dict()
+  for index, column in enumerate(columns):
+    bin_header = '{}_{}'.format(column, query_constants.NH_BIN_POSTFIX)
+    rows = sorted(
+        [(bin_label, frequency) for column_index, bin_label, frequency in
+         _fused_rows(fused_df, query_constants.FUSED_BIN)
+         if column_index == index],
+        key=lambda row: _bin_sort_key(row[0]))
+    histograms[column] = pd.DataFrame(
+        rows, columns=[bin_header, query_constants.FREQUENCY])
+
+  return histograms
+
+
+def unfuse_value_counts_data(
+    fused_df: pd.DataFrame,
+    columns: List[Text]
+) -> Dict[Text, pd.DataFrame]:
+  """Split the result of a fused value counts query into one DataFrame per
+  column, shaped as the result of the single column value counts query.
+
+  Args:
+      fused_df: (pandas.DataFrame), result of the fused query
+      columns: (List[string]), the columns in the order of the fused query
+
+  Returns:
+      Dict[string, pandas.DataFrame]
+  """
+  value_counts = dict()
+  for index, column in enumerate(columns):
+    rows = sorted(
+        [(value, frequency) for column_index, value, frequency in
+         _fused_rows(fused_df, query_constants.FUSED_VALUE)
+         if column_index == index],
+        key=lambda row: row[1], reverse=True)
+    value_counts[column] = pd.DataFrame(
+        rows, columns=[column, query_constants.FREQUENCY])
+
+  return value_counts
+
+
+def _fused_rows(fused_df: pd.DataFrame, key_header: Text):
+  """Iterate over the (column_index, key, frequency) rows of a fused query
+
+  Args:
+      fused_df: (pandas.DataFrame), result of the fused query
+      key_header: (string), header of the bin or value field
+
+  Returns:
+      Iterator[Tuple]
+  """
+  if fused_df.empty:
+    return iter(())
+  return zip(fused_df[query_constants.FUSED_COLUMN_INDEX],
+             fused_df[key_header],
+             fused_df[query_constants.FREQUENCY])
 
 
 class BqPreprocessor(data_preprocessor.DataPreprocessor):
@@ -35,9 +173,24 @@ class BqPreprocessor(data_preprocessor.DataPreprocessor):
   def __init__(self, config=None):
     self._bq_client = bq_client.BqClient(key_file=config.key_file)
     self._bq_table = config.bq_table
+    self._fuse_queries = config.fuse_queries
+    self._result_cache = result_cache.ResultCache(config.cache_dir) \
+      if config.cache_dir else None
+    self._table_snapshot = None
+    self._snapshot_lock = threading.Lock()
+
+  def _get_table_snapshot(self) -> Text:
+    """Version of the analysed table, fetched once per preprocessor"""
+    with self._snapshot_lock:
+      if self._table_snapshot is None:
+        self._table_snapshot = self._bq_client.get_table_snapshot(
+            self._bq_table)
+      return self._table_snapshot
 
   def _extract_data(self, query: Text) -> pd.DataFrame:
-    """Run query with BigQuery and return result as pandas.DataFrame
+    """Run query with BigQuery and return result as pandas.DataFrame.
+    If a cache directory is configured, the result of a query already run
+    against the same version of the table is reused.
 
     Args:
         query: (string), query string
@@ -45,15 +198,30 @@ class BqPreprocessor(data_preprocessor.DataPreprocessor):
     Returns:
         pandas.DataFrame
     """
+    cache_key = None
+    if self._result_cache is not None:
+      cache_key = result_cache.ResultCache.get_key(
+          query, self._get_table_snapshot())
+      result_df = self._result_cache.get(cache_key)
+      if result_df is not None:
+        logging.info('Reusing cached result of the query')
+        logging.debug(query)
+        query_stats.record_query(cache_hit=True)
+        return result_df
+
     try:
       result_df = self._bq_client.run_query(query).to_dataframe()
       logging.info(
           'Running query to extract required data')
       logging.debug(result_df)
-    # pylint: disable-msg=bare-except
-    except:
+      if cache_key is not None:
+        self._result_cache.put(cache_key, result_df)
+    # pylint: disable-msg=broad-except
+    except Exception as e:
+      if bq_client.is_throttling_error(e):
+        raise data_preprocessor.BackendThrottlingError(str(e)) from e
       # pylint: disable-msg=logging-not-lazy
-      logging.error("Unexpected error: " + sys.exc_info()[0])
+      logging.error("Unexpected error: " + str(sys.exc_info()[0]))
       result_df = pd.DataFrame()
 
     return result_df
@@ -143,6 +311,22 @@ class BqPreprocessor(data_preprocessor.DataPreprocessor):
     Returns:
         pandas.DataFrame
     """
+    if self._fuse_queries:
+      numerical_columns = list(numerical_columns)
+      query = query_builder.build_fused_numerical_descriptive_query(
+          table=self._bq_table,
+          numerical_columns=numerical_columns
+      )
+      return unfuse_descriptive_data(
+          fused_df=self._extract_data(query),
+          columns=numerical_columns,
+          metrics=[query_constants.MISSING, query_constants.TOTAL_COUNT,
+                   query_constants.ND_MEAN, query_constants.ND_STD,
+                   query_constants.ND_MIN, query_constants.FUSED_QUANTILES,
+                   query_constants.ND_MAX],
+          column_header=query_constants.ND_COLUMN_NAME
+      )
+
     query = query_builder.build_numerical_descriptive_analysis_query(
         table=self._bq_table,
         numerical_columns=numerical_columns
@@ -188,6 +372,20 @@ class BqPreprocessor(data_preprocessor.DataPreprocessor):
     Returns:
         pandas.DataFrame
     """
+    if self._fuse_queries:
+      categorical_columns = list(categorical_columns)
+      query = query_builder.build_fused_categorical_descriptive_query(
+          table=self._bq_table,
+          categorical_columns=categorical_columns
+      )
+      return unfuse_descriptive_data(
+          fused_df=self._extract_data(query),
+          columns=categorical_columns,
+          metrics=[query_constants.MISSING, query_constants.TOTAL_COUNT,
+                   query_constants.CD_CARDINALITY],
+          column_header=query_constants.CD_COLUMN_NAME
+      )
+
     query = query_builder.build_categorical_descriptive_analysis_query(
         table=self._bq_table,
         categorical_columns=categorical_columns
@@ -240,3 +438,54 @@ class BqPreprocessor(data_preprocessor.DataPreprocessor):
     )
 
     return self._extract_data(query)
+
+  def extract_numerical_histograms_data(
+      self,
+      numerical_columns: List[Text],
+      num_bins: int
+  ) -> Dict[Text, pd.DataFrame]:
+    """Run a single fused query to generate the histograms of multiple
+    numerical columns
+
+    Args:
+        numerical_columns: (List[string]), list of the names of
+        the numerical columns
+        num_bins: (int), number of bins
+
+    Returns:
+        Dict[string, pandas.DataFrame], histogram of each column
+    """
+    numerical_columns = list(numerical_columns)
+    query = query_builder.build_fused_histogram_query(
+        table=self._bq_table,
+        numerical_columns=numerical_columns,
+        num_bins=num_bins
+    )
+
+    return unfuse_histogram_data(self._extract_data(query), numerical_columns)
+
+  def extract_categorical_value_counts_data(
+      self,
+      categorical_columns: List[Text],
+      limit: int
+  ) -> Dict[Text, pd.DataFrame]:
+    """Run a single fused query to compute the value counts of multiple
+    categorical columns
+
+    Args:
+        categorical_columns: (List[string]), list of the names of
+        the categorical columns
+        limit: (int), return top occurrent value of each column
+
+    Returns:
+        Dict[string, pandas.DataFrame], value counts of each column
+    """
+    categorical_columns = list(categorical_columns)
+    query = query_builder.build_fused_value_counts_query(
+        table=self._bq_table,
+        categorical_columns=categorical_columns,
+        limit=limit
+    )
+
+    return unfuse_value_counts_data(self._extract_data(query),
+                                    categorical_columns)
@@ -22,6 +22,11 @@ from __future__ import print_function
 from abc import ABCMeta, abstractmethod
 
 
+class BackendThrottlingError(Exception):
+  """Raised when the processing backend rejects a query because of its
+  concurrency or rate quotas, the query can be retried later."""
+
+
 class DataPreprocessor(metaclass=ABCMeta):
   """Meta class that holds the signature of functions that the concrete
   preprocessing engine should implement."""
@@ -63,3 +68,13 @@ class DataPreprocessor(metaclass=ABCMeta):
   @abstractmethod
   def extract_value_counts_data(self, categorical_column, limit):
     """Abstract method for data extraction of categorical value counts"""
+
+  @abstractmethod
+  def extract_numerical_histograms_data(self, numerical_columns, num_bins):
+    """Abstract method for data extraction of the histograms of multiple
+    numerical attributes at once"""
+
+  @abstractmethod
+  def extract_categorical_value_counts_data(self, categorical_columns, limit):
+    """Abstract method for data extraction of the value counts of multiple
+    categorical attributes at once"""
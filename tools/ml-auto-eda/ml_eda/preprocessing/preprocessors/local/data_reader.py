@@ -0,0 +1,138 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Read local CSV and Parquet files as a stream of pandas.DataFrame chunks"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import glob
+import os
+from typing import Iterator, List, Optional, Text
+
+import pandas as pd
+
+CSV = 'CSV'
+PARQUET = 'PARQUET'
+
+_FORMAT_BY_EXTENSION = {
+    '.csv': CSV,
+    '.parquet': PARQUET,
+    '.pq': PARQUET
+}
+
+
+def list_files(data_path: Text) -> List[Text]:
+  """List the files matched by a path, a directory or a glob pattern
+
+  Args:
+      data_path: (string), path of a file, a directory or a glob pattern
+
+  Returns:
+      List[string]
+  """
+  if os.path.isdir(data_path):
+    data_path = os.path.join(data_path, '*')
+  files = sorted(path for path in glob.glob(data_path)
+                 if os.path.isfile(path))
+  if not files:
+    raise FileNotFoundError(
+        'No data file can be found at: {}'.format(data_path))
+  return files
+
+
+def file_format(file_path: Text) -> Text:
+  """Derive the format of a data file from its extension
+
+  Args:
+      file_path: (string), path of the file
+
+  Returns:
+      string, CSV or PARQUET
+  """
+  extension = os.path.splitext(file_path)[1].lower()
+  if extension not in _FORMAT_BY_EXTENSION:
+    raise ValueError('File format of {} not supported yet.'.format(file_path))
+  return _FORMAT_BY_EXTENSION[extension]
+
+
+def _iter_parquet_chunks(
+    file_path: Text,
+    columns: List[Text],
+    chunk_size: int
+) -> Iterator[pd.DataFrame]:
+  """Stream the row batches of a Parquet file, only reading the required
+  columns"""
+  try:
+    # pylint: disable-msg=import-outside-toplevel
+    import pyarrow.parquet as pq
+  except ImportError:
+    raise ImportError('pyarrow is required to read Parquet files, '
+                      'install it with `pip install pyarrow`.')
+
+  parquet_file = pq.ParquetFile(file_path)
+  for batch in parquet_file.iter_batches(batch_size=chunk_size,
+                                         columns=columns):
+    yield batch.to_pandas()
+
+
+def iter_chunks(
+    data_path: Text,
+    columns: List[Text],
+    chunk_size: int,
+    categorical_columns: Optional[List[Text]] = None
+) -> Iterator[pd.DataFrame]:
+  """Stream the required columns of the data files in chunks of at most
+  chunk_size rows, so that the memory footprint does not depend on the size
+  of the data.
+
+  Args:
+      data_path: (string), path of a file, a directory or a glob pattern
+      columns: (List[string]), names of the columns to read
+      chunk_size: (int), maximum number of rows per chunk
+      categorical_columns: (List[string]), columns read as strings from CSV
+      files, so that the same value is typed consistently across chunks
+
+  Returns:
+      Iterator[pandas.DataFrame]
+  """
+  columns = list(dict.fromkeys(columns))
+  dtype = {column: str for column in categorical_columns or []
+           if column in columns}
+
+  for file_path in list_files(data_path):
+    if file_format(file_path) == PARQUET:
+      chunks = _iter_parquet_chunks(file_path, columns, chunk_size)
+    else:
+      chunks = pd.read_csv(file_path, usecols=columns, dtype=dtype,
+                           chunksize=chunk_size)
+    for chunk in chunks:
+      yield chunk[columns]
+
+
+def read_schema(data_path: Text, num_rows: int = 1000) -> pd.Series:
+  """Infer the column types from the first rows of the first data file
+
+  Args:
+      data_path: (string), path of a file, a directory or a glob pattern
+      num_rows: (int), number of rows used for the inference
+
+  Returns:
+      pandas.Series, dtype of each column
+  """
+  file_path = list_files(data_path)[0]
+  if file_format(file_path) == PARQUET:
+    return next(_iter_parquet_chunks(file_path, None, num_rows)).dtypes
+  return pd.read_csv(file_path, nrows=num_rows).dtypes
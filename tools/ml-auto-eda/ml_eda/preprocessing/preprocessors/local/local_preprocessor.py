@@ -0,0 +1,546 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Class implements the functions in data_preprocessor in process with
+pandas and NumPy over local CSV or Parquet files"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+from itertools import combinations
+from typing import Dict, Iterator, List, Text, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ml_eda.preprocessing.analysis_query import query_constants
+from ml_eda.preprocessing.preprocessors import data_preprocessor
+from ml_eda.preprocessing.preprocessors.local import data_reader
+
+DEFAULT_CHUNK_SIZE = 100000
+# Number of values kept per column to estimate the quantiles, which bounds
+# the memory the same way APPROX_QUANTILES does in BigQuery
+QUANTILE_SAMPLE_SIZE = 100000
+FREQUENCY = 'frequency'
+
+
+class _NumericalAccumulator:
+  """Streaming descriptive statistics of a set of numerical columns.
+
+  Mean and variance are merged chunk by chunk with the parallel algorithm of
+  Chan et al., quantiles are computed on a uniform sample of bounded size.
+  """
+
+  def __init__(self, num_columns: int, rng: np.random.Generator):
+    self._rng = rng
+    self.total = 0
+    self.count = np.zeros(num_columns)
+    self.mean = np.zeros(num_columns)
+    self.m2 = np.zeros(num_columns)
+    self.min = np.full(num_columns, np.inf)
+    self.max = np.full(num_columns, -np.inf)
+    self._sample_keys = [np.empty(0)] * num_columns
+    self._sample_values = [np.empty(0)] * num_columns
+
+  def update(self, values: np.ndarray):
+    """Merge a (rows, columns) chunk of values, NaN being missing values"""
+    mask = ~np.isnan(values)
+    chunk_count = mask.sum(axis=0)
+    chunk_sum = np.where(mask, values, 0).sum(axis=0)
+    chunk_mean = np.divide(chunk_sum, chunk_count,
+                           out=np.zeros_like(chunk_sum),
+                           where=chunk_count > 0)
+    chunk_m2 = (np.where(mask, values - chunk_mean, 0) ** 2).sum(axis=0)
+
+    count = self.count + chunk_count
+    delta = chunk_mean - self.mean
+    safe_count = np.where(count > 0, count, 1)
+    self.mean = self.mean + delta * chunk_count / safe_count
+    self.m2 = (self.m2 + chunk_m2 +
+               delta ** 2 * self.count * chunk_count / safe_count)
+    self.count = count
+    self.total += values.shape[0]
+
+    self.min = np.minimum(
+        self.min, np.where(mask, values, np.inf).min(axis=0, initial=np.inf))
+    self.max = np.maximum(
+        self.max, np.where(mask, values, -np.inf).max(axis=0, initial=-np.inf))
+
+    for index in range(values.shape[1]):
+      self._update_sample(index, values[mask[:, index], index])
+
+  def _update_sample(self, index: int, values: np.ndarray):
+    """Keep the values with the smallest random keys, i.e. a uniform sample
+    of all the values seen so far"""
+    keys = np.concatenate(
+        [self._sample_keys[index], self._rng.random(len(values))])
+    values = np.concatenate([self._sample_values[index], values])
+    if len(keys) > QUANTILE_SAMPLE_SIZE:
+      kept = np.argpartition(keys, QUANTILE_SAMPLE_SIZE)[:QUANTILE_SAMPLE_SIZE]
+      keys, values = keys[kept], values[kept]
+    self._sample_keys[index] = keys
+    self._sample_values[index] = values
+
+  def result(self, index: int) -> Dict[Text, float]:
+    """Descriptive statistics of a column, keyed by the headers of the
+    descriptive queries"""
+    count = self.count[index]
+    sample = self._sample_values[index]
+
+    def _quantile(q):
+      return float(np.quantile(sample, q)) if len(sample) else None
+
+    return {
+        query_constants.MISSING: int(self.total - count),
+        query_constants.TOTAL_COUNT: int(self.total),
+        query_constants.ND_MEAN: self.mean[index] if count else None,
+        query_constants.ND_STD:
+            np.sqrt(self.m2[index] / (count - 1)) if count > 1 else None,
+        query_constants.ND_MIN: self.min[index] if count else None,
+        query_constants.ND_QUANTILE_25: _quantile(0.25),
+        query_constants.ND_MEDIAN: _quantile(0.5),
+        query_constants.ND_QUANTILE_75: _quantile(0.75),
+        query_constants.ND_QUANTILE_95: _quantile(0.95),
+        query_constants.ND_MAX: self.max[index] if count else None
+    }
+
+
+def _format_threshold(value: float) -> Text:
+  """Format a bin threshold the way BigQuery casts a FLOAT64 to STRING"""
+  return '{:.15g}'.format(value)
+
+
+class LocalPreprocessor(data_preprocessor.DataPreprocessor):
+  """Class implements the functions in data_preprocessor in process with
+  pandas and NumPy. The data files are streamed in chunks, so that the
+  memory footprint is bounded by the chunk size rather than the data size.
+  """
+
+  def __init__(self, config=None):
+    self._data_path = config.data_path
+    self._chunk_size = int(getattr(config, 'local_chunk_size', None)
+                           or DEFAULT_CHUNK_SIZE)
+
+  def _iter_chunks(
+      self,
+      columns: List[Text],
+      categorical_columns: List[Text] = None,
+      sampling_rate: float = 1,
+      rng: np.random.Generator = None
+  ) -> Iterator[pd.DataFrame]:
+    """Stream the required columns, randomly sampling the rows if
+    sampling_rate < 1
+
+    Args:
+        columns: (List[string]), names of the columns to read
+        categorical_columns: (List[string]), the categorical columns
+        sampling_rate: (float), sampling rate
+        rng: (numpy.random.Generator), random generator used for sampling
+
+    Returns:
+        Iterator[pandas.DataFrame]
+    """
+    for chunk in data_reader.iter_chunks(
+        data_path=self._data_path,
+        columns=columns,
+        chunk_size=self._chunk_size,
+        categorical_columns=categorical_columns):
+      if sampling_rate < 1:
+        chunk = chunk[rng.random(len(chunk)) < sampling_rate]
+      yield chunk
+
+  @staticmethod
+  def _to_numeric(chunk: pd.DataFrame, columns: List[Text]) -> np.ndarray:
+    """Convert the numerical columns of a chunk to a float matrix, values
+    that can not be parsed being missing"""
+    return np.column_stack([
+        pd.to_numeric(chunk[column], errors='coerce').to_numpy(
+            dtype=float, na_value=np.nan)
+        for column in columns
+    ]) if len(columns) else np.empty((len(chunk), 0))
+
+  def _value_counts(
+      self,
+      categorical_columns: List[Text]
+  ) -> Tuple[Dict[Text, pd.Series], Dict[Text, int]]:
+    """Stream the data once and count the non null values of each column
+
+    Args:
+        categorical_columns: (List[string]), names of the categorical columns
+
+    Returns:
+        Tuple of the value counts and the number of rows of each column
+    """
+    counts = {column: pd.Series(dtype='int64')
+              for column in categorical_columns}
+    totals = dict.fromkeys(categorical_columns, 0)
+    for chunk in self._iter_chunks(categorical_columns, categorical_columns):
+      for column in categorical_columns:
+        counts[column] = counts[column].add(
+            chunk[column].value_counts(dropna=True), fill_value=0)
+        totals[column] += len(chunk)
+    return counts, totals
+
+  def extract_anova_data(
+      self,
+      categorical_column: Text,
+      numeric_column: Text,
+      sampling_rate: float = 1
+  ) -> pd.DataFrame:
+    """Compute the per class count, mean and population variance of the
+    numerical column, and the degrees of freedom of the ANOVA test.
+
+    Args:
+        categorical_column: (string), name of categorical attribute
+        numeric_column: (string), name of numerical attribute
+        sampling_rate: (float), sampling rate
+
+    Returns:
+        pandas.DataFrame
+    """
+    rng = np.random.default_rng()
+    classes = dict()
+    for chunk in self._iter_chunks([categorical_column, numeric_column],
+                                   [categorical_column], sampling_rate, rng):
+      values = pd.to_numeric(chunk[numeric_column], errors='coerce')
+      grouped = values.groupby(chunk[categorical_column], dropna=False)
+      stats = pd.DataFrame({
+          'rows': grouped.size(),
+          'count': grouped.count(),
+          'mean': grouped.mean(),
+          'm2': grouped.var(ddof=0) * grouped.count()
+      }).fillna(0)
+      for name, row in stats.iterrows():
+        rows, count, mean, m2 = classes.get(name, (0, 0, 0., 0.))
+        total = count + row['count']
+        if total:
+          delta = row['mean'] - mean
+          mean += delta * row['count'] / total
+          m2 += row['m2'] + delta ** 2 * count * row['count'] / total
+        classes[name] = (rows + row['rows'], total, mean, m2)
+
+    records = [
+        [name, rows, mean, m2 / count if count else None]
+        for name, (rows, count, mean, m2) in classes.items()
+    ]
+    anova_df = pd.DataFrame(records, columns=[
+        query_constants.ANOVA_CATEGORICAL,
+        query_constants.ANOVA_COUNT_PER_CLASS,
+        query_constants.ANOVA_MEAN_PER_CLASS,
+        query_constants.ANOVA_VARIANCE_PER_CLASS])
+    anova_df[query_constants.ANOVA_DF_GROUP] = len(anova_df) - 1
+    anova_df[query_constants.ANOVA_DF_ERROR] = \
+      anova_df[query_constants.ANOVA_COUNT_PER_CLASS].sum() - len(anova_df)
+
+    return anova_df
+
+  def extract_categorical_aggregation(
+      self,
+      categorical_columns: List[Text],
+      sampling_rate: float = 1
+  ) -> pd.DataFrame:
+    """Compute the frequency of each combination of values of multiple
+    categorical columns.
+
+    Args:
+        categorical_columns: (List[string]), list of the names of
+        the categorical columns
+        sampling_rate: (float), sampling rate
+
+    Returns:
+        pandas.DataFrame
+    """
+    categorical_columns = list(categorical_columns)
+    rng = np.random.default_rng()
+    frequency = None
+    for chunk in self._iter_chunks(categorical_columns, categorical_columns,
+                                   sampling_rate, rng):
+      chunk_frequency = chunk.dropna().groupby(categorical_columns).size()
+      frequency = chunk_frequency if frequency is None else \
+        frequency.add(chunk_frequency, fill_value=0)
+
+    if frequency is None or frequency.empty:
+      return pd.DataFrame(columns=categorical_columns + [FREQUENCY])
+    return frequency.astype('int64').rename(FREQUENCY).reset_index()
+
+  def extract_pearson_correlation_data(
+      self,
+      numerical_columns: List[Text],
+      sampling_rate: float = 1
+  ) -> pd.DataFrame:
+    """Compute the correlation of every pair of numerical columns over the
+    rows where both are present, as CORR does in BigQuery.
+
+    Args:
+        numerical_columns: (List[string]), list of the names of
+        the numerical columns
+        sampling_rate: (float), sampling rate
+
+    Returns:
+        pandas.DataFrame
+    """
+    numerical_columns = list(numerical_columns)
+    num_columns = len(numerical_columns)
+    rng = np.random.default_rng()
+    shift = None
+    n = sx = sxx = sxy = np.zeros((num_columns, num_columns))
+    for chunk in self._iter_chunks(numerical_columns, None,
+                                   sampling_rate, rng):
+      values = self._to_numeric(chunk, numerical_columns)
+      if shift is None:
+        # Shifting by a rough mean keeps the sums of squares accurate
+        shift = np.nan_to_num(np.nanmean(values, axis=0)) \
+          if len(values) else np.zeros(num_columns)
+      mask = (~np.isnan(values)).astype(float)
+      centered = np.where(mask > 0, values - shift, 0)
+      # Entry [i, j] only sums over the rows where both i and j are present
+      n = n + mask.T @ mask
+      sx = sx + centered.T @ mask
+      sxx = sxx + (centered ** 2).T @ mask
+      sxy = sxy + centered.T @ centered
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+      corr = (n * sxy - sx * sx.T) / np.sqrt(
+          (n * sxx - sx ** 2) * (n * sxx.T - sx.T ** 2))
+
+    record = dict()
+    for i, j in combinations(range(num_columns), 2):
+      value = corr[i, j]
+      record['{}_vs_{}'.format(numerical_columns[i], numerical_columns[j])] = \
+        value if np.isfinite(value) else None
+
+    return pd.DataFrame([record])
+
+  def extract_numerical_descriptive_data(
+      self,
+      numerical_columns: List[Text]
+  ) -> pd.DataFrame:
+    """Compute the descriptive analysis of numerical columns in one pass
+
+    Args:
+        numerical_columns: (List[string]), list of the names of
+        the numerical columns
+
+    Returns:
+        pandas.DataFrame
+    """
+    numerical_columns = list(numerical_columns)
+    accumulator = _NumericalAccumulator(len(numerical_columns),
+                                        np.random.default_rng())
+    for chunk in self._iter_chunks(numerical_columns):
+      accumulator.update(self._to_numeric(chunk, numerical_columns))
+
+    records = list()
+    for index, column in enumerate(numerical_columns):
+      record = {query_constants.ND_COLUMN_NAME: column}
+      record.update(accumulator.result(index))
+      records.append(record)
+
+    return pd.DataFrame(records)
+
+  def extract_numerical_descrip_categorical_data(
+      self,
+      categorical_column: Text,
+      numeric_column: Text
+  ) -> pd.DataFrame:
+    """Compute the descriptive analysis of numerical column for each group
+    of data defined by distinct value of categorical column
+
+    Args:
+        categorical_column: (string), name of categorical column
+        numeric_column: (string), name of numerical column
+
+    Returns:
+        pandas.DataFrame
+    """
+    rng = np.random.default_rng()
+    accumulators = dict()
+    for chunk in self._iter_chunks([categorical_column, numeric_column],
+                                   [categorical_column]):
+      chunk = chunk[chunk[categorical_column].notna()]
+      values = self._to_numeric(chunk, [numeric_column])
+      for name, positions in chunk.groupby(
+          categorical_column).indices.items():
+        if name not in accumulators:
+          accumulators[name] = _NumericalAccumulator(1, rng)
+        accumulators[name].update(values[positions])
+
+    records = list()
+    for name, accumulator in accumulators.items():
+      record = {categorical_column: name}
+      record.update(accumulator.result(0))
+      records.append(record)
+
+    return pd.DataFrame(records, columns=[
+        categorical_column,
+        query_constants.MISSING,
+        query_constants.TOTAL_COUNT,
+        query_constants.ND_MEAN,
+        query_constants.ND_STD,
+        query_constants.ND_MIN,
+        query_constants.ND_QUANTILE_25,
+        query_constants.ND_MEDIAN,
+        query_constants.ND_QUANTILE_75,
+        query_constants.ND_QUANTILE_95,
+        query_constants.ND_MAX])
+
+  def extract_categorical_descriptive_data(
+      self,
+      categorical_columns: List[Text]
+  ) -> pd.DataFrame:
+    """Compute the descriptive analysis of categorical columns in one pass
+
+    Args:
+        categorical_columns: (List[string]), list of the names of
+        the categorical columns
+
+    Returns:
+        pandas.DataFrame
+    """
+    categorical_columns = list(categorical_columns)
+    counts, totals = self._value_counts(categorical_columns)
+
+    return pd.DataFrame([{
+        query_constants.CD_COLUMN_NAME: column,
+        query_constants.MISSING: int(totals[column] - counts[column].sum()),
+        query_constants.TOTAL_COUNT: totals[column],
+        query_constants.CD_CARDINALITY: len(counts[column])
+    } for column in categorical_columns])
+
+  def extract_numerical_histogram_data(
+      self,
+      numerical_column: Text,
+      num_bins: int
+  ) -> pd.DataFrame:
+    """Generate histogram for numerical column
+
+    Args:
+        numerical_column: (string), name of numerical column
+        num_bins: (int), number of bins
+
+    Returns:
+        pandas.DataFrame
+    """
+    return self.extract_numerical_histograms_data(
+        [numerical_column], num_bins)[numerical_column]
+
+  def extract_numerical_histograms_data(
+      self,
+      numerical_columns: List[Text],
+      num_bins: int
+  ) -> Dict[Text, pd.DataFrame]:
+    """Generate the histograms of multiple numerical columns with one pass
+    for the boundaries and one pass for the frequencies. Bins follow the
+    histogram query: num_bins - 1 bounded bins of thresholds rounded to 3
+    decimals and a last unbounded bin. Missing values are not binned.
+
+    Args:
+        numerical_columns: (List[string]), list of the names of
+        the numerical columns
+        num_bins: (int), number of bins
+
+    Returns:
+        Dict[string, pandas.DataFrame], histogram of each column
+    """
+    numerical_columns = list(numerical_columns)
+    num_columns = len(numerical_columns)
+
+    min_value = np.full(num_columns, np.inf)
+    max_value = np.full(num_columns, -np.inf)
+    for chunk in self._iter_chunks(numerical_columns):
+      values = self._to_numeric(chunk, numerical_columns)
+      missing = np.isnan(values)
+      min_value = np.minimum(
+          min_value, np.where(missing, np.inf, values).min(axis=0,
+                                                           initial=np.inf))
+      max_value = np.maximum(
+          max_value, np.where(missing, -np.inf, values).max(axis=0,
+                                                            initial=-np.inf))
+
+    step_value = (max_value - min_value) / num_bins
+    # thresholds[k, i] is the lower threshold of the k-th bin of column i
+    thresholds = np.round(
+        min_value + np.arange(num_bins)[:, np.newaxis] * step_value, 3)
+
+    frequencies = np.zeros((num_bins, num_columns), dtype='int64')
+    for chunk in self._iter_chunks(numerical_columns):
+      values = self._to_numeric(chunk, numerical_columns)
+      for index in range(num_columns):
+        column_values = values[:, index]
+        column_values = column_values[~np.isnan(column_values)]
+        bins = np.searchsorted(thresholds[:, index], column_values,
+                               side='right') - 1
+        # Values out of the bounded bins fall in the last one, as in the
+        # ELSE branch of the histogram query
+        bins[(bins < 0) | (bins >= num_bins - 1)] = num_bins - 1
+        frequencies[:, index] += np.bincount(bins, minlength=num_bins)
+
+    histograms = dict()
+    for index, column in enumerate(numerical_columns):
+      labels = [_format_threshold(value) for value in thresholds[:, index]]
+      rows = [
+          ('[{}, {})'.format(labels[k], labels[k + 1])
+           if k < num_bins - 1 else '[{}, Inf)'.format(labels[k]),
+           frequencies[k, index])
+          for k in range(num_bins) if frequencies[k, index]
+      ]
+      histograms[column] = pd.DataFrame(rows, columns=[
+          '{}_{}'.format(column, query_constants.NH_BIN_POSTFIX), FREQUENCY])
+
+    return histograms
+
+  def extract_value_counts_data(
+      self,
+      categorical_column: Text,
+      limit: int
+  ) -> pd.DataFrame:
+    """Compute value counts for categorical column
+
+    Args:
+        categorical_column: (string), name of categorical column
+        limit: (int), return top occurrent value
+
+    Returns:
+        pandas.DataFrame
+    """
+    return self.extract_categorical_value_counts_data(
+        [categorical_column], limit)[categorical_column]
+
+  def extract_categorical_value_counts_data(
+      self,
+      categorical_columns: List[Text],
+      limit: int
+  ) -> Dict[Text, pd.DataFrame]:
+    """Compute the value counts of multiple categorical columns in one pass
+
+    Args:
+        categorical_columns: (List[string]), list of the names of
+        the categorical columns
+        limit: (int), return top occurrent value of each column
+
+    Returns:
+        Dict[string, pandas.DataFrame], value counts of each column
+    """
+    categorical_columns = list(categorical_columns)
+    counts, _ = self._value_counts(categorical_columns)
+
+    value_counts = dict()
+    for column in categorical_columns:
+      top = counts[column].astype('int64').sort_values(
+          ascending=False, kind='stable').head(limit)
+      value_counts[column] = pd.DataFrame({
+          column: top.index, FREQUENCY: top.to_numpy()})
+
+    return value_counts
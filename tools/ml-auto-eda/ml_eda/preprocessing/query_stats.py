@@ -0,0 +1,60 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Statistics of the queries run by the current analysis task.
+
+Each analysis task runs in its own thread, the statistics are therefore kept
+per thread so that the scheduler can attribute them to the task.
+"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import threading
+from typing import Dict
+
+NUM_QUERIES = 'num_queries'
+BYTES_PROCESSED = 'bytes_processed'
+CACHE_HITS = 'cache_hits'
+
+_local = threading.local()
+
+
+def reset():
+  """Start collecting the statistics of a new task in the current thread"""
+  _local.stats = {NUM_QUERIES: 0, BYTES_PROCESSED: 0, CACHE_HITS: 0}
+
+
+def record_query(bytes_processed: int = 0, cache_hit: bool = False):
+  """Record a query run, or served from cache, by the current thread
+
+  Args:
+      bytes_processed: (int), bytes processed by the backend
+      cache_hit: (bool), whether the result was served from cache
+  """
+  if getattr(_local, 'stats', None) is None:
+    reset()
+  _local.stats[NUM_QUERIES] += 1
+  _local.stats[BYTES_PROCESSED] += bytes_processed or 0
+  if cache_hit:
+    _local.stats[CACHE_HITS] += 1
+
+
+def get() -> Dict[str, int]:
+  """Return the statistics collected since the last reset in the current
+  thread"""
+  if getattr(_local, 'stats', None) is None:
+    reset()
+  return dict(_local.stats)
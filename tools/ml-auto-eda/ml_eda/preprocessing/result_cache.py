@@ -0,0 +1,106 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Content addressed cache of the data extracted for the analyses"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from typing import Optional, Text
+
+import pandas as pd
+
+
+class ResultCache:
+  """Cache of the DataFrames extracted by the preprocessors, persisted as
+  pickle files in a local directory.
+
+  An entry is addressed by the hash of the query text and of the snapshot of
+  the data source, e.g. the last modification time of a BigQuery table. As
+  the query text holds the whole specification of an analysis (attributes,
+  number of bins, limits, sampling), changing the job configuration only
+  misses the entries of the affected analyses, while any change of the data
+  misses all of them.
+  """
+
+  def __init__(self, cache_dir: Text):
+    """
+    Args:
+        cache_dir: (string), directory holding the cached results
+    """
+    self._cache_dir = cache_dir
+    if not os.path.exists(cache_dir):
+      os.makedirs(cache_dir)
+
+  @staticmethod
+  def get_key(query: Text, snapshot: Text) -> Text:
+    """Compute the address of a cached result
+
+    Args:
+        query: (string), query or specification of the extracted data
+        snapshot: (string), version of the data source
+
+    Returns:
+        string
+    """
+    content = json.dumps({'query': query, 'snapshot': snapshot},
+                         sort_keys=True)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+  def _get_path(self, key: Text) -> Text:
+    return os.path.join(self._cache_dir, key + '.pkl')
+
+  def get(self, key: Text) -> Optional[pd.DataFrame]:
+    """Return the cached result, None if missing or unreadable
+
+    Args:
+        key: (string), address of the result
+
+    Returns:
+        pandas.DataFrame
+    """
+    path = self._get_path(key)
+    if not os.path.exists(path):
+      return None
+    try:
+      return pd.read_pickle(path)
+    # pylint: disable-msg=broad-except
+    except Exception as e:
+      # pylint: disable-msg=logging-format-interpolation
+      logging.warning('Ignoring unreadable cached result {}: {}'.format(
+          path, e))
+      return None
+
+  def put(self, key: Text, result_df: pd.DataFrame):
+    """Store a result, atomically so that concurrent readers never see a
+    partially written file
+
+    Args:
+        key: (string), address of the result
+        result_df: (pandas.DataFrame), result to cache
+    """
+    fd, temp_path = tempfile.mkstemp(dir=self._cache_dir, suffix='.tmp')
+    os.close(fd)
+    try:
+      result_df.to_pickle(temp_path)
+      os.replace(temp_path, self._get_path(key))
+    except Exception:
+      os.remove(temp_path)
+      raise
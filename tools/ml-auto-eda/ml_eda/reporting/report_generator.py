@@ -16,7 +16,7 @@
 """Generate EDA report based on the performed analysis"""
 
 from collections import OrderedDict
-from typing import Text
+from typing import Dict, List, Text
 import logging
 import argparse
 
@@ -99,7 +99,8 @@ def create_report_contents(
 def create_md_report(
     analysis_tracker: AnalysisTracker,
     figure_base_path: Text,
-    config_params: argparse.ArgumentParser
+    config_params: argparse.ArgumentParser,
+    task_metrics: List[Dict] = None
 ) -> Text:
   # pylint: disable-msg=too-many-locals
   """Creat report based on all the analysis performed
@@ -108,6 +109,8 @@ def create_md_report(
       analysis_tracker: (AnalysisTracker), holder for all the analysis
       figure_base_path: (string), the folder for holding figures
       config_params: runtime configuration from CLI
+      task_metrics: (List[Dict]), latency and bytes processed of each
+      analysis task, reported after the configurations if given
 
   Returns:
       Markdown formatted report in text
@@ -186,6 +189,10 @@ def create_md_report(
     cli_content = CLI_PARAM_TEMPLATE.format(param_content=param_content)
     contents.extend([cli_title, cli_content])
 
+  if task_metrics:
+    contents.append(SECTION_TITLE.format(content='Execution Metrics'))
+    contents.append(utils.create_task_metrics_table(task_metrics))
+
   return ''.join(contents)
 
 
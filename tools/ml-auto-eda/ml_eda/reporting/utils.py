@@ -21,7 +21,9 @@ from __future__ import print_function
 from collections import OrderedDict
 from typing import Set, Dict, List, Union, Text
 
+from ml_eda.orchestration import task_scheduler
 from ml_eda.proto import analysis_entity_pb2
+from ml_eda.preprocessing import query_stats
 from ml_eda.preprocessing.analysis_query import query_constants
 from ml_eda.reporting import template
 from ml_eda.reporting import visualization
@@ -381,3 +383,46 @@ def create_warning_notes(warnings: List[Text]) -> Text:
       content='Warnings'
   )
   return warning_title + create_content_list(warnings)
+
+
+def create_task_metrics_table(task_metrics: List[Dict]) -> Text:
+  """Create a table of the latency and the bytes processed by each analysis
+  task, slowest first
+
+  Examples:
+  task|latency (s)|bytes processed|queries|cache hits|retries
+  :-----:|:-----:|:-----:|:-----:|:-----:|:-----:
+  _run_single_anova(payment_type, tips)|2.531|104857600|1|0|0
+
+  Args:
+      task_metrics: (List[Dict]), metrics of each task as collected by
+      task_scheduler.AdaptiveTaskScheduler
+
+  Returns:
+      string
+  """
+  table_template = template.TABLE_TEMPLATE
+
+  headers = ['task', 'latency (s)', 'bytes processed', 'queries',
+             'cache hits', 'retries']
+  header_string = "|".join(headers)
+  header_separator = "|".join([":-----:" for i in range(len(headers))])
+
+  table_content = []
+  for metrics in sorted(task_metrics,
+                        key=lambda item: item[task_scheduler.LATENCY],
+                        reverse=True):
+    table_content.append("|".join([
+        metrics[task_scheduler.TASK_NAME],
+        '{:.3f}'.format(metrics[task_scheduler.LATENCY]),
+        str(metrics[query_stats.BYTES_PROCESSED]),
+        str(metrics[query_stats.NUM_QUERIES]),
+        str(metrics[query_stats.CACHE_HITS]),
+        str(metrics[task_scheduler.RETRIES])
+    ]))
+
+  return table_template.format(
+      header=header_string,
+      header_separator=header_separator,
+      table_content="\n".join(table_content)
+  )
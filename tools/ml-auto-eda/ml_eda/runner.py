@@ -27,6 +27,11 @@ from ml_eda.orchestration import analysis_run
 from ml_eda.preprocessing import preprocessor_factory
 
 
+def _str_to_bool(value) -> bool:
+  """Parse a boolean command line value, e.g. True, false, 1."""
+  return str(value).lower() in ('true', 't', 'yes', 'y', '1')
+
+
 def initialise_parameters(args_parser: argparse.ArgumentParser
                           ) -> argparse.ArgumentParser:
   """Initialize the data extraction parameters.
@@ -53,6 +58,18 @@ def initialise_parameters(args_parser: argparse.ArgumentParser
       help='BigQuery table name.',
       default='bigquery-public-data.ml_datasets.census_adult_income'
   )
+  args_parser.add_argument(
+      '--data_path',
+      help='Path, directory or glob pattern of the CSV or Parquet files '
+           'analysed by the LOCAL backend.',
+      default=None
+  )
+  args_parser.add_argument(
+      '--local_chunk_size',
+      help='Number of rows read at once by the LOCAL backend.',
+      type=int,
+      default=100000
+  )
   args_parser.add_argument(
       '--preprocessing_backend',
       help='Backend computation engine.',
@@ -60,9 +77,17 @@ def initialise_parameters(args_parser: argparse.ArgumentParser
   )
   args_parser.add_argument(
       '--parallel_thread',
-      help='Number of parallel jobs run through processing backend.',
+      help='Maximum number of parallel jobs run through processing backend, '
+           'the effective number is reduced while the backend throttles.',
       default=10
   )
+  args_parser.add_argument(
+      '--max_task_retries',
+      help='Number of retries of an analysis task throttled by the quotas '
+           'of the processing backend.',
+      type=int,
+      default=5
+  )
   args_parser.add_argument(
       '--job_config',
       help='Configuration file containing the description of the datasource.',
@@ -109,6 +134,27 @@ def initialise_parameters(args_parser: argparse.ArgumentParser
       default=0.05,
       help='Sampling rate for statistical test'
   )
+  args_parser.add_argument(
+      '--cache_dir',
+      default=None,
+      help='Directory caching the query results, so that reruns against an '
+           'unchanged table only run the queries of modified analyses. '
+           'Caching is disabled if not specified.'
+  )
+  args_parser.add_argument(
+      '--fuse_queries',
+      default=True,
+      type=_str_to_bool,
+      help='Indicates whether the descriptive analyses of multiple columns '
+           'are merged into a few wide queries instead of one query per '
+           'column.'
+  )
+  args_parser.add_argument(
+      '--max_fused_columns',
+      default=100,
+      type=int,
+      help='Maximum number of columns analysed by a single fused query.'
+  )
 
   args_params = args_parser.parse_args()
   logging.info('Parameters:')
@@ -0,0 +1,116 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Test cases for the local preprocessor"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import argparse
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from ml_eda.preprocessing.analysis_query import query_constants
+from ml_eda.preprocessing.preprocessors.local import local_preprocessor
+
+
+class TestLocalPreprocessor(TestCase):
+  """Test cases for the local preprocessor, the chunk size is smaller than
+  the data so that the statistics are merged across chunks"""
+
+  def setUp(self):
+    rng = np.random.RandomState(0)
+    num_rows = 1000
+    self._df = pd.DataFrame({
+        'n1': rng.normal(10, 2, num_rows),
+        'n2': rng.uniform(0, 5, num_rows),
+        'c1': rng.choice(['a', 'b', 'c'], num_rows),
+        'c2': rng.choice(['x', 'y'], num_rows)
+    })
+    self._df.loc[::10, 'n1'] = np.nan
+    self._df.loc[::7, 'c1'] = None
+
+    self._data_dir = tempfile.mkdtemp()
+    self._df.to_csv(os.path.join(self._data_dir, 'data.csv'), index=False)
+    self._preprocessor = local_preprocessor.LocalPreprocessor(
+        argparse.Namespace(data_path=self._data_dir, local_chunk_size=128))
+
+  def tearDown(self):
+    shutil.rmtree(self._data_dir)
+
+  def test_numerical_descriptive(self):
+    """Test the streamed statistics match the ones of the whole data"""
+    result = self._preprocessor.extract_numerical_descriptive_data(
+        ['n1', 'n2']).set_index(query_constants.ND_COLUMN_NAME)
+    assert result.loc['n1', query_constants.MISSING] == 100
+    assert result.loc['n1', query_constants.TOTAL_COUNT] == 1000
+    for column in ['n1', 'n2']:
+      assert np.isclose(result.loc[column, query_constants.ND_MEAN],
+                        self._df[column].mean())
+      assert np.isclose(result.loc[column, query_constants.ND_STD],
+                        self._df[column].std())
+      assert np.isclose(result.loc[column, query_constants.ND_MEDIAN],
+                        self._df[column].median())
+      assert np.isclose(result.loc[column, query_constants.ND_MAX],
+                        self._df[column].max())
+
+  def test_pearson_correlation(self):
+    """Test the correlation ignores the rows with missing values"""
+    result = self._preprocessor.extract_pearson_correlation_data(
+        ['n1', 'n2'])
+    assert np.isclose(result.loc[0, 'n1_vs_n2'],
+                      self._df['n1'].corr(self._df['n2']))
+
+  def test_categorical_descriptive_and_value_counts(self):
+    """Test the counts of categorical values"""
+    descriptive = self._preprocessor.extract_categorical_descriptive_data(
+        ['c1']).set_index(query_constants.CD_COLUMN_NAME)
+    assert descriptive.loc['c1', query_constants.CD_CARDINALITY] == 3
+    assert descriptive.loc['c1', query_constants.MISSING] == \
+           self._df['c1'].isna().sum()
+
+    value_counts = self._preprocessor.extract_value_counts_data('c2', 1)
+    expected = self._df['c2'].value_counts()
+    assert value_counts['c2'].tolist() == [expected.index[0]]
+    assert value_counts['frequency'].tolist() == [expected.iloc[0]]
+
+  def test_histogram(self):
+    """Test every non missing value falls in a bin"""
+    histograms = self._preprocessor.extract_numerical_histograms_data(
+        ['n1', 'n2'], 5)
+    assert histograms['n1']['frequency'].sum() == 900
+    assert histograms['n2']['frequency'].sum() == 1000
+    assert histograms['n2']['n2_bin'].iloc[-1].endswith('Inf)')
+
+  def test_categorical_aggregation_and_anova(self):
+    """Test the aggregated data used by chi-square and ANOVA"""
+    aggregation = self._preprocessor.extract_categorical_aggregation(
+        ['c1', 'c2'])
+    expected = self._df.dropna(subset=['c1']).groupby(['c1', 'c2']).size()
+    assert aggregation.set_index(['c1', 'c2'])['frequency'].sort_index() \
+             .tolist() == expected.sort_index().tolist()
+
+    anova = self._preprocessor.extract_anova_data('c2', 'n2').set_index(
+        query_constants.ANOVA_CATEGORICAL)
+    expected = self._df.groupby('c2')['n2']
+    assert np.allclose(
+        anova[query_constants.ANOVA_VARIANCE_PER_CLASS].sort_index(),
+        expected.var(ddof=0).sort_index())
+    assert (anova[query_constants.ANOVA_DF_ERROR] == 998).all()
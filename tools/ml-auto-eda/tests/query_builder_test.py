@@ -0,0 +1,174 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Test cases for fused query building and the unfusing of the results"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+from unittest import TestCase
+
+import pandas as pd
+
+from ml_eda.preprocessing.analysis_query import query_builder
+from ml_eda.preprocessing.analysis_query import query_constants
+from ml_eda.preprocessing.preprocessors.bigquery import bq_preprocessor
+
+
+class TestFusedQueryBuilder(TestCase):
+  """Test cases for fused query building"""
+
+  _table = 'project.dataset.table'
+
+  def test_fused_numerical_descriptive(self):
+    """Test all the columns are aggregated by a single scan"""
+    query = query_builder.build_fused_numerical_descriptive_query(
+        table=self._table,
+        numerical_columns=['a', 'b'])
+    assert query.count('FROM') == 1
+    assert 'UNION ALL' not in query
+    assert 'APPROX_QUANTILES(a, 20) AS `col0_QUANTILES`' in query
+    assert 'AVG(b) AS `col1_MEAN`' in query
+
+  def test_fused_categorical_descriptive(self):
+    """Test all the columns are aggregated by a single scan"""
+    query = query_builder.build_fused_categorical_descriptive_query(
+        table=self._table,
+        categorical_columns=['a', 'b'],
+        sampling_rate=0.5)
+    assert query.count('FROM') == 1
+    assert 'COUNT(DISTINCT b) AS `col1_CARDINALITY`' in query
+    assert 'RAND() < 0.5' in query
+
+  def test_fused_histogram(self):
+    """Test the histograms share the boundary and bucketing passes"""
+    query = query_builder.build_fused_histogram_query(
+        table=self._table,
+        numerical_columns=['a', 'b'],
+        num_bins=4)
+    assert query.count('WITH boundary') == 1
+    assert 'MIN(b) AS min_value_1' in query
+    assert 'STRUCT(0 AS column_index' in query
+    assert 'STRUCT(1 AS column_index' in query
+    assert 'ROUND(min_value_1+3*step_value_1, 3)' in query
+
+  def test_histogram_unchanged(self):
+    """Test the single column histogram still uses the shared boundary"""
+    query = query_builder.build_numerical_histogram_query(
+        table=self._table,
+        numerical_column='a',
+        num_bins=4)
+    assert 'ROUND(min_value+3*step_value, 3)' in query
+    assert 'END AS a_bin' in query
+
+  def test_fused_value_counts(self):
+    """Test the value counts are limited per column"""
+    query = query_builder.build_fused_value_counts_query(
+        table=self._table,
+        categorical_columns=['a', 'b'],
+        limit=10)
+    assert 'CAST(b AS STRING) AS value' in query
+    assert 'PARTITION BY column_index' in query
+    assert 'frequency_rank <= 10' in query
+
+
+class TestUnfuseQueryResults(TestCase):
+  """Test cases for splitting the results of fused queries per column"""
+
+  _columns = ['a', 'b']
+
+  def test_unfuse_descriptive(self):
+    """Test the quantiles are picked from the QUANTILES array"""
+    fused_df = pd.DataFrame([{
+        'col0_MEAN': 1.5,
+        'col0_QUANTILES': list(range(0, 210, 10)),
+        'col1_MEAN': None,
+        'col1_QUANTILES': None,
+    }])
+    result = bq_preprocessor.unfuse_descriptive_data(
+        fused_df=fused_df,
+        columns=self._columns,
+        metrics=[query_constants.ND_MEAN, query_constants.FUSED_QUANTILES],
+        column_header=query_constants.ND_COLUMN_NAME)
+
+    assert list(result[query_constants.ND_COLUMN_NAME]) == self._columns
+    first = result.iloc[0]
+    assert first[query_constants.ND_MEAN] == 1.5
+    assert first[query_constants.ND_QUANTILE_25] == 50
+    assert first[query_constants.ND_MEDIAN] == 100
+    assert first[query_constants.ND_QUANTILE_75] == 150
+    assert first[query_constants.ND_QUANTILE_95] == 190
+    assert query_constants.FUSED_QUANTILES not in result.columns
+    # A column without any non NULL value has NULL quantiles
+    second = result.iloc[1]
+    for quantile in query_constants.FUSED_QUANTILE_OFFSETS:
+      assert pd.isnull(second[quantile])
+
+  def test_unfuse_histogram(self):
+    """Test the bins are ordered by lower bound, NULL bins last"""
+    fused_df = pd.DataFrame(
+        [(0, '[10.0, 20.0)', 3),
+         (1, None, 7),
+         (0, '[2.0, 10.0)', 4),
+         (0, '[20.0, 28.0]', 1)],
+        columns=[query_constants.FUSED_COLUMN_INDEX,
+                 query_constants.FUSED_BIN,
+                 query_constants.FREQUENCY])
+    result = bq_preprocessor.unfuse_histogram_data(fused_df, self._columns)
+
+    assert list(result['a']['a_bin']) == [
+        '[2.0, 10.0)', '[10.0, 20.0)', '[20.0, 28.0]']
+    assert list(result['a'][query_constants.FREQUENCY]) == [4, 3, 1]
+    assert result['b']['b_bin'].isnull().all()
+    assert list(result['b'][query_constants.FREQUENCY]) == [7]
+
+  def test_unfuse_value_counts(self):
+    """Test the values of each column are ordered by frequency"""
+    fused_df = pd.DataFrame(
+        [(1, 'x', 2),
+         (0, 'u', 1),
+         (1, 'y', 5),
+         (0, 'v', 9)],
+        columns=[query_constants.FUSED_COLUMN_INDEX,
+                 query_constants.FUSED_VALUE,
+                 query_constants.FREQUENCY])
+    result = bq_preprocessor.unfuse_value_counts_data(fused_df, self._columns)
+
+    assert list(result['a']['a']) == ['v', 'u']
+    assert list(result['a'][query_constants.FREQUENCY]) == [9, 1]
+    assert list(result['b']['b']) == ['y', 'x']
+    assert list(result['b'][query_constants.FREQUENCY]) == [5, 2]
+
+  def test_unfuse_empty(self):
+    """Test an empty result gives empty DataFrames"""
+    fused_df = pd.DataFrame()
+    assert bq_preprocessor.unfuse_descriptive_data(
+        fused_df=fused_df,
+        columns=self._columns,
+        metrics=[query_constants.ND_MEAN],
+        column_header=query_constants.ND_COLUMN_NAME).empty
+
+    histograms = bq_preprocessor.unfuse_histogram_data(
+        fused_df, self._columns)
+    assert list(histograms) == self._columns
+    assert histograms['a'].empty
+    assert list(histograms['a'].columns) == [
+        'a_bin', query_constants.FREQUENCY]
+
+    value_counts = bq_preprocessor.unfuse_value_counts_data(
+        fused_df, self._columns)
+    assert value_counts['b'].empty
+    assert list(value_counts['b'].columns) == [
+        'b', query_constants.FREQUENCY]
@@ -0,0 +1,53 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Test cases for the result cache"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+import shutil
+import tempfile
+from unittest import TestCase
+
+import pandas as pd
+
+from ml_eda.preprocessing import result_cache
+
+
+class TestResultCache(TestCase):
+  """Test cases for the result cache"""
+
+  def setUp(self):
+    self._cache_dir = tempfile.mkdtemp()
+    self._cache = result_cache.ResultCache(self._cache_dir)
+
+  def tearDown(self):
+    shutil.rmtree(self._cache_dir)
+
+  def test_put_get(self):
+    """Test a stored result is returned for the same query and snapshot"""
+    result_df = pd.DataFrame({'a_bin': ['[0, 1)'], 'frequency': [3]})
+    key = result_cache.ResultCache.get_key('SELECT 1', '2020-01-01:10:0')
+    assert self._cache.get(key) is None
+    self._cache.put(key, result_df)
+    pd.testing.assert_frame_equal(self._cache.get(key), result_df)
+
+  def test_key(self):
+    """Test the key changes with either the query or the snapshot"""
+    key = result_cache.ResultCache.get_key('SELECT 1', 's1')
+    assert key == result_cache.ResultCache.get_key('SELECT 1', 's1')
+    assert key != result_cache.ResultCache.get_key('SELECT 2', 's1')
+    assert key != result_cache.ResultCache.get_key('SELECT 1', 's2')
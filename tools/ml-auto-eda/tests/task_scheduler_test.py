@@ -0,0 +1,92 @@
+# Copyright 2019 Google Inc. All Rights Reserved.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+# ==============================================================================
+
+"""Test cases for the analysis task scheduler"""
+
+from __future__ import absolute_import
+from __future__ import print_function
+
+from unittest import TestCase, mock
+
+from ml_eda.orchestration import task_scheduler
+from ml_eda.preprocessing import query_stats
+from ml_eda.preprocessing.preprocessors import data_preprocessor
+from ml_eda.proto import analysis_entity_pb2
+
+Analysis = analysis_entity_pb2.Analysis
+Attribute = analysis_entity_pb2.Attribute
+
+
+def _attribute(name):
+  attribute = Attribute()
+  attribute.name = name
+  return attribute
+
+
+def _analysis(attribute):
+  query_stats.record_query(bytes_processed=10)
+  analysis = Analysis()
+  analysis.features.extend([attribute])
+  return analysis
+
+
+class TestAdaptiveTaskScheduler(TestCase):
+  """Test cases for the analysis task scheduler"""
+
+  def test_largest_first_and_streaming(self):
+    """Test tasks run by decreasing cost and results are streamed"""
+    streamed = []
+    scheduler = task_scheduler.AdaptiveTaskScheduler(
+        max_parallel=1, on_result=streamed.append)
+    small = (_analysis, (_attribute('a'),))
+    large = (lambda attributes: [_analysis(item) for item in attributes],
+             ([_attribute('b'), _attribute('c')],))
+    results = scheduler.run([small, large])
+
+    assert [item.features[0].name for item in results] == ['b', 'c', 'a']
+    assert streamed == results
+    assert scheduler.task_metrics[0][query_stats.BYTES_PROCESSED] == 20
+    assert scheduler.task_metrics[1][task_scheduler.TASK_NAME] == \
+           '_analysis(a)'
+
+  @mock.patch.object(task_scheduler, 'INITIAL_BACKOFF_SEC', 0.01)
+  def test_retry_throttled(self):
+    """Test throttled tasks are retried and shrink the concurrency limit"""
+    calls = []
+
+    def _throttled_once(attribute):
+      calls.append(attribute.name)
+      if len(calls) == 1:
+        raise data_preprocessor.BackendThrottlingError('rateLimitExceeded')
+      return _analysis(attribute)
+
+    scheduler = task_scheduler.AdaptiveTaskScheduler(max_parallel=4)
+    results = scheduler.run([(_throttled_once, (_attribute('a'),))])
+
+    assert len(results) == 1
+    assert calls == ['a', 'a']
+    assert scheduler.task_metrics[0][task_scheduler.RETRIES] == 1
+    assert scheduler._limit < 4  # pylint: disable-msg=protected-access
+
+  @mock.patch.object(task_scheduler, 'INITIAL_BACKOFF_SEC', 0.01)
+  def test_give_up_after_max_retries(self):
+    """Test the throttling error is raised once retries are exhausted"""
+
+    def _always_throttled(_):
+      raise data_preprocessor.BackendThrottlingError('quotaExceeded')
+
+    scheduler = task_scheduler.AdaptiveTaskScheduler(max_retries=2)
+    with self.assertRaises(data_preprocessor.BackendThrottlingError):
+      scheduler.run([(_always_throttled, (_attribute('a'),))])
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# Copyright 2020 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+The index of the latest transfer operation of each prefix, kept between state
+checks so only new and unfinished operations need to be requested from STS.
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Operations in these statuses will not change anymore
+FINAL_OPERATION_STATUSES = frozenset(['SUCCESS', 'FAILED', 'ABORTED'])
+
+RFC3339_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+
+class OperationIndex():
+    def __init__(self, source_bucket: str, destination_bucket: str):
+        self.source_bucket = source_bucket
+        self.destination_bucket = destination_bucket
+        self.latest_operation_by_prefix: Dict[str, dict] = {}
+
+        # Operations of deleted jobs, ignored when listed again
+        self.removed_operation_names: Set[str] = set()
+
+        # The latest operation start time seen, in RFC 3339 format
+        self.high_water_mark: Optional[str] = None
+        self.last_full_scan = 0.0
+
+    def clear(self):
+        """
+        Removes every operation from the index, before a full scan.
+        """
+        self.latest_operation_by_prefix = {}
+        self.removed_operation_names = set()
+        self.high_water_mark = None
+
+    def add_operation(self, operation: dict):
+        """
+        Assigns a transfer operation to its prefixes, when it is the latest
+        operation of the prefix. An operation already in the index is replaced
+        by its newer state.
+        """
+        if operation['name'] in self.removed_operation_names:
+            return
+
+        metadata = operation['metadata']
+        transfer_spec = metadata['transferSpec']
+
+        if 'objectConditions' not in transfer_spec:
+            return
+
+        object_conditions = transfer_spec['objectConditions']
+
+        if 'includePrefixes' not in object_conditions:
+            return
+
+        if 'gcsDataSource' not in transfer_spec:
+            return
+
+        if 'gcsDataSink' not in transfer_spec:
+            return
+
+        if self.source_bucket != transfer_spec['gcsDataSource']['bucketName']:
+            return
+
+        if self.destination_bucket != \
+                transfer_spec['gcsDataSink']['bucketName']:
+            return
+
+        if 'startTime' in metadata and (
+                self.high_water_mark is None or
+                metadata['startTime'] > self.high_water_mark):
+            self.high_water_mark = metadata['startTime']
+
+        for prefix in object_conditions['includePrefixes']:
+            latest_operation = self.latest_operation_by_prefix.get(prefix)
+
+            if latest_operation is None or \
+                    latest_operation['name'] == operation['name']:
+                # The prefix does not have an operation or this is a newer
+                # state of its operation, let's use this one
+                self.latest_operation_by_prefix[prefix] = operation
+            elif 'endTime' not in metadata or \
+                    'endTime' not in latest_operation['metadata']:
+
+                # if end time is not available, use the start time
+                if metadata['startTime'] > \
+                        latest_operation['metadata']['startTime']:
+                    self.latest_operation_by_prefix[prefix] = operation
+            elif metadata['endTime'] > latest_operation['metadata']['endTime']:
+                # This operation is newer than the assigned operation
+                self.latest_operation_by_prefix[prefix] = operation
+
+    def remove_operations(self, operation_names: List[str]):
+        """
+        Removes the given operations from the prefixes they are the latest
+        operation of.
+        """
+        names = frozenset(operation_names)
+
+        for prefix in [prefix for prefix, operation in
+                       self.latest_operation_by_prefix.items()
+                       if operation['name'] in names]:
+            operation = self.latest_operation_by_prefix.pop(prefix)
+            self.removed_operation_names.add(operation['name'])
+
+    def get_unfinished_operation_names(self) -> List[str]:
+        """
+        Returns the names of the indexed operations that may still change.
+        """
+        names = set()
+
+        for operation in self.latest_operation_by_prefix.values():
+            if operation['metadata'].get('status') not in \
+                    FINAL_OPERATION_STATUSES:
+                names.add(operation['name'])
+
+        return sorted(names)
+
+    def get_min_creation_time(self, overlap: int) -> Optional[str]:
+        """
+        Returns the high-water mark minus an overlap in seconds, covering
+        operations created while the previous scan was running.
+        """
+        if not self.high_water_mark:
+            return None
+
+        mark = datetime.strptime(self.high_water_mark[:19],
+                                 RFC3339_FORMAT[:-1])
+
+        return (mark - timedelta(seconds=overlap)).strftime(RFC3339_FORMAT)
+
+    def save(self, path: str):
+        """
+        Writes the index to a local snapshot file.
+        """
+        snapshot = {
+            'source_bucket': self.source_bucket,
+            'destination_bucket': self.destination_bucket,
+            'high_water_mark': self.high_water_mark,
+            'last_full_scan': self.last_full_scan,
+            'latest_operation_by_prefix': self.latest_operation_by_prefix,
+            'removed_operation_names': sorted(self.removed_operation_names)
+        }
+
+        # Replace the snapshot at once, an interrupted write keeps the last one
+        tmp_path = f'{path}.tmp'
+
+        with open(tmp_path, 'w') as snapshot_file:
+            json.dump(snapshot, snapshot_file)
+
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Optional[str], source_bucket: str,
+             destination_bucket: str) -> 'OperationIndex':
+        """
+        Reads the index from a local snapshot file. Returns an empty index
+        if there is no snapshot or it was taken for other buckets.
+        """
+        index = cls(source_bucket, destination_bucket)
+
+        if not path or not os.path.exists(path):
+            return index
+
+        with open(path) as snapshot_file:
+            snapshot = json.load(snapshot_file)
+
+        if snapshot['source_bucket'] != source_bucket or \
+                snapshot['destination_bucket'] != destination_bucket:
+            logger.warning(
+                f'Ignoring the operation snapshot `{path}` of other buckets')
+            return index
+
+        index.high_water_mark = snapshot['high_water_mark']
+        index.last_full_scan = snapshot['last_full_scan']
+        index.latest_operation_by_prefix = \
+            snapshot['latest_operation_by_prefix']
+        index.removed_operation_names = \
+            set(snapshot['removed_operation_names'])
+
+        logger.info(
+            f'Loaded {len(index.latest_operation_by_prefix)} prefixes from \
+                the operation snapshot `{path}`')
+
+        return index
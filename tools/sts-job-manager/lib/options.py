@@ -92,6 +92,8 @@ class STSJobManagerOptions():
                  allow_new_jobs_when_stalled=False,
                  publish_heartbeat=False,
                  stackdriver_project: Optional[str] = None,
+                 operation_snapshot_path: Optional[str] = None,
+                 full_state_scan_interval=21600,
                  bigquery_options: Optional[BigQueryOptions] = None):
         self.config_path = config_path
         self.source_bucket = source_bucket
@@ -105,6 +107,8 @@ class STSJobManagerOptions():
         self.allow_new_jobs_when_stalled = allow_new_jobs_when_stalled
         self.publish_heartbeat = publish_heartbeat
         self.stackdriver_project = stackdriver_project
+        self.operation_snapshot_path = operation_snapshot_path
+        self.full_state_scan_interval = full_state_scan_interval
         self.bigquery_options: BigQueryOptions = bigquery_options \
             if bigquery_options else BigQueryOptions()
 
@@ -178,6 +182,21 @@ class STSJobManagerOptions():
                             help='Determines how long to sleep between running \
                                 intervals. (default: %(default)s) \
                                 (unit: seconds)')
+        parser.add_argument('--operation-snapshot-path', type=str,
+                            default=self.operation_snapshot_path,
+                            help='A local JSON file keeping the latest \
+                                transfer operation of each prefix between \
+                                runs of this tool. If not set, the \
+                                operations are kept in memory only. \
+                                (default: %(default)s)')
+        parser.add_argument('--full-state-scan-interval', type=int,
+                            metavar='N',
+                            default=self.full_state_scan_interval,
+                            help='Determines how often all transfer \
+                                operations and deleted jobs are scanned. \
+                                State checks in between only request the \
+                                new and unfinished operations. \
+                                (default: %(default)s) (unit: seconds)')
 
     def assign_from_parsed_args(self, args: argparse.Namespace):
         if args.config_path:
@@ -211,6 +230,9 @@ class STSJobManagerOptions():
         self.publish_heartbeat = args.publish_heartbeat
         self.stackdriver_project = args.stackdriver_project \
             if args.stackdriver_project else None
+        self.operation_snapshot_path = args.operation_snapshot_path \
+            if args.operation_snapshot_path else None
+        self.full_state_scan_interval = args.full_state_scan_interval
 
         # Validity checks
         if self.job_interval < self.sleep_timeout:
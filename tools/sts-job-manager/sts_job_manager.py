@@ -32,6 +32,7 @@ from google.cloud import bigquery, monitoring_v3
 from constants import schemas
 from constants.status import (KNOWN_STATUSES, STATUS,
                               sts_operation_status_to_table_status)
+from lib.operation_index import OperationIndex
 from lib.options import STSJobManagerOptions
 from lib.services import Services
 from lib.table_util import get_table_identifier, get_table_ref
@@ -39,6 +40,13 @@ from lib.table_util import get_table_identifier, get_table_ref
 logger = logging.getLogger(__name__)
 logger.setLevel(os.environ.get("LOGLEVEL", "INFO").upper())
 
+# Operations created up to this long before the high-water mark are requested
+# again, covering the ones created while the previous scan was running
+OPERATION_SCAN_OVERLAP = 600  # seconds
+
+# Keeps the `operationNames` filter within the request URL length limit
+MAX_OPERATION_NAMES_PER_LIST = 50
+
 
 class Job:
     def __init__(self, data):
@@ -173,20 +181,13 @@ def insert_history(rows: List[object], services: Services,
         raise Exception('Error inserting one or more rows')
 
 
-def get_latest_operation_by_prefix(services: Services,
-                                   options: STSJobManagerOptions):
+def list_transfer_operations(services: Services, operation_filter: dict):
     """
-    Gets the latest transfer operation cooresponding to a prefix.
-    Returns a key-value object where the key is a prefix and the value is a
-    [TransferOperation](https://cloud.google.com/storage-transfer/docs/reference/rest/v1/transferOperations#resource-transferoperation).
+    Yields the transfer operations matching a filter, page by page.
     """
-    job_filter = json.dumps({"project_id": services.bigquery.project})
-
     request = services.sts.transferOperations().list(
-        name='transferOperations', filter=job_filter, pageSize=256)
-
-    latest_operation_by_prefix: Dict[str, dict] = {}
-    operation_to_prefix: Dict[str, str] = {}
+        name='transferOperations', filter=json.dumps(operation_filter),
+        pageSize=256)
 
     while request is not None:
         response = request.execute()
@@ -194,65 +195,18 @@ def get_latest_operation_by_prefix(services: Services,
         if not response:
             break
 
-        for operation in response['operations']:
-            transfer_spec = operation['metadata']['transferSpec']
-
-            if 'objectConditions' not in transfer_spec:
-                continue
-
-            object_conditions = transfer_spec['objectConditions']
-
-            if 'includePrefixes' not in object_conditions:
-                continue
-
-            if 'gcsDataSource' not in operation['metadata']['transferSpec']:
-                continue
-
-            if 'gcsDataSink' not in operation['metadata']['transferSpec']:
-                continue
-
-            if options.source_bucket != operation['metadata']['transferSpec'][
-                    'gcsDataSource']['bucketName']:
-                continue
-
-            if options.destination_bucket != operation['metadata'][
-                    'transferSpec']['gcsDataSink']['bucketName']:
-                continue
-
-            for prefix in object_conditions['includePrefixes']:
-                operation_to_set_for_prefix = None
-
-                if prefix not in latest_operation_by_prefix:
-                    # The prefix does not have an operation, let's use this one
-                    operation_to_set_for_prefix = operation
-                elif 'endTime' not in operation['metadata'] or \
-                        'endTime' not in latest_operation_by_prefix[prefix][
-                            'metadata']:
-
-                    # if end time is not available, use the start time
-                    if operation['metadata']['startTime'] > \
-                            latest_operation_by_prefix[prefix]['metadata'][
-                                'startTime']:
-                        latest_operation_by_prefix[prefix] = operation
-                elif operation['metadata']['endTime'] > \
-                        latest_operation_by_prefix[prefix]['metadata'][
-                            'endTime']:
-                    # This operation is newer than the assigned operation
-                    operation_to_set_for_prefix = operation
-
-                # Set the operation for the prefix
-                if operation_to_set_for_prefix:
-                    # unreference existing operation to prefix, if exists
-                    operation_to_prefix.pop(operation['name'], None)
-
-                    latest_operation_by_prefix[prefix] = operation
-                    operation_to_prefix[operation['name']] = prefix
+        yield from response['operations']
 
         request = services.sts.transferOperations().list_next(
             previous_request=request, previous_response=response)
 
-    # If the latest transferOperation is from a deleted job, we should not
-    # consider the operation for state management
+
+def get_deleted_job_operation_names(services: Services) -> List[str]:
+    """
+    Gets the latest transfer operation name of every deleted transfer job.
+    """
+    operation_names: List[str] = []
+
     deleted_job_request = services.sts.transferJobs().list(
         filter=json.dumps({
             "project_id": services.bigquery.project,
@@ -269,21 +223,99 @@ def get_latest_operation_by_prefix(services: Services,
             if 'latestOperationName' not in transferJob:
                 continue
 
-            operation_to_remove = transferJob['latestOperationName']
-
-            prefix = operation_to_prefix.pop(operation_to_remove, None)
-
-            if prefix:
-                latest_operation_by_prefix.pop(prefix, None)
+            operation_names.append(transferJob['latestOperationName'])
 
         deleted_job_request = services.sts.transferJobs().list_next(
             previous_request=deleted_job_request,
             previous_response=deleted_job_response)
 
-    return latest_operation_by_prefix
+    return operation_names
+
+
+def scan_all_operations(operation_index: OperationIndex, services: Services):
+    """
+    Rebuilds the operation index from every transfer operation of the project.
+    """
+    logger.info('Scanning all transfer operations...')
+
+    operation_index.clear()
+
+    for operation in list_transfer_operations(
+            services, {"project_id": services.bigquery.project}):
+        operation_index.add_operation(operation)
+
+    # If the latest transferOperation is from a deleted job, we should not
+    # consider the operation for state management
+    operation_index.remove_operations(
+        get_deleted_job_operation_names(services))
+
+    operation_index.last_full_scan = time.time()
+
+
+def scan_new_operations(operation_index: OperationIndex, services: Services):
+    """
+    Updates the operation index with the transfer operations created since
+    its high-water mark and the new state of its unfinished operations.
+    """
+    logger.info(
+        f'Scanning transfer operations created since \
+            `{operation_index.high_water_mark}`...')
+
+    refreshed_operation_names = set()
+
+    for operation in list_transfer_operations(services, {
+            "projectId": services.bigquery.project,
+            "minCreationTime": operation_index.get_min_creation_time(
+                OPERATION_SCAN_OVERLAP)}):
+        operation_index.add_operation(operation)
+        refreshed_operation_names.add(operation['name'])
+
+    unfinished_operation_names = [
+        name for name in operation_index.get_unfinished_operation_names()
+        if name not in refreshed_operation_names]
+
+    for i in range(0, len(unfinished_operation_names),
+                   MAX_OPERATION_NAMES_PER_LIST):
+        for operation in list_transfer_operations(services, {
+                "projectId": services.bigquery.project,
+                "operationNames": unfinished_operation_names[
+                    i:i + MAX_OPERATION_NAMES_PER_LIST]}):
+            operation_index.add_operation(operation)
+
+
+def get_latest_operation_by_prefix(
+        services: Services, options: STSJobManagerOptions,
+        operation_index: Optional[OperationIndex] = None):
+    """
+    Gets the latest transfer operation cooresponding to a prefix.
+    Returns a key-value object where the key is a prefix and the value is a
+    [TransferOperation](https://cloud.google.com/storage-transfer/docs/reference/rest/v1/transferOperations#resource-transferoperation).
+
+    When an operation index from a previous call is provided, only the
+    operations created since its high-water mark and its unfinished operations
+    are requested. Every `--full-state-scan-interval`, all the operations and
+    deleted jobs are scanned again to reconcile the index.
+    """
+    if operation_index is None:
+        operation_index = OperationIndex(
+            options.source_bucket, options.destination_bucket)
+
+    full_scan_timeout = time.time() - operation_index.last_full_scan >= \
+        options.full_state_scan_interval
+
+    if full_scan_timeout or operation_index.high_water_mark is None:
+        scan_all_operations(operation_index, services)
+    else:
+        scan_new_operations(operation_index, services)
+
+    if options.operation_snapshot_path:
+        operation_index.save(options.operation_snapshot_path)
+
+    return operation_index.latest_operation_by_prefix
 
 
-def manage_state(services: Services, options: STSJobManagerOptions):
+def manage_state(services: Services, options: STSJobManagerOptions,
+                 operation_index: Optional[OperationIndex] = None):
     """
     Gathers all prefix information from both STS and the database, then updates
     the corresponding rows where necessary.
@@ -295,7 +327,7 @@ def manage_state(services: Services, options: STSJobManagerOptions):
 
     # transfer operations from STS
     latest_operation_by_prefix = get_latest_operation_by_prefix(
-        services, options)
+        services, options, operation_index)
 
     history_rows: List[object] = []
     job_status_to_update: Dict[str, List[str]] = {
@@ -638,6 +670,9 @@ def interval(services: Services, options: STSJobManagerOptions):
     last_manage_jobs = 0.0
     last_jobs: Dict[str, Job] = {}
     jobs: Dict[str, Job] = {}
+    operation_index = OperationIndex.load(
+        options.operation_snapshot_path, options.source_bucket,
+        options.destination_bucket)
 
     while True:
         logging.info(f'Running main interval #{interval_count}...')
@@ -648,14 +683,14 @@ def interval(services: Services, options: STSJobManagerOptions):
 
         if job_timeout or metrics_timeout:
             last_jobs = jobs
-            jobs = manage_state(services, options)
+            jobs = manage_state(services, options, operation_index)
             last_state_check = time.time()
 
         if job_timeout:
             manage_jobs(jobs, last_jobs, services, options)
 
             # Regather metrics
-            jobs = manage_state(services, options)
+            jobs = manage_state(services, options, operation_index)
 
             last_manage_jobs = time.time()
 